@@ -1,5 +1,6 @@
 # Own's modules
 from client_modules.data_access.dynamo_handler import DynamoDBHandler
+from client_modules.data_access.schemas import CLIENT_SCHEMA
 import settings
 
 # Third-party libraries
@@ -18,6 +19,8 @@ class ClientDAO:
         self.clients_db = DynamoDBHandler(
             table_name=settings.CLIENTS_TABLE_NAME,
             partition_key="phone_number",
+            backend=settings.CLIENTS_DYNAMODB_BACKEND,
+            schema=CLIENT_SCHEMA,
         )
 
     def create_client(self, item: dict) -> dict:
@@ -45,6 +48,38 @@ class ClientDAO:
         response = self.clients_db.update_record(item)
         return response
 
+    def get_client(self, phone_number: str) -> dict:
+        """
+        Attempts to retrieve a single client by its phone number.
+
+        :param phone_number: Phone number of the client
+        :type phone_number: str
+        :return: a dictionary that contains the response object, with the client as payload
+        :rtype: dict
+        """
+        response = self.clients_db.fetch_record({"phone_number": phone_number})
+        return response
+
+    def patch_client(self, phone_number: str, changes: dict, version: int) -> dict:
+        """
+        Attempts to write only the changed attributes of a client, if it is still on the given version.
+
+        :param phone_number: Phone number of the client
+        :type phone_number: str
+        :param changes: Attributes to set
+        :type changes: dict
+        :param version: Version of the client the changes were made on
+        :type version: int
+        :return: a dictionary that contains the response object, with the updated attributes as payload
+        :rtype: dict
+        """
+        response = self.clients_db.patch_record(
+            key={"phone_number": phone_number},
+            changes=changes,
+            expected_version=version,
+        )
+        return response
+
     def fetch_client(self, primary_key: str, query_value: str) -> dict:
         """
         Attempts to retrieve a client record from the DynamoDB table.
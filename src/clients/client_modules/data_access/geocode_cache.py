@@ -0,0 +1,235 @@
+# Python's libraries
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Dict
+from typing import Tuple
+
+# Own's modules
+from client_modules.utils.aws import AWSClientManager
+from settings import GEOCODE_CACHE_TABLE_NAME
+from settings import GEOCODE_CACHE_PRIMARY_KEY
+from settings import METRICS_NAMESPACE
+
+# Third-party libraries
+from aws_lambda_powertools import Logger
+from aws_lambda_powertools.metrics import MetricUnit
+from aws_lambda_powertools.metrics import single_metric
+
+
+ADDRESS_ABBREVIATIONS = {
+    "av": "avenida",
+    "ave": "avenida",
+    "avda": "avenida",
+    "blvd": "boulevard",
+    "blv": "boulevard",
+    "c": "calle",
+    "cll": "calle",
+    "calz": "calzada",
+    "carr": "carretera",
+    "col": "colonia",
+    "fracc": "fraccionamiento",
+    "priv": "privada",
+    "prol": "prolongacion",
+    "no": "numero",
+    "num": "numero",
+    "int": "interior",
+    "ext": "exterior",
+    "cp": "codigo postal",
+    "gdl": "guadalajara",
+    "jal": "jalisco",
+    "zap": "zapopan",
+    "tlaq": "tlaquepaque",
+    "mex": "mexico",
+}
+
+_lru = OrderedDict()
+_lru_lock = threading.Lock()
+_stats = {
+    "memory_hits": 0,
+    "table_hits": 0,
+    "negative_hits": 0,
+    "misses": 0,
+    "lookups": 0,
+    "lookup_latency_ms": 0.0,
+}
+
+
+def normalize_address(str_address: str) -> str:
+    """This function folds case, accents, punctuation, whitespace and common abbreviations
+    so the same address written in different ways shares a cache entry.
+
+    :param str_address: Address as received from the client
+    :type str_address: str
+    :return: Normalized address
+    :rtype: str
+    """
+    folded = unicodedata.normalize("NFKD", str_address.lower())
+    folded = "".join(char for char in folded if not unicodedata.combining(char))
+    folded = folded.replace("#", " numero ")
+    tokens = re.sub(r"[^\w]+", " ", folded).split()
+    return " ".join(ADDRESS_ABBREVIATIONS.get(token, token) for token in tokens)
+
+
+def get_cache_stats() -> Dict[str, float]:
+    """This function returns the counters of the container, including an estimate
+    of the Location Service time that was saved by the hits.
+
+    :return: Counters of the cache
+    :rtype: Dict[str, float]
+    """
+    stats = dict(_stats)
+    hits = stats["memory_hits"] + stats["table_hits"]
+    average_latency = (
+        stats["lookup_latency_ms"] / stats["lookups"] if stats["lookups"] else 0.0
+    )
+    stats["saved_ms_estimate"] = hits * average_latency
+    return stats
+
+
+def clear_memory_cache() -> None:
+    """This function drops the in-container entries and counters."""
+    with _lru_lock:
+        _lru.clear()
+        for stat_name in _stats:
+            _stats[stat_name] = 0
+
+
+class GeocodeCache:
+    """
+    A two-tier cache for geocoding results, an in-container LRU in front of a DynamoDB table with TTL.
+    Addresses that the Location Service could not match are cached for a shorter time.
+    """
+
+    MAX_MEMORY_ENTRIES = 1024
+    POSITIVE_TTL_SECONDS = 30 * 24 * 60 * 60
+    NEGATIVE_TTL_SECONDS = 60 * 60
+
+    def __init__(self, table=None):
+        self.logger = Logger()
+        self._table = table
+
+    @property
+    def table(self):
+        if self._table is None:
+            self._table = AWSClientManager().dynamodb.Table(GEOCODE_CACHE_TABLE_NAME)
+        return self._table
+
+    def get(self, str_address: str) -> Tuple[bool, Dict[str, float] | None]:
+        """This function looks for the coordinates of an address, first in memory and then in DynamoDB.
+
+        :param str_address: Address as received from the client
+        :type str_address: str
+        :return: Whether the address was cached and its coordinates, None for negative results
+        :rtype: Tuple[bool, Dict[str, float] | None]
+        """
+        cache_key = normalize_address(str_address)
+        now = time.time()
+
+        with _lru_lock:
+            entry = _lru.get(cache_key)
+            if entry is not None and entry[1] > now:
+                _lru.move_to_end(cache_key)
+            else:
+                entry = None
+
+        if entry is not None:
+            self._record_hit("memory", entry[0])
+            return True, entry[0]
+
+        try:
+            response = self.table.get_item(Key={GEOCODE_CACHE_PRIMARY_KEY: cache_key})
+        except Exception as error:
+            self.logger.warning(f"Geocode cache could not be read. Details {error}")
+            self._record_miss()
+            return False, None
+
+        item = response.get("Item")
+        # TTL deletion is not immediate, expired items can still be returned
+        if item is None or int(item["expires_at"]) <= now:
+            self._record_miss()
+            return False, None
+
+        location = None
+        if item.get("found"):
+            location = {
+                "latitude": float(item["latitude"]),
+                "longitude": float(item["longitude"]),
+            }
+        self._remember(cache_key, location, int(item["expires_at"]))
+        self._record_hit("table", location)
+        return True, location
+
+    def put(self, str_address: str, location: Dict[str, float] | None) -> None:
+        """This function stores the result of the Location Service, None is stored as a negative result.
+
+        :param str_address: Address as received from the client
+        :type str_address: str
+        :param location: Coordinates of the address
+        :type location: Dict[str, float] | None
+        """
+        cache_key = normalize_address(str_address)
+        ttl = self.POSITIVE_TTL_SECONDS if location else self.NEGATIVE_TTL_SECONDS
+        expires_at = int(time.time()) + ttl
+        self._remember(cache_key, location, expires_at)
+
+        item = {
+            GEOCODE_CACHE_PRIMARY_KEY: cache_key,
+            "found": location is not None,
+            "expires_at": expires_at,
+        }
+        if location:
+            item["latitude"] = Decimal(str(location["latitude"]))
+            item["longitude"] = Decimal(str(location["longitude"]))
+
+        try:
+            self.table.put_item(Item=item)
+        except Exception as error:
+            self.logger.warning(f"Geocode cache could not be written. Details {error}")
+
+    def record_lookup(self, latency_ms: float) -> None:
+        """This function records the latency of a call to the Location Service.
+
+        :param latency_ms: Duration of the call in milliseconds
+        :type latency_ms: float
+        """
+        with _lru_lock:
+            _stats["lookups"] += 1
+            _stats["lookup_latency_ms"] += latency_ms
+        self._emit_metric(
+            "GeocodeLookupLatency", MetricUnit.Milliseconds, latency_ms
+        )
+
+    def _remember(
+        self, cache_key: str, location: Dict[str, float] | None, expires_at: int
+    ) -> None:
+        with _lru_lock:
+            _lru[cache_key] = (location, expires_at)
+            _lru.move_to_end(cache_key)
+            while len(_lru) > self.MAX_MEMORY_ENTRIES:
+                _lru.popitem(last=False)
+
+    def _record_hit(self, tier: str, location: Dict[str, float] | None) -> None:
+        with _lru_lock:
+            _stats[f"{tier}_hits"] += 1
+            if location is None:
+                _stats["negative_hits"] += 1
+        self._emit_metric("GeocodeCacheHit", MetricUnit.Count, 1, tier=tier)
+
+    def _record_miss(self) -> None:
+        with _lru_lock:
+            _stats["misses"] += 1
+        self._emit_metric("GeocodeCacheMiss", MetricUnit.Count, 1)
+
+    def _emit_metric(self, name: str, unit: MetricUnit, value: float, **dimensions):
+        try:
+            with single_metric(
+                name=name, unit=unit, value=value, namespace=METRICS_NAMESPACE
+            ) as metric:
+                for dimension_name, dimension_value in dimensions.items():
+                    metric.add_dimension(name=dimension_name, value=dimension_value)
+        except Exception as error:
+            self.logger.warning(f"Metric {name} could not be emitted. Details {error}")
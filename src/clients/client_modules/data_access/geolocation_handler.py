@@ -1,7 +1,9 @@
 # Python's libraries
+import time
 from typing import Dict
 
 # Own's modules
+from client_modules.data_access.geocode_cache import GeocodeCache
 from client_modules.utils.aws import AWSClientManager
 import settings
 
@@ -11,10 +13,14 @@ from aws_lambda_powertools import Logger
 
 class Geolocation:
 
+    def __init__(self, cache: GeocodeCache = None):
+        self.cache = cache or GeocodeCache()
+
     def get_lat_and_long_from_street_address(
         self, str_address: str
     ) -> Dict[str, float]:
-        """This function will check AWS Locatio Service to match an address with a geolocation coordinates
+        """This function will check AWS Locatio Service to match an address with a geolocation coordinates.
+        Results, including addresses that could not be matched, are cached by normalized address.
 
 
         :param str_address: String representation of the address received by client inside the inputs payload
@@ -22,22 +28,33 @@ class Geolocation:
         """
         logger = Logger()
         if settings.environment != "local":
-            aws_resources = AWSClientManager()
             location = None
             if isinstance(str_address, str):
+                is_cached, location = self.cache.get(str_address)
+                if is_cached:
+                    logger.info(f"Location: {str_address} found in cache")
+                    return location
+
                 try:
+                    aws_resources = AWSClientManager()
+                    started_at = time.perf_counter()
                     aws_repsonse = aws_resources.location.search_place_index_for_text(
                         IndexName="HiBerrySearchIndex", Text=str_address
                     )
+                    self.cache.record_lookup((time.perf_counter() - started_at) * 1000)
                     if aws_repsonse["ResponseMetadata"]["HTTPStatusCode"] == 200:
-                        logger.info(f"Location: {str_address} found")
-                        lat = aws_repsonse["Results"][0]["Place"]["Geometry"]["Point"][
-                            1
-                        ]
-                        long = aws_repsonse["Results"][0]["Place"]["Geometry"]["Point"][
-                            0
-                        ]
-                        location = {"latitude": lat, "longitude": long}
+                        if aws_repsonse["Results"]:
+                            logger.info(f"Location: {str_address} found")
+                            lat = aws_repsonse["Results"][0]["Place"]["Geometry"][
+                                "Point"
+                            ][1]
+                            long = aws_repsonse["Results"][0]["Place"]["Geometry"][
+                                "Point"
+                            ][0]
+                            location = {"latitude": lat, "longitude": long}
+                        else:
+                            logger.warning(f"Location: {str_address} not found")
+                        self.cache.put(str_address, location)
                     else:
                         logger.warning("AWS Response was not successfull")
 
@@ -0,0 +1,24 @@
+# Own modules
+from client_modules.data_access.client_table import EntitySchema
+
+CLIENT_ERROR_SCHEMA = EntitySchema("ClientError", {"code": str, "value": str})
+
+CLIENT_SCHEMA = EntitySchema(
+    "Client",
+    {
+        "phone_number": str,
+        "name": str,
+        "address": str,
+        "second_address": str,
+        "address_latitude": float,
+        "address_longitude": float,
+        "second_address_latitude": float,
+        "second_address_longitude": float,
+        "discount": str,
+        "email": str,
+        "errors": [CLIENT_ERROR_SCHEMA],
+        "version": int,
+        "last_modified_by": str,
+        "last_modified_at": str,
+    },
+)
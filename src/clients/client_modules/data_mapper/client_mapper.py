@@ -1,4 +1,5 @@
 # Python's libraries
+from decimal import Decimal
 from typing import Dict
 from typing import Any
 from datetime import datetime
@@ -124,3 +125,76 @@ class ClientHelper:
             "last_modified_at": datetime.now().isoformat(),
         }
         return data
+
+    def build_client_patch(
+        self, stored_client: Dict[str, Any], username: str
+    ) -> Dict[str, Any]:
+        """This function will compare the attributes sent by the client, in client_data, with the stored client
+        and build the attributes to write. Only the addresses that changed are geocoded again.
+
+        Arguments:
+            stored_client -- the client as it is stored in DynamoDB
+            username -- who is sending the request
+
+        Returns:
+            Only the attributes that changed, empty when nothing changed
+        """
+        address_fields = {
+            "address": "ADDRESS_NEEDS_GEO",
+            "second_address": "SECOND_ADDRESS_NEEDS_GEO",
+        }
+        requested = dict(self.client_data)
+        for address_field_name in address_fields:
+            geolocation = requested.pop(f"{address_field_name}_geolocation", None)
+            if geolocation is not None:
+                requested[f"{address_field_name}_latitude"] = geolocation["latitude"]
+                requested[f"{address_field_name}_longitude"] = geolocation["longitude"]
+
+        changes = {
+            name: value
+            for name, value in requested.items()
+            if not is_same_value(stored_client.get(name), value)
+        }
+        if not changes:
+            return {}
+
+        client_errors = list(stored_client.get("errors") or [])
+        for address_field_name, error_code in address_fields.items():
+            if address_field_name not in changes:
+                continue
+
+            client_errors = [
+                error for error in client_errors if error.get("code") != error_code
+            ]
+            if f"{address_field_name}_latitude" in changes:
+                continue
+
+            geolocation = None
+            if changes[address_field_name] is not None:
+                geolocation = self.get_geolocation_data(
+                    address_field_name,
+                    f"{address_field_name}_geolocation",
+                    error_code,
+                    client_errors,
+                )
+            changes[f"{address_field_name}_latitude"] = (
+                float(geolocation.get("latitude", 0)) if geolocation else None
+            )
+            changes[f"{address_field_name}_longitude"] = (
+                float(geolocation.get("longitude", 0)) if geolocation else None
+            )
+
+        if client_errors != (stored_client.get("errors") or []):
+            changes["errors"] = client_errors
+        changes["last_modified_by"] = username
+        changes["last_modified_at"] = datetime.now().isoformat()
+        return changes
+
+
+def is_same_value(stored_value: Any, value: Any) -> bool:
+    """
+    Compares a value read from DynamoDB, where numbers are Decimal, with a value sent by the client.
+    """
+    if isinstance(stored_value, Decimal) and isinstance(value, float):
+        return stored_value == Decimal(str(value))
+    return stored_value == value
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from pydantic import StrictStr, StrictFloat, StrictBool
+from pydantic import conint
 
 
 class Geolocation(BaseModel):
@@ -26,3 +27,15 @@ class HIBerryClient(HIBerryBaseClient):
 
 class HIBerryClientUpdate(HIBerryBaseClient):
     pass
+
+
+class HIBerryClientPatch(BaseModel):
+    phone_number: StrictStr
+    version: conint(ge=0)
+    name: StrictStr | None = None
+    address: str | None = None
+    discount: StrictStr | None = None
+    second_address: str | None = None
+    address_geolocation: Geolocation | None = None
+    second_address_geolocation: Geolocation | None = None
+    email: StrictStr | None = None
@@ -5,6 +5,7 @@ from typing import Any
 # Own's modules
 from client_modules.dao.client_dao import ClientDAO
 from client_modules.models.client import HIBerryClient, HIBerryClientUpdate
+from client_modules.models.client import HIBerryClientPatch
 from client_modules.utils.doorman import DoormanUtil
 from client_modules.errors.auth_error import AuthError
 from client_modules.data_mapper.client_mapper import ClientHelper
@@ -193,6 +194,100 @@ def update_client(event: Dict[str, Any], context: LambdaContext) -> Dict[str, An
         )
 
 
+def patch_client(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    """
+    This function is the entry point of the process that will receive some attributes of a client
+    and the version that was read, and will attempt to write only the attributes that changed.
+
+    :param event: Custom object that can come from an APIGateway.
+    :type event: Dict
+    :param context: Regular lambda function context.
+    :type context: LambdaContext
+    :return: Custom object with the response from the lambda, it could be a 200 if the update was successful,
+            a 409 if the client was modified by someone else or >= 400 if there was an error.
+    :rtype: Dict
+    """
+
+    logger = Logger()
+    logger.info("Initializing Patch Client function")
+    doorman = DoormanUtil(event, logger)
+
+    try:
+        username = doorman.get_username_from_context()
+        is_auth = doorman.auth_user()
+        if not is_auth:
+            raise AuthError(f"User {username} is not authorized to update a client")
+
+        body = doorman.get_body_from_request()
+
+        logger.debug(f"Incoming data is {body=} and {username=}")
+
+        client_patch = HIBerryClientPatch(**body)
+        dao = ClientDAO()
+        stored_response = dao.get_client(client_patch.phone_number)
+        if stored_response.get("status") != "success":
+            return doorman.build_response(
+                payload={"message": stored_response.get("message", "Client not found")},
+                status_code=stored_response.get("status_code", 500),
+            )
+
+        stored_client = stored_response["payload"]
+        version_response = dao.clients_db.check_version(stored_client, client_patch.version)
+        if version_response["status"] != "success":
+            return doorman.build_response(
+                payload={"message": version_response["message"], **version_response["payload"]},
+                status_code=version_response["status_code"],
+            )
+
+        builder = ClientHelper(
+            client_patch.model_dump(
+                exclude_unset=True, exclude={"phone_number", "version"}
+            )
+        )
+        changes = builder.build_client_patch(stored_client, username)
+        if not changes:
+            logger.info(f"Client {client_patch.phone_number} did not change")
+            return doorman.build_response(
+                payload={**version_response["payload"], "changes": {}},
+                status_code=200,
+            )
+
+        patch_response = dao.patch_client(
+            client_patch.phone_number, changes, client_patch.version
+        )
+        if patch_response.get("status") != "success":
+            return doorman.build_response(
+                payload={"message": patch_response.get("message", "Update failed")},
+                status_code=patch_response.get("status_code", 500),
+            )
+
+        logger.info(
+            f"Client {client_patch.phone_number} updated attributes: {list(changes)}"
+        )
+        return doorman.build_response(payload=patch_response["payload"], status_code=200)
+
+    except ValidationError as validation_error:
+        error_details = "Some fields failed validation: " + str(validation_error)
+        logger.error(error_details)
+        return doorman.build_response(
+            payload={"message": error_details}, status_code=400
+        )
+
+    except AuthError as auth_error:
+        error_details = str(auth_error)
+        logger.error(error_details)
+        return doorman.build_response(
+            payload={"message": error_details}, status_code=403
+        )
+
+    except Exception as e:
+        error_details = f"Error updating the client: {e}"
+        logger.error(error_details, exc_info=True)
+        return doorman.build_response(
+            payload={"message": error_details}, status_code=500
+        )
+
+
 def retrieve_client(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
     """This function is the entry point of this process that queries clients table and return the data related to the phone number.
 
@@ -4,3 +4,12 @@ import os
 environment = os.environ.get("APP_ENVIRONMENT", "local")
 CLIENTS_TABLE_NAME = "Clients"
 CLIENTS_PRIMARY_KEY = "phone_number"
+GEOCODE_CACHE_TABLE_NAME = "GeocodeCache"
+GEOCODE_CACHE_PRIMARY_KEY = "address"
+METRICS_NAMESPACE = "HiBerry"
+# Bodies smaller than this are not compressed, the level applies to gzip (1-9) and brotli (0-11)
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.environ.get("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+RESPONSE_COMPRESSION_LEVEL = int(os.environ.get("RESPONSE_COMPRESSION_LEVEL", "6"))
+# resource uses the boto3 Table resource, client uses the low-level client with the compiled converters of the
+# schema, which returns numbers as int and float instead of Decimal
+CLIENTS_DYNAMODB_BACKEND = os.environ.get("CLIENTS_DYNAMODB_BACKEND", "resource")
@@ -1,21 +1,36 @@
 # Python's libraries
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
 from typing import Dict
 from typing import Any
 
 # Own's modules
 from order_modules.dao.order_dao import OrderDAO
+from order_modules.data_mapper.order_batch_mapper import OrderBatchHelper
 from order_modules.data_mapper.order_mapper import OrderHelper
 from order_modules.models.order import (
+    DRIVER_STOP_FIELDS,
+    DriverStopsRequest,
     HIBerryOrder,
+    HIBerryOrderPatch,
     HIBerryOrderUpdate,
+    OrderChangesRequest,
     OrderPrimaryKey,
-    DeliveryDateMixin,
+    OrdersBatchRequest,
+    OrdersPageRequest,
 )
+from order_modules.utils.change_stamp import format_change_stamp
+from order_modules.utils.cursor import encode_cursor
 from order_modules.utils.doorman import DoormanUtil
+from order_modules.utils.etag import build_etag
+from order_modules.utils.etag import etag_matches
 from order_modules.errors.auth_error import AuthError
 from order_modules.errors.business_error import BusinessError
 
 from settings import ORDERS_PRIMARY_KEY
+from settings import CHANGES_SAFETY_LAG_SECONDS
+from settings import TOMBSTONE_TTL_DAYS
 
 # Third-party libraries
 from pydantic import ValidationError
@@ -39,6 +54,8 @@ def create_order(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any
 
     logger = Logger()
     logger.info("Initializing Create Order function")
+    builder = None
+    is_saved = False
     try:
         doorman = DoormanUtil(event, logger)
         username = doorman.get_username_from_context()
@@ -61,6 +78,7 @@ def create_order(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any
         create_response = dao.create_order(order_db_data)
 
         if create_response["status_code"] == 201:
+            is_saved = True
             order_status = order_db_data["status"]
             assigned_driver = order_db_data["driver"]
             errors = order_db_data["errors"]
@@ -116,6 +134,121 @@ def create_order(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any
             payload={"message": error_details}, status_code=500
         )
 
+    finally:
+        # The slot reserved for the order is given back unless the order was written
+        if builder is not None and not is_saved:
+            builder.release_capacity()
+
+
+def create_orders_batch(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    """This function is the entry point of the bulk import of orders, like the orders of a wholesale customer
+    or a Shopify backlog. Each order is validated, geocoded and assigned on its own, addresses are geocoded
+    concurrently and the orders are written with BatchWriteItem.
+
+    :param event: Custom object that comes from an APIGateway, the body has the list of orders
+    :type event: Dict
+    :param context: Regular lambda function context
+    :type context: LambdaContext
+    :return: Custom object with the result of each order in the same position it was received, it is a 201
+    if every order was created, a 207 if some of them failed, a 400 if none of them was created or >= 400 if the
+    request was not valid
+    :rtype: Dict
+    """
+
+    logger = Logger()
+    logger.info("Initializing Create Orders Batch function")
+    doorman = DoormanUtil(event, logger)
+    try:
+        username = doorman.get_username_from_context()
+        is_auth = doorman.auth_user()
+        if is_auth is False:
+            raise AuthError(f"User {username} is not authorized to create orders")
+
+        batch_request = OrdersBatchRequest(**doorman.get_body_from_request())
+        results = [None] * len(batch_request.orders)
+        positions = []
+        orders_data = []
+        for position, order in enumerate(batch_request.orders):
+            try:
+                orders_data.append(HIBerryOrder(**order).model_dump())
+                positions.append(position)
+            except ValidationError as validation_error:
+                results[position] = {
+                    "status_code": 400,
+                    "message": f"Some fields failed validation: {validation_error.errors()}",
+                }
+
+        logger.info(f"Processing {len(orders_data)} valid orders of {len(results)}")
+        batch = OrderBatchHelper(orders_data)
+        built = batch.build_orders(username=username)
+        to_write = [position for position, result in enumerate(built) if "order" in result]
+        for position, result in enumerate(built):
+            if "order" not in result:
+                results[positions[position]] = result
+
+        if to_write:
+            dao = OrderDAO()
+            write_response = dao.create_orders([built[position]["order"] for position in to_write])
+            failures = write_response["payload"]["failures"]
+            batch.release_capacity([to_write[failure["position"]] for failure in failures])
+            for failure in failures:
+                results[positions[to_write[failure["position"]]]] = {
+                    "status_code": 500,
+                    "message": failure["message"],
+                }
+            for written in write_response["payload"]["written"]:
+                order_db_data = built[to_write[written]]["order"]
+                results[positions[to_write[written]]] = {
+                    "status_code": 201,
+                    "id": order_db_data["id"],
+                    "delivery_date": order_db_data["delivery_date"],
+                    "latitude": order_db_data["latitude"],
+                    "longitude": order_db_data["longitude"],
+                    "status": order_db_data["status"],
+                    "assigned_driver": order_db_data["driver"],
+                    "errors": order_db_data["errors"],
+                }
+
+        created = sum(1 for result in results if result["status_code"] == 201)
+        logger.info(f"{created} orders of {len(results)} were created")
+        if created == len(results):
+            status_code = 201
+        elif created == 0:
+            status_code = 400
+        else:
+            status_code = 207
+        return doorman.build_response(
+            payload={
+                "created": created,
+                "failed": len(results) - created,
+                "results": [
+                    {"index": position, **result} for position, result in enumerate(results)
+                ],
+            },
+            status_code=status_code,
+        )
+
+    except ValidationError as validation_error:
+        error_details = f"Some fields failed validation: {validation_error.errors()}"
+        logger.error(error_details)
+        return doorman.build_response(
+            payload={"message": error_details}, status_code=400
+        )
+
+    except AuthError as auth_error:
+        error_details = f"Not authorized. {auth_error}"
+        logger.error(error_details)
+        return doorman.build_response(
+            payload={"message": error_details}, status_code=403
+        )
+
+    except Exception as e:
+        error_details = f"Error processing the orders: {e}."
+        logger.error(error_details, exc_info=True)
+        return doorman.build_response(
+            payload={"message": error_details}, status_code=500
+        )
+
 
 def retrieve_orders(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
     """This function is the entry point of this process that queries orders table and return all the elements for specific date.
@@ -143,18 +276,73 @@ def retrieve_orders(event: Dict[str, Any], context: LambdaContext) -> Dict[str,
             _query_param_name="date", _is_required=True
         )
 
-        logger.debug(f"Incoming data is {date=} and {username=}")
+        limit = doorman.get_query_param_from_request(_query_param_name="limit")
+        cursor = doorman.get_query_param_from_request(_query_param_name="cursor")
+        fields = doorman.get_query_param_from_request(_query_param_name="fields")
+
+        logger.debug(
+            f"Incoming data is {date=}, {limit=}, {cursor=}, {fields=} and {username=}"
+        )
 
-        orders_date = DeliveryDateMixin(delivery_date=date)
+        page_request = OrdersPageRequest(
+            delivery_date=date, limit=limit, cursor=cursor, fields=fields
+        )
 
         dao = OrderDAO()
-        orders = dao.fetch_orders(
-            primary_key=ORDERS_PRIMARY_KEY, query_value=orders_date.delivery_date
+        # Read before the orders, a write that lands in between changes it again afterwards
+        marker = dao.fetch_marker(page_request.delivery_date)
+        cache_headers = {}
+        if marker is not None:
+            etag = build_etag(
+                marker, page_request.limit, page_request.cursor, page_request.fields
+            )
+            cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+            if etag_matches(doorman.get_header_from_request("If-None-Match"), etag):
+                logger.debug(f"Orders of {page_request.delivery_date} did not change")
+                return doorman.build_response(
+                    payload=None, status_code=304, headers=cache_headers
+                )
+
+        if not page_request.is_paginated:
+            orders = dao.fetch_orders(
+                primary_key=ORDERS_PRIMARY_KEY,
+                query_value=page_request.delivery_date,
+                fields=page_request.fields,
+            )
+            output_data = orders["payload"]
+            logger.debug(f"Outgoing data is {output_data=}")
+
+            return doorman.build_response(
+                payload=output_data, status_code=200, headers=cache_headers
+            )
+
+        page = dao.fetch_orders_page(
+            delivery_date=page_request.delivery_date,
+            limit=page_request.limit,
+            exclusive_start_key=page_request.exclusive_start_key,
+            fields=page_request.fields,
         )
-        output_data = orders["payload"]
+        if page["status"] != "success":
+            return doorman.build_response(
+                payload={"message": page["message"]},
+                status_code=page.get("status_code", 500),
+            )
+
+        output_data = {
+            "orders": page["payload"]["items"],
+            "next_cursor": encode_cursor(page["payload"]["last_evaluated_key"]),
+        }
         logger.debug(f"Outgoing data is {output_data=}")
 
-        return doorman.build_response(payload=output_data, status_code=200)
+        return doorman.build_response(
+            payload=output_data, status_code=200, headers=cache_headers
+        )
+
+    except ValidationError as validation_error:
+        error_details = f"Some query parameters failed validation: {validation_error.errors()}"
+        logger.error(error_details)
+        output_data = {"message": error_details}
+        return doorman.build_response(payload=output_data, status_code=400)
 
     except AuthError as auth_error:
         error_details = f"Not authorized. {auth_error}"
@@ -169,6 +357,177 @@ def retrieve_orders(event: Dict[str, Any], context: LambdaContext) -> Dict[str,
         return doorman.build_response(payload=output_data, status_code=500)
 
 
+def retrieve_driver_stops(
+    event: Dict[str, Any], context: LambdaContext
+) -> Dict[str, Any]:
+    """This function is the entry point of the process that returns the stops of a driver for a specific date,
+    sorted by delivery_sequence and only with the attributes the driver needs.
+
+    :param event: Custom object that can come from an APIGateway.
+    :type event: Dict
+    :param context: Regular lambda function context
+    :type context: LambdaContext
+    :return: Custom object with the reponse from the lambda, it could be a 200, if the resources were found
+    or >= 400 if theras was an error
+    :rtype: Dict
+    """
+
+    logger = Logger()
+    logger.info("Initializing Retrieve Driver Stops function")
+    doorman = DoormanUtil(event, logger)
+
+    try:
+        username = doorman.get_username_from_context()
+        is_auth = doorman.auth_user()
+        if is_auth is False:
+            raise AuthError(f"User {username} is not authorized to retrieve driver stops")
+
+        date = doorman.get_query_param_from_request(
+            _query_param_name="date", _is_required=True
+        )
+        driver = doorman.get_query_param_from_request(
+            _query_param_name="driver", _is_required=True
+        )
+
+        logger.debug(f"Incoming data is {date=}, {driver=} and {username=}")
+
+        stops_request = DriverStopsRequest(delivery_date=date, driver=driver)
+
+        dao = OrderDAO()
+        stops = dao.fetch_driver_stops(
+            delivery_date=stops_request.delivery_date,
+            driver=stops_request.driver,
+            fields=list(DRIVER_STOP_FIELDS),
+        )
+        if stops["status"] != "success":
+            return doorman.build_response(
+                payload={"message": stops["message"]},
+                status_code=stops.get("status_code", 500),
+            )
+
+        output_data = stops["payload"]
+        logger.debug(f"Outgoing data is {output_data=}")
+
+        return doorman.build_response(payload=output_data, status_code=200)
+
+    except ValidationError as validation_error:
+        error_details = f"Some query parameters failed validation: {validation_error.errors()}"
+        logger.error(error_details)
+        output_data = {"message": error_details}
+        return doorman.build_response(payload=output_data, status_code=400)
+
+    except AuthError as auth_error:
+        error_details = f"Not authorized. {auth_error}"
+        logger.error(error_details)
+        output_data = {"message": error_details}
+        return doorman.build_response(payload=output_data, status_code=403)
+
+    except Exception as e:
+        error_details = f"Error processing the request to fetch driver stops: {e}"
+        logger.error(error_details, exc_info=True)
+        output_data = {"message": error_details}
+        return doorman.build_response(payload=output_data, status_code=500)
+
+
+def retrieve_order_changes(
+    event: Dict[str, Any], context: LambdaContext
+) -> Dict[str, Any]:
+    """This function is the entry point of the process that returns the orders of a date that were created, updated
+    or deleted after a watermark, and the watermark to send in the next request. Without a watermark every order
+    of the date is returned, that is how clients start syncing. Watermarks older than the tombstones are answered
+    with a 410, the deletions before them are no longer known and clients must sync the whole date again.
+
+    :param event: Custom object that can come from an APIGateway.
+    :type event: Dict
+    :param context: Regular lambda function context
+    :type context: LambdaContext
+    :return: Custom object with the reponse from the lambda, it could be a 200, if the resources were found
+    or >= 400 if theras was an error
+    :rtype: Dict
+    """
+
+    logger = Logger()
+    logger.info("Initializing Retrieve Order Changes function")
+    doorman = DoormanUtil(event, logger)
+
+    try:
+        username = doorman.get_username_from_context()
+        is_auth = doorman.auth_user()
+        if is_auth is False:
+            raise AuthError(f"User {username} is not authorized to retrieve orders")
+
+        date = doorman.get_query_param_from_request(
+            _query_param_name="date", _is_required=True
+        )
+        since = doorman.get_query_param_from_request(_query_param_name="since")
+
+        logger.debug(f"Incoming data is {date=}, {since=} and {username=}")
+
+        changes_request = OrderChangesRequest(delivery_date=date, since=since)
+
+        # Taken before reading, changes stamped after it are returned again in the next request
+        requested_at = datetime.now(timezone.utc)
+        watermark = format_change_stamp(
+            requested_at - timedelta(seconds=CHANGES_SAFETY_LAG_SECONDS)
+        )
+
+        dao = OrderDAO()
+        if changes_request.since is None:
+            orders = dao.fetch_orders(
+                primary_key=ORDERS_PRIMARY_KEY,
+                query_value=changes_request.delivery_date,
+            )
+            changes = {**orders, "payload": {"orders": orders["payload"], "deleted": []}}
+        else:
+            since = format_change_stamp(changes_request.since)
+            oldest_since = format_change_stamp(
+                requested_at - timedelta(days=TOMBSTONE_TTL_DAYS)
+            )
+            if since < oldest_since:
+                return doorman.build_response(
+                    payload={
+                        "message": f"Changes are kept for {TOMBSTONE_TTL_DAYS} days, sync the whole date again",
+                        "full_resync": True,
+                    },
+                    status_code=410,
+                )
+            watermark = max(watermark, since)
+            changes = dao.fetch_changes(
+                delivery_date=changes_request.delivery_date, since=since
+            )
+
+        if changes["status"] != "success":
+            return doorman.build_response(
+                payload={"message": changes["message"]},
+                status_code=changes.get("status_code", 500),
+            )
+
+        output_data = {**changes["payload"], "watermark": watermark}
+        logger.debug(
+            f"Returning {len(output_data['orders'])} changed and {len(output_data['deleted'])} deleted orders"
+        )
+
+        return doorman.build_response(payload=output_data, status_code=200)
+
+    except ValidationError as validation_error:
+        error_details = f"Some query parameters failed validation: {validation_error.errors()}"
+        logger.error(error_details)
+        output_data = {"message": error_details}
+        return doorman.build_response(payload=output_data, status_code=400)
+
+    except AuthError as auth_error:
+        error_details = f"Not authorized. {auth_error}"
+        logger.error(error_details)
+        output_data = {"message": error_details}
+        return doorman.build_response(payload=output_data, status_code=403)
+
+    except Exception as e:
+        error_details = f"Error processing the request to fetch order changes: {e}"
+        logger.error(error_details, exc_info=True)
+        output_data = {"message": error_details}
+        return doorman.build_response(payload=output_data, status_code=500)
+
+
 def update_order(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
     """
     This function is the entry point of the process that will receive an order update request
@@ -185,6 +544,8 @@ def update_order(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any
 
     logger = Logger()
     logger.info("Initializing Update Order function")
+    builder = None
+    is_saved = False
     try:
         doorman = DoormanUtil(event, logger)
         username = doorman.get_username_from_context()
@@ -216,28 +577,24 @@ def update_order(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any
         )
         dao = OrderDAO()
 
+        logger.info(
+            f"Updating order for: {order_data.client_name} at {order_data.delivery_address} and id {order_id} with status {order_status}"
+        )
         original_date = order_data.original_date
         if original_date != order_data.delivery_date:
-            order_to_delete = OrderPrimaryKey(id=order_id, delivery_date=original_date)
-            delete_response = dao.delete_order(
-                delivery_date=order_to_delete.delivery_date, order_id=order_to_delete.id
+            order_to_move = OrderPrimaryKey(id=order_id, delivery_date=original_date)
+            update_response = dao.move_order(
+                order_db_data, original_date=order_to_move.delivery_date
             )
-
-            if delete_response["status"] != "success":
-                logger.error(f"Error deleting order: {delete_response['message']}")
-                return doorman.build_response(
-                    payload={"message": delete_response["message"]},
-                    status_code=delete_response.get("status_code", 500),
+            if update_response["status"] == "success":
+                logger.info(
+                    f"Order with ID {order_id} moved from {original_date=} to {order_data.delivery_date}"
                 )
-
-            logger.info(f"Order with ID {order_id} on {original_date=} deleted")
-
-        logger.info(
-            f"Updating order for: {order_data.client_name} at {order_data.delivery_address} and id {order_id} with status {order_status}"
-        )
-        update_response = dao.update_order(order_db_data)
+        else:
+            update_response = dao.update_order(order_db_data)
 
         if update_response["status_code"] == 200:
+            is_saved = True
             order_status = order_db_data["status"]
             assigned_driver = order_db_data["driver"]
             errors = order_db_data["errors"]
@@ -293,6 +650,125 @@ def update_order(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any
             payload={"message": error_details}, status_code=500
         )
 
+    finally:
+        # The slot reserved for the order is given back unless the order was written
+        if builder is not None and not is_saved:
+            builder.release_capacity()
+
+
+def patch_order(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    """
+    This function is the entry point of the process that will receive some attributes of an order
+    and the version the client read, and will attempt to write only the attributes that changed.
+
+    :param event: Custom object that can come from an API Gateway.
+    :type event: Dict
+    :param context: Regular lambda function context
+    :type context: LambdaContext
+    :return: Custom object with the response from the lambda, it could be a 200 if the update was successful,
+    a 409 if the order was modified by someone else or >= 400 if there was an error
+    :rtype: Dict
+    """
+
+    logger = Logger()
+    logger.info("Initializing Patch Order function")
+    builder = None
+    is_saved = False
+    try:
+        doorman = DoormanUtil(event, logger)
+        username = doorman.get_username_from_context()
+        is_auth = doorman.auth_user()
+        if is_auth is False:
+            raise AuthError(f"User {username} is not authorized to update a order")
+
+        body = doorman.get_body_from_request()
+
+        logger.debug(f"Incoming data is {body=} and {username=}")
+
+        order_patch = HIBerryOrderPatch(**body)
+        dao = OrderDAO()
+        stored_response = dao.fetch_order(order_patch.delivery_date, order_patch.id)
+        if stored_response["status"] != "success":
+            return doorman.build_response(
+                payload={"message": stored_response["message"]},
+                status_code=stored_response["status_code"],
+            )
+
+        stored_order = stored_response["payload"]
+        version_response = dao.orders_db.check_version(stored_order, order_patch.version)
+        if version_response["status"] != "success":
+            return doorman.build_response(
+                payload={"message": version_response["message"], **version_response["payload"]},
+                status_code=version_response["status_code"],
+            )
+
+        builder = OrderHelper(
+            order_patch.model_dump(
+                mode="json",
+                exclude_unset=True,
+                exclude={"id", "delivery_date", "version"},
+            )
+        )
+        changes = builder.build_order_patch(stored_order, username)
+        if not changes:
+            logger.info(f"Order {order_patch.id} did not change")
+            return doorman.build_response(
+                payload={"id": order_patch.id, **version_response["payload"], "changes": {}},
+                status_code=200,
+            )
+
+        patch_response = dao.patch_order(
+            order_patch.delivery_date, order_patch.id, changes, order_patch.version
+        )
+        if patch_response["status"] != "success":
+            return doorman.build_response(
+                payload={"message": patch_response["message"]},
+                status_code=patch_response.get("status_code", 500),
+            )
+
+        is_saved = True
+        if builder.reserved_slot is not None:
+            dao.capacity.release_order(stored_order)
+
+        logger.info(f"Order {order_patch.id} updated attributes: {list(changes)}")
+        return doorman.build_response(
+            payload={"id": order_patch.id, **patch_response["payload"]},
+            status_code=200,
+        )
+
+    except ValidationError as validation_error:
+        error_details = f"Some fields failed validation: {validation_error.errors()}"
+        logger.error(error_details)
+        return doorman.build_response(
+            payload={"message": error_details}, status_code=400
+        )
+
+    except BusinessError as business_error:
+        error_details = f"Order could not be processed due: {business_error}"
+        logger.error(error_details)
+        return doorman.build_response(
+            payload={"message": error_details}, status_code=400
+        )
+
+    except AuthError as auth_error:
+        error_details = f"Not authorized. {auth_error}"
+        logger.error(error_details)
+        return doorman.build_response(
+            payload={"message": error_details}, status_code=403
+        )
+
+    except Exception as e:
+        error_details = f"Error updating the order: {e}."
+        logger.error(error_details, exc_info=True)
+        return doorman.build_response(
+            payload={"message": error_details}, status_code=500
+        )
+
+    finally:
+        # The slot reserved for the order is given back unless the order was written
+        if builder is not None and not is_saved:
+            builder.release_capacity()
+
 
 def delete_order(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
     """
@@ -0,0 +1,4 @@
+import pathlib
+import sys
+
+sys.path.append(str(pathlib.Path(__file__).parent))
@@ -3,13 +3,30 @@ from typing import Dict
 from typing import Any
 
 # Own's modules
+from distance_metrics import get_distance_metric
+from distance_metrics import HaversineMetric
+from location_router import TravelPlanner
+from delivery_modules.dao.job_dao import SchedulingJobDAO
 from delivery_modules.dao.order_dao import OrderDAO
 from delivery_modules.processors.delivery_helpers import DeliveryProcessor
+from delivery_modules.processors.delivery_helpers import build_driver_route
+from delivery_modules.processors.job_tracker import SchedulingJob
+from delivery_modules.processors.order_helpers import OrderIndex
+from delivery_modules.processors.route_balancer import RouteBalancer
 from delivery_modules.utils.doorman import DoormanUtil
+from delivery_modules.utils.encoders import loads_json
+from delivery_modules.utils.job_queue import get_job_queue
 from delivery_modules.errors.auth_error import AuthError
+from delivery_modules.models.delivery import RerouteRequestModel
 from delivery_modules.models.delivery import ScheduleRequestModel
 from delivery_modules.models.delivery import UpdateScheduleRequestModel
 from settings import ORDERS_PRIMARY_KEY
+from settings import DISTANCE_METRIC
+from settings import ROAD_MATRIX_PATH
+from settings import DISTANCE_MATRIX_CACHE_DIR
+from settings import REROUTE_TIME_BUDGET_SECONDS
+from settings import SCHEDULING_JOB_TTL_DAYS
+from settings import SCHEDULING_QUEUE_URL
 
 # Third-party libraries
 from aws_lambda_powertools import Logger
@@ -17,16 +34,156 @@ from aws_lambda_powertools.utilities.typing import LambdaContext
 from pydantic import ValidationError
 
 
+def schedule_orders(
+    schedule_request: ScheduleRequestModel, job: SchedulingJob = None
+) -> Dict[str, Any]:
+    """This function retrieves the orders of a date, assigns drivers and writes the optimized routes.
+
+    :param schedule_request: Date, drivers and mode of the scheduling
+    :type schedule_request: ScheduleRequestModel
+    :param job: Job whose record is updated as every driver is scheduled, defaults to None
+    :type job: SchedulingJob, optional
+    :return: The number of rewritten orders and the orders that could not be scheduled
+    :rtype: Dict[str, Any]
+    """
+    logger = Logger()
+    schedule_for_date = schedule_request.date
+    available_drivers = schedule_request.available_drivers
+
+    logger.info(f"Date to process: {schedule_for_date}")
+    logger.info(
+        f"Available drivers to process: {', '.join(map(str, available_drivers))}"
+    )
+
+    dao = OrderDAO()
+    orders_for_today = dao.fetch_orders(
+        primary_key=ORDERS_PRIMARY_KEY, query_value=schedule_for_date
+    )
+    orders_for_today = orders_for_today.get("payload", [])
+    stored_schedule = DeliveryProcessor.snapshot_schedule(orders_for_today)
+    rewritten_orders = 0
+    unscheduled_orders = []
+
+    if len(orders_for_today) > 0:
+
+        drivers_reassigned = False
+        if len(available_drivers) == 1:
+            available_driver = available_drivers[0]
+            for order in orders_for_today:
+                order["driver"] = available_driver
+            logger.info(
+                f"All orders have been assigned to the available driver: {available_driver}"
+            )
+            drivers_reassigned = True
+
+        orders_to_schedule = orders_for_today
+        if schedule_request.mode == "balanced" and len(available_drivers) > 1:
+            orders_to_schedule, unscheduled_orders = RouteBalancer().assign_drivers(
+                orders_for_today, available_drivers
+            )
+            drivers_reassigned = True
+
+        logger.info(f"Orders for today {schedule_for_date}: {len(orders_for_today)}")
+        planner = TravelPlanner(
+            metric=get_distance_metric(
+                DISTANCE_METRIC,
+                matrix_path=ROAD_MATRIX_PATH,
+                cache_dir=DISTANCE_MATRIX_CACHE_DIR,
+            )
+        )
+        scheduler = DeliveryProcessor(planner=planner)
+        order_index = OrderIndex(orders_to_schedule, available_drivers)
+        unscheduled_orders += order_index.report_unscheduled()
+        if unscheduled_orders:
+            logger.warning(
+                f"{len(unscheduled_orders)} orders will not be scheduled: {unscheduled_orders}"
+            )
+            unscheduled_keys = {
+                (order["delivery_date"], order["id"]) for order in unscheduled_orders
+            }
+            dropped_orders = scheduler.drop_orders(
+                [
+                    order
+                    for order in orders_for_today
+                    if (order["delivery_date"], order["id"]) in unscheduled_keys
+                ],
+                dao,
+            )
+            rewritten_orders += dropped_orders
+            drivers_reassigned = drivers_reassigned or dropped_orders > 0
+        if drivers_reassigned:
+            dao.sync_capacity(schedule_for_date, orders_for_today)
+        on_driver_scheduled = job.record_driver if job else None
+        if schedule_request.mode == "incremental":
+            rewritten_orders += scheduler.process_insertions(
+                available_drivers,
+                order_index,
+                dao,
+                stored_schedule,
+                on_driver_scheduled=on_driver_scheduled,
+            )
+        else:
+            rewritten_orders += scheduler.process_records_in_parallel(
+                available_drivers,
+                order_index,
+                dao,
+                stored_schedule,
+                on_driver_scheduled=on_driver_scheduled,
+            )
+        logger.info(
+            f"{rewritten_orders} of {len(orders_for_today)} orders were rewritten"
+        )
+    else:
+        logger.warning("No orders to process today, check DB if this is ok")
+
+    return {
+        "rewritten_orders": rewritten_orders,
+        "unscheduled_orders": unscheduled_orders,
+    }
+
+
+def run_scheduling_job(message: Dict[str, Any]) -> None:
+    """This function runs a queued scheduling job and keeps its record up to date.
+
+    :param message: Message sent to the queue, with the job_id and the scheduling request
+    :type message: Dict[str, Any]
+    """
+    logger = Logger()
+    job = SchedulingJob(message["job_id"], SchedulingJobDAO())
+    logger.info(f"Running scheduling job {job.job_id}")
+    try:
+        schedule_request = ScheduleRequestModel(**message["request"])
+        job.start(schedule_request.available_drivers)
+        job.complete(schedule_orders(schedule_request, job))
+        logger.info(f"Scheduling job {job.job_id} completed")
+    except Exception as e:
+        error_details = f"Error while running the scheduling job: {e}"
+        logger.error(error_details)
+        job.fail(error_details)
+
+
+_scheduling_queue = None
+
+
+def get_scheduling_queue():
+    """Build the queue of the scheduling jobs once per container, the local queue keeps its worker thread."""
+    global _scheduling_queue
+    if _scheduling_queue is None:
+        _scheduling_queue = get_job_queue(SCHEDULING_QUEUE_URL, run_scheduling_job)
+    return _scheduling_queue
+
+
 def set_delivery_schedule_order(
     event: Dict[str, Any], context: LambdaContext
 ) -> Dict[str, Any]:
-    """This function will retrieve todays orders to generate an optimized path.
+    """This function will queue a job that retrieves the orders of a date to generate an optimized path.
+    API Gateway requests can not last more than 29 seconds, so the routes are computed by the worker function.
 
     :param event: Custom object that can come from an APIGateway, containing date field for delivery orders.
     :type event: Dict
     :param context: Regular lambda function context
     :type context: LambdaContext
-    :return: Custom object with the reponse from the lambda, it could be a 200, if the resources were found
+    :return: Custom object with the reponse from the lambda, it could be a 202 with the id of the job
     or >= 400 if theras was an error
     :rtype: Dict
     """
@@ -43,43 +200,28 @@ def set_delivery_schedule_order(
 
         logger.debug(f"Incoming data is {body=} and {username=}")
 
-        schedule_orders = ScheduleRequestModel(**body)
-        schedule_for_date = schedule_orders.date
-        available_drivers = schedule_orders.available_drivers
-
-        logger.info(f"Date to process: {schedule_for_date}")
-        logger.info(
-            f"Available drivers to process: {', '.join(map(str, available_drivers))}"
+        schedule_request = ScheduleRequestModel(**body)
+        job = SchedulingJob.build_record(
+            schedule_request.model_dump(), username, SCHEDULING_JOB_TTL_DAYS
         )
+        create_response = SchedulingJobDAO().create_job(job)
+        if create_response["status"] != "success":
+            return doorman.build_response(
+                payload={"message": create_response["message"]},
+                status_code=create_response["status_code"],
+            )
 
-        dao = OrderDAO()
-        orders_for_today = dao.fetch_orders(
-            primary_key=ORDERS_PRIMARY_KEY, query_value=schedule_for_date
+        get_scheduling_queue().send(
+            {"job_id": job["job_id"], "request": job["request"]}
         )
-        orders_for_today = orders_for_today.get("payload", [])
-
-        if len(orders_for_today) > 0:
-
-            if len(available_drivers) == 1:
-                available_driver = available_drivers[0]
-                for order in orders_for_today:
-                    order["driver"] = available_driver
-                logger.info(
-                    f"All orders have been assigned to the available driver: {available_driver}"
-                )
-
-            logger.info(
-                f"Orders for today {schedule_for_date}: {len(orders_for_today)}"
-            )
-            scheduler = DeliveryProcessor()
-            for driver_number in available_drivers:
-                scheduler.process_records_for_driver(
-                    driver_number, orders_for_today, dao
-                )
-        else:
-            logger.warning("No orders to process today, check DB if this is ok")
+        logger.info(f"Scheduling job {job['job_id']} queued")
         return doorman.build_response(
-            payload={"message": "scheduling completed"}, status_code=200
+            payload={
+                "message": "scheduling queued",
+                "job_id": job["job_id"],
+                "status": job["status"],
+            },
+            status_code=202,
         )
 
     except ValidationError as validation_error:
@@ -101,6 +243,70 @@ def set_delivery_schedule_order(
         return doorman.build_response(payload=output_data, status_code=500)
 
 
+def process_scheduling_jobs(
+    event: Dict[str, Any], context: LambdaContext
+) -> Dict[str, Any]:
+    """This function runs the scheduling jobs delivered by the SQS queue. Jobs record their own failures,
+    so messages are never sent back to the queue.
+
+    :param event: SQS event with one message per job
+    :type event: Dict
+    :param context: Regular lambda function context
+    :type context: LambdaContext
+    :return: An empty list of batch item failures
+    :rtype: Dict
+    """
+    logger = Logger()
+    logger.info("Initializing process_scheduling_jobs function")
+    for record in event.get("Records", []):
+        run_scheduling_job(loads_json(record["body"]))
+    return {"batchItemFailures": []}
+
+
+def get_scheduling_job(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    """This function will retrieve the status, the progress per driver and the result of a scheduling job.
+
+    :param event: Custom object that can come from an APIGateway, containing the job_id as path parameter.
+    :type event: Dict
+    :param context: Regular lambda function context
+    :type context: LambdaContext
+    :return: Custom object with the reponse from the lambda, it could be a 200 with the job
+    or >= 400 if theras was an error
+    :rtype: Dict
+    """
+
+    logger = Logger()
+    logger.info("Initializing get_scheduling_job function")
+    try:
+        doorman = DoormanUtil(event, logger)
+        username = doorman.get_username_from_context()
+        is_auth = doorman.auth_user()
+        if is_auth is False:
+            raise AuthError(f"User {username} is not authorized to check scheduling jobs")
+        job_id = doorman.get_path_param_from_request("job_id")
+
+        job_response = SchedulingJobDAO().fetch_job(job_id)
+        if job_response["status"] != "success":
+            return doorman.build_response(
+                payload={"message": job_response["message"]},
+                status_code=job_response["status_code"],
+            )
+
+        return doorman.build_response(payload=job_response["payload"], status_code=200)
+
+    except AuthError as auth_error:
+        error_details = f"Not authorized. {auth_error}"
+        logger.error(error_details)
+        output_data = {"message": error_details}
+        return doorman.build_response(payload=output_data, status_code=403)
+
+    except Exception as e:
+        error_details = f"Error while fetching the scheduling job. Details: {e}"
+        logger.error(error_details)
+        output_data = {"message": error_details}
+        return doorman.build_response(payload=output_data, status_code=500)
+
+
 def update_delivery_schedule_order(
     event: Dict[str, Any], context: LambdaContext
 ) -> Dict[str, Any]:
@@ -131,10 +337,23 @@ def update_delivery_schedule_order(
 
         dao = OrderDAO()
         orders_to_update = [
-                location.__dict__
-                for location in orders_with_new_sequence.orders
-            ]
-        dao.bulk_update(orders_to_update)
+            {
+                **location.__dict__,
+                "driver_route": build_driver_route(
+                    location.driver, location.delivery_date
+                ),
+            }
+            for location in orders_with_new_sequence.orders
+        ]
+        update_response = dao.bulk_update(orders_to_update)
+        if update_response["status"] != "success":
+            return doorman.build_response(
+                payload={
+                    "message": update_response["message"],
+                    "failures": (update_response["payload"] or {}).get("failures", []),
+                },
+                status_code=update_response["status_code"],
+            )
 
         return doorman.build_response(
             payload={"message": "scheduling updated"}, status_code=200
@@ -157,3 +376,97 @@ def update_delivery_schedule_order(
         logger.error(error_details)
         output_data = {"message": error_details}
         return doorman.build_response(payload=output_data, status_code=500)
+
+
+def reroute_driver(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    """This function will sequence again the stops that a driver has not delivered, starting from the
+    position the driver reports. Delivered orders are not touched.
+
+    :param event: Custom object that can come from an APIGateway, containing date, driver, latitude and longitude.
+    :type event: Dict
+    :param context: Regular lambda function context
+    :type context: LambdaContext
+    :return: Custom object with the reponse from the lambda, it could be a 200 with the remaining stops in order
+    or >= 400 if theras was an error
+    :rtype: Dict
+    """
+
+    logger = Logger()
+    logger.info("Initializing reroute_driver function")
+    try:
+        doorman = DoormanUtil(event, logger)
+        username = doorman.get_username_from_context()
+        is_auth = doorman.auth_user()
+        if is_auth is False:
+            raise AuthError(f"User {username} is not authorized to reroute a driver")
+        body = doorman.get_body_from_request()
+
+        logger.debug(f"Incoming data is {body=} and {username=}")
+
+        reroute_request = RerouteRequestModel(**body)
+        if not doorman.can_access_driver(reroute_request.driver):
+            raise AuthError(
+                f"User {username} is not authorized to reroute driver {reroute_request.driver}"
+            )
+        dao = OrderDAO()
+        orders_for_today = dao.fetch_orders(
+            primary_key=ORDERS_PRIMARY_KEY, query_value=reroute_request.date
+        )
+        orders_for_today = orders_for_today.get("payload", [])
+        stored_schedule = DeliveryProcessor.snapshot_schedule(orders_for_today)
+
+        # The position of the driver changes on every request, caching the matrices would not help
+        planner = TravelPlanner(
+            metric=HaversineMetric(), time_budget=REROUTE_TIME_BUDGET_SECONDS
+        )
+        remaining_stops, rewritten_orders = DeliveryProcessor(
+            planner=planner
+        ).reroute_driver(
+            reroute_request.driver,
+            orders_for_today,
+            {
+                "latitude": reroute_request.latitude,
+                "longitude": reroute_request.longitude,
+            },
+            dao,
+            stored_schedule,
+        )
+        logger.info(
+            f"Driver {reroute_request.driver} has {len(remaining_stops)} stops left, {rewritten_orders} rewritten"
+        )
+        return doorman.build_response(
+            payload={
+                "message": "driver rerouted",
+                "rewritten_orders": rewritten_orders,
+                "orders": [
+                    {
+                        "id": stop["id"],
+                        "delivery_time": stop["delivery_time"],
+                        "delivery_sequence": int(stop["delivery_sequence"]),
+                        "status": stop.get("status"),
+                        "latitude": float(stop["latitude"]),
+                        "longitude": float(stop["longitude"]),
+                    }
+                    for stop in remaining_stops
+                ],
+            },
+            status_code=200,
+        )
+
+    except ValidationError as validation_error:
+        error_details = f"Some fields failed validation: {validation_error.errors()}"
+        logger.error(error_details)
+        return doorman.build_response(
+            payload={"message": error_details}, status_code=400
+        )
+    except AuthError as auth_error:
+        error_details = f"Not authorized. {auth_error}"
+        logger.error(error_details)
+        output_data = {"message": error_details}
+        return doorman.build_response(payload=output_data, status_code=403)
+
+    except Exception as e:
+        error_details = f"Error while rerouting the driver. Details: {e}"
+        logger.error(error_details, exc_info=True)
+        output_data = {"message": error_details}
+        return doorman.build_response(payload=output_data, status_code=500)
@@ -0,0 +1,60 @@
+# Python libraries
+from typing import Dict
+from typing import Any
+
+# Own's modules
+from delivery_modules.data_access.dynamo_handler import DynamoDBHandler
+
+from settings import SCHEDULING_JOBS_TABLE_NAME
+from settings import SCHEDULING_JOBS_PRIMARY_KEY
+
+
+class SchedulingJobDAO:
+    """
+    A class for handling the records that track the scheduling jobs.
+    """
+
+    def __init__(self):
+        """
+        Initializes a new instance of the DAO class.
+        """
+        self.jobs_db = DynamoDBHandler(
+            table_name=SCHEDULING_JOBS_TABLE_NAME,
+            partition_key=SCHEDULING_JOBS_PRIMARY_KEY,
+        )
+
+    def create_job(self, job: Dict[str, Any]) -> dict:
+        """
+        Attempts to insert the record of a new job.
+
+        :param job: Job representation built as a dict
+        :type job: Dict[str, Any]
+        :return: a dictionary that contains the response object
+        :rtype: dict
+        """
+        response = self.jobs_db.put_records([job])
+        return response
+
+    def update_job(self, attributes: Dict[str, Any]) -> dict:
+        """
+        Attempts to update the given attributes of a job.
+
+        :param attributes: job_id and the attributes to update
+        :type attributes: Dict[str, Any]
+        :return: a dictionary that contains the response object
+        :rtype: dict
+        """
+        response = self.jobs_db.update_record(attributes)
+        return response
+
+    def fetch_job(self, job_id: str) -> dict:
+        """
+        Attempts to retrieve the record of a job.
+
+        :param job_id: Id returned when the job was queued
+        :type job_id: str
+        :return: a dictionary that contains the response object
+        :rtype: dict
+        """
+        response = self.jobs_db.fetch_record(key={SCHEDULING_JOBS_PRIMARY_KEY: job_id})
+        return response
@@ -1,12 +1,18 @@
 # Python libraries
+import uuid
 from typing import Dict
 from typing import List
 from typing import Any
 
 # Own's modules
 from delivery_modules.data_access.dynamo_handler import DynamoDBHandler
+from delivery_modules.utils.change_stamp import format_change_stamp
 
 from settings import ORDERS_TABLE_NAME
+from settings import CAPACITY_TABLE_NAME
+from settings import CAPACITY_PRIMARY_KEY
+from settings import COLLECTION_VERSIONS_TABLE_NAME
+from settings import COLLECTION_VERSIONS_PRIMARY_KEY
 
 # Third-party libraries
 from boto3.dynamodb.conditions import Key
@@ -24,18 +30,42 @@ class OrderDAO:
         self.orders_db = DynamoDBHandler(
             table_name=ORDERS_TABLE_NAME,
             partition_key="delivery_date",
+            sort_key="id",
+            version_attribute="version",
+        )
+        self.capacity_db = DynamoDBHandler(
+            table_name=CAPACITY_TABLE_NAME,
+            partition_key=CAPACITY_PRIMARY_KEY,
+            sort_key="slot",
+        )
+        self.versions_db = DynamoDBHandler(
+            table_name=COLLECTION_VERSIONS_TABLE_NAME,
+            partition_key=COLLECTION_VERSIONS_PRIMARY_KEY,
         )
 
     def bulk_update(self, items: List[Dict[str, Any]]) -> dict:
         """
-        Attempts to insert a new record for an order into the DynamoDB table.
+        Attempts to update the given attributes of several orders in the DynamoDB table.
+        The orders are stamped with changed_at so they show up in the changes feed, and the version
+        markers of their dates are replaced so dashboards fetch them again.
 
-        :param item: Order representation
-        :type item: dict
-        :return: a dictionary that contains the response object
+        :param items: Keys of the orders and the attributes to update
+        :type items: List[Dict[str, Any]]
+        :return: a dictionary that contains the response object, with the orders that failed in the payload
         :rtype: dict
         """
-        response = self.orders_db.update_records(items)
+        changed_at = format_change_stamp()
+        response = self.orders_db.update_records(
+            [{**item, "changed_at": changed_at} for item in items]
+        )
+        # Also when some orders failed, the ones that were written changed the dates
+        for delivery_date in {item["delivery_date"] for item in items}:
+            self.versions_db.update_record(
+                {
+                    COLLECTION_VERSIONS_PRIMARY_KEY: f"orders#{delivery_date}",
+                    "marker": uuid.uuid4().hex,
+                }
+            )
         return response
 
     def fetch_orders(self, primary_key: str, query_value: str) -> dict:
@@ -52,3 +82,41 @@ class OrderDAO:
         key_condition_expression = Key(primary_key).eq(query_value)
         response = self.orders_db.retrieve_records(key_condition_expression)
         return response
+
+    def sync_capacity(self, delivery_date: str, orders: List[Dict[str, Any]]) -> dict:
+        """
+        Rewrites the capacity ledger of a date with the number of orders per delivery_time and driver,
+        it must be used after drivers are reassigned outside of the orders functions. Orders without
+        a driver do not take a slot.
+
+        :param delivery_date: Date of the orders
+        :type delivery_date: str
+        :param orders: All the orders of the date
+        :type orders: List[Dict[str, Any]]
+        :return: a dictionary that contains the response object
+        :rtype: dict
+        """
+        key_condition_expression = Key(CAPACITY_PRIMARY_KEY).eq(delivery_date)
+        current_counters = self.capacity_db.retrieve_records(key_condition_expression)
+        counters = {
+            counter["slot"]: {**counter, "order_count": 0}
+            for counter in current_counters.get("payload") or []
+        }
+
+        for order in orders:
+            if order.get("driver") is None:
+                continue
+            slot = f"{order.get('delivery_time')}#{order.get('driver')}"
+            counter = counters.setdefault(
+                slot,
+                {
+                    CAPACITY_PRIMARY_KEY: delivery_date,
+                    "slot": slot,
+                    "delivery_time": order.get("delivery_time"),
+                    "driver": order.get("driver"),
+                    "order_count": 0,
+                },
+            )
+            counter["order_count"] += 1
+
+        return self.capacity_db.put_records(list(counters.values()))
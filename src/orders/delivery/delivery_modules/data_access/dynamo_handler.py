@@ -1,7 +1,12 @@
 # Python libraries
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+from functools import lru_cache
 from typing import Dict
 from typing import Any
 from typing import List
+from typing import Iterator
+from typing import Tuple
 
 # Own modules
 from delivery_modules.utils.aws import AWSClientManager
@@ -20,108 +25,395 @@ class DynamoDBHandler:
     HTTP_STATUS_OK = 200
     HTTP_STATUS_CREATED = 201
     HTTP_STATUS_NO_CONTENT = 204
+    HTTP_STATUS_MULTI_STATUS = 207
     HTTP_STATUS_BAD_REQUEST = 400
     HTTP_STATUS_FORBIDDEN = 403
     HTTP_STATUS_NOT_FOUND = 404
     HTTP_STATUS_INTERNAL_SERVER_ERROR = 500
+    MAX_TRANSACTION_ITEMS = 100
+    MAX_PARALLEL_UPDATES = 16
 
-    def __init__(self, table_name: str, partition_key: str, sort_key: str = None):
+    def __init__(
+        self,
+        table_name: str,
+        partition_key: str,
+        sort_key: str = None,
+        version_attribute: str = None,
+    ):
+        """
+        :param version_attribute: Attribute increased by one on every update, so clients holding an
+            older version can not patch the record, defaults to None
+        :type version_attribute: str, optional
+        """
         self.table_name = table_name
         self.partition_key = partition_key
         self.sort_key = sort_key
+        self.version_attribute = version_attribute
         aws_resources_manager = AWSClientManager()
         dynamodb_resource = aws_resources_manager.dynamodb
         self.table = dynamodb_resource.Table(table_name)
         self.logger = Logger()
 
-    def update_records(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def build_update_expression(
+        attribute_names: Tuple[str, ...],
+        version_attribute: str = None,
+        removed_names: Tuple[str, ...] = (),
+    ) -> Tuple[str, Dict[str, str], Tuple[str, ...]]:
+        """This function builds the SET expression for records with the same attributes,
+        it is computed once per shape and reused for every record.
+
+        :param attribute_names: Attributes that will be updated, in order
+        :type attribute_names: Tuple[str, ...]
+        :param version_attribute: Attribute to increase by one, defaults to None
+        :type version_attribute: str, optional
+        :param removed_names: Attributes that will be removed, defaults to ()
+        :type removed_names: Tuple[str, ...], optional
+        :return: The update expression, its attribute names and the placeholders of the values
+        :rtype: Tuple[str, Dict[str, str], Tuple[str, ...]]
+        """
+        expression_attribute_names = {
+            f"#attr{index}": name for index, name in enumerate(attribute_names)
+        }
+        placeholders = tuple(f":attr{index}" for index in range(len(attribute_names)))
+        clauses = []
+        if attribute_names:
+            clauses.append(
+                "SET "
+                + ", ".join(
+                    f"{name} = {placeholder}"
+                    for name, placeholder in zip(expression_attribute_names, placeholders)
+                )
+            )
+        if removed_names:
+            removed_placeholders = {
+                f"#removed{index}": name for index, name in enumerate(removed_names)
+            }
+            expression_attribute_names.update(removed_placeholders)
+            clauses.append("REMOVE " + ", ".join(removed_placeholders))
+        if version_attribute:
+            expression_attribute_names["#version"] = version_attribute
+            clauses.append("ADD #version :version_increment")
+        return " ".join(clauses), expression_attribute_names, placeholders
+
+    def build_update_request(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """This function maps a record into the arguments of an update, the key attributes
+        are used as Key and the rest of them are set, attributes with None as value are removed.
+
+        :param record: Key attributes and the attributes to update
+        :type record: Dict[str, Any]
+        :return: Arguments for update_item
+        :rtype: Dict[str, Any]
+        """
+        key_names = tuple(name for name in (self.partition_key, self.sort_key) if name)
+        attribute_names = tuple(
+            name
+            for name in record
+            if name not in key_names and record[name] is not None
+        )
+        removed_names = tuple(
+            name for name in record if name not in key_names and record[name] is None
+        )
+        (
+            update_expression,
+            expression_attribute_names,
+            placeholders,
+        ) = self.build_update_expression(
+            attribute_names, self.version_attribute, removed_names
+        )
+        expression_attribute_values = {
+            placeholder: record[name]
+            for placeholder, name in zip(placeholders, attribute_names)
+        }
+        if self.version_attribute:
+            expression_attribute_values[":version_increment"] = 1
+        return {
+            "TableName": self.table_name,
+            "Key": {name: record[name] for name in key_names},
+            "UpdateExpression": update_expression,
+            "ExpressionAttributeNames": expression_attribute_names,
+            "ExpressionAttributeValues": expression_attribute_values,
+        }
+
+    def update_records(
+        self, records: List[Dict[str, Any]], use_transactions: bool = True
+    ) -> Dict[str, Any]:
         """This function is used to update records to the DB. The dictionary must contain ONLY
         partition key, sort key and the attributs that will be updated to prevent any potential overwritten.
+        Records are written in TransactWriteItems chunks, one request per 100 records. Chunks that fail
+        are written again record by record through a bounded thread pool to find which records failed.
 
-        :param item: Order representation built as a dict
-        :type item: dict
-        :return: A summary of the update_item action
+        :param records: Orders representation built as dicts
+        :type records: List[Dict[str, Any]]
+        :param use_transactions: Write in transactions before falling back to single updates, defaults to True
+        :type use_transactions: bool, optional
+        :return: A summary of the update action, with the number of updated records and the failures as payload
         :rtype: Dict[str, Any]
         """
         try:
-            total_records = len(records)
-            self.logger.debug(f"Total records to update: {total_records}")
-            for index, record in enumerate(records, start=1):
-                self.logger.debug(f"Updating record {index} of {total_records}")
-
-                update_expression_parts = []
-                expression_attribute_values = {}
-                expression_attribute_names = {}
-
-                for key, value in record.items():
-                    if key not in ["delivery_date", "id"]:
-                        placeholder = f":{key}"
-                        expression_attribute_values[placeholder] = value
-                        update_expression_parts.append(f"#{key} = {placeholder}")
-                        expression_attribute_names[f"#{key}"] = key
-
-                update_expression = "SET " + ", ".join(update_expression_parts)
-                self.logger.info(f"Attributes Names to update {expression_attribute_names} - Attributes values to update {expression_attribute_values}, with expression {update_expression}.")
-
-                self.table.update_item(
-                    Key={"delivery_date": record["delivery_date"], "id": record["id"]},
-                    UpdateExpression=update_expression,
-                    ExpressionAttributeValues=expression_attribute_values,
-                    ExpressionAttributeNames=expression_attribute_names,
+            requests = [self.build_update_request(record) for record in records]
+            self.logger.debug(f"Total records to update: {len(requests)}")
+
+            keys = [tuple(request["Key"].values()) for request in requests]
+            if use_transactions and len(set(keys)) == len(keys):
+                pending_requests = []
+                for start in range(0, len(requests), self.MAX_TRANSACTION_ITEMS):
+                    chunk = requests[start : start + self.MAX_TRANSACTION_ITEMS]
+                    if not self.transact_update(chunk):
+                        pending_requests.extend(chunk)
+            else:
+                pending_requests = requests
+
+            failures = self.update_in_parallel(pending_requests)
+            updated_records = len(requests) - len(failures)
+            payload = {"updated": updated_records, "failures": failures}
+
+            if failures:
+                self.logger.error(f"{len(failures)} records could not be updated")
+                return self.build_response_object(
+                    status="error",
+                    status_code=(
+                        self.HTTP_STATUS_MULTI_STATUS
+                        if updated_records
+                        else self.HTTP_STATUS_INTERNAL_SERVER_ERROR
+                    ),
+                    message=f"{len(failures)} of {len(requests)} records could not be updated",
+                    payload=payload,
                 )
 
             return self.build_response_object(
                 status="success",
                 status_code=self.HTTP_STATUS_OK,
                 message="Records updated in DynamoDB",
+                payload=payload,
+            )
+        except Exception as error:
+            self.logger.error(f"Exception when saving record: Details: {error}")
+            return self.build_response_object(
+                status="error",
+                status_code=self.HTTP_STATUS_INTERNAL_SERVER_ERROR,
+                message=str(error),
+            )
+
+    def update_record(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """This function is used to update the given attributes of a single record.
+
+        :param record: Key attributes and the attributes to update
+        :type record: Dict[str, Any]
+        :return: A summary of the update action
+        :rtype: Dict[str, Any]
+        """
+        try:
+            request = self.build_update_request(record)
+            request.pop("TableName")
+            self.table.update_item(**request)
+            return self.build_response_object(
+                status="success",
+                status_code=self.HTTP_STATUS_OK,
+                message="Record updated in DynamoDB",
             )
         except ClientError as error:
             message = f"{error.response['Error']['Message']}. {error.response['Error']['Code']}"
-            self.logger.error(f"ClientError when saving record: Details: {message}")
+            self.logger.error(f"ClientError when updating record: Details: {message}")
             return self.build_response_object(
                 status="error",
                 status_code=error.response["ResponseMetadata"]["HTTPStatusCode"],
                 message=message,
             )
         except Exception as error:
-            self.logger.error(f"Exception when saving record: Details: {error}")
+            self.logger.error(f"Exception when updating record: Details: {error}")
             return self.build_response_object(
                 status="error",
                 status_code=self.HTTP_STATUS_INTERNAL_SERVER_ERROR,
                 message=str(error),
             )
 
-    def retrieve_records(self, key_condition_expression: Key) -> Dict[str, Any]:
+    def fetch_record(self, key: Dict[str, Any]) -> Dict[str, Any]:
+        """This function is used to fetch a single record by its key.
+
+        :param key: Key attributes of the record
+        :type key: Dict[str, Any]
+        :return: A summary of the get action, with the item as payload
+        :rtype: Dict[str, Any]
+        """
         try:
-            response = self.table.query(
-                KeyConditionExpression=key_condition_expression,
-            )
-            if response["ResponseMetadata"]["HTTPStatusCode"] == self.HTTP_STATUS_OK:
-                self.logger.info("Order were fetched from DynamoDB")
-                return self.build_response_object(
-                    status="success",
-                    status_code=self.HTTP_STATUS_OK,
-                    message=f"{len(response['Items'])} items were found",
-                    payload=response["Items"],
-                )
-            else:
-                message = response["Error"]["Message"]
-                self.logger.error(f"Failed saving record: Details: {message}")
+            item = self.table.get_item(Key=key).get("Item")
+            if item is None:
                 return self.build_response_object(
                     status="error",
-                    status_code=response["ResponseMetadata"]["HTTPStatusCode"],
-                    message=message,
+                    status_code=self.HTTP_STATUS_NOT_FOUND,
+                    message=f"No record was found for {key}",
                 )
+
+            return self.build_response_object(
+                status="success",
+                status_code=self.HTTP_STATUS_OK,
+                message="Record was found",
+                payload=item,
+            )
         except ClientError as error:
             message = f"{error.response['Error']['Message']}. {error.response['Error']['Code']}"
-            self.logger.error(f"ClientError when saving record: Details: {message}")
+            self.logger.error(f"ClientError when fetching record: Details: {message}")
             return self.build_response_object(
                 status="error",
                 status_code=error.response["ResponseMetadata"]["HTTPStatusCode"],
                 message=message,
             )
         except Exception as error:
-            self.logger.error(f"Exception when saving record: Details: {error}")
+            self.logger.error(f"Exception when fetching record: Details: {error}")
+            return self.build_response_object(
+                status="error",
+                status_code=self.HTTP_STATUS_INTERNAL_SERVER_ERROR,
+                message=str(error),
+            )
+
+    def transact_update(self, requests: List[Dict[str, Any]]) -> bool:
+        """This function writes up to 100 updates in a single TransactWriteItems request.
+
+        :param requests: Arguments of each update
+        :type requests: List[Dict[str, Any]]
+        :return: True if every update was written, False if the transaction was rejected
+        :rtype: bool
+        """
+        try:
+            self.table.meta.client.transact_write_items(
+                TransactItems=[{"Update": request} for request in requests]
+            )
+            return True
+        except ClientError as error:
+            message = f"{error.response['Error']['Message']}. {error.response['Error']['Code']}"
+            self.logger.warning(
+                f"Transaction of {len(requests)} records was rejected, updating them one by one. Details: {message}"
+            )
+            return False
+
+    def update_in_parallel(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """This function writes updates concurrently, every failure is reported with the key of its record.
+
+        :param requests: Arguments of each update
+        :type requests: List[Dict[str, Any]]
+        :return: The key and the error message of each record that could not be updated
+        :rtype: List[Dict[str, Any]]
+        """
+        if not requests:
+            return []
+
+        # Clients are thread safe, resources are not
+        client = self.table.meta.client
+        failures = []
+        max_workers = min(self.MAX_PARALLEL_UPDATES, len(requests))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(client.update_item, **request): request
+                for request in requests
+            }
+            for future in as_completed(futures):
+                error = future.exception()
+                if error is None:
+                    continue
+
+                if isinstance(error, ClientError):
+                    message = f"{error.response['Error']['Message']}. {error.response['Error']['Code']}"
+                else:
+                    message = str(error)
+                failures.append({**futures[future]["Key"], "message": message})
+        return failures
+
+    def put_records(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """This function is used to write complete records to the DB with a batch writer,
+        existing records with the same key are replaced.
+
+        :param records: List of items to write
+        :type records: List[Dict[str, Any]]
+        :return: A summary of the batch write action
+        :rtype: Dict[str, Any]
+        """
+        try:
+            with self.table.batch_writer() as batch:
+                for record in records:
+                    batch.put_item(Item=record)
+
+            return self.build_response_object(
+                status="success",
+                status_code=self.HTTP_STATUS_OK,
+                message=f"{len(records)} records written in DynamoDB",
+            )
+        except ClientError as error:
+            message = f"{error.response['Error']['Message']}. {error.response['Error']['Code']}"
+            self.logger.error(f"ClientError when writing records: Details: {message}")
+            return self.build_response_object(
+                status="error",
+                status_code=error.response["ResponseMetadata"]["HTTPStatusCode"],
+                message=message,
+            )
+        except Exception as error:
+            self.logger.error(f"Exception when writing records: Details: {error}")
+            return self.build_response_object(
+                status="error",
+                status_code=self.HTTP_STATUS_INTERNAL_SERVER_ERROR,
+                message=str(error),
+            )
+
+    def query_pages(
+        self,
+        key_condition_expression: Key,
+        page_size: int = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """This function is used to query the table one page at a time, following LastEvaluatedKey lazily.
+
+        :param key_condition_expression: Condition used to query the table
+        :type key_condition_expression: Key
+        :param page_size: Maximum number of items evaluated per request, defaults to None (up to 1 MB)
+        :type page_size: int, optional
+        :return: An iterator with the items of each page
+        :rtype: Iterator[List[Dict[str, Any]]]
+        """
+        query_arguments = {"KeyConditionExpression": key_condition_expression}
+        if page_size is not None:
+            query_arguments["Limit"] = page_size
+
+        while True:
+            response = self.table.query(**query_arguments)
+            yield response["Items"]
+
+            last_evaluated_key = response.get("LastEvaluatedKey")
+            if last_evaluated_key is None:
+                break
+            query_arguments["ExclusiveStartKey"] = last_evaluated_key
+
+    def retrieve_records(self, key_condition_expression: Key) -> Dict[str, Any]:
+        """This function is used to fetch all the records that match the key condition,
+        following the pagination of DynamoDB so results bigger than 1 MB are not truncated.
+
+        :param key_condition_expression: Condition used to query the table
+        :type key_condition_expression: Key
+        :return: A summary of the query action, with the items as payload
+        :rtype: Dict[str, Any]
+        """
+        try:
+            items = [
+                item
+                for page in self.query_pages(key_condition_expression)
+                for item in page
+            ]
+            self.logger.info("Order were fetched from DynamoDB")
+            return self.build_response_object(
+                status="success",
+                status_code=self.HTTP_STATUS_OK,
+                message=f"{len(items)} items were found",
+                payload=items,
+            )
+        except ClientError as error:
+            message = f"{error.response['Error']['Message']}. {error.response['Error']['Code']}"
+            self.logger.error(f"ClientError when retrieving records: Details: {message}")
+            return self.build_response_object(
+                status="error",
+                status_code=error.response["ResponseMetadata"]["HTTPStatusCode"],
+                message=message,
+            )
+        except Exception as error:
+            self.logger.error(f"Exception when retrieving records: Details: {error}")
             return self.build_response_object(
                 status="error",
                 status_code=self.HTTP_STATUS_INTERNAL_SERVER_ERROR,
@@ -1,9 +1,11 @@
 from typing import List
+from typing import Literal
 from datetime import datetime
 
 from pydantic import StrictStr
 from pydantic import StrictInt
 from pydantic import BaseModel
+from pydantic import confloat
 from pydantic import field_validator
 
 
@@ -18,6 +20,18 @@ def validate_date_format(date: StrictStr) -> StrictStr:
 class ScheduleRequestModel(BaseModel):
     date: StrictStr
     available_drivers: List[int]
+    # assigned keeps the drivers of the orders, balanced splits the stops across the available drivers,
+    # incremental only inserts the orders that are not scheduled yet in the existing routes
+    mode: Literal["assigned", "balanced", "incremental"] = "assigned"
+
+    validate_date = field_validator("date")(validate_date_format)
+
+
+class RerouteRequestModel(BaseModel):
+    date: StrictStr
+    driver: StrictInt
+    latitude: confloat(ge=-90, le=90)
+    longitude: confloat(ge=-180, le=180)
 
     validate_date = field_validator("date")(validate_date_format)
 
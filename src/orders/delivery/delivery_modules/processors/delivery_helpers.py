@@ -1,80 +1,525 @@
 # Python's libraries
+import multiprocessing
+import os
+from collections import defaultdict
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Tuple
 
 # Own's modules
 from location_router import TravelPlanner
-from delivery_modules.processors.order_helpers import OrderProcessor
+from delivery_modules.processors.order_helpers import OrderIndex
 
 # Third-party libraries
 from aws_lambda_powertools import Logger
 
 
+SCHEDULED_STATUS = "Programada"
+DELIVERED_STATUS = "Entregada"
+IN_PROGRESS_STATUSES = ("En ruta", DELIVERED_STATUS)
+SHIFTS = ("9 AM - 1 PM", "1 PM - 5 PM")
+OFFICES_LOCATION = {
+    "latitude": 20.7257943,
+    "longitude": -103.3792193,
+}  # HiBerry offices geolocation
+SCHEDULE_FIELDS = ("delivery_sequence", "driver", "status", "driver_route")
+# Attributes that place an order in the route of a driver and in DriverRouteIndex
+ROUTE_FIELDS = ("driver", "delivery_sequence", "driver_route")
+
+
+def build_driver_route(driver: int, delivery_date: str) -> str:
+    """
+    Build the partition key of the driver route index of the orders table.
+    """
+    return f"{int(driver)}#{delivery_date}"
+
+
 class DeliveryProcessor:
 
-    def process_records_for_driver(self, driver_number, orders_for_today, dao):
-        logger = Logger()
-        processor = OrderProcessor()
-        planner = TravelPlanner()
-        logger.info(f"Processing records for driver {driver_number}")
-        morning_records = processor.select_orders_by_delivery_range_time(
-            order_records=orders_for_today,
-            delivery_time_to_match="9 AM - 1 PM",
-            driver_to_match=driver_number,
-        )
-        if len(morning_records) > 0:
-            logger.info(
-                f"Records to schedule for 9 AM - 1 PM delivery for Driver {driver_number}: {len(morning_records)}"
-            )
-            morning_starting_point = {
-                "latitude": 20.7257943,
-                "longitude": -103.3792193,
-            }  # HiBerry offices geolocation
-            morning_ordered_locations = planner.find_shortest_path(
-                morning_records, morning_starting_point
+    def __init__(self, planner: TravelPlanner = None):
+        self.planner = planner or TravelPlanner()
+
+    @staticmethod
+    def snapshot_schedule(
+        orders_for_today: List[Dict[str, Any]]
+    ) -> Dict[Tuple[str, str], Tuple[Any, ...]]:
+        """
+        Copy the schedule stored for each order, it must be taken before drivers or sequences are changed
+        in memory, the planner updates delivery_sequence of the orders it receives.
+
+        Parameters:
+        - orders_for_today (list): Orders as fetched from DynamoDB.
+
+        Returns:
+        - dict: (delivery_date, id) as key and the stored delivery_sequence, driver and status as value.
+        """
+        return {
+            (order["delivery_date"], order["id"]): tuple(
+                order.get(field) for field in SCHEDULE_FIELDS
             )
-            afternoon_starting_point = {
-                "latitude": morning_ordered_locations[-1]["latitude"],
-                "longitude": morning_ordered_locations[-1]["longitude"],
+            for order in orders_for_today
+        }
+
+    def save_shift(
+        self,
+        ordered_locations: List[Dict[str, Any]],
+        dao,
+        stored_schedule: Dict[Tuple[str, str], Tuple[Any, ...]] | None,
+        status: str | None = SCHEDULED_STATUS,
+    ) -> int:
+        """
+        Write the schedule of the orders of a shift, skipping the orders whose stored schedule did not change.
+
+        Parameters:
+        - ordered_locations (list): Orders of the shift with their new delivery_sequence.
+        - dao: OrderDAO used to write the orders.
+        - stored_schedule (dict): Snapshot of the stored schedule, None to write every order.
+        - status (str): Status of the written orders, None to keep the status of each order.
+          Orders already on the street or delivered keep their stored schedule when a status is given.
+
+        Returns:
+        - int: Number of orders that were rewritten.
+        """
+        logger = Logger()
+        reduced_ordered_locations = [
+            {
+                "id": location["id"],
+                "delivery_date": location["delivery_date"],
+                "delivery_sequence": location["delivery_sequence"],
+                "driver": location["driver"],
+                "status": status or location.get("status"),
+                "driver_route": build_driver_route(
+                    location["driver"], location["delivery_date"]
+                ),
             }
-            reduced_morning_ordered_locations = [
+            for location in ordered_locations
+            if status is None or not is_in_progress(location)
+        ]
+        if stored_schedule is not None:
+            reduced_ordered_locations = [
+                location
+                for location in reduced_ordered_locations
+                if stored_schedule.get((location["delivery_date"], location["id"]))
+                != tuple(location[field] for field in SCHEDULE_FIELDS)
+            ]
+
+        if not reduced_ordered_locations:
+            return 0
+
+        update_response = dao.bulk_update(reduced_ordered_locations)
+        if update_response["status"] != "success":
+            logger.error(
+                f"Shift was not fully scheduled: {update_response['message']}"
+            )
+        return (update_response.get("payload") or {}).get(
+            "updated", len(reduced_ordered_locations)
+        )
+
+    def drop_orders(self, orders: List[Dict[str, Any]], dao) -> int:
+        """
+        Take out of the routes of their drivers the orders that will not be scheduled, their driver,
+        delivery_sequence and driver_route are removed so drivers no longer get them as stops.
+        Orders on the street or delivered keep their schedule.
+
+        Parameters:
+        - orders (list): Orders that will not be scheduled, their route attributes are removed in memory too.
+        - dao: OrderDAO used to write the orders.
+
+        Returns:
+        - int: Number of orders that were rewritten.
+        """
+        logger = Logger()
+        dropped_orders = [
+            order
+            for order in orders
+            if not is_in_progress(order)
+            and any(order.get(field) is not None for field in ROUTE_FIELDS)
+        ]
+        if not dropped_orders:
+            return 0
+
+        for order in dropped_orders:
+            for field in ROUTE_FIELDS:
+                order.pop(field, None)
+        update_response = dao.bulk_update(
+            [
                 {
-                    "id": location["id"],
-                    "delivery_date": location["delivery_date"],
-                    "delivery_sequence": location["delivery_sequence"],
-                    "driver": location["driver"],
-                    "status": "Programada",
+                    "id": order["id"],
+                    "delivery_date": order["delivery_date"],
+                    **{field: None for field in ROUTE_FIELDS},
                 }
-                for location in morning_ordered_locations
+                for order in dropped_orders
             ]
-            dao.bulk_update(reduced_morning_ordered_locations)
-            logger.info(f"Driver {driver_number} records scheduled for morning shift")
-        else:
-            afternoon_starting_point = {
-                "latitude": 20.7257943,
-                "longitude": -103.3792193,
-            }  # HiBerry offices geolocation
-
-        afternoon_records = processor.select_orders_by_delivery_range_time(
-            order_records=orders_for_today,
-            delivery_time_to_match="1 PM - 5 PM",
-            driver_to_match=driver_number,
         )
-        if len(afternoon_records) > 0:
+        if update_response["status"] != "success":
+            logger.error(
+                f"Orders were not fully taken out of their routes: {update_response['message']}"
+            )
+        return (update_response.get("payload") or {}).get(
+            "updated", len(dropped_orders)
+        )
+
+    def plan_driver_routes(
+        self,
+        driver_number: int,
+        order_index: OrderIndex,
+        starting_point: Dict[str, float] = None,
+        skip_in_progress: bool = True,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Sequence the morning and afternoon shifts of a driver, the afternoon starts where the morning ends.
+        Nothing is written, so it can run in another process.
+
+        Parameters:
+        - driver_number (int): Driver to schedule.
+        - order_index (OrderIndex): Orders of the date grouped by driver and delivery_time.
+        - starting_point (dict): Where the first route starts, defaults to the offices.
+        - skip_in_progress (bool): Keep the orders on the street or delivered out of the routes,
+          the remaining orders are sequenced after them.
+
+        Returns:
+        - list: The ordered orders of each shift that has orders.
+        """
+        logger = Logger()
+        routes = []
+        starting_point = dict(starting_point or OFFICES_LOCATION)
+        for delivery_time in SHIFTS:
+            records = order_index.select(driver_number, delivery_time)
+            last_sequence = 0
+            if skip_in_progress:
+                records, last_sequence, starting_point = split_in_progress(
+                    records, starting_point
+                )
+            if len(records) == 0:
+                continue
+
             logger.info(
-                f"Records to schedule for 1 PM - 5 PM delivery for Driver {driver_number}: {len(afternoon_records)}"
+                f"Records to schedule for {delivery_time} delivery for Driver {driver_number}: {len(records)}"
             )
-            afternoon_ordered_locations = planner.find_shortest_path(
-                afternoon_records, afternoon_starting_point
+            ordered_locations = continue_sequence(
+                self.planner.find_shortest_path(records, starting_point), last_sequence
             )
-            reduced_afternoon_ordered_locations = [
-                {
-                    "id": location["id"],
-                    "delivery_date": location["delivery_date"],
-                    "delivery_sequence": location["delivery_sequence"],
-                    "driver": location["driver"],
-                    "status": "Programada",
-                }
-                for location in afternoon_ordered_locations
-            ]
+            starting_point = {
+                "latitude": ordered_locations[-1]["latitude"],
+                "longitude": ordered_locations[-1]["longitude"],
+            }
+            routes.append(ordered_locations)
+        return routes
+
+    def reroute_driver(
+        self,
+        driver_number: int,
+        orders_for_today: List[Dict[str, Any]],
+        current_location: Dict[str, float],
+        dao,
+        stored_schedule=None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Sequence again the stops of a driver that were not delivered, starting from where the driver is.
+        Delivered stops keep their delivery_sequence and the remaining ones continue after them.
+
+        Parameters:
+        - driver_number (int): Driver to reroute.
+        - orders_for_today (list): All the orders of the date.
+        - current_location (dict): Latitude and longitude of the driver.
+        - dao: OrderDAO used to write the orders.
+        - stored_schedule (dict): Snapshot from snapshot_schedule, None to write every order.
+
+        Returns:
+        - tuple: The remaining stops in their new order and the number of orders that were rewritten.
+        """
+        remaining_orders = []
+        last_delivered_sequences = defaultdict(int)
+        for order in orders_for_today:
+            if order.get("status") != DELIVERED_STATUS:
+                remaining_orders.append(order)
+            elif (
+                order.get("driver") == driver_number
+                and order.get("delivery_sequence") is not None
+            ):
+                last_delivered_sequences[order.get("delivery_time")] = max(
+                    last_delivered_sequences[order.get("delivery_time")],
+                    int(order["delivery_sequence"]),
+                )
 
-            dao.bulk_update(reduced_afternoon_ordered_locations)
-            logger.info(f"Driver {driver_number} records scheduled for afternoon shift")
+        routes = self.plan_driver_routes(
+            driver_number,
+            OrderIndex(remaining_orders),
+            starting_point=current_location,
+            skip_in_progress=False,
+        )
+        rewritten_orders = 0
+        for ordered_locations in routes:
+            offset = last_delivered_sequences[ordered_locations[0]["delivery_time"]]
+            for location in ordered_locations:
+                location["delivery_sequence"] += offset
+            rewritten_orders += self.save_shift(
+                ordered_locations, dao, stored_schedule, status=None
+            )
+
+        return [location for route in routes for location in route], rewritten_orders
+
+    def plan_driver_insertions(
+        self, driver_number: int, order_index: OrderIndex
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Insert the orders that were not scheduled yet into the routes a driver already has,
+        shifts without a route are sequenced from scratch. Orders on the street or delivered
+        are left out and the route continues after them.
+
+        Parameters:
+        - driver_number (int): Driver to schedule.
+        - order_index (OrderIndex): Orders of the date grouped by driver and delivery_time.
+
+        Returns:
+        - list: The ordered orders of each shift that has orders.
+        """
+        logger = Logger()
+        routes = []
+        starting_point = dict(OFFICES_LOCATION)
+        for delivery_time in SHIFTS:
+            records, last_sequence, starting_point = split_in_progress(
+                order_index.select(driver_number, delivery_time), starting_point
+            )
+            if len(records) == 0:
+                continue
+
+            scheduled_records = sorted(
+                (record for record in records if is_scheduled(record)),
+                key=lambda record: record["delivery_sequence"],
+            )
+            new_records = [record for record in records if not is_scheduled(record)]
+            if scheduled_records:
+                logger.info(
+                    f"Inserting {len(new_records)} orders in the {delivery_time} route of Driver {driver_number}"
+                )
+                ordered_locations = self.planner.insert_locations(
+                    scheduled_records, new_records, starting_point
+                )
+            else:
+                ordered_locations = self.planner.find_shortest_path(
+                    records, starting_point
+                )
+            ordered_locations = continue_sequence(ordered_locations, last_sequence)
+            starting_point = {
+                "latitude": ordered_locations[-1]["latitude"],
+                "longitude": ordered_locations[-1]["longitude"],
+            }
+            routes.append(ordered_locations)
+        return routes
+
+    def process_insertions(
+        self,
+        drivers: List[int],
+        order_index: OrderIndex,
+        dao,
+        stored_schedule=None,
+        on_driver_scheduled: Callable[[int, int], None] = None,
+    ) -> int:
+        """
+        Insert the new orders of every driver and write only the orders whose schedule changed.
+
+        Parameters:
+        - drivers (list): Drivers to schedule.
+        - order_index (OrderIndex): Orders of the date grouped by driver and delivery_time.
+        - dao: OrderDAO used to write the orders.
+        - stored_schedule (dict): Snapshot from snapshot_schedule, None to write every order.
+        - on_driver_scheduled (callable): Called with the driver and its rewritten orders once its routes are written.
+
+        Returns:
+        - int: Number of orders that were rewritten.
+        """
+        rewritten_orders = 0
+        for driver_number in drivers:
+            driver_rewritten_orders = 0
+            for ordered_locations in self.plan_driver_insertions(driver_number, order_index):
+                driver_rewritten_orders += self.save_shift(
+                    ordered_locations, dao, stored_schedule
+                )
+            rewritten_orders += driver_rewritten_orders
+            if on_driver_scheduled:
+                on_driver_scheduled(driver_number, driver_rewritten_orders)
+        return rewritten_orders
+
+    def process_records_for_driver(
+        self,
+        driver_number,
+        orders_for_today,
+        dao,
+        stored_schedule=None,
+        order_index: OrderIndex = None,
+    ):
+        """
+        Sequence the morning and afternoon shifts of a driver and write the orders that changed.
+
+        Parameters:
+        - driver_number (int): Driver to schedule.
+        - orders_for_today (list): All the orders of the date.
+        - dao: OrderDAO used to write the orders.
+        - stored_schedule (dict): Snapshot from snapshot_schedule, None to write every order.
+        - order_index (OrderIndex): Orders of the date already grouped, built from orders_for_today if missing.
+
+        Returns:
+        - int: Number of orders that were rewritten.
+        """
+        logger = Logger()
+        logger.info(f"Processing records for driver {driver_number}")
+        order_index = order_index or OrderIndex(orders_for_today)
+        rewritten_orders = 0
+        for ordered_locations in self.plan_driver_routes(driver_number, order_index):
+            rewritten_orders += self.save_shift(ordered_locations, dao, stored_schedule)
+        logger.info(
+            f"Driver {driver_number} records scheduled, {rewritten_orders} rewritten"
+        )
+        return rewritten_orders
+
+    def process_records_in_parallel(
+        self,
+        drivers: List[int],
+        order_index: OrderIndex,
+        dao,
+        stored_schedule=None,
+        max_workers: int = None,
+        on_driver_scheduled: Callable[[int, int], None] = None,
+    ) -> int:
+        """
+        Sequence the routes of every driver in its own process and write the orders that changed
+        from this process. Lambda does not provide /dev/shm, so processes talk through pipes
+        instead of a multiprocessing pool. Routes that fail in a process are planned here.
+
+        Parameters:
+        - drivers (list): Drivers to schedule.
+        - order_index (OrderIndex): Orders of the date grouped by driver and delivery_time.
+        - dao: OrderDAO used to write the orders.
+        - stored_schedule (dict): Snapshot from snapshot_schedule, None to write every order.
+        - max_workers (int): Maximum number of processes running at the same time, defaults to the CPUs.
+        - on_driver_scheduled (callable): Called with the driver and its rewritten orders once its routes are written.
+
+        Returns:
+        - int: Number of orders that were rewritten.
+        """
+        logger = Logger()
+        max_workers = max_workers or os.cpu_count() or 1
+        routes_by_driver = {}
+        try:
+            for start in range(0, len(drivers), max_workers):
+                workers = []
+                for driver_number in drivers[start : start + max_workers]:
+                    receiver, sender = multiprocessing.Pipe(duplex=False)
+                    worker = multiprocessing.Process(
+                        target=plan_routes_in_worker,
+                        args=(sender, self, driver_number, order_index),
+                    )
+                    worker.start()
+                    sender.close()
+                    workers.append((driver_number, worker, receiver))
+
+                for driver_number, worker, receiver in workers:
+                    try:
+                        status, result = receiver.recv()
+                    except EOFError:
+                        status, result = "error", "process exited without a result"
+                    worker.join()
+                    if status == "success":
+                        routes_by_driver[driver_number] = result
+                    else:
+                        logger.warning(
+                            f"Routes of driver {driver_number} failed in a process: {result}"
+                        )
+        except OSError as error:
+            logger.warning(f"Processes could not be started. Details: {error}")
+
+        rewritten_orders = 0
+        for driver_number in drivers:
+            if driver_number not in routes_by_driver:
+                routes_by_driver[driver_number] = self.plan_driver_routes(
+                    driver_number, order_index
+                )
+            driver_rewritten_orders = 0
+            for ordered_locations in routes_by_driver[driver_number]:
+                driver_rewritten_orders += self.save_shift(
+                    ordered_locations, dao, stored_schedule
+                )
+            rewritten_orders += driver_rewritten_orders
+            if on_driver_scheduled:
+                on_driver_scheduled(driver_number, driver_rewritten_orders)
+        return rewritten_orders
+
+
+def is_scheduled(order: Dict[str, Any]) -> bool:
+    """
+    Orders already sequenced in a route that drivers may have printed.
+    """
+    return (
+        order.get("status") == SCHEDULED_STATUS
+        and order.get("delivery_sequence") is not None
+    )
+
+
+def is_in_progress(order: Dict[str, Any]) -> bool:
+    """
+    Orders that a driver already took to the street or delivered, their schedule is fixed.
+    """
+    return order.get("status") in IN_PROGRESS_STATUSES
+
+
+def split_in_progress(
+    records: List[Dict[str, Any]], starting_point: Dict[str, float]
+) -> Tuple[List[Dict[str, Any]], int, Dict[str, float]]:
+    """
+    Separate the orders of a shift that are in progress from the ones that can be sequenced.
+
+    Parameters:
+    - records (list): Orders of a shift of a driver.
+    - starting_point (dict): Where the route of the shift starts.
+
+    Returns:
+    - tuple: The orders to sequence, the last sequence taken by the orders in progress
+      and the location where the route continues.
+    """
+    pending_records = [record for record in records if not is_in_progress(record)]
+    fixed_records = [
+        record
+        for record in records
+        if is_in_progress(record) and record.get("delivery_sequence") is not None
+    ]
+    if not fixed_records:
+        return pending_records, 0, starting_point
+
+    last_record = max(fixed_records, key=lambda record: record["delivery_sequence"])
+    return (
+        pending_records,
+        int(last_record["delivery_sequence"]),
+        {"latitude": last_record["latitude"], "longitude": last_record["longitude"]},
+    )
+
+
+def continue_sequence(
+    ordered_locations: List[Dict[str, Any]], last_sequence: int
+) -> List[Dict[str, Any]]:
+    """
+    Shift the delivery_sequence of a route so it starts after last_sequence,
+    locations that are already after it keep their delivery_sequence.
+    """
+    previous_sequence = last_sequence
+    for location in ordered_locations:
+        if location["delivery_sequence"] <= previous_sequence:
+            location["delivery_sequence"] = previous_sequence + 1
+        previous_sequence = location["delivery_sequence"]
+    return ordered_locations
+
+
+def plan_routes_in_worker(connection, processor, driver_number, order_index):
+    """
+    Entry point of the processes started by process_records_in_parallel.
+    """
+    try:
+        connection.send(
+            ("success", processor.plan_driver_routes(driver_number, order_index))
+        )
+    except Exception as error:
+        connection.send(("error", str(error)))
+    finally:
+        connection.close()
@@ -0,0 +1,96 @@
+# Python's libraries
+import uuid
+from datetime import datetime
+from datetime import timedelta
+from typing import Any
+from typing import Dict
+from typing import List
+
+# Third-party libraries
+from aws_lambda_powertools import Logger
+
+
+class SchedulingJob:
+    """
+    Keep the record of a scheduling job up to date while it runs, the record is what the clients poll.
+    Drivers are tracked one by one, so a job that fails halfway shows which routes were written.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    DRIVER_PENDING = "pending"
+    DRIVER_SCHEDULED = "scheduled"
+
+    def __init__(self, job_id: str, dao):
+        self.job_id = job_id
+        self.dao = dao
+        self.drivers = {}
+        self.logger = Logger()
+
+    @classmethod
+    def build_record(
+        cls, request: Dict[str, Any], requested_by: str, ttl_days: int
+    ) -> Dict[str, Any]:
+        """
+        Build the record of a job that was just queued.
+
+        Parameters:
+        - request (dict): The validated scheduling request.
+        - requested_by (str): User that queued the job.
+        - ttl_days (int): Days the record is kept before DynamoDB expires it.
+
+        Returns:
+        - dict: The job record, with a new job_id.
+        """
+        created_at = datetime.now()
+        return {
+            "job_id": str(uuid.uuid4()),
+            "status": cls.QUEUED,
+            "request": request,
+            "requested_by": requested_by,
+            "drivers": {
+                str(driver): {"status": cls.DRIVER_PENDING, "rewritten_orders": 0}
+                for driver in request.get("available_drivers", [])
+            },
+            "created_at": created_at.isoformat(),
+            "updated_at": created_at.isoformat(),
+            "expires_at": int((created_at + timedelta(days=ttl_days)).timestamp()),
+        }
+
+    def save(self, **attributes) -> None:
+        response = self.dao.update_job(
+            {
+                "job_id": self.job_id,
+                **attributes,
+                "updated_at": datetime.now().isoformat(),
+            }
+        )
+        if response["status"] != "success":
+            self.logger.error(
+                f"Job {self.job_id} could not be updated: {response['message']}"
+            )
+
+    def start(self, drivers: List[int]) -> None:
+        self.drivers = {
+            str(driver): {"status": self.DRIVER_PENDING, "rewritten_orders": 0}
+            for driver in drivers
+        }
+        self.save(status=self.RUNNING, drivers=self.drivers)
+
+    def record_driver(self, driver_number: int, rewritten_orders: int) -> None:
+        """
+        Mark the routes of a driver as written, it is the callback of the DeliveryProcessor.
+        """
+        self.drivers[str(driver_number)] = {
+            "status": self.DRIVER_SCHEDULED,
+            "rewritten_orders": rewritten_orders,
+        }
+        self.save(drivers=self.drivers)
+
+    def complete(self, result: Dict[str, Any]) -> None:
+        self.save(status=self.COMPLETED, result=result)
+
+    def fail(self, message: str) -> None:
+        self.save(status=self.FAILED, message=message)
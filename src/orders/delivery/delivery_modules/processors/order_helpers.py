@@ -1,4 +1,6 @@
+from collections import defaultdict
 from typing import Dict
+from typing import Iterable
 from typing import List
 from typing import Any
 
@@ -34,3 +36,64 @@ class OrderProcessor:
                 selected_orders.append(order)
 
         return selected_orders
+
+
+class OrderIndex:
+    """
+    Orders of a day grouped once by (driver, delivery_time), so every shift of every driver is a lookup.
+    Orders without driver or delivery_time, or assigned to a driver that is not available, are kept
+    apart so they can be reported.
+    """
+
+    MISSING_DRIVER = "MISSING_DRIVER"
+    MISSING_DELIVERY_TIME = "MISSING_DELIVERY_TIME"
+    UNAVAILABLE_DRIVER = "UNAVAILABLE_DRIVER"
+
+    def __init__(
+        self,
+        order_records: List[Dict[str, Any]],
+        available_drivers: Iterable[int] = None,
+    ):
+        """
+        Parameters:
+        - order_records (list): Orders of the day.
+        - available_drivers (list): Drivers that will be scheduled, None to accept any driver.
+        """
+        available_drivers = (
+            set(available_drivers) if available_drivers is not None else None
+        )
+        self.buckets = defaultdict(list)
+        self.unscheduled = []
+
+        for order in order_records:
+            driver = order.get("driver")
+            delivery_time = order.get("delivery_time")
+            if driver is None:
+                self.unscheduled.append((order, self.MISSING_DRIVER))
+            elif delivery_time is None:
+                self.unscheduled.append((order, self.MISSING_DELIVERY_TIME))
+            elif available_drivers is not None and driver not in available_drivers:
+                self.unscheduled.append((order, self.UNAVAILABLE_DRIVER))
+            else:
+                self.buckets[(driver, delivery_time)].append(order)
+
+    def select(self, driver: int, delivery_time: str) -> List[Dict[str, Any]]:
+        """
+        Returns the orders of a driver for a delivery_time, in the order they were received.
+        """
+        return list(self.buckets.get((driver, delivery_time), []))
+
+    def report_unscheduled(self) -> List[Dict[str, Any]]:
+        """
+        Returns the key of each order that will not be scheduled and the reason.
+        """
+        return [
+            {
+                "id": order.get("id"),
+                "delivery_date": order.get("delivery_date"),
+                "driver": order.get("driver"),
+                "delivery_time": order.get("delivery_time"),
+                "reason": reason,
+            }
+            for order, reason in self.unscheduled
+        ]
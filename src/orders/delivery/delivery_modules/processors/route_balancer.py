@@ -0,0 +1,109 @@
+# Python's libraries
+from collections import defaultdict
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+# Third-party libraries
+import numpy as np
+from aws_lambda_powertools import Logger
+
+
+class RouteBalancer:
+    """
+    Partition the orders of a day across the available drivers, per shift, with a capacitated sweep:
+    stops are sorted by their angle around the offices and split in contiguous sectors with
+    the same number of stops, so every driver gets a compact area and a similar workload.
+    """
+
+    SHIFT_CAPACITY = 32
+    OFFICES_LOCATION = (20.7257943, -103.3792193)
+    MISSING_GEOLOCATION = "MISSING_GEOLOCATION"
+    MISSING_DELIVERY_TIME = "MISSING_DELIVERY_TIME"
+    OVER_CAPACITY = "OVER_CAPACITY"
+
+    def __init__(
+        self,
+        shift_capacity: int = SHIFT_CAPACITY,
+        depot: Tuple[float, float] = OFFICES_LOCATION,
+    ):
+        self.shift_capacity = shift_capacity
+        self.depot = depot
+        self.logger = Logger()
+
+    def sweep_order(self, orders: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Sort the orders by their angle around the depot, starting after the widest empty angle
+        so no sector is split across a gap between neighbourhoods.
+
+        Parameters:
+        - orders (list): Orders with latitude and longitude.
+
+        Returns:
+        - array: Indexes of the orders in sweep order.
+        """
+        coordinates = np.array(
+            [[float(order["latitude"]), float(order["longitude"])] for order in orders]
+        )
+        depot_latitude, depot_longitude = self.depot
+        angles = np.arctan2(
+            coordinates[:, 0] - depot_latitude,
+            (coordinates[:, 1] - depot_longitude) * np.cos(np.radians(depot_latitude)),
+        )
+        sweep = np.argsort(angles, kind="stable")
+        sorted_angles = angles[sweep]
+        gaps = np.diff(np.append(sorted_angles, sorted_angles[0] + 2 * np.pi))
+        return np.roll(sweep, -((int(np.argmax(gaps)) + 1) % len(sweep)))
+
+    def assign_drivers(
+        self, orders: List[Dict[str, Any]], drivers: List[int]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Set the driver of every order, balancing the number of stops of each driver per shift.
+
+        Parameters:
+        - orders (list): Orders of the day.
+        - drivers (list): Available drivers.
+
+        Returns:
+        - tuple: The orders that got a driver and the report of the orders that could not be assigned.
+        """
+        shifts = defaultdict(list)
+        unassigned = []
+        for order in orders:
+            if order.get("latitude") is None or order.get("longitude") is None:
+                unassigned.append((order, self.MISSING_GEOLOCATION))
+            elif order.get("delivery_time") is None:
+                unassigned.append((order, self.MISSING_DELIVERY_TIME))
+            else:
+                shifts[order["delivery_time"]].append(order)
+
+        assigned = []
+        drivers = sorted(drivers)
+        for delivery_time, shift_orders in shifts.items():
+            sweep = self.sweep_order(shift_orders)
+            shift_capacity = self.shift_capacity * len(drivers)
+            for index in sweep[shift_capacity:]:
+                unassigned.append((shift_orders[index], self.OVER_CAPACITY))
+
+            sectors = np.array_split(sweep[:shift_capacity], len(drivers))
+            for driver, sector in zip(drivers, sectors):
+                for index in sector:
+                    shift_orders[index]["driver"] = driver
+                    assigned.append(shift_orders[index])
+                self.logger.info(
+                    f"Driver {driver} gets {len(sector)} stops for {delivery_time}"
+                )
+
+        report = [
+            {
+                "id": order.get("id"),
+                "delivery_date": order.get("delivery_date"),
+                "driver": order.get("driver"),
+                "delivery_time": order.get("delivery_time"),
+                "reason": reason,
+            }
+            for order, reason in unassigned
+        ]
+        return assigned, report
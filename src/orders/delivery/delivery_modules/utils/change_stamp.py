@@ -0,0 +1,23 @@
+# Python's libraries
+from datetime import datetime
+from datetime import timezone
+
+
+def format_change_stamp(moment: datetime | None = None) -> str:
+    """Converts a moment into the changed_at stamp of the orders, an ISO string in UTC (Z) with microseconds
+    so stamps compare in the same order as strings, like DynamoDB sort keys do.
+
+    :param moment: Moment to convert, naive moments are taken as UTC, defaults to None (now)
+    :type moment: datetime | None
+    :return: The stamp
+    :rtype: str
+    """
+    if moment is None:
+        moment = datetime.now(timezone.utc)
+    elif moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return (
+        moment.astimezone(timezone.utc)
+        .isoformat(timespec="microseconds")
+        .replace("+00:00", "Z")
+    )
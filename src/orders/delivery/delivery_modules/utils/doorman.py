@@ -1,19 +1,39 @@
 # Python's libraries
-import json
+import base64
 import os
 
 # Own's modules
 from delivery_modules.errors.util_error import UtilError
+from delivery_modules.utils.compression import compress_response
+from delivery_modules.utils.encoders import dumps_json
+from delivery_modules.utils.encoders import loads_json
 from delivery_modules.errors.auth_error import AuthError
 from settings import environment
+from settings import RESPONSE_COMPRESSION_LEVEL
+from settings import RESPONSE_COMPRESSION_MIN_BYTES
 
 # Third-party libraries
 from aws_lambda_powertools import Logger
 
 ACCESS_RULES = {
-    "Admin": ["ScheduleOrdersFunction", "UpdateOrderSequencingFunction"],
-    "MesaDeControl": ["ScheduleOrdersFunction", "UpdateOrderSequencingFunction"],
+    "Admin": [
+        "ScheduleOrdersFunction",
+        "UpdateOrderSequencingFunction",
+        "RerouteDriverFunction",
+        "GetSchedulingJobFunction",
+    ],
+    "MesaDeControl": [
+        "ScheduleOrdersFunction",
+        "UpdateOrderSequencingFunction",
+        "RerouteDriverFunction",
+        "GetSchedulingJobFunction",
+    ],
+    "Repartidor": ["RerouteDriverFunction"],
 }
+# Groups that may act on the route of any driver, the rest only on the route of their own driver
+ALL_DRIVERS_GROUPS = ("Admin", "MesaDeControl")
+# Cognito attribute with the driver number of the Repartidor users
+DRIVER_CLAIM = "custom:driver"
 
 
 class DoormanUtil(object):
@@ -39,8 +59,12 @@ class DoormanUtil(object):
         # Check if body is already a dict and return it directly
         if isinstance(self.request["body"], dict):
             return self.request["body"]
+        raw_body = self.request["body"]
+        # The APIs accept binary media types, so API Gateway can send the body base64 encoded
+        if self.request.get("isBase64Encoded"):
+            raw_body = base64.b64decode(raw_body).decode("utf-8")
         try:
-            body = json.loads(self.request["body"])
+            body = loads_json(raw_body)
         except Exception as e:
             raise UtilError(
                 _message=f"The body was not a JSON object. Details: {e}",
@@ -50,7 +74,35 @@ class DoormanUtil(object):
 
         return body
 
-    def build_response(self, payload: dict, status_code: int) -> dict:
+    def get_path_param_from_request(self, _path_param_name):
+        path_parameters = self.request.get("pathParameters") or {}
+        path_param_value = path_parameters.get(_path_param_name)
+        if path_param_value is None or path_param_value == "":
+            raise UtilError(
+                _message=f"There is no {_path_param_name} in pathParameters",
+                _error=None,
+                _logger=self.logger,
+            )
+
+        return path_param_value
+
+    def get_header_from_request(self, _header_name):
+        """Returns the value of a request header, header names are case insensitive.
+
+        :param _header_name: Name of the header
+        :type _header_name: str
+        :return: Value of the header, None when it was not sent
+        :rtype: str | None
+        """
+        headers = self.request.get("headers") or {}
+        for name, value in headers.items():
+            if name.lower() == _header_name.lower():
+                return value
+        return None
+
+    def build_response(
+        self, payload: dict, status_code: int, headers: dict = None
+    ) -> dict:
         """This code defines the response_success function, which is used to return a response to the client.
         The function takes two parameters: payload and status_code.
         The payload parameter is used to provide the body of the response,
@@ -62,6 +114,8 @@ class DoormanUtil(object):
         :type _payload: dict, optional
         :param _status_code: HTTP status code, 201 for create
         :type _status_code: int, optional
+        :param headers: Extra headers of the response like ETag, defaults to None
+        :type headers: dict, optional
         :return: dict with the formatted response
         :rtype: dict
         """
@@ -74,9 +128,18 @@ class DoormanUtil(object):
                 "Access-Control-Allow-Headers": "Content-Type,Authorization,x-apigateway-header,X-Amz-Date,X-Api-Key,X-Amz-Security-Token",
                 "Access-Control-Allow-Methods": "GET, POST, PATCH, OPTIONS, DELETE",
             },
-            "body": json.dumps(payload),
+            "body": dumps_json(payload),
         }
-
+        response["headers"].update(headers or {})
+
+        # Bodies of the biggest responses, like a full day of orders, are compressed when the client accepts it
+        compress_response(
+            response,
+            self.get_header_from_request("Accept"),
+            self.get_header_from_request("Accept-Encoding"),
+            RESPONSE_COMPRESSION_MIN_BYTES,
+            RESPONSE_COMPRESSION_LEVEL,
+        )
         return response
 
     def _is_any_group_authorized(self, group_names: list) -> bool:
@@ -138,3 +201,32 @@ class DoormanUtil(object):
             return False
 
         return self._is_any_group_authorized(user_groups)
+
+    def can_access_driver(self, driver: int) -> bool:
+        """
+        Checks if the user may act on the route of a driver. Admin and MesaDeControl users may act on
+        any route, Repartidor users only on the route of the driver in their Cognito attributes.
+
+        Parameters:
+        - driver (int): Driver of the route.
+
+        Returns:
+        - bool: True if the user may act on the route; False otherwise.
+        """
+        if environment == "local":
+            return True
+
+        try:
+            claims = self.request["requestContext"]["authorizer"]["claims"]
+        except KeyError:
+            return False
+
+        user_groups = (claims.get("cognito:groups") or "").split(",")
+        if any(group_name in ALL_DRIVERS_GROUPS for group_name in user_groups):
+            return True
+
+        try:
+            return int(claims[DRIVER_CLAIM]) == int(driver)
+        except (KeyError, TypeError, ValueError):
+            self.logger.error("User has no driver in the Cognito attributes")
+            return False
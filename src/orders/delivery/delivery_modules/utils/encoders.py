@@ -0,0 +1,95 @@
+# Python's libraries
+import json
+from decimal import Decimal
+from typing import Any
+
+# Third-party libraries
+try:
+    import orjson
+except ImportError:  # orjson is optional, JSON is encoded with the standard library without it
+    orjson = None
+
+# Values that floats_to_decimals walks into, tuples are stored as lists
+CONTAINER_TYPES = (dict, list, tuple)
+
+
+class DecimalEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return str(obj)
+        return super(DecimalEncoder, self).default(obj)
+
+
+def encode_decimal(obj: Any) -> str:
+    """Fallback of orjson for the types it does not serialize, Decimals are sent as strings like DecimalEncoder does.
+
+    :param obj: Value that orjson could not serialize
+    :type obj: Any
+    :raises TypeError: If the value is not a Decimal
+    :return: The Decimal as a string
+    :rtype: str
+    """
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_json(payload: Any) -> str:
+    """Serializes a payload that can contain the Decimals returned by DynamoDB.
+    Uses orjson when it is installed and the standard library with DecimalEncoder otherwise.
+
+    :param payload: Value to serialize
+    :type payload: Any
+    :return: The JSON document
+    :rtype: str
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            payload, default=encode_decimal, option=orjson.OPT_NON_STR_KEYS
+        ).decode("utf-8")
+    return json.dumps(payload, cls=DecimalEncoder)
+
+
+def loads_json(document: str | bytes) -> Any:
+    """Parses a JSON document, with orjson when it is installed.
+
+    :param document: The JSON document
+    :type document: str | bytes
+    :raises ValueError: If the document is not valid JSON
+    :return: The parsed value
+    :rtype: Any
+    """
+    if orjson is not None:
+        return orjson.loads(document)
+    return json.loads(document)
+
+
+def floats_to_decimals(value: Any) -> Any:
+    """Converts the floats of an item into Decimals in a single pass, DynamoDB does not accept floats.
+    Each float goes through its shortest repr, so 20.12 is stored as Decimal("20.12") exactly like
+    json.loads(json.dumps(item), parse_float=Decimal) did, without serializing the whole item.
+    Tuples become lists and values that are already Decimals are kept.
+
+    :param value: Item, list or scalar
+    :type value: Any
+    :return: The same structure with Decimals instead of floats
+    :rtype: Any
+    """
+    if isinstance(value, dict):
+        # Scalars are converted inline, only nested containers cost a call
+        return {
+            key: (
+                Decimal(repr(item))
+                if isinstance(item, float)
+                else floats_to_decimals(item)
+                if isinstance(item, CONTAINER_TYPES)
+                else item
+            )
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [floats_to_decimals(item) for item in value]
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    return value
+
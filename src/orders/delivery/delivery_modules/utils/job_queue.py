@@ -0,0 +1,75 @@
+# Python's libraries
+import queue
+import threading
+from typing import Any
+from typing import Callable
+from typing import Dict
+
+# Own's modules
+from delivery_modules.utils.aws import get_client
+from delivery_modules.utils.encoders import dumps_json
+from delivery_modules.utils.encoders import loads_json
+
+# Third-party libraries
+from aws_lambda_powertools import Logger
+
+
+class SqsJobQueue:
+    """
+    Send jobs to the SQS queue that triggers the worker function.
+    """
+
+    def __init__(self, queue_url: str):
+        self.queue_url = queue_url
+
+    def send(self, message: Dict[str, Any]) -> None:
+        get_client("sqs").send_message(
+            QueueUrl=self.queue_url,
+            MessageBody=dumps_json(message),
+        )
+
+
+class LocalJobQueue:
+    """
+    In-process stand-in of the SQS queue, jobs run one at a time in a background thread
+    of the same process. Messages go through JSON like they do through SQS.
+    """
+
+    def __init__(self, worker: Callable[[Dict[str, Any]], Any]):
+        self.worker = worker
+        self.messages = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+        self.logger = Logger()
+
+    def send(self, message: Dict[str, Any]) -> None:
+        self.messages.put(loads_json(dumps_json(message)))
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.consume, daemon=True)
+                self.thread.start()
+
+    def consume(self) -> None:
+        while True:
+            message = self.messages.get()
+            try:
+                self.worker(message)
+            except Exception as error:
+                self.logger.error(f"Job failed in the local queue. Details: {error}")
+            finally:
+                self.messages.task_done()
+
+    def join(self) -> None:
+        """
+        Wait until every job sent so far has run.
+        """
+        self.messages.join()
+
+
+def get_job_queue(queue_url: str, worker: Callable[[Dict[str, Any]], Any]):
+    """
+    Build the SQS queue when there is a queue URL, the local queue otherwise.
+    """
+    if queue_url:
+        return SqsJobQueue(queue_url)
+    return LocalJobQueue(worker)
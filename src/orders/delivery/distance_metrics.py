@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+from abc import ABC
+from abc import abstractmethod
+from collections import OrderedDict
+
+import numpy as np
+
+from aws_lambda_powertools import Logger
+
+
+EARTH_RADIUS_KM = 6371.0088
+COORDINATE_DECIMALS = 6
+
+
+def get_coordinates(points):
+    """
+    Convert a list of points with latitude and longitude into a float array of shape (n, 2)
+    """
+    return np.array(
+        [[float(point["latitude"]), float(point["longitude"])] for point in points],
+        dtype=float,
+    )
+
+
+def get_stop_keys(coordinates):
+    """
+    Round the coordinates so the same stop always produces the same key
+    """
+    return [
+        (round(latitude, COORDINATE_DECIMALS), round(longitude, COORDINATE_DECIMALS))
+        for latitude, longitude in coordinates.tolist()
+    ]
+
+
+class DistanceMetric(ABC):
+    """
+    Base class of the metrics used by the TravelPlanner, matrix[i][j] is the cost of going from i to j
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def build_matrix(self, points):
+        """
+        Calculate the cost between every pair of points, as a float array of shape (n, n)
+        """
+
+    def calculate_distance(self, point1, point2):
+        """
+        Calculate the cost of going from point1 to point2
+        """
+        return float(self.build_matrix([point1, point2])[0, 1])
+
+
+class EuclideanMetric(DistanceMetric):
+    """
+    Distance in degrees, it was the original metric of the router
+    """
+
+    name = "euclidean"
+
+    def build_matrix(self, points):
+        coordinates = get_coordinates(points)
+        deltas = coordinates[:, np.newaxis, :] - coordinates[np.newaxis, :, :]
+        return np.sqrt((deltas**2).sum(axis=2))
+
+
+class HaversineMetric(DistanceMetric):
+    """
+    Great-circle distance in kilometers
+    """
+
+    name = "haversine"
+
+    def build_matrix(self, points):
+        radians = np.radians(get_coordinates(points))
+        latitudes = radians[:, 0]
+        longitudes = radians[:, 1]
+        latitude_deltas = latitudes[:, np.newaxis] - latitudes[np.newaxis, :]
+        longitude_deltas = longitudes[:, np.newaxis] - longitudes[np.newaxis, :]
+        haversine = (
+            np.sin(latitude_deltas / 2) ** 2
+            + np.cos(latitudes)[:, np.newaxis]
+            * np.cos(latitudes)[np.newaxis, :]
+            * np.sin(longitude_deltas / 2) ** 2
+        )
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(haversine, 0.0, 1.0)))
+
+
+class PrecomputedMatrixMetric(DistanceMetric):
+    """
+    Road distances or travel times between known stops, usually exported from a routing service.
+    Sets of points that include unknown stops are measured with the fallback metric.
+    """
+
+    name = "precomputed"
+
+    def __init__(self, stops, matrix, fallback: DistanceMetric = None):
+        self.matrix = np.asarray(matrix, dtype=float)
+        self.stop_indexes = {
+            stop_key: index
+            for index, stop_key in enumerate(get_stop_keys(np.asarray(stops, dtype=float)))
+        }
+        self.fallback = fallback or HaversineMetric()
+        self.logger = Logger()
+
+    @classmethod
+    def from_file(cls, path: str, fallback: DistanceMetric = None):
+        """
+        Load a JSON file with the format {"stops": [[latitude, longitude], ...], "matrix": [[...], ...]}
+        """
+        with open(path, "r", encoding="utf-8") as matrix_file:
+            content = json.load(matrix_file)
+        return cls(content["stops"], content["matrix"], fallback=fallback)
+
+    def build_matrix(self, points):
+        stop_keys = get_stop_keys(get_coordinates(points))
+        missing_stops = [key for key in stop_keys if key not in self.stop_indexes]
+        if missing_stops:
+            self.logger.warning(
+                f"{len(missing_stops)} stops are not in the precomputed matrix, "
+                f"using {self.fallback.name} distances"
+            )
+            return self.fallback.build_matrix(points)
+
+        indexes = [self.stop_indexes[key] for key in stop_keys]
+        return self.matrix[np.ix_(indexes, indexes)]
+
+
+class CachedMetric(DistanceMetric):
+    """
+    Keep the matrices of the sets of stops already measured, in the container and optionally in a directory,
+    so scheduling the same day again does not measure them again
+    """
+
+    MAX_MEMORY_ENTRIES = 32
+
+    _memory_cache = OrderedDict()
+
+    def __init__(self, metric: DistanceMetric, cache_dir: str = None):
+        self.metric = metric
+        self.name = f"cached-{metric.name}"
+        self.cache_dir = cache_dir
+
+    def build_cache_key(self, sorted_stop_keys):
+        digest = hashlib.sha256(
+            json.dumps([self.metric.name, sorted_stop_keys]).encode("utf-8")
+        )
+        return digest.hexdigest()
+
+    def build_matrix(self, points):
+        stop_keys = get_stop_keys(get_coordinates(points))
+        # Matrices are stored for the stops sorted, so the order of the points does not matter
+        order = sorted(range(len(stop_keys)), key=lambda index: stop_keys[index])
+        cache_key = self.build_cache_key([stop_keys[index] for index in order])
+
+        sorted_matrix = self.load(cache_key)
+        if sorted_matrix is None:
+            sorted_matrix = self.metric.build_matrix([points[index] for index in order])
+            self.save(cache_key, sorted_matrix)
+
+        positions = np.empty(len(order), dtype=int)
+        positions[order] = np.arange(len(order))
+        return sorted_matrix[np.ix_(positions, positions)]
+
+    def calculate_distance(self, point1, point2):
+        """
+        Pairs are measured without the cache, they are cheap and would evict the matrices of whole routes
+        """
+        return self.metric.calculate_distance(point1, point2)
+
+    def load(self, cache_key):
+        matrix = self._memory_cache.get(cache_key)
+        if matrix is not None:
+            self._memory_cache.move_to_end(cache_key)
+            return matrix
+
+        if self.cache_dir:
+            path = os.path.join(self.cache_dir, f"{cache_key}.npy")
+            if os.path.exists(path):
+                matrix = np.load(path)
+                self.remember(cache_key, matrix)
+        return matrix
+
+    def save(self, cache_key, matrix):
+        self.remember(cache_key, matrix)
+        if self.cache_dir:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                np.save(os.path.join(self.cache_dir, f"{cache_key}.npy"), matrix)
+            except OSError as error:
+                Logger().warning(f"Distance matrix could not be cached. Details {error}")
+
+    def remember(self, cache_key, matrix):
+        self._memory_cache[cache_key] = matrix
+        self._memory_cache.move_to_end(cache_key)
+        while len(self._memory_cache) > self.MAX_MEMORY_ENTRIES:
+            self._memory_cache.popitem(last=False)
+
+
+def get_distance_metric(
+    metric_name: str = HaversineMetric.name,
+    matrix_path: str = None,
+    cache_dir: str = None,
+) -> DistanceMetric:
+    """
+    Build the metric configured for the router, every metric is cached per set of stops
+    """
+    metrics = {
+        EuclideanMetric.name: EuclideanMetric,
+        HaversineMetric.name: HaversineMetric,
+    }
+    if metric_name == PrecomputedMatrixMetric.name:
+        if not matrix_path:
+            raise ValueError("A matrix path is required for precomputed distances")
+        metric = PrecomputedMatrixMetric.from_file(matrix_path)
+    elif metric_name in metrics:
+        metric = metrics[metric_name]()
+    else:
+        raise ValueError(f"Distance metric {metric_name} is not supported")
+
+    return CachedMetric(metric, cache_dir=cache_dir)
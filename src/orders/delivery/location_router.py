@@ -1,36 +1,215 @@
+import time
+
+import numpy as np
+
+from distance_metrics import DistanceMetric
+from distance_metrics import HaversineMetric
+
+
 class TravelPlanner:
+    DEFAULT_TIME_BUDGET_SECONDS = 1.0
+    OR_OPT_SEGMENT_LENGTHS = (1, 2, 3)
+    MIN_IMPROVEMENT = 1e-12
+
+    def __init__(
+        self,
+        metric: DistanceMetric = None,
+        time_budget: float = DEFAULT_TIME_BUDGET_SECONDS,
+    ):
+        """
+        metric -- how the cost between two stops is measured, haversine kilometers by default
+        time_budget -- seconds that the improvement phase may use for each route
+        """
+        self.metric = metric or HaversineMetric()
+        self.time_budget = time_budget
+
     def calculate_distance(self, point1, point2):
         """
-        Calculate the Euclidean distance between two points
+        Calculate the cost of going from point1 to point2 with the metric of the planner
         """
-        lat1, lon1 = float(point1["latitude"]), float(point1["longitude"])
-        lat2, lon2 = float(point2["latitude"]), float(point2["longitude"])
-        return ((lat1 - lat2) ** 2 + (lon1 - lon2) ** 2) ** 0.5
+        return self.metric.calculate_distance(point1, point2)
 
-    def find_shortest_path(self, locations, start_point):
+    def build_distance_matrix(self, points):
         """
-        Find the shortest path to visit all locations using the nearest neighbor heuristic
+        Calculate the cost between every pair of points at once
         """
-        num_locations = len(locations)
-        if num_locations == 0:
-            return []
+        return self.metric.build_matrix(points)
 
-        unvisited = locations[:]
-        current_location = start_point
-        path = [start_point]
-        total_distance = 0
+    def route_length(self, matrix, route):
+        """
+        Calculate the length of an open route, given as indexes of the distance matrix
+        """
+        route = np.asarray(route)
+        return float(matrix[route[:-1], route[1:]].sum())
+
+    def build_nearest_neighbour_route(self, matrix):
+        """
+        Build a route from index 0 always moving to the closest stop that was not visited
+        """
+        visited = np.zeros(len(matrix), dtype=bool)
+        visited[0] = True
+        route = [0]
+        current = 0
+        for _ in range(len(matrix) - 1):
+            current = int(np.argmin(np.where(visited, np.inf, matrix[current])))
+            visited[current] = True
+            route.append(current)
+        return np.array(route)
+
+    def improve_with_two_opt(self, matrix, route, deadline):
+        """
+        Reverse the segment route[i:j + 1] when it shortens the route, the start point never moves
+        """
+        improved = False
+        last = len(route) - 1
+        for i in range(1, last):
+            if time.perf_counter() > deadline:
+                break
 
-        while unvisited:
-            nearest_location = min(
-                unvisited,
-                key=lambda loc: self.calculate_distance(current_location, loc),
+            before, first = route[i - 1], route[i]
+            ends = route[i + 1 :]
+            afters = np.append(route[i + 2 :], -1)
+            has_after = afters >= 0
+            safe_afters = np.where(has_after, afters, 0)
+            # Travel times are not symmetric, reversing a segment also changes the cost of its legs
+            reversal_costs = np.cumsum(
+                matrix[route[i + 1 :], route[i:-1]] - matrix[route[i:-1], route[i + 1 :]]
             )
-            total_distance += self.calculate_distance(
-                current_location, nearest_location
+            deltas = (
+                matrix[before, ends]
+                - matrix[before, first]
+                + np.where(
+                    has_after,
+                    matrix[first, safe_afters] - matrix[ends, safe_afters],
+                    0.0,
+                )
+                + reversal_costs
             )
-            current_location = nearest_location
-            path.append(nearest_location)
-            unvisited.remove(nearest_location)
+            best = int(np.argmin(deltas))
+            if deltas[best] < -self.MIN_IMPROVEMENT:
+                j = i + 1 + best
+                route[i : j + 1] = route[i : j + 1][::-1]
+                improved = True
+        return route, improved
+
+    def improve_with_or_opt(self, matrix, route, deadline):
+        """
+        Move segments of consecutive stops, optionally reversed, to the position where they are cheaper
+        """
+        improved = False
+        for segment_length in self.OR_OPT_SEGMENT_LENGTHS:
+            i = 1
+            while i + segment_length <= len(route):
+                if time.perf_counter() > deadline:
+                    return route, improved
+
+                segment = route[i : i + segment_length]
+                before = route[i - 1]
+                has_after = i + segment_length < len(route)
+                after = route[i + segment_length] if has_after else None
+                removal_gain = matrix[before, segment[0]] + (
+                    matrix[segment[-1], after] - matrix[before, after] if has_after else 0.0
+                )
+
+                rest = np.concatenate((route[:i], route[i + segment_length :]))
+                lefts = rest
+                rights = np.append(rest[1:], -1)
+                has_right = rights >= 0
+                safe_rights = np.where(has_right, rights, 0)
+                kept_edges = np.where(has_right, matrix[lefts, safe_rights], 0.0)
+
+                forward_costs = (
+                    matrix[lefts, segment[0]]
+                    + np.where(has_right, matrix[segment[-1], safe_rights], 0.0)
+                    - kept_edges
+                )
+                reversed_costs = (
+                    matrix[lefts, segment[-1]]
+                    + np.where(has_right, matrix[segment[0], safe_rights], 0.0)
+                    - kept_edges
+                    + self.route_length(matrix, segment[::-1])
+                    - self.route_length(matrix, segment)
+                )
+                costs = np.minimum(forward_costs, reversed_costs)
+                best = int(np.argmin(costs))
+                if costs[best] < removal_gain - self.MIN_IMPROVEMENT:
+                    moved = (
+                        segment
+                        if forward_costs[best] <= reversed_costs[best]
+                        else segment[::-1]
+                    )
+                    route = np.concatenate((rest[: best + 1], moved, rest[best + 1 :]))
+                    improved = True
+                else:
+                    i += 1
+        return route, improved
+
+    def optimize_route(self, matrix):
+        """
+        Build a route with the nearest neighbor heuristic and improve it with 2-opt and Or-opt
+        until no move shortens it or the time budget is spent
+        """
+        deadline = time.perf_counter() + self.time_budget
+        route = self.build_nearest_neighbour_route(matrix)
+        improved = len(route) > 3
+        while improved and time.perf_counter() < deadline:
+            route, two_opt_improved = self.improve_with_two_opt(matrix, route, deadline)
+            route, or_opt_improved = self.improve_with_or_opt(matrix, route, deadline)
+            improved = two_opt_improved or or_opt_improved
+        return route
+
+    def find_cheapest_insertion(self, matrix, route, new_index):
+        """
+        Find the position of route where inserting new_index adds the least cost, route[0] never moves
+        """
+        route = np.asarray(route)
+        lefts = route
+        rights = np.append(route[1:], -1)
+        has_right = rights >= 0
+        safe_rights = np.where(has_right, rights, 0)
+        costs = matrix[lefts, new_index] + np.where(
+            has_right,
+            matrix[new_index, safe_rights] - matrix[lefts, safe_rights],
+            0.0,
+        )
+        return int(np.argmin(costs)) + 1
+
+    def insert_locations(self, route, new_locations, start_point):
+        """
+        Insert new locations in a route that was already sequenced, each one at its cheapest position.
+        Locations of the route keep their delivery_sequence unless a new location takes it,
+        in that case the following ones are shifted
+        """
+        points = [start_point, *route, *new_locations]
+        matrix = self.build_distance_matrix(points)
+        order = list(range(len(route) + 1))
+        for new_index in range(len(route) + 1, len(points)):
+            order.insert(self.find_cheapest_insertion(matrix, order, new_index), new_index)
+
+        path = []
+        previous_sequence = 0
+        for index in order[1:]:
+            location = points[index]
+            sequence = location.get("delivery_sequence") if index <= len(route) else None
+            if sequence is None or sequence <= previous_sequence:
+                sequence = previous_sequence + 1
+            location["delivery_sequence"] = sequence
+            previous_sequence = sequence
+            path.append(location)
+
+        return path
+
+    def find_shortest_path(self, locations, start_point):
+        """
+        Find a short path that visits all locations starting from start_point,
+        each location gets its position in the path as delivery_sequence
+        """
+        if len(locations) == 0:
+            return []
+
+        points = [start_point, *locations]
+        route = self.optimize_route(self.build_distance_matrix(points))
+        path = [points[index] for index in route]
 
         for index, location in enumerate(path):
             location["delivery_sequence"] = index
@@ -12,28 +12,60 @@ if environment is None:
 
 logger.info(f"Starting with environment: {environment}")
 ORDERS_PRIMARY_KEY = "delivery_date"
+CAPACITY_PRIMARY_KEY = "delivery_date"
+# Bodies smaller than this are not compressed, the level applies to gzip (1-9) and brotli (0-11)
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.environ.get("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+RESPONSE_COMPRESSION_LEVEL = int(os.environ.get("RESPONSE_COMPRESSION_LEVEL", "6"))
+COLLECTION_VERSIONS_PRIMARY_KEY = "collection"
+SCHEDULING_JOBS_PRIMARY_KEY = "job_id"
+SCHEDULING_JOB_TTL_DAYS = 7
+# Without a queue URL the jobs run in a thread of the same process, that is how the API works locally
+SCHEDULING_QUEUE_URL = os.environ.get("SCHEDULING_QUEUE_URL")
+# haversine, euclidean or precomputed (a road distance/duration matrix in ROAD_MATRIX_PATH)
+DISTANCE_METRIC = os.environ.get("DISTANCE_METRIC", "haversine")
+ROAD_MATRIX_PATH = os.environ.get("ROAD_MATRIX_PATH")
+DISTANCE_MATRIX_CACHE_DIR = os.environ.get(
+    "DISTANCE_MATRIX_CACHE_DIR", "/tmp/distance_matrices"
+)
+# Rerouting is requested by drivers on the street, the improvement phase gets a short budget per shift
+REROUTE_TIME_BUDGET_SECONDS = float(os.environ.get("REROUTE_TIME_BUDGET_SECONDS", "0.2"))
 
 if environment.lower() == "prod":
     ORDERS_TABLE_NAME = "Orders"
+    CAPACITY_TABLE_NAME = "OrdersCapacity"
+    SCHEDULING_JOBS_TABLE_NAME = "SchedulingJobs"
+    COLLECTION_VERSIONS_TABLE_NAME = "CollectionVersions"
     PRODUCTS_TABLE_NAME = "Products"
 
 elif environment.lower() == "development":
     ORDERS_TABLE_NAME = "Orders"
+    CAPACITY_TABLE_NAME = "OrdersCapacity"
+    SCHEDULING_JOBS_TABLE_NAME = "SchedulingJobs"
+    COLLECTION_VERSIONS_TABLE_NAME = "CollectionVersions"
     PRODUCTS_TABLE_NAME = "Products"
 
 
 elif environment.lower() == "uat":
     ORDERS_TABLE_NAME = "Orders"
+    CAPACITY_TABLE_NAME = "OrdersCapacity"
+    SCHEDULING_JOBS_TABLE_NAME = "SchedulingJobs"
+    COLLECTION_VERSIONS_TABLE_NAME = "CollectionVersions"
     PRODUCTS_TABLE_NAME = "Products"
 
 
 elif environment.lower() == "qa":
     ORDERS_TABLE_NAME = "Orders"
+    CAPACITY_TABLE_NAME = "OrdersCapacity"
+    SCHEDULING_JOBS_TABLE_NAME = "SchedulingJobs"
+    COLLECTION_VERSIONS_TABLE_NAME = "CollectionVersions"
     PRODUCTS_TABLE_NAME = "Products"
 
 
 elif environment.lower() == "local":
     ORDERS_TABLE_NAME = "Orders"
+    CAPACITY_TABLE_NAME = "OrdersCapacity"
+    SCHEDULING_JOBS_TABLE_NAME = "SchedulingJobs"
+    COLLECTION_VERSIONS_TABLE_NAME = "CollectionVersions"
 
 
 else:
@@ -0,0 +1,194 @@
+# Python's libraries
+from typing import Any
+from typing import Dict
+from typing import Tuple
+
+# Own's modules
+from order_modules.data_access.dynamo_handler import DynamoDBHandler
+from order_modules.errors.dao_error import DaoError
+
+from settings import CAPACITY_TABLE_NAME
+from settings import CAPACITY_PRIMARY_KEY
+from settings import CAPACITY_SORT_KEY
+
+# Third-party libraries
+from aws_lambda_powertools import Logger
+from boto3.dynamodb.conditions import Key
+
+
+class CapacityDAO:
+    """
+    A class for handling the capacity ledger, one counter item per delivery date, delivery time and driver.
+    """
+
+    COUNTER_NAME = "order_count"
+
+    def __init__(self):
+        """
+        Initializes a new instance of the DAO class.
+        """
+        self.capacity_db = DynamoDBHandler(
+            table_name=CAPACITY_TABLE_NAME,
+            partition_key=CAPACITY_PRIMARY_KEY,
+            sort_key=CAPACITY_SORT_KEY,
+        )
+
+    def _build_key(
+        self, delivery_date: str, delivery_time: str, driver: int | None
+    ) -> Dict[str, str]:
+        """
+        Builds the primary key of the counter for a delivery date, delivery time and driver.
+        """
+        return {
+            CAPACITY_PRIMARY_KEY: delivery_date,
+            CAPACITY_SORT_KEY: f"{delivery_time}#{driver}",
+        }
+
+    def fetch_capacity(self, delivery_date: str) -> Dict[Tuple[str, Any], int]:
+        """
+        Attempts to retrieve all the counters of a delivery date.
+
+        :param delivery_date: Date that we will use to query the table
+        :type delivery_date: str
+        :return: a dictionary with (delivery_time, driver) as key and the number of orders as value
+        :rtype: Dict[Tuple[str, Any], int]
+        """
+        key_condition_expression = Key(CAPACITY_PRIMARY_KEY).eq(delivery_date)
+        response = self.capacity_db.retrieve_records(key_condition_expression)
+        if response["status"] != "success":
+            raise DaoError(
+                _message=f"Capacity for {delivery_date} could not be fetched",
+                _error=response["message"],
+            )
+
+        return {
+            (item["delivery_time"], item.get("driver")): int(item[self.COUNTER_NAME])
+            for item in response["payload"]
+        }
+
+    def initialize_capacity(
+        self, delivery_date: str, slots: Dict[Tuple[str, Any], int]
+    ) -> None:
+        """
+        Sets the counters of a delivery date that has orders but was not tracked in the ledger yet.
+
+        :param delivery_date: Date of the counters
+        :type delivery_date: str
+        :param slots: a dictionary with (delivery_time, driver) as key and the number of orders as value
+        :type slots: Dict[Tuple[str, Any], int]
+        """
+        for (delivery_time, driver), count in slots.items():
+            self.capacity_db.initialize_counter(
+                key=self._build_key(delivery_date, delivery_time, driver),
+                counter_name=self.COUNTER_NAME,
+                value=count,
+                attributes={"delivery_time": delivery_time, "driver": driver},
+            )
+
+    def reserve_slot(
+        self,
+        delivery_date: str,
+        delivery_time: str,
+        driver: int | None,
+        max_orders: int = None,
+        amount: int = 1,
+    ) -> dict:
+        """
+        Attempts to add orders, one by default, to the counter of a delivery date, delivery time and driver.
+        If max_orders is provided, the reservation is rejected with a 409 when the orders do not fit in the slot.
+
+        :param delivery_date: Delivery date of the order
+        :type delivery_date: str
+        :param delivery_time: Delivery time of the order
+        :type delivery_time: str
+        :param driver: Driver assigned to the order
+        :type driver: int | None
+        :param max_orders: Capacity of the slot, defaults to None
+        :type max_orders: int, optional
+        :param amount: Number of orders to add, defaults to 1
+        :type amount: int, optional
+        :return: a dictionary that contains the response object
+        :rtype: dict
+        """
+        return self.capacity_db.update_counter(
+            key=self._build_key(delivery_date, delivery_time, driver),
+            counter_name=self.COUNTER_NAME,
+            amount=amount,
+            max_value=max_orders,
+            attributes={"delivery_time": delivery_time, "driver": driver},
+        )
+
+    def release_slot(
+        self,
+        delivery_date: str,
+        delivery_time: str,
+        driver: int | None,
+        amount: int = 1,
+    ) -> dict:
+        """
+        Attempts to remove orders, one by default, from the counter of a delivery date, delivery time and driver.
+
+        :param delivery_date: Delivery date of the order
+        :type delivery_date: str
+        :param delivery_time: Delivery time of the order
+        :type delivery_time: str
+        :param driver: Driver assigned to the order
+        :type driver: int | None
+        :param amount: Number of orders to remove, defaults to 1
+        :type amount: int, optional
+        :return: a dictionary that contains the response object
+        :rtype: dict
+        """
+        response = self.capacity_db.update_counter(
+            key=self._build_key(delivery_date, delivery_time, driver),
+            counter_name=self.COUNTER_NAME,
+            amount=-amount,
+            min_value=0,
+        )
+        if response["status"] != "success":
+            # A missing or lower counter means the ledger and the orders are out of sync
+            Logger().warning(
+                f"Slot {delivery_date} {delivery_time} {driver} was not released: {response['message']}"
+            )
+        return response
+
+    def release_order(self, order: dict) -> dict | None:
+        """
+        Attempts to remove an order, as stored in DynamoDB, from its counter.
+
+        :param order: Order representation
+        :type order: dict
+        :return: a dictionary that contains the response object, None if there was no order
+        :rtype: dict | None
+        """
+        if not order:
+            return None
+
+        driver = order.get("driver")
+        return self.release_slot(
+            delivery_date=order["delivery_date"],
+            delivery_time=order.get("delivery_time"),
+            driver=int(driver) if driver is not None else None,
+        )
+
+    def build_release_item(self, order: dict) -> Dict[str, Any]:
+        """
+        Builds the transaction element that removes an order, as stored in DynamoDB, from its counter,
+        so the counter changes in the same transaction as the order.
+
+        :param order: Order representation with delivery_date, delivery_time and driver
+        :type order: dict
+        :return: The Update element of the transaction
+        :rtype: Dict[str, Any]
+        """
+        driver = order.get("driver")
+        return self.capacity_db.build_counter_item(
+            key=self._build_key(
+                order["delivery_date"],
+                order.get("delivery_time"),
+                int(driver) if driver is not None else None,
+            ),
+            counter_name=self.COUNTER_NAME,
+            amount=-1,
+            min_value=0,
+        )
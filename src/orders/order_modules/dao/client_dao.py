@@ -0,0 +1,44 @@
+# Own's modules
+from order_modules.data_access.dynamo_handler import DynamoDBHandler
+
+from settings import CLIENTS_TABLE_NAME
+from settings import CLIENTS_PRIMARY_KEY
+
+
+class ClientDAO:
+    """
+    A class for reading the clients that place orders, the Clients table is owned by the clients service.
+    """
+
+    LOCATION_FIELDS = [
+        "address",
+        "address_latitude",
+        "address_longitude",
+        "second_address",
+        "second_address_latitude",
+        "second_address_longitude",
+    ]
+
+    def __init__(self):
+        """
+        Initializes a new instance of the DAO class.
+        """
+        self.clients_db = DynamoDBHandler(
+            table_name=CLIENTS_TABLE_NAME,
+            partition_key=CLIENTS_PRIMARY_KEY,
+        )
+
+    def fetch_client_locations(self, phone_number: str) -> dict:
+        """
+        Attempts to retrieve the addresses of a client and their coordinates.
+
+        :param phone_number: Phone number of the client
+        :type phone_number: str
+        :return: a dictionary that contains the response object
+        :rtype: dict
+        """
+        response = self.clients_db.fetch_record(
+            key={CLIENTS_PRIMARY_KEY: phone_number},
+            projection=self.LOCATION_FIELDS,
+        )
+        return response
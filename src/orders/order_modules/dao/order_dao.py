@@ -1,13 +1,28 @@
 # Python's libraries
 from datetime import datetime
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
 
 # Own's modules
 from order_modules.data_access.dynamo_handler import DynamoDBHandler
+from order_modules.data_access.schemas import ORDER_SCHEMA
+from order_modules.dao.capacity_dao import CapacityDAO
+from order_modules.dao.tombstone_dao import TombstoneDAO
+from order_modules.dao.version_dao import CollectionVersionDAO
+from order_modules.utils.change_stamp import format_change_stamp
 
 from settings import ORDERS_TABLE_NAME
 from settings import ORDERS_PRIMARY_KEY
+from settings import ORDERS_DYNAMODB_BACKEND
+from settings import DRIVER_ROUTE_INDEX_NAME
+from settings import DRIVER_ROUTE_KEY
+from settings import CHANGES_INDEX_NAME
+from settings import CHANGE_STAMP_KEY
 
 # Third-party libraries
+from aws_lambda_powertools import Logger
 from boto3.dynamodb.conditions import Key
 
 
@@ -16,6 +31,10 @@ class OrderDAO:
     A class for handling interactions with the DynamoDB table and the Lambda Function.
     """
 
+    SLOT_FIELDS = ["delivery_time", "driver"]
+    # Key attributes of the driver route index, DynamoDB rejects them as null so they are removed instead
+    ROUTE_INDEX_FIELDS = (DRIVER_ROUTE_KEY, "delivery_sequence")
+
     def __init__(self):
         """
         Initializes a new instance of the DAO class.
@@ -23,7 +42,78 @@ class OrderDAO:
         self.orders_db = DynamoDBHandler(
             table_name=ORDERS_TABLE_NAME,
             partition_key=ORDERS_PRIMARY_KEY,
+            backend=ORDERS_DYNAMODB_BACKEND,
+            schema=ORDER_SCHEMA,
         )
+        self.capacity = CapacityDAO()
+        self.tombstones = TombstoneDAO()
+        self.versions = CollectionVersionDAO()
+
+    @staticmethod
+    def collection_for(delivery_date: str) -> str:
+        """
+        Builds the name of the collection of the orders of a delivery date, used for its version marker.
+        """
+        return f"orders#{delivery_date}"
+
+    def fetch_marker(self, delivery_date: str) -> str | None:
+        """
+        Attempts to retrieve the version marker of the orders of a delivery date.
+
+        :param delivery_date: Date of the orders
+        :type delivery_date: str
+        :return: the marker, None if it could not be read
+        :rtype: str | None
+        """
+        return self.versions.fetch_marker(self.collection_for(delivery_date))
+
+    def touch_dates(self, *delivery_dates: str) -> None:
+        """
+        Replaces the version marker of the orders of the given delivery dates, after they were written.
+        """
+        for delivery_date in set(delivery_dates):
+            response = self.versions.touch(self.collection_for(delivery_date))
+            if response["status"] != "success":
+                Logger().error(
+                    f"Version marker of {delivery_date} was not replaced: {response['message']}"
+                )
+
+    @staticmethod
+    def build_driver_route(driver: Any, delivery_date: str) -> str | None:
+        """
+        Builds the partition key of the driver route index, None when the order has no driver.
+
+        :param driver: Driver of the order
+        :type driver: Any
+        :param delivery_date: Delivery date of the order
+        :type delivery_date: str
+        :return: The driver and the date joined by #
+        :rtype: str | None
+        """
+        if driver is None:
+            return None
+        return f"{int(driver)}#{delivery_date}"
+
+    def build_stored_order(self, item: dict) -> dict:
+        """
+        Copies an order adding its driver route and change stamp, without the index attributes that are null.
+
+        :param item: Order representation
+        :type item: dict
+        :return: the order to write
+        :rtype: dict
+        """
+        item = {
+            **item,
+            DRIVER_ROUTE_KEY: self.build_driver_route(
+                item.get("driver"), item[ORDERS_PRIMARY_KEY]
+            ),
+            CHANGE_STAMP_KEY: format_change_stamp(),
+        }
+        for field in self.ROUTE_INDEX_FIELDS:
+            if item.get(field) is None:
+                item.pop(field, None)
+        return item
 
     def create_order(self, item: dict) -> dict:
         """
@@ -35,10 +125,37 @@ class OrderDAO:
         :rtype: dict
         """
 
-        response = self.orders_db.insert_record(item)
+        response = self.orders_db.insert_record(self.build_stored_order(item))
+        if response["status"] == "success":
+            self.touch_dates(item[ORDERS_PRIMARY_KEY])
+        return response
+
+    def create_orders(self, items: List[dict]) -> dict:
+        """
+        Attempts to insert new records for several orders with BatchWriteItem requests.
+
+        :param items: Order representations, every order has a new id
+        :type items: List[dict]
+        :return: a dictionary that contains the response object, with the positions of the written
+            orders and the position and error message of each failure as payload
+        :rtype: dict
+        """
+        response = self.orders_db.batch_insert(
+            [self.build_stored_order(item) for item in items],
+            key_attributes=[ORDERS_PRIMARY_KEY, "id"],
+        )
+        self.touch_dates(
+            *(items[position][ORDERS_PRIMARY_KEY] for position in response["payload"]["written"])
+        )
         return response
 
-    def fetch_orders(self, primary_key: str, query_value: str) -> dict:
+    def fetch_orders(
+        self,
+        primary_key: str,
+        query_value: str,
+        limit: int = None,
+        fields: List[str] = None,
+    ) -> dict:
         """
         Attempts to retrieve order records from the DynamoDB table.
 
@@ -46,16 +163,140 @@ class OrderDAO:
         :type primary_key: str
         :param querie_value: Value that we will use to query the table
         :type querie_value: str
+        :param limit: Maximum number of orders to return, defaults to None (all the orders)
+        :type limit: int, optional
+        :param fields: Attributes of the orders to return, defaults to None (all the attributes)
+        :type fields: List[str], optional
         :return: a dictionary that contains the response object
         :rtype: dict
         """
         key_condition_expression = Key(primary_key).eq(query_value)
-        response = self.orders_db.retrieve_records(key_condition_expression)
+        response = self.orders_db.retrieve_records(
+            key_condition_expression, limit=limit, projection=fields
+        )
+        return response
+
+    def fetch_orders_page(
+        self,
+        delivery_date: str,
+        limit: int = None,
+        exclusive_start_key: Dict[str, Any] = None,
+        fields: List[str] = None,
+    ) -> dict:
+        """
+        Attempts to retrieve a single page of orders of a delivery date.
+
+        :param delivery_date: Date of the orders
+        :type delivery_date: str
+        :param limit: Maximum number of orders in the page, defaults to None (up to 1 MB)
+        :type limit: int, optional
+        :param exclusive_start_key: Key of the last order of the previous page, defaults to None
+        :type exclusive_start_key: Dict[str, Any], optional
+        :param fields: Attributes of the orders to return, defaults to None (all the attributes)
+        :type fields: List[str], optional
+        :return: a dictionary that contains the response object, with the orders and the
+        LastEvaluatedKey as payload
+        :rtype: dict
+        """
+        key_condition_expression = Key(ORDERS_PRIMARY_KEY).eq(delivery_date)
+        response = self.orders_db.retrieve_page(
+            key_condition_expression,
+            page_size=limit,
+            exclusive_start_key=exclusive_start_key,
+            projection=fields,
+        )
+        return response
+
+    def iter_orders(
+        self, delivery_date: str, page_size: int = None, limit: int = None
+    ) -> Iterator[dict]:
+        """
+        Lazily iterates the orders of a delivery date, requesting the next page only when it is needed.
+        Errors from DynamoDB are raised while iterating.
+
+        :param delivery_date: Date of the orders
+        :type delivery_date: str
+        :param page_size: Maximum number of orders evaluated per request, defaults to None
+        :type page_size: int, optional
+        :param limit: Maximum number of orders to return, defaults to None (all the orders)
+        :type limit: int, optional
+        :return: an iterator with the orders
+        :rtype: Iterator[dict]
+        """
+        key_condition_expression = Key(ORDERS_PRIMARY_KEY).eq(delivery_date)
+        return self.orders_db.query_items(
+            key_condition_expression, page_size=page_size, limit=limit
+        )
+
+    def fetch_driver_stops(
+        self, delivery_date: str, driver: int, fields: List[str] = None
+    ) -> dict:
+        """
+        Attempts to retrieve the stops of a driver on a delivery date from the driver route index,
+        sorted by delivery_sequence. Orders without a sequence are not in the index.
+
+        :param delivery_date: Date of the orders
+        :type delivery_date: str
+        :param driver: Driver of the orders
+        :type driver: int
+        :param fields: Attributes of the orders to return, defaults to None (the projected attributes)
+        :type fields: List[str], optional
+        :return: a dictionary that contains the response object, with the stops as payload
+        :rtype: dict
+        """
+        key_condition_expression = Key(DRIVER_ROUTE_KEY).eq(
+            self.build_driver_route(driver, delivery_date)
+        )
+        response = self.orders_db.retrieve_records(
+            key_condition_expression,
+            projection=fields,
+            index_name=DRIVER_ROUTE_INDEX_NAME,
+        )
+        return response
+
+    def fetch_changes(self, delivery_date: str, since: str) -> dict:
+        """
+        Attempts to retrieve the orders of a delivery date written after a change stamp, from the changes index,
+        and the orders removed from that date after it. A tombstone older than the order with the same id
+        is not returned, the order came back to the date after it was removed.
+
+        :param delivery_date: Date of the orders
+        :type delivery_date: str
+        :param since: Change stamp, only later changes are returned
+        :type since: str
+        :return: a dictionary that contains the response object, with the changed orders and the ids
+        of the removed orders as payload
+        :rtype: dict
+        """
+        key_condition_expression = Key(ORDERS_PRIMARY_KEY).eq(delivery_date) & Key(
+            CHANGE_STAMP_KEY
+        ).gt(since)
+        response = self.orders_db.retrieve_records(
+            key_condition_expression, index_name=CHANGES_INDEX_NAME
+        )
+        if response["status"] != "success":
+            return response
+
+        deletions = self.tombstones.fetch_deletions(delivery_date, since)
+        if deletions["status"] != "success":
+            return deletions
+
+        orders = response["payload"]
+        order_stamps = {order["id"]: order[CHANGE_STAMP_KEY] for order in orders}
+        response["payload"] = {
+            "orders": orders,
+            "deleted": [
+                {"id": tombstone["id"], CHANGE_STAMP_KEY: tombstone[CHANGE_STAMP_KEY]}
+                for tombstone in deletions["payload"]
+                if order_stamps.get(tombstone["id"], "") < tombstone[CHANGE_STAMP_KEY]
+            ],
+        }
         return response
 
     def update_order(self, item: dict) -> dict:
         """
         Attempts to update a record for an order into the DynamoDB table.
+        The replaced order, if any, is released from the capacity ledger.
 
         :param item: Order representation
         :type item: dict
@@ -63,12 +304,130 @@ class OrderDAO:
         :rtype: dict
         """
 
-        response = self.orders_db.update_record(item)
+        response = self.orders_db.update_record(self.build_stored_order(item))
+        if response["status"] == "success":
+            self.capacity.release_order(response["payload"])
+            self.touch_dates(item[ORDERS_PRIMARY_KEY])
+        return response
+
+    def fetch_order(self, delivery_date: str, order_id: str) -> dict:
+        """
+        Attempts to retrieve a single order from the DynamoDB table.
+
+        :param delivery_date: The delivery date of the order
+        :type delivery_date: str
+        :param order_id: The unique identifier of the order
+        :type order_id: str
+        :return: a dictionary that contains the response object, with the order as payload
+        :rtype: dict
+        """
+        response = self.orders_db.fetch_record(
+            {ORDERS_PRIMARY_KEY: delivery_date, "id": order_id}
+        )
+        return response
+
+    def patch_order(
+        self, delivery_date: str, order_id: str, changes: dict, version: int
+    ) -> dict:
+        """
+        Attempts to write only the changed attributes of an order, if it is still on the given version.
+
+        :param delivery_date: The delivery date of the order
+        :type delivery_date: str
+        :param order_id: The unique identifier of the order
+        :type order_id: str
+        :param changes: Attributes to set
+        :type changes: dict
+        :param version: Version of the order the changes were made on
+        :type version: int
+        :return: a dictionary that contains the response object, with the updated attributes as payload
+        :rtype: dict
+        """
+        if "driver" in changes:
+            changes = {
+                **changes,
+                DRIVER_ROUTE_KEY: self.build_driver_route(changes["driver"], delivery_date),
+            }
+        changes = {**changes, CHANGE_STAMP_KEY: format_change_stamp()}
+        removals = [
+            field
+            for field in self.ROUTE_INDEX_FIELDS
+            if field in changes and changes[field] is None
+        ]
+        response = self.orders_db.patch_record(
+            key={ORDERS_PRIMARY_KEY: delivery_date, "id": order_id},
+            changes={
+                name: value for name, value in changes.items() if name not in removals
+            },
+            expected_version=version,
+            removals=removals,
+        )
+        if response["status"] == "success":
+            self.touch_dates(delivery_date)
+        return response
+
+    def move_order(self, item: dict, original_date: str) -> dict:
+        """
+        Attempts to move an order to another delivery date in a single transaction: the order is put
+        on its new date, deleted from the original one and released from the capacity ledger of the
+        original date. If any of them fails, nothing is written.
+
+        :param item: Order representation with the new delivery_date
+        :type item: dict
+        :param original_date: Delivery date where the order is stored
+        :type original_date: str
+        :return: a dictionary that contains the response object, with the moved order as it was stored as payload
+        :rtype: dict
+        """
+        original_key = {ORDERS_PRIMARY_KEY: original_date, "id": item["id"]}
+        version_attribute = self.orders_db.VERSION_ATTRIBUTE
+        stored_response = self.orders_db.fetch_record(
+            original_key, projection=self.SLOT_FIELDS + [version_attribute]
+        )
+        if stored_response["status"] != "success":
+            return stored_response
+
+        stored_slot = stored_response["payload"]
+        previous_order = {**stored_slot, ORDERS_PRIMARY_KEY: original_date}
+        # The order is only deleted if its slot and version did not change since it was read,
+        # the moved order continues with the next version
+        stored_item = {
+            **self.build_stored_order(item),
+            version_attribute: int(stored_slot.get(version_attribute, 0)) + 1,
+        }
+        transact_items = [
+            self.orders_db.build_put_item(stored_item, must_not_exist=True),
+            self.orders_db.build_delete_item(
+                original_key,
+                expected=stored_slot,
+                missing=[] if version_attribute in stored_slot else [version_attribute],
+            ),
+            self.tombstones.build_deletion_item(
+                original_date, item["id"], stored_item[CHANGE_STAMP_KEY]
+            ),
+        ]
+        response = self.orders_db.transact_write(
+            transact_items + [self.capacity.build_release_item(previous_order)]
+        )
+        reasons = (response["payload"] or {}).get("cancellation_reasons", [])
+        if reasons == ["None", "None", "None", "ConditionalCheckFailed"]:
+            # The slot of the original date is not counted in the ledger, there is nothing to release
+            response = self.orders_db.transact_write(transact_items)
+            reasons = (response["payload"] or {}).get("cancellation_reasons", [])
+
+        if response["status"] == "success":
+            response["payload"] = previous_order
+            self.touch_dates(original_date, item[ORDERS_PRIMARY_KEY])
+        elif reasons[:1] == ["ConditionalCheckFailed"]:
+            response["message"] = f"Order {item['id']} already exists on {item[ORDERS_PRIMARY_KEY]}"
+        elif reasons[1:2] == ["ConditionalCheckFailed"]:
+            response["message"] = f"Order {item['id']} changed on {original_date}, try again"
         return response
 
     def delete_order(self, delivery_date: str, order_id: str) -> dict:
         """
         Attempts to delete an order from the DynamoDB table.
+        The deleted order, if any, is released from the capacity ledger and gets a tombstone for the changes feed.
         :param delivery_date: The delivery date of the order
         :type delivery_date: str
         :param order_id: The unique identifier of the order
@@ -76,4 +435,15 @@ class OrderDAO:
         :return: a dictionary that contains the response object
         :rtype: dict
         """
-        return self.orders_db.delete_record(delivery_date, order_id)
+        response = self.orders_db.delete_record(delivery_date, order_id)
+        if response["status"] == "success" and response["payload"]:
+            self.capacity.release_order(response["payload"])
+            self.touch_dates(delivery_date)
+            tombstone_response = self.tombstones.record_deletion(
+                delivery_date, order_id, format_change_stamp()
+            )
+            if tombstone_response["status"] != "success":
+                Logger().error(
+                    f"Deletion of order {order_id} will not be in the changes feed: {tombstone_response['message']}"
+                )
+        return response
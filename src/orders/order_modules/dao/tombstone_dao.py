@@ -0,0 +1,110 @@
+# Python's libraries
+import time
+from typing import Any
+from typing import Dict
+from typing import List
+
+# Own's modules
+from order_modules.data_access.dynamo_handler import DynamoDBHandler
+
+from settings import TOMBSTONES_TABLE_NAME
+from settings import TOMBSTONES_PRIMARY_KEY
+from settings import TOMBSTONES_SORT_KEY
+from settings import TOMBSTONE_TTL_DAYS
+from settings import CHANGE_STAMP_KEY
+
+# Third-party libraries
+from boto3.dynamodb.conditions import Key
+
+
+class TombstoneDAO:
+    """
+    A class for handling the tombstones of the orders removed from a delivery date, so the changes feed
+    can report deletions. Tombstones expire after TOMBSTONE_TTL_DAYS.
+    """
+
+    def __init__(self):
+        """
+        Initializes a new instance of the DAO class.
+        """
+        self.tombstones_db = DynamoDBHandler(
+            table_name=TOMBSTONES_TABLE_NAME,
+            partition_key=TOMBSTONES_PRIMARY_KEY,
+            sort_key=TOMBSTONES_SORT_KEY,
+        )
+
+    def build_tombstone(
+        self, delivery_date: str, order_id: str, changed_at: str
+    ) -> Dict[str, Any]:
+        """
+        Builds the tombstone of an order removed from a delivery date.
+        """
+        return {
+            TOMBSTONES_PRIMARY_KEY: delivery_date,
+            TOMBSTONES_SORT_KEY: order_id,
+            CHANGE_STAMP_KEY: changed_at,
+            "expires_at": int(time.time()) + TOMBSTONE_TTL_DAYS * 24 * 60 * 60,
+        }
+
+    def record_deletion(self, delivery_date: str, order_id: str, changed_at: str) -> dict:
+        """
+        Attempts to save the tombstone of an order removed from a delivery date.
+
+        :param delivery_date: Date the order was removed from
+        :type delivery_date: str
+        :param order_id: The unique identifier of the order
+        :type order_id: str
+        :param changed_at: Change stamp of the deletion
+        :type changed_at: str
+        :return: a dictionary that contains the response object
+        :rtype: dict
+        """
+        return self.tombstones_db.insert_record(
+            self.build_tombstone(delivery_date, order_id, changed_at)
+        )
+
+    def build_deletion_item(
+        self, delivery_date: str, order_id: str, changed_at: str
+    ) -> Dict[str, Any]:
+        """
+        Builds the transaction element that saves the tombstone of an order, so it is written
+        in the same transaction that removes the order.
+
+        :param delivery_date: Date the order was removed from
+        :type delivery_date: str
+        :param order_id: The unique identifier of the order
+        :type order_id: str
+        :param changed_at: Change stamp of the deletion
+        :type changed_at: str
+        :return: The Put element of the transaction
+        :rtype: Dict[str, Any]
+        """
+        return self.tombstones_db.build_put_item(
+            self.build_tombstone(delivery_date, order_id, changed_at)
+        )
+
+    def fetch_deletions(self, delivery_date: str, since: str) -> dict:
+        """
+        Attempts to retrieve the tombstones of a delivery date written after a change stamp.
+        Deletions are rare, the partition is read and filtered here.
+
+        :param delivery_date: Date of the orders
+        :type delivery_date: str
+        :param since: Change stamp, only later tombstones are returned
+        :type since: str
+        :return: a dictionary that contains the response object, with the tombstones as payload
+        :rtype: dict
+        """
+        key_condition_expression = Key(TOMBSTONES_PRIMARY_KEY).eq(delivery_date)
+        response = self.tombstones_db.retrieve_records(
+            key_condition_expression,
+            projection=[TOMBSTONES_SORT_KEY, CHANGE_STAMP_KEY],
+        )
+        if response["status"] == "success":
+            tombstones: List[Dict[str, Any]] = response["payload"]
+            response["payload"] = [
+                tombstone
+                for tombstone in tombstones
+                if tombstone.get(CHANGE_STAMP_KEY, "") > since
+            ]
+        return response
@@ -0,0 +1,62 @@
+# Python's libraries
+import uuid
+
+# Own's modules
+from order_modules.data_access.dynamo_handler import DynamoDBHandler
+
+from settings import COLLECTION_VERSIONS_TABLE_NAME
+from settings import COLLECTION_VERSIONS_PRIMARY_KEY
+
+
+class CollectionVersionDAO:
+    """
+    A class for handling the version markers of the collections served to the dashboards, one item per
+    collection with a token that changes on every write. Conditional requests compare it instead of the items.
+    """
+
+    MARKER_NAME = "marker"
+    INITIAL_MARKER = "0"
+
+    def __init__(self):
+        """
+        Initializes a new instance of the DAO class.
+        """
+        self.versions_db = DynamoDBHandler(
+            table_name=COLLECTION_VERSIONS_TABLE_NAME,
+            partition_key=COLLECTION_VERSIONS_PRIMARY_KEY,
+        )
+
+    def fetch_marker(self, collection: str) -> str | None:
+        """
+        Attempts to retrieve the version marker of a collection, with a consistent read so a marker
+        changed by a write acknowledged before is never missed.
+
+        :param collection: Name of the collection
+        :type collection: str
+        :return: the marker, INITIAL_MARKER if the collection was never written and None if it could not be read
+        :rtype: str | None
+        """
+        response = self.versions_db.fetch_record(
+            {COLLECTION_VERSIONS_PRIMARY_KEY: collection}, consistent_read=True
+        )
+        if response["status"] == "success":
+            return response["payload"][self.MARKER_NAME]
+        if response["status_code"] == DynamoDBHandler.HTTP_STATUS_NOT_FOUND:
+            return self.INITIAL_MARKER
+        return None
+
+    def touch(self, collection: str) -> dict:
+        """
+        Attempts to replace the version marker of a collection, it must be called after the collection was written.
+
+        :param collection: Name of the collection
+        :type collection: str
+        :return: a dictionary that contains the response object
+        :rtype: dict
+        """
+        return self.versions_db.update_record(
+            {
+                COLLECTION_VERSIONS_PRIMARY_KEY: collection,
+                self.MARKER_NAME: uuid.uuid4().hex,
+            }
+        )
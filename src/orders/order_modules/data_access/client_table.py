@@ -0,0 +1,286 @@
+# Python libraries
+import math
+from decimal import Decimal
+from typing import Any
+from typing import Callable
+from typing import Dict
+
+# Own modules
+from order_modules.utils.aws import get_client
+from order_modules.utils.aws import get_resource
+
+# Third-party libraries
+from boto3.dynamodb.conditions import ConditionBase
+from boto3.dynamodb.conditions import ConditionExpressionBuilder
+
+AttributeValue = Dict[str, Any]
+
+NULL = {"NULL": True}
+
+
+def marshal_value(value: Any) -> AttributeValue:
+    """Converts a Python value into a DynamoDB attribute value, dispatching on its type.
+    Used for the attributes that are not in a schema and for expression values.
+
+    :param value: Value to convert
+    :type value: Any
+    :raises TypeError: If the value can not be stored in DynamoDB
+    :return: The attribute value
+    :rtype: AttributeValue
+    """
+    value_type = type(value)
+    if value_type is str:
+        return {"S": value}
+    if value is None:
+        return NULL
+    if value_type is bool:
+        return {"BOOL": value}
+    if value_type is int:
+        return {"N": str(value)}
+    if value_type is float:
+        if not math.isfinite(value):
+            raise TypeError(f"{value} can not be stored in DynamoDB")
+        return {"N": repr(value)}
+    if isinstance(value, Decimal):
+        return {"N": str(value)}
+    if isinstance(value, dict):
+        return {"M": {key: marshal_value(item) for key, item in value.items()}}
+    if isinstance(value, (list, tuple)):
+        return {"L": [marshal_value(item) for item in value]}
+    if isinstance(value, (set, frozenset)):
+        if all(isinstance(item, str) for item in value):
+            return {"SS": list(value)}
+        return {"NS": [marshal_value(item)["N"] for item in value]}
+    if isinstance(value, (bytes, bytearray)):
+        return {"B": bytes(value)}
+    if isinstance(value, str):
+        return {"S": str(value)}
+    if isinstance(value, int):
+        return {"N": str(int(value))}
+    raise TypeError(f"Unsupported type {value_type.__name__} for DynamoDB")
+
+
+def parse_number(number: str) -> int | float:
+    """Converts a DynamoDB number into an int when it has no fraction and into a float otherwise."""
+    try:
+        return int(number)
+    except ValueError:
+        return float(number)
+
+
+def unmarshal_value(attribute_value: AttributeValue) -> Any:
+    """Converts a DynamoDB attribute value into native Python types, numbers become int or float.
+
+    :param attribute_value: The attribute value
+    :type attribute_value: AttributeValue
+    :return: The Python value
+    :rtype: Any
+    """
+    ((data_type, value),) = attribute_value.items()
+    if data_type == "S":
+        return value
+    if data_type == "N":
+        return parse_number(value)
+    if data_type == "BOOL":
+        return value
+    if data_type == "NULL":
+        return None
+    if data_type == "M":
+        return {key: unmarshal_value(item) for key, item in value.items()}
+    if data_type == "L":
+        return [unmarshal_value(item) for item in value]
+    if data_type == "SS":
+        return set(value)
+    if data_type == "NS":
+        return {parse_number(number) for number in value}
+    if data_type == "BS":
+        return set(value)
+    return value
+
+
+class EntitySchema:
+    """
+    Types of the attributes of an entity. The marshal and unmarshal functions are compiled once from the
+    schema, so every attribute goes straight to its converter instead of inspecting the value.
+    Attributes can be str, int, float, bool, a nested EntitySchema for maps or a one element list with
+    the type of the items. Attributes outside the schema, or values of another type, use the generic converters.
+    """
+
+    def __init__(self, name: str, fields: Dict[str, Any]):
+        self.name = name
+        self.fields = fields
+        self.encoders = {
+            field: self.compile_encoder(field_type) for field, field_type in fields.items()
+        }
+        self.decoders = {
+            field: self.compile_decoder(field_type) for field, field_type in fields.items()
+        }
+
+    @classmethod
+    def compile_encoder(cls, field_type: Any) -> Callable[[Any], AttributeValue]:
+        """Builds the function that converts the values of an attribute into attribute values."""
+        if field_type is str:
+            return lambda value: {"S": value} if type(value) is str else marshal_value(value)
+        if field_type is int:
+            return lambda value: (
+                {"N": str(value)} if type(value) is int else marshal_value(value)
+            )
+        if field_type is float:
+            return lambda value: (
+                {"N": repr(value)}
+                if type(value) is float and math.isfinite(value)
+                else marshal_value(value)
+            )
+        if field_type is bool:
+            return lambda value: {"BOOL": value} if type(value) is bool else marshal_value(value)
+        if isinstance(field_type, EntitySchema):
+            return lambda value: (
+                {"M": field_type.marshal(value)} if type(value) is dict else marshal_value(value)
+            )
+        if isinstance(field_type, list):
+            (item_type,) = field_type
+            encode_item = cls.compile_encoder(item_type)
+            return lambda value: (
+                {"L": [NULL if item is None else encode_item(item) for item in value]}
+                if type(value) is list
+                else marshal_value(value)
+            )
+        return marshal_value
+
+    @classmethod
+    def compile_decoder(cls, field_type: Any) -> Callable[[AttributeValue], Any]:
+        """Builds the function that converts the attribute values of an attribute into native types."""
+        if field_type is str:
+            return lambda value: value["S"] if "S" in value else unmarshal_value(value)
+        if field_type is int:
+            return lambda value: parse_number(value["N"]) if "N" in value else unmarshal_value(value)
+        if field_type is float:
+            return lambda value: float(value["N"]) if "N" in value else unmarshal_value(value)
+        if field_type is bool:
+            return lambda value: value["BOOL"] if "BOOL" in value else unmarshal_value(value)
+        if isinstance(field_type, EntitySchema):
+            return lambda value: (
+                field_type.unmarshal(value["M"]) if "M" in value else unmarshal_value(value)
+            )
+        if isinstance(field_type, list):
+            (item_type,) = field_type
+            decode_item = cls.compile_decoder(item_type)
+            return lambda value: (
+                [None if "NULL" in item else decode_item(item) for item in value["L"]]
+                if "L" in value
+                else unmarshal_value(value)
+            )
+        return unmarshal_value
+
+    def marshal(self, item: Dict[str, Any]) -> Dict[str, AttributeValue]:
+        """Converts an item into the attribute values expected by the low-level client.
+
+        :param item: Item with Python values
+        :type item: Dict[str, Any]
+        :return: The item with attribute values
+        :rtype: Dict[str, AttributeValue]
+        """
+        encoders = self.encoders
+        return {
+            name: NULL
+            if value is None
+            else encoders[name](value)
+            if name in encoders
+            else marshal_value(value)
+            for name, value in item.items()
+        }
+
+    def unmarshal(self, item: Dict[str, AttributeValue]) -> Dict[str, Any]:
+        """Converts an item returned by the low-level client into native Python types.
+
+        :param item: Item with attribute values
+        :type item: Dict[str, AttributeValue]
+        :return: The item with Python values
+        :rtype: Dict[str, Any]
+        """
+        decoders = self.decoders
+        return {
+            name: None
+            if "NULL" in value
+            else decoders[name](value)
+            if name in decoders
+            else unmarshal_value(value)
+            for name, value in item.items()
+        }
+
+
+class ClientTable:
+    """
+    Stand-in of the boto3 Table resource built on the low-level dynamodb client. It accepts the same
+    arguments as the resource methods used by DynamoDBHandler and converts items with an EntitySchema,
+    so numbers are returned as int and float instead of Decimal.
+    Transactions keep going through the resource client, they are built with Python values.
+    """
+
+    def __init__(self, table_name: str, schema: EntitySchema):
+        self.table_name = table_name
+        self.schema = schema
+        self.client = get_client("dynamodb")
+        self.meta = get_resource("dynamodb").Table(table_name).meta
+
+    def build_arguments(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Maps the arguments of a resource method into the arguments of the client method.
+
+        :param arguments: Arguments with Python values and condition objects
+        :type arguments: Dict[str, Any]
+        :return: Arguments with attribute values and expressions as strings
+        :rtype: Dict[str, Any]
+        """
+        client_arguments = {"TableName": self.table_name, **arguments}
+        names = dict(arguments.get("ExpressionAttributeNames") or {})
+        values = dict(arguments.get("ExpressionAttributeValues") or {})
+        builder = ConditionExpressionBuilder()
+        for argument in ("KeyConditionExpression", "FilterExpression", "ConditionExpression"):
+            condition = arguments.get(argument)
+            if isinstance(condition, ConditionBase):
+                expression = builder.build_expression(
+                    condition, is_key_condition=argument == "KeyConditionExpression"
+                )
+                client_arguments[argument] = expression.condition_expression
+                names.update(expression.attribute_name_placeholders)
+                values.update(expression.attribute_value_placeholders)
+
+        for argument in ("Item", "Key", "ExclusiveStartKey"):
+            if argument in arguments:
+                client_arguments[argument] = self.schema.marshal(arguments[argument])
+        if names:
+            client_arguments["ExpressionAttributeNames"] = names
+        if values:
+            client_arguments["ExpressionAttributeValues"] = {
+                placeholder: marshal_value(value) for placeholder, value in values.items()
+            }
+        return client_arguments
+
+    def build_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Converts the items of a client response into native Python types."""
+        unmarshal = self.schema.unmarshal
+        if "Items" in response:
+            response["Items"] = [unmarshal(item) for item in response["Items"]]
+        for field in ("Item", "Attributes", "LastEvaluatedKey"):
+            if field in response:
+                response[field] = unmarshal(response[field])
+        return response
+
+    def put_item(self, **arguments) -> Dict[str, Any]:
+        return self.build_response(self.client.put_item(**self.build_arguments(arguments)))
+
+    def get_item(self, **arguments) -> Dict[str, Any]:
+        return self.build_response(self.client.get_item(**self.build_arguments(arguments)))
+
+    def update_item(self, **arguments) -> Dict[str, Any]:
+        return self.build_response(self.client.update_item(**self.build_arguments(arguments)))
+
+    def delete_item(self, **arguments) -> Dict[str, Any]:
+        return self.build_response(self.client.delete_item(**self.build_arguments(arguments)))
+
+    def query(self, **arguments) -> Dict[str, Any]:
+        return self.build_response(self.client.query(**self.build_arguments(arguments)))
+
+    def scan(self, **arguments) -> Dict[str, Any]:
+        return self.build_response(self.client.scan(**self.build_arguments(arguments)))
+
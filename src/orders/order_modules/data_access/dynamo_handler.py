@@ -1,11 +1,16 @@
 # Python libraries
-import json
-from decimal import Decimal
+import random
+import time
 from typing import Dict
 from typing import Any
+from typing import Iterator
+from typing import List
 
 # Own modules
+from order_modules.data_access.client_table import ClientTable
+from order_modules.data_access.client_table import EntitySchema
 from order_modules.utils.aws import AWSClientManager
+from order_modules.utils.encoders import floats_to_decimals
 
 # Third-party libraries
 from aws_lambda_powertools import Logger
@@ -20,21 +25,60 @@ class DynamoDBHandler:
 
     HTTP_STATUS_OK = 200
     HTTP_STATUS_CREATED = 201
+    HTTP_STATUS_MULTI_STATUS = 207
     HTTP_STATUS_NO_CONTENT = 204
     HTTP_STATUS_BAD_REQUEST = 400
     HTTP_STATUS_FORBIDDEN = 403
     HTTP_STATUS_NOT_FOUND = 404
+    HTTP_STATUS_CONFLICT = 409
     HTTP_STATUS_INTERNAL_SERVER_ERROR = 500
+    VERSION_ATTRIBUTE = "version"
+    VERSIONED_PUT_MAX_ATTEMPTS = 3
+    MAX_BATCH_WRITE_ITEMS = 25
+    BATCH_WRITE_MAX_ATTEMPTS = 6
+    BATCH_WRITE_BASE_DELAY_SECONDS = 0.05
 
-    def __init__(self, table_name: str, partition_key: str, sort_key: str = None):
+    def __init__(
+        self,
+        table_name: str,
+        partition_key: str,
+        sort_key: str = None,
+        backend: str = "resource",
+        schema: EntitySchema = None,
+    ):
+        """
+        :param backend: resource for the boto3 Table resource, client for the low-level client with the
+            compiled converters of the schema, defaults to resource
+        :type backend: str, optional
+        :param schema: Types of the attributes of the items, used by the client backend
+        :type schema: EntitySchema, optional
+        """
         self.table_name = table_name
         self.partition_key = partition_key
         self.sort_key = sort_key
-        aws_resources_manager = AWSClientManager()
-        dynamodb_resource = aws_resources_manager.dynamodb
-        self.table = dynamodb_resource.Table(table_name)
+        if backend == "client":
+            self.table = ClientTable(table_name, schema or EntitySchema(table_name, {}))
+        elif backend == "resource":
+            aws_resources_manager = AWSClientManager()
+            dynamodb_resource = aws_resources_manager.dynamodb
+            self.table = dynamodb_resource.Table(table_name)
+        else:
+            raise ValueError(f"DynamoDB backend not supported: {backend}")
         self.logger = Logger()
 
+    def to_db_item(self, item: dict) -> dict:
+        """The Table resource rejects floats, they are converted to Decimal. The client backend
+        converts floats itself, so its items are sent as they are.
+
+        :param item: Item or changes as dict
+        :type item: dict
+        :return: The item to write
+        :rtype: dict
+        """
+        if isinstance(self.table, ClientTable):
+            return item
+        return floats_to_decimals(item)
+
     def insert_record(self, item: dict) -> Dict[str, Any]:
         """This function is used to save a record to a database.
         It takes in a dictionary, which is build from a Order Model, as an argument and attempts to put the item into the database.
@@ -49,7 +93,7 @@ class DynamoDBHandler:
         :rtype: Dict[str, Any]
         """
         try:
-            db_item = json.loads(json.dumps(item), parse_float=Decimal)
+            db_item = self.to_db_item(item)
             response = self.table.put_item(Item=db_item)
             if response["ResponseMetadata"]["HTTPStatusCode"] == self.HTTP_STATUS_OK:
                 self.logger.info("Order was created in DynamoDB")
@@ -82,27 +126,175 @@ class DynamoDBHandler:
                 message=str(error),
             )
 
-    def retrieve_records(self, key_condition_expression: Key) -> Dict[str, Any]:
+    def build_projection_arguments(self, projection: List[str] = None) -> Dict[str, Any]:
+        """This function maps a list of attributes into a ProjectionExpression.
+        Names are always aliased because attributes like status are reserved words.
+
+        :param projection: Attributes to return, defaults to None (all the attributes)
+        :type projection: List[str], optional
+        :return: Arguments with the projection, empty when all the attributes are returned
+        :rtype: Dict[str, Any]
+        """
+        if not projection:
+            return {}
+
+        names = {f"#field{index}": field for index, field in enumerate(projection)}
+        return {
+            "ProjectionExpression": ", ".join(names),
+            "ExpressionAttributeNames": names,
+        }
+
+    def build_query_arguments(
+        self,
+        key_condition_expression: Key,
+        page_size: int = None,
+        projection: List[str] = None,
+        exclusive_start_key: Dict[str, Any] = None,
+        index_name: str = None,
+    ) -> Dict[str, Any]:
+        """This function maps the query options into the arguments expected by table.query
+
+        :param key_condition_expression: Condition used to query the table
+        :type key_condition_expression: Key
+        :param page_size: Maximum number of items evaluated per request, defaults to None (up to 1 MB)
+        :type page_size: int, optional
+        :param projection: Attributes to return, defaults to None (all the attributes)
+        :type projection: List[str], optional
+        :param exclusive_start_key: Key where the query should continue, defaults to None
+        :type exclusive_start_key: Dict[str, Any], optional
+        :param index_name: Secondary index to query, defaults to None (the table)
+        :type index_name: str, optional
+        :return: Arguments for table.query
+        :rtype: Dict[str, Any]
+        """
+        query_arguments = {"KeyConditionExpression": key_condition_expression}
+        if index_name is not None:
+            query_arguments["IndexName"] = index_name
+        if page_size is not None:
+            query_arguments["Limit"] = page_size
+        query_arguments.update(self.build_projection_arguments(projection))
+        if exclusive_start_key is not None:
+            query_arguments["ExclusiveStartKey"] = exclusive_start_key
+        return query_arguments
+
+    def query_pages(
+        self,
+        key_condition_expression: Key,
+        page_size: int = None,
+        projection: List[str] = None,
+        index_name: str = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """This function is used to query the table one page at a time.
+        Pages are requested lazily following LastEvaluatedKey, so callers that stop iterating
+        do not pay for the pages they did not read.
+
+        :param key_condition_expression: Condition used to query the table
+        :type key_condition_expression: Key
+        :param page_size: Maximum number of items evaluated per request, defaults to None (up to 1 MB)
+        :type page_size: int, optional
+        :param projection: Attributes to return, defaults to None (all the attributes)
+        :type projection: List[str], optional
+        :param index_name: Secondary index to query, defaults to None (the table)
+        :type index_name: str, optional
+        :return: An iterator with the items of each page
+        :rtype: Iterator[List[Dict[str, Any]]]
+        """
+        query_arguments = self.build_query_arguments(
+            key_condition_expression,
+            page_size=page_size,
+            projection=projection,
+            index_name=index_name,
+        )
+
+        while True:
+            response = self.table.query(**query_arguments)
+            yield response["Items"]
+
+            last_evaluated_key = response.get("LastEvaluatedKey")
+            if last_evaluated_key is None:
+                break
+            query_arguments["ExclusiveStartKey"] = last_evaluated_key
+
+    def query_items(
+        self,
+        key_condition_expression: Key,
+        page_size: int = None,
+        limit: int = None,
+        projection: List[str] = None,
+        index_name: str = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """This function is used to query the table one item at a time, across all the pages.
+
+        :param key_condition_expression: Condition used to query the table
+        :type key_condition_expression: Key
+        :param page_size: Maximum number of items evaluated per request, defaults to None (up to 1 MB)
+        :type page_size: int, optional
+        :param limit: Maximum number of items to return, defaults to None (all the items)
+        :type limit: int, optional
+        :param projection: Attributes to return, defaults to None (all the attributes)
+        :type projection: List[str], optional
+        :param index_name: Secondary index to query, defaults to None (the table)
+        :type index_name: str, optional
+        :return: An iterator with the items
+        :rtype: Iterator[Dict[str, Any]]
+        """
+        if limit is not None and limit <= 0:
+            return
+
+        items_returned = 0
+        for page in self.query_pages(
+            key_condition_expression,
+            page_size=page_size,
+            projection=projection,
+            index_name=index_name,
+        ):
+            for item in page:
+                yield item
+                items_returned += 1
+                if limit is not None and items_returned >= limit:
+                    return
+
+    def retrieve_records(
+        self,
+        key_condition_expression: Key,
+        page_size: int = None,
+        limit: int = None,
+        projection: List[str] = None,
+        index_name: str = None,
+    ) -> Dict[str, Any]:
+        """This function is used to fetch all the records that match the key condition,
+        following the pagination of DynamoDB so results bigger than 1 MB are not truncated.
+
+        :param key_condition_expression: Condition used to query the table
+        :type key_condition_expression: Key
+        :param page_size: Maximum number of items evaluated per request, defaults to None (up to 1 MB)
+        :type page_size: int, optional
+        :param limit: Maximum number of items to return, defaults to None (all the items)
+        :type limit: int, optional
+        :param projection: Attributes to return, defaults to None (all the attributes)
+        :type projection: List[str], optional
+        :param index_name: Secondary index to query, defaults to None (the table)
+        :type index_name: str, optional
+        :return: A summary of the query action, with the items as payload
+        :rtype: Dict[str, Any]
+        """
         try:
-            response = self.table.query(
-                KeyConditionExpression=key_condition_expression,
-            )
-            if response["ResponseMetadata"]["HTTPStatusCode"] == self.HTTP_STATUS_OK:
-                self.logger.info("Order were fetched from DynamoDB")
-                return self.build_response_object(
-                    status="success",
-                    status_code=self.HTTP_STATUS_OK,
-                    message=f"{len(response['Items'])} items were found",
-                    payload=response["Items"],
-                )
-            else:
-                message = response["Error"]["Message"]
-                self.logger.error(f"Failed retrieving records: Details: {message}")
-                return self.build_response_object(
-                    status="error",
-                    status_code=response["ResponseMetadata"]["HTTPStatusCode"],
-                    message=message,
+            items = list(
+                self.query_items(
+                    key_condition_expression,
+                    page_size=page_size,
+                    limit=limit,
+                    projection=projection,
+                    index_name=index_name,
                 )
+            )
+            self.logger.info("Order were fetched from DynamoDB")
+            return self.build_response_object(
+                status="success",
+                status_code=self.HTTP_STATUS_OK,
+                message=f"{len(items)} items were found",
+                payload=items,
+            )
         except ClientError as error:
             message = f"{error.response['Error']['Message']}. {error.response['Error']['Code']}"
             self.logger.error(
@@ -121,10 +313,153 @@ class DynamoDBHandler:
                 message=str(error),
             )
 
+    def retrieve_page(
+        self,
+        key_condition_expression: Key,
+        page_size: int = None,
+        exclusive_start_key: Dict[str, Any] = None,
+        projection: List[str] = None,
+    ) -> Dict[str, Any]:
+        """This function is used to fetch a single page of records, so clients can paginate with a cursor.
+
+        :param key_condition_expression: Condition used to query the table
+        :type key_condition_expression: Key
+        :param page_size: Maximum number of items to return, defaults to None (up to 1 MB)
+        :type page_size: int, optional
+        :param exclusive_start_key: Key where the previous page ended, defaults to None
+        :type exclusive_start_key: Dict[str, Any], optional
+        :param projection: Attributes to return, defaults to None (all the attributes)
+        :type projection: List[str], optional
+        :return: A summary of the query action, with the items and the LastEvaluatedKey as payload
+        :rtype: Dict[str, Any]
+        """
+        try:
+            response = self.table.query(
+                **self.build_query_arguments(
+                    key_condition_expression,
+                    page_size=page_size,
+                    projection=projection,
+                    exclusive_start_key=exclusive_start_key,
+                )
+            )
+            self.logger.info("Page of orders was fetched from DynamoDB")
+            return self.build_response_object(
+                status="success",
+                status_code=self.HTTP_STATUS_OK,
+                message=f"{len(response['Items'])} items were found",
+                payload={
+                    "items": response["Items"],
+                    "last_evaluated_key": response.get("LastEvaluatedKey"),
+                },
+            )
+        except ClientError as error:
+            message = f"{error.response['Error']['Message']}. {error.response['Error']['Code']}"
+            self.logger.error(f"ClientError when retrieving page: Details: {message}")
+            return self.build_response_object(
+                status="error",
+                status_code=error.response["ResponseMetadata"]["HTTPStatusCode"],
+                message=message,
+            )
+        except Exception as error:
+            self.logger.error(f"Exception when retrieving page: Details: {error}")
+            return self.build_response_object(
+                status="error",
+                status_code=self.HTTP_STATUS_INTERNAL_SERVER_ERROR,
+                message=str(error),
+            )
+
+    def fetch_record(
+        self,
+        key: Dict[str, Any],
+        projection: List[str] = None,
+        consistent_read: bool = False,
+    ) -> Dict[str, Any]:
+        """This function is used to fetch a single record by its primary key.
+
+        :param key: Primary key of the record
+        :type key: Dict[str, Any]
+        :param projection: Attributes to return, defaults to None (all the attributes)
+        :type projection: List[str], optional
+        :param consistent_read: Whether the read must include every write acknowledged before it, defaults to False
+        :type consistent_read: bool, optional
+        :return: A summary of the get action, with the item as payload
+        :rtype: Dict[str, Any]
+        """
+        try:
+            response = self.table.get_item(
+                Key=key,
+                ConsistentRead=consistent_read,
+                **self.build_projection_arguments(projection),
+            )
+            item = response.get("Item")
+            if item is None:
+                return self.build_response_object(
+                    status="error",
+                    status_code=self.HTTP_STATUS_NOT_FOUND,
+                    message="Item was not found",
+                )
+
+            return self.build_response_object(
+                status="success",
+                status_code=self.HTTP_STATUS_OK,
+                message="Item was found",
+                payload=item,
+            )
+        except ClientError as error:
+            message = f"{error.response['Error']['Message']}. {error.response['Error']['Code']}"
+            self.logger.error(f"ClientError when fetching record: Details: {message}")
+            return self.build_response_object(
+                status="error",
+                status_code=error.response["ResponseMetadata"]["HTTPStatusCode"],
+                message=message,
+            )
+        except Exception as error:
+            self.logger.error(f"Exception when fetching record: Details: {error}")
+            return self.build_response_object(
+                status="error",
+                status_code=self.HTTP_STATUS_INTERNAL_SERVER_ERROR,
+                message=str(error),
+            )
+
+    def build_versioned_put(self, item: dict) -> Dict[str, Any]:
+        """
+        This function reads the version of the stored item and builds the arguments of a put_item that
+        replaces it with the next version. The put is conditioned on the version that was read,
+        records written before versioning are on version 0.
+
+        :param item: Item as dict
+        :type item: dict
+        :return: Item, condition and expression attributes of the put_item
+        :rtype: Dict[str, Any]
+        """
+        key = {name: item[name] for name in (self.partition_key, self.sort_key) if name}
+        stored_item = (
+            self.table.get_item(
+                Key=key,
+                ProjectionExpression="#version",
+                ExpressionAttributeNames={"#version": self.VERSION_ATTRIBUTE},
+                ConsistentRead=True,
+            ).get("Item")
+            or {}
+        )
+        put_arguments = {"ExpressionAttributeNames": {"#version": self.VERSION_ATTRIBUTE}}
+        if self.VERSION_ATTRIBUTE in stored_item:
+            stored_version = int(stored_item[self.VERSION_ATTRIBUTE])
+            put_arguments["ConditionExpression"] = "#version = :stored_version"
+            put_arguments["ExpressionAttributeValues"] = {":stored_version": stored_version}
+        else:
+            stored_version = 0
+            put_arguments["ConditionExpression"] = "attribute_not_exists(#version)"
+        put_arguments["Item"] = self.to_db_item(
+            {**item, self.VERSION_ATTRIBUTE: stored_version + 1}
+        )
+        return put_arguments
+
     def update_record(self, item: dict) -> Dict[str, Any]:
         """
         This function is used to update a record in the database using put_item.
-        If the item already exists, it will be updated.
+        The item gets the next version of the stored one, see build_versioned_put.
+        If the item already exists, it will be updated and the replaced item is returned as payload.
 
         :param item: Item as dict
         :type item: dict
@@ -132,14 +467,29 @@ class DynamoDBHandler:
         :rtype: Dict[str, Any]
         """
         try:
-            db_item = json.loads(json.dumps(item), parse_float=Decimal)
-            response = self.table.put_item(Item=db_item)
+            for _ in range(self.VERSIONED_PUT_MAX_ATTEMPTS):
+                try:
+                    response = self.table.put_item(
+                        **self.build_versioned_put(item), ReturnValues="ALL_OLD"
+                    )
+                    break
+                except ClientError as error:
+                    if error.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                        raise
+                    self.logger.info("Record was modified while it was replaced, reading it again")
+            else:
+                return self.build_response_object(
+                    status="error",
+                    status_code=self.HTTP_STATUS_CONFLICT,
+                    message="Record was modified while it was replaced, try again",
+                )
             if response["ResponseMetadata"]["HTTPStatusCode"] == self.HTTP_STATUS_OK:
                 self.logger.info("Order was updated in DynamoDB")
                 return self.build_response_object(
                     status="success",
                     status_code=self.HTTP_STATUS_OK,
                     message="Record updated in DynamoDB",
+                    payload=response.get("Attributes"),
                 )
             else:
                 message = response["Error"]["Message"]
@@ -169,7 +519,7 @@ class DynamoDBHandler:
         """
         This function is used to delete a record from the database.
         It takes in the delivery date and order id as arguments and attempts to delete the item from the database.
-        If the response from the database is successful, it returns a status of "success".
+        If the response from the database is successful, it returns a status of "success" and the deleted item as payload.
         If there is an AWS ClientError, it logs information about the error and also returns a status of "error" along
         with the HTTP status code and details about the error message.
         :param delivery_date: Delivery date of the order
@@ -181,7 +531,8 @@ class DynamoDBHandler:
         """
         try:
             response = self.table.delete_item(
-                Key={"delivery_date": delivery_date, "id": order_id}
+                Key={"delivery_date": delivery_date, "id": order_id},
+                ReturnValues="ALL_OLD",
             )
             if response["ResponseMetadata"]["HTTPStatusCode"] == self.HTTP_STATUS_OK:
                 self.logger.info(
@@ -191,6 +542,7 @@ class DynamoDBHandler:
                     status="success",
                     status_code=self.HTTP_STATUS_OK,
                     message=f"Record with id {order_id} on {delivery_date} was deleted from DynamoDB",
+                    payload=response.get("Attributes"),
                 )
             else:
                 message = response.get("Error", {}).get("Message", "Unknown error")
@@ -216,6 +568,524 @@ class DynamoDBHandler:
                 message=str(error),
             )
 
+    def build_put_item(self, item: dict, must_not_exist: bool = False) -> Dict[str, Any]:
+        """This function maps an item into the Put of a TransactWriteItems request.
+
+        :param item: Item as dict
+        :type item: dict
+        :param must_not_exist: Reject the transaction if an item with the same key exists, defaults to False
+        :type must_not_exist: bool, optional
+        :return: The Put element of the transaction
+        :rtype: Dict[str, Any]
+        """
+        put_item = {
+            "TableName": self.table_name,
+            "Item": floats_to_decimals(item),
+        }
+        if must_not_exist:
+            put_item["ConditionExpression"] = "attribute_not_exists(#pk)"
+            put_item["ExpressionAttributeNames"] = {"#pk": self.partition_key}
+        return {"Put": put_item}
+
+    def build_delete_item(
+        self,
+        key: Dict[str, Any],
+        expected: Dict[str, Any] = None,
+        missing: List[str] = None,
+    ) -> Dict[str, Any]:
+        """This function maps a key into the Delete of a TransactWriteItems request, the item must exist
+        and, if expected is provided, still have those attribute values.
+
+        :param key: Primary key of the item
+        :type key: Dict[str, Any]
+        :param expected: Attribute values the item must have, defaults to None
+        :type expected: Dict[str, Any], optional
+        :param missing: Attributes the item must not have, defaults to None
+        :type missing: List[str], optional
+        :return: The Delete element of the transaction
+        :rtype: Dict[str, Any]
+        """
+        expression_attribute_names = {"#pk": self.partition_key}
+        expression_attribute_values = {}
+        condition_expression_parts = ["attribute_exists(#pk)"]
+        for index, (name, value) in enumerate((expected or {}).items()):
+            expression_attribute_names[f"#attr{index}"] = name
+            expression_attribute_values[f":attr{index}"] = value
+            condition_expression_parts.append(f"#attr{index} = :attr{index}")
+        for index, name in enumerate(missing or []):
+            expression_attribute_names[f"#missing{index}"] = name
+            condition_expression_parts.append(f"attribute_not_exists(#missing{index})")
+
+        delete_item = {
+            "TableName": self.table_name,
+            "Key": key,
+            "ConditionExpression": " AND ".join(condition_expression_parts),
+            "ExpressionAttributeNames": expression_attribute_names,
+        }
+        if expression_attribute_values:
+            delete_item["ExpressionAttributeValues"] = expression_attribute_values
+        return {"Delete": delete_item}
+
+    def build_counter_item(
+        self, key: Dict[str, Any], counter_name: str, amount: int, min_value: int = None
+    ) -> Dict[str, Any]:
+        """This function maps a counter change into the Update of a TransactWriteItems request,
+        the counter must exist and, if min_value is provided, not end up below it.
+
+        :param key: Primary key of the counter item
+        :type key: Dict[str, Any]
+        :param counter_name: Name of the numeric attribute to update
+        :type counter_name: str
+        :param amount: Value to add, use negative values to decrement
+        :type amount: int
+        :param min_value: Minimum value allowed for the counter after the update, defaults to None
+        :type min_value: int, optional
+        :return: The Update element of the transaction
+        :rtype: Dict[str, Any]
+        """
+        expression_attribute_values = {":amount": amount}
+        condition_expression = "attribute_exists(#counter)"
+        if min_value is not None:
+            expression_attribute_values[":lower_limit"] = min_value - amount
+            condition_expression += " AND #counter >= :lower_limit"
+
+        return {
+            "Update": {
+                "TableName": self.table_name,
+                "Key": key,
+                "UpdateExpression": "ADD #counter :amount",
+                "ConditionExpression": condition_expression,
+                "ExpressionAttributeNames": {"#counter": counter_name},
+                "ExpressionAttributeValues": expression_attribute_values,
+            }
+        }
+
+    def batch_insert(
+        self, items: List[Dict[str, Any]], key_attributes: List[str]
+    ) -> Dict[str, Any]:
+        """This function writes items in BatchWriteItem requests of up to 25 items. The UnprocessedItems
+        returned when the table is throttled are sent again with exponential backoff and jitter.
+        Existing items with the same key are replaced, the items must have new keys.
+
+        :param items: Items to write
+        :type items: List[Dict[str, Any]]
+        :param key_attributes: Attributes of the primary key, used to match the unprocessed items
+        :type key_attributes: List[str]
+        :return: A summary of the batch, with the positions of the written items and the position and
+            error message of each failure as payload. The status is success when every item was written
+        :rtype: Dict[str, Any]
+        """
+        written = []
+        failures = []
+        for start in range(0, len(items), self.MAX_BATCH_WRITE_ITEMS):
+            pending = {
+                tuple(str(item.get(name)) for name in key_attributes): position
+                for position, item in enumerate(
+                    items[start : start + self.MAX_BATCH_WRITE_ITEMS], start
+                )
+            }
+            requests = [
+                {"PutRequest": {"Item": floats_to_decimals(items[position])}}
+                for position in pending.values()
+            ]
+            message = "Items were not processed after several attempts"
+            for attempt in range(self.BATCH_WRITE_MAX_ATTEMPTS):
+                if attempt:
+                    time.sleep(
+                        random.uniform(0, self.BATCH_WRITE_BASE_DELAY_SECONDS * 2**attempt)
+                    )
+                try:
+                    response = self.table.meta.client.batch_write_item(
+                        RequestItems={self.table_name: requests}
+                    )
+                except ClientError as error:
+                    message = f"{error.response['Error']['Message']}. {error.response['Error']['Code']}"
+                    self.logger.error(f"ClientError when writing batch: Details: {message}")
+                    if error.response["Error"]["Code"] not in (
+                        "ProvisionedThroughputExceededException",
+                        "ThrottlingException",
+                        "RequestLimitExceeded",
+                    ):
+                        break
+                    continue
+                except Exception as error:
+                    message = str(error)
+                    self.logger.error(f"Exception when writing batch: Details: {message}")
+                    break
+
+                requests = response.get("UnprocessedItems", {}).get(self.table_name, [])
+                unprocessed = {
+                    tuple(str(request["PutRequest"]["Item"].get(name)) for name in key_attributes)
+                    for request in requests
+                }
+                written.extend(
+                    position for key, position in pending.items() if key not in unprocessed
+                )
+                pending = {
+                    key: position for key, position in pending.items() if key in unprocessed
+                }
+                if not pending:
+                    break
+
+            failures.extend(
+                {"position": position, "message": message} for position in pending.values()
+            )
+
+        self.logger.info(f"{len(written)} items written in batches, {len(failures)} failed")
+        return self.build_response_object(
+            status="success" if not failures else "error",
+            status_code=self.HTTP_STATUS_OK if not failures else self.HTTP_STATUS_MULTI_STATUS,
+            message=f"{len(written)} items written in DynamoDB",
+            payload={"written": sorted(written), "failures": failures},
+        )
+
+    def transact_write(self, transact_items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """This function writes several items, of this or other tables, in a single TransactWriteItems request.
+        Either every item is written or none of them. When the transaction is cancelled it returns a 409
+        with the cancellation reason of each item, in the same order, as payload.
+
+        :param transact_items: Put, Update, Delete or ConditionCheck elements
+        :type transact_items: List[Dict[str, Any]]
+        :return: A summary of the transaction
+        :rtype: Dict[str, Any]
+        """
+        try:
+            self.table.meta.client.transact_write_items(TransactItems=transact_items)
+            return self.build_response_object(
+                status="success",
+                status_code=self.HTTP_STATUS_OK,
+                message=f"{len(transact_items)} items written in a transaction",
+            )
+        except ClientError as error:
+            message = f"{error.response['Error']['Message']}. {error.response['Error']['Code']}"
+            if error.response["Error"]["Code"] == "TransactionCanceledException":
+                reasons = [
+                    reason.get("Code", "None")
+                    for reason in error.response.get("CancellationReasons", [])
+                ]
+                self.logger.info(f"Transaction was cancelled, reasons: {reasons}")
+                return self.build_response_object(
+                    status="error",
+                    status_code=self.HTTP_STATUS_CONFLICT,
+                    message=message,
+                    payload={"cancellation_reasons": reasons},
+                )
+            self.logger.error(f"ClientError when writing transaction: Details: {message}")
+            return self.build_response_object(
+                status="error",
+                status_code=error.response["ResponseMetadata"]["HTTPStatusCode"],
+                message=message,
+            )
+        except Exception as error:
+            self.logger.error(f"Exception when writing transaction: Details: {error}")
+            return self.build_response_object(
+                status="error",
+                status_code=self.HTTP_STATUS_INTERNAL_SERVER_ERROR,
+                message=str(error),
+            )
+
+    def update_counter(
+        self,
+        key: Dict[str, Any],
+        counter_name: str,
+        amount: int,
+        max_value: int = None,
+        min_value: int = None,
+        attributes: Dict[str, Any] = None,
+    ) -> Dict[str, Any]:
+        """
+        This function is used to atomically add an amount to a numeric attribute using update_item.
+        When max_value or min_value are provided, the update is conditional and it will be rejected
+        with a 409 status code if the counter would end up outside of those limits.
+
+        :param key: Primary key of the counter item
+        :type key: Dict[str, Any]
+        :param counter_name: Name of the numeric attribute to update
+        :type counter_name: str
+        :param amount: Value to add, use negative values to decrement
+        :type amount: int
+        :param max_value: Maximum value allowed for the counter after the update, defaults to None
+        :type max_value: int, optional
+        :param min_value: Minimum value allowed for the counter after the update, defaults to None
+        :type min_value: int, optional
+        :param attributes: Extra attributes to set in the counter item, defaults to None
+        :type attributes: Dict[str, Any], optional
+        :return: A summary of the update_item action, with the updated counter as payload
+        :rtype: Dict[str, Any]
+        """
+        try:
+            expression_attribute_names = {"#counter": counter_name}
+            expression_attribute_values = {":amount": amount}
+            set_expression_parts = []
+            for index, (name, value) in enumerate((attributes or {}).items()):
+                expression_attribute_names[f"#attr{index}"] = name
+                expression_attribute_values[f":attr{index}"] = value
+                set_expression_parts.append(f"#attr{index} = :attr{index}")
+
+            update_expression = "ADD #counter :amount"
+            if set_expression_parts:
+                update_expression = (
+                    f"SET {', '.join(set_expression_parts)} {update_expression}"
+                )
+
+            update_arguments = {
+                "Key": key,
+                "UpdateExpression": update_expression,
+                "ExpressionAttributeNames": expression_attribute_names,
+                "ExpressionAttributeValues": expression_attribute_values,
+                "ReturnValues": "UPDATED_NEW",
+            }
+
+            condition_expression_parts = []
+            if max_value is not None:
+                expression_attribute_values[":upper_limit"] = max_value - amount
+                condition_expression_parts.append(
+                    "(attribute_not_exists(#counter) OR #counter <= :upper_limit)"
+                )
+            if min_value is not None:
+                expression_attribute_values[":lower_limit"] = min_value - amount
+                condition_expression_parts.append("#counter >= :lower_limit")
+            if condition_expression_parts:
+                update_arguments["ConditionExpression"] = " AND ".join(
+                    condition_expression_parts
+                )
+
+            response = self.table.update_item(**update_arguments)
+            return self.build_response_object(
+                status="success",
+                status_code=self.HTTP_STATUS_OK,
+                message=f"Counter {counter_name} updated in DynamoDB",
+                payload=response.get("Attributes"),
+            )
+        except ClientError as error:
+            if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                self.logger.info(
+                    f"Counter {counter_name} for {key} is out of its limits, update was rejected"
+                )
+                return self.build_response_object(
+                    status="error",
+                    status_code=self.HTTP_STATUS_CONFLICT,
+                    message=f"Counter {counter_name} is out of its limits",
+                )
+            message = f"{error.response['Error']['Message']}. {error.response['Error']['Code']}"
+            self.logger.error(f"ClientError when updating counter: Details: {message}")
+            return self.build_response_object(
+                status="error",
+                status_code=error.response["ResponseMetadata"]["HTTPStatusCode"],
+                message=message,
+            )
+        except Exception as error:
+            self.logger.error(f"Exception when updating counter: Details: {error}")
+            return self.build_response_object(
+                status="error",
+                status_code=self.HTTP_STATUS_INTERNAL_SERVER_ERROR,
+                message=str(error),
+            )
+
+    def initialize_counter(
+        self,
+        key: Dict[str, Any],
+        counter_name: str,
+        value: int,
+        attributes: Dict[str, Any] = None,
+    ) -> Dict[str, Any]:
+        """
+        This function is used to set the starting value of a counter, only if the counter does not exist yet.
+        Counters that were already initialized by a concurrent request are left untouched.
+
+        :param key: Primary key of the counter item
+        :type key: Dict[str, Any]
+        :param counter_name: Name of the numeric attribute to initialize
+        :type counter_name: str
+        :param value: Starting value of the counter
+        :type value: int
+        :param attributes: Extra attributes to set in the counter item, defaults to None
+        :type attributes: Dict[str, Any], optional
+        :return: A summary of the update_item action
+        :rtype: Dict[str, Any]
+        """
+        try:
+            expression_attribute_names = {"#counter": counter_name}
+            expression_attribute_values = {":value": value}
+            set_expression_parts = ["#counter = if_not_exists(#counter, :value)"]
+            for index, (name, attribute_value) in enumerate(
+                (attributes or {}).items()
+            ):
+                expression_attribute_names[f"#attr{index}"] = name
+                expression_attribute_values[f":attr{index}"] = attribute_value
+                set_expression_parts.append(f"#attr{index} = :attr{index}")
+
+            self.table.update_item(
+                Key=key,
+                UpdateExpression=f"SET {', '.join(set_expression_parts)}",
+                ConditionExpression="attribute_not_exists(#counter)",
+                ExpressionAttributeNames=expression_attribute_names,
+                ExpressionAttributeValues=expression_attribute_values,
+            )
+            return self.build_response_object(
+                status="success",
+                status_code=self.HTTP_STATUS_OK,
+                message=f"Counter {counter_name} initialized in DynamoDB",
+            )
+        except ClientError as error:
+            if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                self.logger.info(
+                    f"Counter {counter_name} for {key} was already initialized"
+                )
+                return self.build_response_object(
+                    status="success",
+                    status_code=self.HTTP_STATUS_OK,
+                    message=f"Counter {counter_name} was already initialized",
+                )
+            message = f"{error.response['Error']['Message']}. {error.response['Error']['Code']}"
+            self.logger.error(
+                f"ClientError when initializing counter: Details: {message}"
+            )
+            return self.build_response_object(
+                status="error",
+                status_code=error.response["ResponseMetadata"]["HTTPStatusCode"],
+                message=message,
+            )
+        except Exception as error:
+            self.logger.error(f"Exception when initializing counter: Details: {error}")
+            return self.build_response_object(
+                status="error",
+                status_code=self.HTTP_STATUS_INTERNAL_SERVER_ERROR,
+                message=str(error),
+            )
+
+    def check_version(
+        self, stored_item: Dict[str, Any], expected_version: int
+    ) -> Dict[str, Any]:
+        """
+        This function compares the version of a stored record with the version read by the client,
+        before the changes of a patch are built. Records written before versioning are on version 0.
+
+        :param stored_item: Record as it is stored
+        :type stored_item: Dict[str, Any]
+        :param expected_version: Version of the record read by the client
+        :type expected_version: int
+        :return: A success with the stored version as payload, or a 409 with the stored version as payload
+        :rtype: Dict[str, Any]
+        """
+        stored_version = int(stored_item.get(self.VERSION_ATTRIBUTE, 0))
+        if stored_version != expected_version:
+            return self.build_response_object(
+                status="error",
+                status_code=self.HTTP_STATUS_CONFLICT,
+                message=f"Record was modified after version {expected_version}, fetch it again",
+                payload={"version": stored_version},
+            )
+        return self.build_response_object(
+            status="success",
+            status_code=self.HTTP_STATUS_OK,
+            message="Record is on the expected version",
+            payload={"version": stored_version},
+        )
+
+    def patch_record(
+        self,
+        key: Dict[str, Any],
+        changes: Dict[str, Any],
+        expected_version: int,
+        removals: List[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        This function is used to update only the given attributes of an existing record using update_item.
+        The record must still be on expected_version, records written before versioning are on version 0.
+        Every patch increases the version by one, when it does not match a 409 status code is returned.
+
+        :param key: Primary key of the record
+        :type key: Dict[str, Any]
+        :param changes: Attributes to set, key attributes can not be changed
+        :type changes: Dict[str, Any]
+        :param expected_version: Version of the record read by the client
+        :type expected_version: int
+        :param removals: Attributes to remove, like index keys that can not be set to null, defaults to None
+        :type removals: List[str], optional
+        :return: A summary of the update_item action, with the new version and the updated attributes
+            as changes in the payload
+        :rtype: Dict[str, Any]
+        """
+        try:
+            db_changes = self.to_db_item(changes)
+            expression_attribute_names = {
+                "#pk": self.partition_key,
+                "#version": self.VERSION_ATTRIBUTE,
+            }
+            expression_attribute_values = {
+                ":expected_version": expected_version,
+                ":next_version": expected_version + 1,
+            }
+            set_expression_parts = ["#version = :next_version"]
+            for index, (name, value) in enumerate(db_changes.items()):
+                expression_attribute_names[f"#attr{index}"] = name
+                expression_attribute_values[f":attr{index}"] = value
+                set_expression_parts.append(f"#attr{index} = :attr{index}")
+            remove_expression_parts = []
+            for index, name in enumerate(removals or []):
+                expression_attribute_names[f"#remove{index}"] = name
+                remove_expression_parts.append(f"#remove{index}")
+
+            condition_expression = "attribute_exists(#pk) AND #version = :expected_version"
+            if expected_version == 0:
+                condition_expression = (
+                    "attribute_exists(#pk) AND "
+                    "(attribute_not_exists(#version) OR #version = :expected_version)"
+                )
+
+            update_expression = f"SET {', '.join(set_expression_parts)}"
+            if remove_expression_parts:
+                update_expression += f" REMOVE {', '.join(remove_expression_parts)}"
+
+            response = self.table.update_item(
+                Key=key,
+                UpdateExpression=update_expression,
+                ConditionExpression=condition_expression,
+                ExpressionAttributeNames=expression_attribute_names,
+                ExpressionAttributeValues=expression_attribute_values,
+                ReturnValues="UPDATED_NEW",
+            )
+            self.logger.info(f"Record {key} was patched in DynamoDB")
+            updated_attributes = response.get("Attributes") or {}
+            return self.build_response_object(
+                status="success",
+                status_code=self.HTTP_STATUS_OK,
+                message="Record updated in DynamoDB",
+                payload={
+                    "version": updated_attributes.get(self.VERSION_ATTRIBUTE),
+                    "changes": {
+                        name: value
+                        for name, value in updated_attributes.items()
+                        if name != self.VERSION_ATTRIBUTE
+                    },
+                },
+            )
+        except ClientError as error:
+            if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                self.logger.info(
+                    f"Record {key} does not exist or is not on version {expected_version}"
+                )
+                return self.build_response_object(
+                    status="error",
+                    status_code=self.HTTP_STATUS_CONFLICT,
+                    message=f"Record does not exist or was modified after version {expected_version}, fetch it again",
+                )
+            message = f"{error.response['Error']['Message']}. {error.response['Error']['Code']}"
+            self.logger.error(f"ClientError when patching record: Details: {message}")
+            return self.build_response_object(
+                status="error",
+                status_code=error.response["ResponseMetadata"]["HTTPStatusCode"],
+                message=message,
+            )
+        except Exception as error:
+            self.logger.error(f"Exception when patching record: Details: {error}")
+            return self.build_response_object(
+                status="error",
+                status_code=self.HTTP_STATUS_INTERNAL_SERVER_ERROR,
+                message=str(error),
+            )
+
     def build_response_object(
         self,
         status: str,
@@ -0,0 +1,41 @@
+# Own modules
+from order_modules.data_access.client_table import EntitySchema
+
+ORDER_ERROR_SCHEMA = EntitySchema("OrderError", {"code": str, "value": str})
+
+CART_ITEM_SCHEMA = EntitySchema(
+    "CartItem",
+    {"product": str, "quantity": int, "price": float, "sku": str},
+)
+
+ORDER_SCHEMA = EntitySchema(
+    "Order",
+    {
+        "id": str,
+        "delivery_date": str,
+        "delivery_time": str,
+        "client_name": str,
+        "delivery_address": str,
+        "phone_number": str,
+        "latitude": float,
+        "longitude": float,
+        "cart_items": [CART_ITEM_SCHEMA],
+        "total_amount": float,
+        "payment_method": str,
+        "errors": [ORDER_ERROR_SCHEMA],
+        "notes": str,
+        "status": str,
+        "delivery_sequence": int,
+        "driver": int,
+        "source": int,
+        "cooler": int,
+        "discount": str,
+        "driver_route": str,
+        "changed_at": str,
+        "version": int,
+        "created_by": str,
+        "created_at": str,
+        "updated_by": str,
+        "updated_at": str,
+    },
+)
@@ -0,0 +1,263 @@
+# Python's libraries
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+# Own's modules
+from order_modules.dao.capacity_dao import CapacityDAO
+from order_modules.dao.client_dao import ClientDAO
+from order_modules.data_access.geolocation_handler import Geolocation
+from order_modules.data_mapper.order_mapper import OrderHelper
+from order_modules.errors.business_error import BusinessError
+from order_modules.errors.dao_error import DaoError
+from order_modules.utils.delivery import DeliveryScheduler
+from order_modules.utils.source import OrderSource
+
+from settings import BATCH_GEOCODING_WORKERS
+
+# Third-party libraries
+from aws_lambda_powertools import Logger
+
+
+class OrderBatchHelper:
+    """
+    Builds several new orders at once. Addresses are geocoded concurrently and drivers are assigned
+    against a snapshot of the capacity counters of each date, kept in memory while the batch is assigned,
+    so the ledger is read once per date and written once per slot instead of once per order.
+    """
+
+    def __init__(
+        self,
+        orders_data: List[Dict[str, Any]],
+        location_service: Geolocation = None,
+        capacity_dao: CapacityDAO = None,
+        client_dao: ClientDAO = None,
+    ):
+        self.logger = Logger()
+        self.capacity_dao = capacity_dao or CapacityDAO()
+        location_service = location_service or Geolocation()
+        client_dao = client_dao or ClientDAO()
+        self.helpers = [
+            OrderHelper(order_data, location_service, self.capacity_dao, client_dao)
+            for order_data in orders_data
+        ]
+        self.drivers = [None] * len(self.helpers)
+        self.planner = DeliveryScheduler()
+        self.slot_snapshots = {}
+
+    def resolve_geolocations(self) -> None:
+        """
+        Fetches the geolocation of every order, with up to BATCH_GEOCODING_WORKERS lookups at a time.
+        """
+        if not self.helpers:
+            return
+
+        max_workers = min(BATCH_GEOCODING_WORKERS, len(self.helpers))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(OrderHelper.resolve_geolocation, self.helpers))
+
+    def fetch_slots(self, delivery_date: str) -> Dict[Tuple[str, Any], int]:
+        """
+        Returns the capacity snapshot of a date, it is fetched the first time the date is used.
+
+        :param delivery_date: Date of the counters
+        :type delivery_date: str
+        :return: A dictionary with (delivery_time, driver) as key and the number of orders as value
+        :rtype: Dict[Tuple[str, Any], int]
+        """
+        if delivery_date not in self.slot_snapshots:
+            # Every helper shares the capacity DAO, any of them can fetch the counters
+            self.slot_snapshots[delivery_date] = dict(
+                self.helpers[0].fetch_capacity(delivery_date, self.planner)
+            )
+        return self.slot_snapshots[delivery_date]
+
+    def assign_drivers(self) -> List[Dict[str, Any] | None]:
+        """
+        Assigns a driver to every geocoded order, the orders of each date are assigned together in the
+        order they were received, counting each assignment in the snapshot of its date so the next
+        orders see it.
+
+        :return: The failure of each order that could not be assigned, None for the others
+        :rtype: List[Dict[str, Any] | None]
+        """
+        failures = [None] * len(self.helpers)
+        positions_by_date = {}
+        for position, helper in enumerate(self.helpers):
+            if helper.resolve_geolocation() is not None:
+                positions_by_date.setdefault(helper.order_data.get("delivery_date"), []).append(
+                    position
+                )
+
+        for delivery_date, positions in positions_by_date.items():
+            try:
+                slots = self.fetch_slots(delivery_date)
+            except DaoError as error:
+                for position in positions:
+                    failures[position] = {"status_code": 500, "message": str(error)}
+                continue
+
+            pending_orders = [
+                {
+                    "latitude": self.helpers[position].geolocation.get("latitude"),
+                    "longitude": self.helpers[position].geolocation.get("longitude"),
+                    "delivery_time": self.helpers[position].order_data.get("delivery_time"),
+                    "source": self.helpers[position].order_data.get("source"),
+                }
+                for position in positions
+            ]
+            drivers = self.planner.assign_drivers_for_date(delivery_date, pending_orders, slots)
+            for position, driver in zip(positions, drivers):
+                if driver:
+                    self.drivers[position] = driver
+                else:
+                    failures[position] = {
+                        "status_code": 400,
+                        "message": "Order could not be processed due: No drivers available",
+                    }
+        return failures
+
+    def reserve_slots(self, positions: List[int]) -> List[Dict[str, Any] | None]:
+        """
+        Reserves the slots of the assigned orders in the capacity ledger, with one counter update per slot.
+        When another request filled a slot after the snapshot was taken, the orders of that slot are
+        assigned again one by one, like single orders are.
+
+        :param positions: Positions of the orders to reserve
+        :type positions: List[int]
+        :return: The failure of each order that could not be reserved, None for the others
+        :rtype: List[Dict[str, Any] | None]
+        """
+        groups = {}
+        for position in positions:
+            helper = self.helpers[position]
+            driver = self.drivers[position]
+            # Orders without geolocation and Shopify orders are not limited, like in OrderHelper
+            max_orders = (
+                self.planner.DRIVER_SHIFT_CAPACITY
+                if driver is not None
+                and helper.order_data.get("source") is not OrderSource.SHOPIFY
+                else None
+            )
+            slot = (
+                helper.order_data.get("delivery_date"),
+                helper.order_data.get("delivery_time"),
+                driver,
+                max_orders,
+            )
+            groups.setdefault(slot, []).append(position)
+
+        failures = {}
+        for (delivery_date, delivery_time, driver, max_orders), group in groups.items():
+            try:
+                # Orders without geolocation may be the first ones of an untracked date
+                self.fetch_slots(delivery_date)
+            except DaoError as error:
+                for position in group:
+                    failures[position] = {"status_code": 500, "message": str(error)}
+                continue
+
+            reservation = self.capacity_dao.reserve_slot(
+                delivery_date=delivery_date,
+                delivery_time=delivery_time,
+                driver=driver,
+                max_orders=max_orders,
+                amount=len(group),
+            )
+            if reservation["status"] == "success":
+                for position in group:
+                    self.helpers[position].reserved_slot = (delivery_date, delivery_time, driver)
+                continue
+
+            if reservation["status_code"] != 409:
+                for position in group:
+                    failures[position] = {
+                        "status_code": 500,
+                        "message": f"Capacity could not be reserved: {reservation['message']}",
+                    }
+                continue
+
+            self.logger.info(
+                f"Slot {delivery_date} {delivery_time} {driver} is full, assigning {len(group)} orders again"
+            )
+            for position in group:
+                helper = self.helpers[position]
+                try:
+                    self.drivers[position] = helper.get_available_driver(
+                        helper.resolve_geolocation(),
+                        delivery_time,
+                        delivery_date,
+                        helper.order_data.get("source"),
+                    )
+                except BusinessError as error:
+                    failures[position] = {
+                        "status_code": 400,
+                        "message": f"Order could not be processed due: {error}",
+                    }
+                except DaoError as error:
+                    failures[position] = {"status_code": 500, "message": str(error)}
+
+        return [failures.get(position) for position in positions]
+
+    def build_orders(self, username: str) -> List[Dict[str, Any]]:
+        """
+        Builds the orders of the batch. Every order gets its own result, the orders that could be
+        built have their representation as order, the others a status code and a message.
+
+        :param username: Who is sending the request.
+        :type username: str
+        :return: The result of each order, in the order they were received
+        :rtype: List[Dict[str, Any]]
+        """
+        self.resolve_geolocations()
+        results = [
+            failure if failure is not None else {}
+            for failure in self.assign_drivers()
+        ]
+        assigned = [position for position, result in enumerate(results) if not result]
+        for position, failure in zip(assigned, self.reserve_slots(assigned)):
+            if failure is not None:
+                results[position] = failure
+
+        for position, helper in enumerate(self.helpers):
+            if results[position]:
+                continue
+            try:
+                results[position] = {
+                    "order": helper.build_order(
+                        username=username, generate_driver=False, driver=self.drivers[position]
+                    )
+                }
+            except (BusinessError, DaoError) as error:
+                helper.release_capacity()
+                results[position] = {"status_code": 500, "message": str(error)}
+        return results
+
+    def release_capacity(self, positions: List[int]) -> None:
+        """
+        Removes the slots reserved for the given orders from the capacity ledger, with one counter
+        update per slot. It must be called for the orders that could not be saved.
+
+        :param positions: Positions of the orders
+        :type positions: List[int]
+        """
+        groups = {}
+        for position in positions:
+            helper = self.helpers[position]
+            if helper.reserved_slot is not None:
+                groups[helper.reserved_slot] = groups.get(helper.reserved_slot, 0) + 1
+                helper.reserved_slot = None
+
+        for (delivery_date, delivery_time, driver), amount in groups.items():
+            response = self.capacity_dao.release_slot(
+                delivery_date=delivery_date,
+                delivery_time=delivery_time,
+                driver=driver,
+                amount=amount,
+            )
+            if response["status"] != "success":
+                self.logger.error(
+                    f"Slot {delivery_date} {delivery_time} {driver} was not released: {response['message']}"
+                )
@@ -1,39 +1,99 @@
 # Python's libraries
 import uuid
+from decimal import Decimal
 from typing import Dict
 from typing import Any
+from typing import Tuple
 from datetime import datetime
 
 # Own's modules
 from order_modules.utils.status import OrderStatus
 from order_modules.dao.order_dao import OrderDAO
+from order_modules.dao.capacity_dao import CapacityDAO
+from order_modules.dao.client_dao import ClientDAO
+from order_modules.data_access.geocode_cache import normalize_address
 from order_modules.data_access.geolocation_handler import Geolocation
 from order_modules.utils.delivery import DeliveryScheduler
 from order_modules.errors.business_error import BusinessError
+from order_modules.errors.dao_error import DaoError
 from order_modules.utils.source import OrderSource
-from settings import ORDERS_PRIMARY_KEY
 
 # Third-party libraries
 from aws_lambda_powertools import Logger
 
 
 class OrderHelper:
+    MAX_RESERVATION_ATTEMPTS = 3
+
     def __init__(
-        self, order_data: Dict[str, Any], location_service: Geolocation = None
+        self,
+        order_data: Dict[str, Any],
+        location_service: Geolocation = None,
+        capacity_dao: CapacityDAO = None,
+        client_dao: ClientDAO = None,
     ):
         self.order_data = order_data
         self.logger = Logger()
         self.location_service = location_service or Geolocation()
+        self.capacity_dao = capacity_dao or CapacityDAO()
+        self.client_dao = client_dao or ClientDAO()
+        self.reserved_slot = None
+        self.geolocation = None
+        self.is_geolocation_resolved = False
+
+    def fetch_client_geolocation(self) -> Dict[str, float] | None:
+        """
+        Fetches the coordinates stored for the client of the order, only when the delivery address
+        is one of the addresses of the client.
+
+        :return: A dictionary with latitude and longitude, None if the client does not have them
+        :rtype: Dict[str, float] | None
+        """
+        phone_number = self.order_data.get("phone_number")
+        delivery_address = self.order_data.get("delivery_address")
+        if not isinstance(phone_number, str) or not isinstance(delivery_address, str):
+            return None
+
+        try:
+            response = self.client_dao.fetch_client_locations(phone_number)
+        except Exception as error:
+            self.logger.warning(f"Client {phone_number} could not be fetched: {error}")
+            return None
+
+        if response["status"] != "success":
+            return None
+
+        client = response["payload"]
+        normalized_address = normalize_address(delivery_address)
+        for address_field_name in ("address", "second_address"):
+            client_address = client.get(address_field_name)
+            latitude = client.get(f"{address_field_name}_latitude")
+            longitude = client.get(f"{address_field_name}_longitude")
+            if (
+                isinstance(client_address, str)
+                and latitude is not None
+                and longitude is not None
+                and normalize_address(client_address) == normalized_address
+            ):
+                return {"latitude": float(latitude), "longitude": float(longitude)}
+
+        return None
 
     def fetch_geolocation(self) -> Dict[str, float]:
         """
         Fetches geolocation data based on the order data's delivery address.
+        Coordinates already stored for the client are preferred over the Geolocation Service.
 
         :return: A dictionary with latitude and longitude
         :rtype: Dict[str, float]
         """
         geolocation = self.order_data.get("geolocation", None)
         if geolocation is None:
+            geolocation = self.fetch_client_geolocation()
+            if geolocation is not None:
+                self.logger.info("Using geolocation data stored for the client")
+                return geolocation
+
             self.logger.info(
                 "Input did not include geolocation data, invoking Geolocation Service"
             )
@@ -45,13 +105,60 @@ class OrderHelper:
             self.logger.info("Using provided geolocation data from input")
             return geolocation
 
+    def resolve_geolocation(self) -> Dict[str, float] | None:
+        """
+        Fetches the geolocation of the order only once, later calls reuse the result even when
+        the address could not be geocoded.
+
+        :return: A dictionary with latitude and longitude, None if the address could not be geocoded
+        :rtype: Dict[str, float] | None
+        """
+        if not self.is_geolocation_resolved:
+            self.geolocation = self.fetch_geolocation()
+            self.is_geolocation_resolved = True
+        return self.geolocation
+
+    def fetch_capacity(
+        self, delivery_date: str, planner: DeliveryScheduler
+    ) -> Dict[Tuple[str, Any], int]:
+        """
+        Fetches the capacity counters of a date. Dates that were not tracked in the ledger yet
+        are initialized counting their orders, this only happens once per date.
+
+        :param delivery_date: Date of the counters
+        :param planner: Scheduler used to group the orders into slots
+        :return: A dictionary with (delivery_time, driver) as key and the number of orders as value
+        """
+        slots = self.capacity_dao.fetch_capacity(delivery_date)
+        if slots:
+            return slots
+
+        dao = OrderDAO()
+        slots = planner.count_orders_by_slot(dao.iter_orders(delivery_date))
+        if slots:
+            self.logger.info(f"Initializing capacity ledger for {delivery_date}")
+            self.capacity_dao.initialize_capacity(delivery_date, slots)
+        return slots
+
     def get_available_driver(
         self,
         geolocation: Dict[str, float],
         delivery_time: str,
         delivery_date: str,
         source: OrderSource,
+        enforce_capacity: bool = True,
     ):
+        """
+        Assigns a driver using the capacity counters of the date and reserves the slot for the order.
+        If another request takes the last place of the slot first, the assignment is evaluated again.
+
+        :param geolocation: Customer latitude and longitude
+        :param delivery_time: Delivery time of the order
+        :param delivery_date: Delivery date of the order
+        :param source: Where the order comes from, Shopify orders skip the capacity limit
+        :param enforce_capacity: Flag to reject the reservation if the slot is full
+        :return: Driver assigned
+        """
 
         customer_location = (geolocation.get("latitude"), geolocation.get("longitude"))
 
@@ -60,24 +167,86 @@ class OrderHelper:
                 "delivery_date", datetime.now().strftime("%Y-%m-%d")
             )
 
-        dao = OrderDAO()
-        orders = dao.fetch_orders(
-            primary_key=ORDERS_PRIMARY_KEY, query_value=delivery_date
+        planner = DeliveryScheduler()
+        max_orders = (
+            planner.DRIVER_SHIFT_CAPACITY
+            if enforce_capacity and source is not OrderSource.SHOPIFY
+            else None
         )
-        orders = orders["payload"]
 
-        planner = DeliveryScheduler()
-        driver = planner.assign_driver_for_delivery(
-            customer_location=customer_location,
-            delivery_time=delivery_time,
-            order_date=delivery_date,
-            orders=orders,
-            source=source,
+        for _ in range(self.MAX_RESERVATION_ATTEMPTS):
+            slots = self.fetch_capacity(delivery_date, planner)
+            driver = planner.assign_driver_from_slots(
+                customer_location=customer_location,
+                delivery_time=delivery_time,
+                order_date=delivery_date,
+                slots=slots,
+                source=source,
+            )
+            if not driver:
+                raise BusinessError("No drivers available")
+
+            reservation = self.capacity_dao.reserve_slot(
+                delivery_date=delivery_date,
+                delivery_time=delivery_time,
+                driver=driver,
+                max_orders=max_orders,
+            )
+            if reservation["status"] == "success":
+                self.reserved_slot = (delivery_date, delivery_time, driver)
+                return driver
+
+            if reservation["status_code"] != 409:
+                raise DaoError(
+                    _message="Capacity could not be reserved",
+                    _error=reservation["message"],
+                )
+
+            self.logger.info(
+                f"Driver {driver} reached capacity for {delivery_date} {delivery_time}, evaluating again"
+            )
+
+        raise BusinessError("No drivers available")
+
+    def reserve_capacity(
+        self, delivery_date: str, delivery_time: str, driver: int | None
+    ) -> None:
+        """
+        Adds the order to the capacity ledger when no slot was reserved while assigning the driver,
+        for example when the driver was selected manually or the order has no geolocation.
+
+        :param delivery_date: Delivery date of the order
+        :param delivery_time: Delivery time of the order
+        :param driver: Driver of the order
+        """
+        if self.reserved_slot is not None:
+            return
+
+        # The counters of an untracked date are initialized first, so its orders are counted
+        self.fetch_capacity(delivery_date, DeliveryScheduler())
+        reservation = self.capacity_dao.reserve_slot(
+            delivery_date=delivery_date, delivery_time=delivery_time, driver=driver
         )
-        if driver:
-            return driver
-        else:
-            raise BusinessError("No drivers available")
+        if reservation["status"] != "success":
+            raise DaoError(
+                _message="Capacity could not be reserved",
+                _error=reservation["message"],
+            )
+        self.reserved_slot = (delivery_date, delivery_time, driver)
+
+    def release_capacity(self) -> None:
+        """
+        Removes the slot reserved by this helper from the capacity ledger,
+        it must be called when the order could not be saved.
+        """
+        if self.reserved_slot is None:
+            return
+
+        delivery_date, delivery_time, driver = self.reserved_slot
+        self.capacity_dao.release_slot(
+            delivery_date=delivery_date, delivery_time=delivery_time, driver=driver
+        )
+        self.reserved_slot = None
 
     def build_order(
         self,
@@ -100,14 +269,15 @@ class OrderHelper:
         latitude = None
         longitude = None
 
-        if uid is None:
+        is_new_order = uid is None
+        if is_new_order:
             uid = str(uuid.uuid4())
 
         delivery_date = self.order_data.get("delivery_date")
         delivery_time = self.order_data.get("delivery_time")
         source = self.order_data.get("source")
 
-        geolocation = self.fetch_geolocation()
+        geolocation = self.resolve_geolocation()
         if geolocation is None:
             self.logger.info(
                 "Geolocation Data is missing, adding to the list of errors"
@@ -124,13 +294,19 @@ class OrderHelper:
 
             if generate_driver:
                 driver = self.get_available_driver(
-                    geolocation, delivery_time, delivery_date, source
+                    geolocation,
+                    delivery_time,
+                    delivery_date,
+                    source,
+                    enforce_capacity=is_new_order,
                 )
 
         items = [item for item in self.order_data.get("cart_items", [])]
 
         status = OrderStatus.ERROR.value if order_errors else status_on_success.value
 
+        self.reserve_capacity(delivery_date, delivery_time, driver)
+
         data = {
             "id": uid,
             "client_name": self.order_data.get("client_name"),
@@ -167,3 +343,101 @@ class OrderHelper:
         data.update(metadata)
 
         return data
+
+    def build_order_patch(
+        self, stored_order: Dict[str, Any], username: str
+    ) -> Dict[str, Any]:
+        """This function will compare the attributes sent by the client, in order_data, with the stored order
+        and build the attributes to write. The address is only geocoded again when it changed and the driver
+        is only evaluated again when the location or the delivery time changed.
+
+        :param stored_order: The order as it is stored in DynamoDB.
+        :param username: Who is sending the request.
+        :return: Only the attributes that changed, empty when nothing changed.
+        """
+        requested = dict(self.order_data)
+        geolocation = requested.pop("geolocation", None)
+        if geolocation is not None:
+            requested["latitude"] = float(geolocation["latitude"])
+            requested["longitude"] = float(geolocation["longitude"])
+
+        changes = {
+            name: value
+            for name, value in requested.items()
+            if not is_same_value(stored_order.get(name), value)
+        }
+        if not changes:
+            return {}
+
+        if "delivery_address" in changes and geolocation is None:
+            self.order_data = {**stored_order, **changes}
+            geolocation = self.fetch_geolocation()
+            if geolocation is None:
+                self.logger.info(
+                    "Geolocation Data is missing, adding to the list of errors"
+                )
+                changes.update(
+                    latitude=None,
+                    longitude=None,
+                    status=OrderStatus.ERROR.value,
+                    errors=[
+                        {
+                            "code": "ADDRESS_NEEDS_GEO",
+                            "value": "Order requires geolocation coordinates to be updated manually",
+                        }
+                    ],
+                )
+            else:
+                changes.update(
+                    latitude=float(geolocation.get("latitude", 0)),
+                    longitude=float(geolocation.get("longitude", 0)),
+                    errors=[],
+                )
+
+        delivery_date = stored_order["delivery_date"]
+        delivery_time = changes.get("delivery_time", stored_order.get("delivery_time"))
+        stored_driver = stored_order.get("driver")
+        stored_driver = int(stored_driver) if stored_driver is not None else None
+        driver = changes.get("driver", stored_driver)
+        latitude = changes.get("latitude", stored_order.get("latitude"))
+        longitude = changes.get("longitude", stored_order.get("longitude"))
+        # DynamoDB returns the source as a Decimal, orders stored without it come from the app
+        stored_source = stored_order.get("source")
+        source = (
+            OrderSource(int(stored_source))
+            if stored_source is not None
+            else OrderSource.HIBERRYAPP
+        )
+        if (
+            ("latitude" in changes or "delivery_time" in changes)
+            and "driver" not in changes
+            and latitude is not None
+            and longitude is not None
+        ):
+            driver = self.get_available_driver(
+                {"latitude": float(latitude), "longitude": float(longitude)},
+                delivery_time,
+                delivery_date,
+                source,
+                enforce_capacity=False,
+            )
+
+        if (delivery_time, driver) == (stored_order.get("delivery_time"), stored_driver):
+            # The order stays in its slot, the reservation made while assigning the driver is not needed
+            self.release_capacity()
+        else:
+            self.reserve_capacity(delivery_date, delivery_time, driver)
+            changes["driver"] = driver
+
+        changes["updated_by"] = username
+        changes["updated_at"] = datetime.now().isoformat()
+        return changes
+
+
+def is_same_value(stored_value: Any, value: Any) -> bool:
+    """
+    Compares a value read from DynamoDB, where numbers are Decimal, with a value sent by the client.
+    """
+    if isinstance(stored_value, Decimal) and isinstance(value, float):
+        return stored_value == Decimal(str(value))
+    return stored_value == value
@@ -1,17 +1,66 @@
 from datetime import datetime, timedelta, timezone
+from typing import Any
+from typing import Dict
 from typing import List
 import math
 
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, field_validator, model_validator
 from pydantic import StrictStr
 from pydantic import StrictInt
 from pydantic import StrictFloat
 from pydantic import confloat
 from pydantic import conint
+from pydantic import conlist
 from pydantic import validator
 
 from order_modules.utils.status import OrderStatus
 from order_modules.utils.source import OrderSource
+from order_modules.utils.cursor import decode_cursor
+
+ORDER_FIELDS = (
+    "id",
+    "client_name",
+    "delivery_date",
+    "delivery_time",
+    "delivery_address",
+    "latitude",
+    "longitude",
+    "phone_number",
+    "cart_items",
+    "total_amount",
+    "payment_method",
+    "errors",
+    "notes",
+    "status",
+    "delivery_sequence",
+    "driver",
+    "source",
+    "cooler",
+    "discount",
+    "created_by",
+    "created_at",
+    "updated_by",
+    "updated_at",
+)
+# Attributes projected in the driver route index, what the driver app shows for each stop
+DRIVER_STOP_FIELDS = (
+    "id",
+    "delivery_date",
+    "delivery_sequence",
+    "delivery_time",
+    "client_name",
+    "delivery_address",
+    "latitude",
+    "longitude",
+    "phone_number",
+    "total_amount",
+    "payment_method",
+    "notes",
+    "status",
+    "cooler",
+)
+MAX_ORDERS_PAGE_SIZE = 500
+MAX_BATCH_ORDERS = 500
 
 
 def validate_date_format(date: StrictStr) -> StrictStr:
@@ -107,5 +156,84 @@ class HIBerryOrderUpdate(HIBerryOrder):
     validate_date = field_validator("original_date")(validate_date_format)
 
 
+class HIBerryOrderPatch(DeliveryDateMixin):
+    """
+    Attributes of an order that can be changed without sending the whole order, the delivery date
+    and the cart are changed with HIBerryOrderUpdate.
+    """
+
+    id: StrictStr
+    version: conint(ge=0)
+    client_name: StrictStr | None = None
+    delivery_time: StrictStr | None = None
+    delivery_address: StrictStr | None = None
+    phone_number: StrictStr | None = None
+    payment_method: StrictStr | None = None
+    geolocation: Geolocation | None = None
+    status: OrderStatus | None = None
+    notes: StrictStr | None = None
+    delivery_sequence: StrictInt | None = None
+    cooler: StrictInt | None = None
+    driver: int | None = None
+
+
 class OrderPrimaryKey(DeliveryDateMixin):
     id: StrictStr
+
+
+class DriverStopsRequest(DeliveryDateMixin):
+    driver: conint(ge=1)
+
+
+class OrderChangesRequest(DeliveryDateMixin):
+    since: datetime | None = None
+
+
+class OrdersPageRequest(DeliveryDateMixin):
+    limit: conint(ge=1, le=MAX_ORDERS_PAGE_SIZE) | None = None
+    cursor: StrictStr | None = None
+    fields: List[StrictStr] | None = None
+
+    @field_validator("fields", mode="before")
+    @classmethod
+    def split_fields(cls, value):
+        if isinstance(value, str):
+            value = [field.strip() for field in value.split(",") if field.strip()]
+        return value
+
+    @field_validator("fields")
+    @classmethod
+    def validate_fields(cls, value):
+        if value is None:
+            return value
+
+        unknown_fields = [field for field in value if field not in ORDER_FIELDS]
+        if unknown_fields:
+            raise ValueError(f"fields not supported: {', '.join(unknown_fields)}")
+
+        # Keys are always included, clients need them to update orders
+        return list(dict.fromkeys(["delivery_date", "id", *value]))
+
+    @model_validator(mode="after")
+    def validate_cursor(self):
+        if self.cursor is not None:
+            start_key = decode_cursor(self.cursor)
+            if start_key.get("delivery_date") != self.delivery_date:
+                raise ValueError("cursor does not belong to the requested date")
+        return self
+
+    @property
+    def is_paginated(self) -> bool:
+        return self.limit is not None or self.cursor is not None
+
+    @property
+    def exclusive_start_key(self) -> dict | None:
+        return decode_cursor(self.cursor) if self.cursor is not None else None
+
+
+class OrdersBatchRequest(BaseModel):
+    """
+    Orders of a bulk import, each order is validated on its own so one invalid order does not reject the rest.
+    """
+
+    orders: conlist(Dict[str, Any], min_length=1, max_length=MAX_BATCH_ORDERS)
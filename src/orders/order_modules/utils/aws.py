@@ -1,4 +1,78 @@
+import threading
+
 import boto3
+from botocore.config import Config
+
+DEFAULT_REGION = "us-east-1"
+
+# Shared by every client and resource of the container, so connections are
+# pooled and kept alive between invocations
+BOTO_CONFIG = Config(
+    max_pool_connections=25,
+    tcp_keepalive=True,
+    connect_timeout=2,
+    read_timeout=5,
+    retries={"max_attempts": 5, "mode": "adaptive"},
+)
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def _get_or_create(kind: str, name: str, region: str, factory):
+    """
+    get a client or resource from the registry, creating it the first time
+    it is requested in the container
+    PARAMS:
+    - kind: client or resource
+    - name: Resource Name
+    - region: Region Name
+    - factory: boto3 method used to create it
+    RETURNS:
+    - boto3 AWS client or resource
+    """
+    registry_key = (kind, name, region)
+    instance = _registry.get(registry_key)
+    if instance is None:
+        # boto3's default session is not thread safe while creating clients
+        with _registry_lock:
+            instance = _registry.get(registry_key)
+            if instance is None:
+                instance = factory(name, region_name=region, config=BOTO_CONFIG)
+                _registry[registry_key] = instance
+    return instance
+
+
+def get_client(resource: str, region: str = DEFAULT_REGION):
+    """
+    get a client that is created once per container
+    PARAMS:
+    - resource: Resource Name
+    - region: Region Name
+    RETURNS:
+    - boto3 AWS client
+    """
+    return _get_or_create("client", resource, region, boto3.client)
+
+
+def get_resource(resource: str, region: str = DEFAULT_REGION):
+    """
+    get a resource that is created once per container
+    PARAMS:
+    - resource: Resource Name
+    - region: Region Name
+    RETURNS:
+    - boto3 AWS resource
+    """
+    return _get_or_create("resource", resource, region, boto3.resource)
+
+
+def clear_registry():
+    """
+    drop every client and resource of the registry, so the next request creates them again
+    """
+    with _registry_lock:
+        _registry.clear()
 
 
 class AWSClientManager:
@@ -11,19 +85,31 @@ class AWSClientManager:
     - dynamodb
     - location
 
+    Clients and resources are created lazily, the first time they are used,
+    and shared by every instance of the container.
     """
 
-    def __init__(self):
-        """
-        It's init some most used resources
-        """
-        self.lambda_client = self.get_client("lambda")
-        self.s3_resource = self.get_resource("s3")
-        self.s3_client = self.get_client("s3")
-        self.dynamodb = self.get_resource("dynamodb")
-        self.location = self.get_client("location")
+    @property
+    def lambda_client(self):
+        return self.get_client("lambda")
+
+    @property
+    def s3_resource(self):
+        return self.get_resource("s3")
+
+    @property
+    def s3_client(self):
+        return self.get_client("s3")
+
+    @property
+    def dynamodb(self):
+        return self.get_resource("dynamodb")
+
+    @property
+    def location(self):
+        return self.get_client("location")
 
-    def get_session(self, region="us-east-1"):
+    def get_session(self, region=DEFAULT_REGION):
         """
         get a session using boto3 native session methods
         PARAMS:
@@ -33,22 +119,22 @@ class AWSClientManager:
         """
         return boto3.Session(region_name=region)
 
-    def get_resource(self, resource: str, region="us-east-1"):
+    def get_resource(self, resource: str, region=DEFAULT_REGION):
         """
-        get a resource using boto3 native resource method
+        get a resource from the registry of the container
         PARAMS:
         - resource: Resource Name
         RETURNS:
         - boto3 AWS resource
         """
-        return boto3.resource(resource, region_name=region)
+        return get_resource(resource, region)
 
-    def get_client(self, resource: str, region="us-east-1"):
+    def get_client(self, resource: str, region=DEFAULT_REGION):
         """
-        get a client using boto3 native client method
+        get a client from the registry of the container
         PARAMS:
         - resource: Resource Name
         RETURNS:
         - boto3 AWS client
         """
-        return boto3.client(resource, region_name=region)
+        return get_client(resource, region)
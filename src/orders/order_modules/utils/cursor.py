@@ -0,0 +1,45 @@
+# Python's libraries
+import base64
+from typing import Any
+from typing import Dict
+
+# Own's modules
+from order_modules.utils.encoders import dumps_json
+from order_modules.utils.encoders import loads_json
+
+
+def encode_cursor(last_evaluated_key: Dict[str, Any] | None) -> str | None:
+    """Converts the LastEvaluatedKey of a query into an opaque string that clients send back to get the next page.
+
+    :param last_evaluated_key: Key returned by DynamoDB, None when there are no more pages
+    :type last_evaluated_key: Dict[str, Any] | None
+    :return: Cursor for the next page, None when there are no more pages
+    :rtype: str | None
+    """
+    if not last_evaluated_key:
+        return None
+
+    raw_cursor = dumps_json(last_evaluated_key).encode("utf-8")
+    return base64.urlsafe_b64encode(raw_cursor).decode("utf-8")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Converts a cursor created by encode_cursor back into the ExclusiveStartKey of a query.
+
+    :param cursor: Cursor received from the client
+    :type cursor: str
+    :raises ValueError: If the cursor was not created by encode_cursor
+    :return: Key to start the next query
+    :rtype: Dict[str, Any]
+    """
+    try:
+        start_key = loads_json(base64.urlsafe_b64decode(cursor.encode("utf-8")))
+    except Exception:
+        raise ValueError("cursor is not valid")
+
+    if not isinstance(start_key, dict) or not all(
+        isinstance(value, str) for value in start_key.values()
+    ):
+        raise ValueError("cursor is not valid")
+
+    return start_key
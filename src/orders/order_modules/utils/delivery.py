@@ -3,9 +3,15 @@ from typing import Tuple
 from typing import List
 from typing import Dict
 from typing import Any
+from typing import Iterable
 
 from order_modules.utils.source import OrderSource
 
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, sectors are computed one order at a time without it
+    np = None
+
 
 class DeliveryScheduler:
     MORNING_DELIVERIES = "9 AM - 1 PM"
@@ -18,6 +24,21 @@ class DeliveryScheduler:
     SOUTH_EAST_SECTOR = 4
     DRIVER_1 = 1
     DRIVER_2 = 2
+    DRIVER_SHIFT_CAPACITY = 32
+    # Driver of each sector, indexed by sector. The last one is the peer of the southeast driver
+    DRIVER_SECTOR_MAP = (
+        INVALID_SECTOR,
+        DRIVER_1,  # Northwest
+        DRIVER_2,  # Southwest
+        DRIVER_1,  # Northeast
+        DRIVER_2,  # Southeast
+        DRIVER_1,  # Northwest
+    )
+    WEST_SECTORS = (NORTH_WEST_SECTOR, SOUTH_WEST_SECTOR)
+    EAST_SECTORS = (NORTH_EAST_SECTOR, SOUTH_EAST_SECTOR)
+    MONDAY_WEDNESDAY_FRIDAY = (0, 2, 4)
+    TUESDAY_THURSDAY_SATURDAY = (1, 3, 5)
+    SATURDAY = 5
 
     def __init__(self, origin=(20.6783825, -103.348088)):
         # Origin is at Hidalgo and Alcalde intersection in Guadalajara
@@ -64,6 +85,55 @@ class DeliveryScheduler:
         else:
             return self.INVALID_SECTOR  # Invalid sector
 
+    def _get_customer_sectors(
+        self, customer_locations: List[Tuple[float | None, float | None]]
+    ) -> List[int]:
+        """Aux function that will return the sector of several customer locations at once,
+        with the same quadrant test as _get_customer_sector applied to arrays
+
+        Arguments:
+            customer_locations -- List of tuples with lat and long, None when it is unknown
+
+        Returns:
+            List of integers in the same order, locations without coordinates are in the invalid sector
+        """
+        if np is None:
+            return [
+                self.INVALID_SECTOR
+                if None in customer_location
+                else self._get_customer_sector(customer_location)
+                for customer_location in customer_locations
+            ]
+
+        coordinates = np.array(customer_locations, dtype=float).reshape(-1, 2)
+        is_north = coordinates[:, 0] >= self.origin[0]
+        is_west = coordinates[:, 1] <= self.origin[1]
+        sectors = np.where(
+            is_west,
+            np.where(is_north, self.NORTH_WEST_SECTOR, self.SOUTH_WEST_SECTOR),
+            np.where(is_north, self.NORTH_EAST_SECTOR, self.SOUTH_EAST_SECTOR),
+        )
+        sectors[np.isnan(coordinates).any(axis=1)] = self.INVALID_SECTOR
+        return sectors.tolist()
+
+    @staticmethod
+    def count_orders_by_slot(
+        orders: Iterable[Dict[str, Any]]
+    ) -> Dict[Tuple[str, Any], int]:
+        """Aux function that will group a list of orders into capacity slots
+
+        Arguments:
+            orders -- Orders fetched from DynamoDB using a date as a filter, it can be a lazy iterator
+
+        Returns:
+            Dictionary with (delivery_time, driver) as key and the number of orders in that slot as value
+        """
+        slots = {}
+        for order in orders:
+            slot = (order.get("delivery_time"), order.get("driver"))
+            slots[slot] = slots.get(slot, 0) + 1
+        return slots
+
     def _check_capacity_and_assign_driver(
         self,
         orders: List[Dict[str, Any]],
@@ -84,35 +154,56 @@ class DeliveryScheduler:
             - 0: If the delivery schedule is at full capacity and the order cannot be accommodated.
             - 1 or 2:  Number of the driver assigned.
         """
-        # helper
-        driver_sector_map = [
-            self.INVALID_SECTOR,
-            self.DRIVER_1,  # Northwest
-            self.DRIVER_2,  # Southwest
-            self.DRIVER_1,  # Northeast
-            self.DRIVER_2,  # Southeast
-            self.DRIVER_1,
-        ]  # Northwest
+        return self._check_slots_and_assign_driver(
+            slots=self.count_orders_by_slot(orders),
+            delivery_time_range=delivery_time_range,
+            sector=sector,
+            source=source,
+        )
+
+    def _check_slots_and_assign_driver(
+        self,
+        slots: Dict[Tuple[str, Any], int],
+        delivery_time_range: str,
+        sector: int,
+        source: OrderSource = OrderSource.HIBERRYAPP,
+    ) -> int:
+        """This function will check if the order can be assign to a delivery man in the delivery_time range,
+        using the number of orders already booked per delivery_time and driver
+
+        Arguments:
+            slots -- Dictionary with (delivery_time, driver) as key and the number of orders as value
+            delivery_time_range -- Could be for monday shift or afternoon shift
+            sector -- Integer that will be used to assign the delivery man to the order, 1 or 2 for west and 3 or 4 for east
+                        if we are at capacity for specific hours, we will use the other delivery man
+            source -- OrderSource Enum . If Shopify , driver is assigned with no capacity check .
+                    Shopify has priority and should be created based on sector only.
+        int:
+            - 0: If the delivery schedule is at full capacity and the order cannot be accommodated.
+            - 1 or 2:  Number of the driver assigned.
+        """
+        driver_sector_map = self.DRIVER_SECTOR_MAP
 
         # Step 1: Check for max capacity
-        total_orders_count = len(orders)
+        total_orders_count = sum(slots.values())
 
         # Case 1: Delivery Man for this sector has capacity, so we assign it directly to him
-        if total_orders_count < 32 or source is OrderSource.SHOPIFY:
+        if total_orders_count < self.DRIVER_SHIFT_CAPACITY or source is OrderSource.SHOPIFY:
             return driver_sector_map[sector]
 
         # Case 2: We have full capacity for the date (32 deliveries for shift,
         # we have 2 drivers and 2 shifts each, so 32 * 4 = 128)
-        if total_orders_count >= 128:
+        if total_orders_count >= self.DRIVER_SHIFT_CAPACITY * 4:
             return self.AT_CAPACITY
 
         # Step 2: Check Capacity Within Time Range
-        time_range_orders = [
-            order for order in orders if order["delivery_time"] == delivery_time_range
-        ]
-        time_range_orders_count = len(time_range_orders)
+        time_range_orders_count = sum(
+            count
+            for (delivery_time, _), count in slots.items()
+            if delivery_time == delivery_time_range
+        )
         # Case 3: Drivers dont have capacity for the range hours
-        if time_range_orders_count >= 64:
+        if time_range_orders_count >= self.DRIVER_SHIFT_CAPACITY * 2:
             return self.AT_CAPACITY
 
         # Step 3: Assign Delivery Man and Sector
@@ -121,13 +212,11 @@ class DeliveryScheduler:
         # So at least one sector has capacity so if its not the first, then its the second
 
         # driver_sector_map[1] -> DRIVER_1 . By definition, DRIVER_1 is assigned to North sectors.
-        north_sector_orders = [
-            order
-            for order in time_range_orders
-            if order["driver"] == driver_sector_map[1]
-        ]
+        north_sector_orders_count = slots.get(
+            (delivery_time_range, driver_sector_map[1]), 0
+        )
 
-        if len(north_sector_orders) < 32:
+        if north_sector_orders_count < self.DRIVER_SHIFT_CAPACITY:
             # Case 4 Driver has capacity for its own sector
             assigned_driver = driver_sector_map[sector]
         else:
@@ -166,14 +255,121 @@ class DeliveryScheduler:
                 - Deliveries are preferred on Mondays, Wednesdays, and Fridays (days 0, 2, 4) during the afternoon (1 PM - 5 PM).
                 - Deliveries are preferred on Tuesdays, Thursdays, and Saturdays (days 1, 3, 5) during the morning (9 AM - 1 PM).
         """
+        return self.assign_driver_from_slots(
+            customer_location=customer_location,
+            delivery_time=delivery_time,
+            order_date=order_date,
+            slots=self.count_orders_by_slot(orders),
+            source=source,
+        )
+
+    def assign_driver_from_slots(
+        self,
+        customer_location: Tuple[float, float],
+        delivery_time: str,
+        order_date: str,
+        slots: Dict[Tuple[str, Any], int],
+        source: OrderSource = OrderSource.HIBERRYAPP,
+    ) -> int:
+        """This function will check if the order can be created for the date and time specified,
+        using the capacity counters of the date instead of the full list of orders.
+
+        Arguments:
+            customer_location -- Geolocation data, lat and long
+            delivery_time -- Options can be '9 AM - 1 PM' or '1 PM - 5 PM'
+            order_date -- string date with format YYYY-MM-DD
+            slots -- Dictionary with (delivery_time, driver) as key and the number of orders as value
+            source -- OrderSource Enum. Used to give priority to Shopify orders.
+        Returns:
+            int: Same contract as assign_driver_for_delivery
+        """
         day_of_week = self._get_day_of_week(order_date)
         customer_sector = self._get_customer_sector(customer_location)
-        driver_assigned = self._check_capacity_and_assign_driver(
-            orders=orders,
+        driver_assigned = self._check_slots_and_assign_driver(
+            slots=slots,
             delivery_time_range=delivery_time,
             sector=customer_sector,
             source=source,
         )
+        return self._check_sector_schedule(
+            driver_assigned=driver_assigned,
+            delivery_time=delivery_time,
+            day_of_week=day_of_week,
+            sector=customer_sector,
+            source=source,
+        )
+
+    def assign_drivers_for_date(
+        self,
+        order_date: str,
+        pending_orders: List[Dict[str, Any]],
+        slots: Dict[Tuple[str, Any], int],
+    ) -> List[int]:
+        """This function will check several orders of the same date at once, in the order they are given.
+        The sectors are computed for all the orders together and every assignment is counted in slots,
+        so each order sees the orders assigned before it, like if they were created one by one.
+
+        Arguments:
+            order_date -- string date with format YYYY-MM-DD
+            pending_orders -- Orders with latitude, longitude, delivery_time and source (OrderSource),
+                        HiberryApp is used when there is no source
+            slots -- Dictionary with (delivery_time, driver) as key and the number of orders as value,
+                        it is updated with the orders that got a driver
+        Returns:
+            List[int]: The outcome of each order, with the same contract as assign_driver_for_delivery.
+                Orders without coordinates can not be scheduled
+        """
+        day_of_week = self._get_day_of_week(order_date)
+        sectors = self._get_customer_sectors(
+            [(order.get("latitude"), order.get("longitude")) for order in pending_orders]
+        )
+        drivers = []
+        for order, sector in zip(pending_orders, sectors):
+            delivery_time = order.get("delivery_time")
+            source = order.get("source") or OrderSource.HIBERRYAPP
+            if sector == self.INVALID_SECTOR:
+                drivers.append(self.AT_CAPACITY)
+                continue
+
+            driver_assigned = self._check_sector_schedule(
+                driver_assigned=self._check_slots_and_assign_driver(
+                    slots=slots,
+                    delivery_time_range=delivery_time,
+                    sector=sector,
+                    source=source,
+                ),
+                delivery_time=delivery_time,
+                day_of_week=day_of_week,
+                sector=sector,
+                source=source,
+            )
+            if driver_assigned != self.AT_CAPACITY:
+                slots[(delivery_time, driver_assigned)] = (
+                    slots.get((delivery_time, driver_assigned), 0) + 1
+                )
+            drivers.append(driver_assigned)
+        return drivers
+
+    def _check_sector_schedule(
+        self,
+        driver_assigned: int,
+        delivery_time: str,
+        day_of_week: int,
+        sector: int,
+        source: OrderSource = OrderSource.HIBERRYAPP,
+    ) -> int:
+        """This function will check if the sector of the customer is delivered in the delivery_time of that day,
+        see the notes of assign_driver_for_delivery
+
+        Arguments:
+            driver_assigned -- Driver assigned by capacity, 0 if there was no capacity
+            delivery_time -- Options can be '9 AM - 1 PM' or '1 PM - 5 PM'
+            day_of_week -- 0 for Monday, 1 for Tuesday, etc.
+            sector -- Sector of the customer
+            source -- OrderSource Enum. Shopify orders are delivered in any sector.
+        Returns:
+            int: The driver assigned or 0 if the sector is not delivered in that delivery_time
+        """
         if source is OrderSource.SHOPIFY:
             return driver_assigned
 
@@ -181,34 +377,31 @@ class DeliveryScheduler:
             return 0
 
         # Saturday is day 5, in sat only one schedule is running, so all sector are available
-        if day_of_week == 5:
+        if day_of_week == self.SATURDAY:
             return driver_assigned
 
-        west_sectors = [1, 2]
-        east_sectors = [3, 4]
-
         if (
-            day_of_week in [0, 2, 4]
+            day_of_week in self.MONDAY_WEDNESDAY_FRIDAY
             and delivery_time == self.MORNING_DELIVERIES
-            and customer_sector not in west_sectors
+            and sector not in self.WEST_SECTORS
         ):
             return 0
         elif (
-            day_of_week in [1, 3, 5]
+            day_of_week in self.TUESDAY_THURSDAY_SATURDAY
             and delivery_time == self.MORNING_DELIVERIES
-            and customer_sector not in east_sectors
+            and sector not in self.EAST_SECTORS
         ):
             return 0
         elif (
-            day_of_week in [0, 2, 4]
+            day_of_week in self.MONDAY_WEDNESDAY_FRIDAY
             and delivery_time == self.AFTERNOON_DELIVERIES
-            and customer_sector not in east_sectors
+            and sector not in self.EAST_SECTORS
         ):
             return 0
         elif (
-            day_of_week in [1, 3, 5]
+            day_of_week in self.TUESDAY_THURSDAY_SATURDAY
             and delivery_time == self.AFTERNOON_DELIVERIES
-            and customer_sector not in west_sectors
+            and sector not in self.WEST_SECTORS
         ):
             return 0
         else:
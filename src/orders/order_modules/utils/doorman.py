@@ -1,13 +1,17 @@
 # Python's libraries
-import json
+import base64
 import os
 from datetime import datetime
 
 # Own's modules
 from order_modules.errors.util_error import UtilError
-from order_modules.utils.encoders import DecimalEncoder
+from order_modules.utils.compression import compress_response
+from order_modules.utils.encoders import dumps_json
+from order_modules.utils.encoders import loads_json
 from order_modules.errors.auth_error import AuthError
 from settings import environment
+from settings import RESPONSE_COMPRESSION_LEVEL
+from settings import RESPONSE_COMPRESSION_MIN_BYTES
 
 # Third-party libraries
 from aws_lambda_powertools import Logger
@@ -15,16 +19,30 @@ from aws_lambda_powertools import Logger
 ACCESS_RULES = {
     "Admin": [
         "RetrieveOrdersFunction",
+        "RetrieveDriverStopsFunction",
+        "RetrieveOrderChangesFunction",
         "CreateOrderFunction",
+        "CreateOrdersBatchFunction",
         "DeleteOrderFunction",
         "UpdateOrderFunction",
+        "PatchOrderFunction",
     ],
     "MesaDeControl": [
         "RetrieveOrdersFunction",
+        "RetrieveDriverStopsFunction",
+        "RetrieveOrderChangesFunction",
         "CreateOrderFunction",
+        "CreateOrdersBatchFunction",
         "UpdateOrderFunction",
+        "PatchOrderFunction",
+    ],
+    "Repartidor": [
+        "RetrieveOrdersFunction",
+        "RetrieveDriverStopsFunction",
+        "RetrieveOrderChangesFunction",
+        "UpdateOrderFunction",
+        "PatchOrderFunction",
     ],
-    "Repartidor": ["RetrieveOrdersFunction", "UpdateOrderFunction"],
 }
 
 
@@ -51,8 +69,12 @@ class DoormanUtil(object):
         # Check if body is already a dict and return it directly
         if isinstance(self.request["body"], dict):
             return self.request["body"]
+        raw_body = self.request["body"]
+        # The APIs accept binary media types, so API Gateway can send the body base64 encoded
+        if self.request.get("isBase64Encoded"):
+            raw_body = base64.b64decode(raw_body).decode("utf-8")
         try:
-            body = json.loads(self.request["body"])
+            body = loads_json(raw_body)
         except Exception as e:
             raise UtilError(
                 _message=f"The body was not a JSON object. Details: {e}",
@@ -107,7 +129,23 @@ class DoormanUtil(object):
         except Exception as e:
             raise UtilError(_message=str(e), _error=str(e), _logger=self.logger)
 
-    def build_response(self, payload: dict, status_code: int) -> dict:
+    def get_header_from_request(self, _header_name):
+        """Returns the value of a request header, header names are case insensitive.
+
+        :param _header_name: Name of the header
+        :type _header_name: str
+        :return: Value of the header, None when it was not sent
+        :rtype: str | None
+        """
+        headers = self.request.get("headers") or {}
+        for name, value in headers.items():
+            if name.lower() == _header_name.lower():
+                return value
+        return None
+
+    def build_response(
+        self, payload: dict, status_code: int, headers: dict = None
+    ) -> dict:
         """This code defines the response_success function, which is used to return a response to the client.
         The function takes two parameters: payload and status_code.
         The payload parameter is used to provide the body of the response,
@@ -119,6 +157,8 @@ class DoormanUtil(object):
         :type _payload: dict, optional
         :param _status_code: HTTP status code, 201 for create
         :type _status_code: int, optional
+        :param headers: Extra headers of the response like ETag, defaults to None
+        :type headers: dict, optional
         :return: dict with the formatted response
         :rtype: dict
         """
@@ -128,12 +168,25 @@ class DoormanUtil(object):
             "headers": {
                 "Content-Type": "application/json",
                 "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,Authorization,x-apigateway-header,X-Amz-Date,X-Api-Key,X-Amz-Security-Token",
+                "Access-Control-Allow-Headers": "Content-Type,Authorization,x-apigateway-header,X-Amz-Date,X-Api-Key,X-Amz-Security-Token,If-None-Match",
+                "Access-Control-Expose-Headers": "ETag",
                 "Access-Control-Allow-Methods": "GET, POST, PATCH, OPTIONS, DELETE",
             },
-            "body": json.dumps(payload, cls=DecimalEncoder),
+            "body": dumps_json(payload),
         }
-
+        response["headers"].update(headers or {})
+        if status_code == 304:
+            # Not Modified responses have no body
+            response["body"] = ""
+
+        # Bodies of the biggest responses, like a full day of orders, are compressed when the client accepts it
+        compress_response(
+            response,
+            self.get_header_from_request("Accept"),
+            self.get_header_from_request("Accept-Encoding"),
+            RESPONSE_COMPRESSION_MIN_BYTES,
+            RESPONSE_COMPRESSION_LEVEL,
+        )
         return response
 
     def get_username_from_context(self):
@@ -0,0 +1,41 @@
+# Python's libraries
+import hashlib
+from typing import Any
+
+
+def build_etag(marker: str, *variant: Any) -> str:
+    """Builds a weak ETag from the version marker of a collection and the parameters of the request,
+    different pages or projections of the same collection get different ETags.
+
+    :param marker: Version marker of the collection
+    :type marker: str
+    :param variant: Parameters that change the representation, like limit or fields
+    :type variant: Any
+    :return: The ETag, weak because the body can be compressed in different ways
+    :rtype: str
+    """
+    digest = hashlib.blake2b(repr(variant).encode("utf-8"), digest_size=6).hexdigest()
+    return f'W/"{marker}-{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Evaluates an If-None-Match header against the current ETag with the weak comparison.
+
+    :param if_none_match: Value of the If-None-Match header, None when it was not sent
+    :type if_none_match: str | None
+    :param etag: Current ETag of the representation
+    :type etag: str
+    :return: True when the client already has the current representation
+    :rtype: bool
+    """
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque_tag = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque_tag
+        for candidate in if_none_match.split(",")
+    )
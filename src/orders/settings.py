@@ -12,32 +12,82 @@ environment = os.environ.get("APP_ENVIRONMENT", "local")
 
 logger.info(f"Starting with environment: {environment}")
 ORDERS_PRIMARY_KEY = "delivery_date"
+CAPACITY_PRIMARY_KEY = "delivery_date"
+CAPACITY_SORT_KEY = "slot"
+GEOCODE_CACHE_PRIMARY_KEY = "address"
+CLIENTS_PRIMARY_KEY = "phone_number"
+METRICS_NAMESPACE = "HiBerry"
+# Bodies smaller than this are not compressed, the level applies to gzip (1-9) and brotli (0-11)
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.environ.get("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+RESPONSE_COMPRESSION_LEVEL = int(os.environ.get("RESPONSE_COMPRESSION_LEVEL", "6"))
+# Orders of a driver on a date, sorted by delivery_sequence. Only sequenced orders with a driver are indexed
+DRIVER_ROUTE_INDEX_NAME = "DriverRouteIndex"
+DRIVER_ROUTE_KEY = "driver_route"
+# Orders of a date sorted by the moment they were last written, it backs the changes feed
+CHANGES_INDEX_NAME = "ChangesIndex"
+CHANGE_STAMP_KEY = "changed_at"
+TOMBSTONES_PRIMARY_KEY = "delivery_date"
+TOMBSTONES_SORT_KEY = "id"
+TOMBSTONE_TTL_DAYS = 7
+# Writes stamped right before a poll can take a moment to reach the index, they are returned again in the next poll
+CHANGES_SAFETY_LAG_SECONDS = 5
+COLLECTION_VERSIONS_PRIMARY_KEY = "collection"
+# Addresses of a bulk import geocoded at the same time
+BATCH_GEOCODING_WORKERS = int(os.environ.get("BATCH_GEOCODING_WORKERS", "8"))
+# resource uses the boto3 Table resource, client uses the low-level client with the compiled converters of the
+# schema, which returns numbers as int and float instead of Decimal
+ORDERS_DYNAMODB_BACKEND = os.environ.get("ORDERS_DYNAMODB_BACKEND", "resource")
 
 if environment.lower() == "prod":
     CREATE_ORDER_ENDPOINT = "TODO"
     ORDERS_TABLE_NAME = "Orders"
+    CAPACITY_TABLE_NAME = "OrdersCapacity"
+    TOMBSTONES_TABLE_NAME = "OrderTombstones"
+    COLLECTION_VERSIONS_TABLE_NAME = "CollectionVersions"
+    GEOCODE_CACHE_TABLE_NAME = "GeocodeCache"
     PRODUCTS_TABLE_NAME = "Products"
+    CLIENTS_TABLE_NAME = "Clients"
 
 elif environment.lower() == "development":
     CREATE_ORDER_ENDPOINT = "TODO"
     ORDERS_TABLE_NAME = "Orders"
+    CAPACITY_TABLE_NAME = "OrdersCapacity"
+    TOMBSTONES_TABLE_NAME = "OrderTombstones"
+    COLLECTION_VERSIONS_TABLE_NAME = "CollectionVersions"
+    GEOCODE_CACHE_TABLE_NAME = "GeocodeCache"
     PRODUCTS_TABLE_NAME = "Products"
+    CLIENTS_TABLE_NAME = "Clients"
 
 
 elif environment.lower() == "uat":
     CREATE_ORDER_ENDPOINT = "TODO"
     ORDERS_TABLE_NAME = "Orders"
+    CAPACITY_TABLE_NAME = "OrdersCapacity"
+    TOMBSTONES_TABLE_NAME = "OrderTombstones"
+    COLLECTION_VERSIONS_TABLE_NAME = "CollectionVersions"
+    GEOCODE_CACHE_TABLE_NAME = "GeocodeCache"
     PRODUCTS_TABLE_NAME = "Products"
+    CLIENTS_TABLE_NAME = "Clients"
 
 
 elif environment.lower() == "qa":
     CREATE_ORDER_ENDPOINT = "TODO"
     ORDERS_TABLE_NAME = "Orders"
+    CAPACITY_TABLE_NAME = "OrdersCapacity"
+    TOMBSTONES_TABLE_NAME = "OrderTombstones"
+    COLLECTION_VERSIONS_TABLE_NAME = "CollectionVersions"
+    GEOCODE_CACHE_TABLE_NAME = "GeocodeCache"
     PRODUCTS_TABLE_NAME = "Products"
+    CLIENTS_TABLE_NAME = "Clients"
 
 elif environment.lower() == "local":
     ORDERS_TABLE_NAME = "Orders"
+    CAPACITY_TABLE_NAME = "OrdersCapacity"
+    TOMBSTONES_TABLE_NAME = "OrderTombstones"
+    COLLECTION_VERSIONS_TABLE_NAME = "CollectionVersions"
+    GEOCODE_CACHE_TABLE_NAME = "GeocodeCache"
     PRODUCTS_TABLE_NAME = "Products"
+    CLIENTS_TABLE_NAME = "Clients"
 
 
 else:
@@ -5,7 +5,10 @@ from typing import Any
 # Own's modules
 from product_modules.dao.product_dao import ProductDAO
 from product_modules.models.product import HIBerryProduct, HIBerryProductUpdate
+from product_modules.models.product import HIBerryProductPatch
 from product_modules.utils.doorman import DoormanUtil
+from product_modules.utils.etag import build_etag
+from product_modules.utils.etag import etag_matches
 from product_modules.errors.auth_error import AuthError
 from product_modules.data_mapper.product_mapper import ProductHelper
 
@@ -116,11 +119,25 @@ def get_all_products(event: Dict[str, Any], context: LambdaContext) -> Dict[str,
         logger.debug(f"Incoming data is {username=}")
 
         dao = ProductDAO()
+        # Read before the products, a write that lands in between changes it again afterwards
+        marker = dao.fetch_marker()
+        cache_headers = {}
+        if marker is not None:
+            etag = build_etag(marker)
+            cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+            if etag_matches(doorman.get_header_from_request("If-None-Match"), etag):
+                logger.debug("Products did not change")
+                return doorman.build_response(
+                    payload=None, status_code=304, headers=cache_headers
+                )
+
         products = dao.fetch_products()
         output_data = products
 
         logger.debug(f"Outgoing data is {output_data=}")
-        return doorman.build_response(payload=output_data, status_code=200)
+        return doorman.build_response(
+            payload=output_data, status_code=200, headers=cache_headers
+        )
 
     except AuthError as auth_error:
         error_details = f"Not authorized. {auth_error}"
@@ -261,3 +278,84 @@ def update_product(event: Dict[str, Any], context: LambdaContext) -> Dict[str, A
         return doorman.build_response(
             payload={"message": error_details}, status_code=500
         )
+
+
+def patch_product(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    """
+    This function is the entry point of the process that will receive some attributes of a product
+    and the version that was read, and will attempt to write only those attributes.
+
+    :param event: Custom object that can come from an APIGateway.
+    :type event: Dict
+    :param context: Regular lambda function context.
+    :type context: LambdaContext
+    :return: Custom object with the response from the lambda, it could be a 200 if the update was successful,
+        a 409 if the product was modified by someone else or >= 400 if there was an error.
+    :rtype: Dict
+    """
+
+    logger = Logger()
+    logger.info("Initializing Patch Product function")
+    doorman = DoormanUtil(event, logger)
+
+    try:
+        username = doorman.get_username_from_context()
+        is_auth = doorman.auth_user()
+        if not is_auth:
+            raise AuthError(f"User {username} is not authorized to update a product")
+
+        body = doorman.get_body_from_request()
+
+        logger.debug(f"Incoming data is {body=} and {username=}")
+
+        product_patch = HIBerryProductPatch(**body)
+        builder = ProductHelper()
+        changes = builder.build_product_patch(
+            product_data=product_patch.model_dump(
+                exclude_unset=True, exclude={"id", "version"}
+            ),
+            username=username,
+        )
+        if not changes:
+            return doorman.build_response(
+                payload={"version": product_patch.version, "changes": {}},
+                status_code=200,
+            )
+
+        logger.info(f"Patching product: {product_patch.id}")
+        dao = ProductDAO()
+        patch_response = dao.patch_product(
+            product_patch.id, changes, product_patch.version
+        )
+
+        if patch_response.get("status") == "success":
+            return doorman.build_response(
+                payload=patch_response["payload"],
+                status_code=patch_response["status_code"],
+            )
+        else:
+            return doorman.build_response(
+                payload={"message": patch_response.get("message", "Update failed")},
+                status_code=patch_response.get("status_code", 500),
+            )
+
+    except ValidationError as validation_error:
+        error_details = "Some fields failed validation: " + str(validation_error)
+        logger.error(error_details)
+        return doorman.build_response(
+            payload={"message": error_details}, status_code=400
+        )
+
+    except AuthError as auth_error:
+        error_details = str(auth_error)
+        logger.error(error_details)
+        return doorman.build_response(
+            payload={"message": error_details}, status_code=403
+        )
+
+    except Exception as e:
+        error_details = f"Error updating the product: {e}"
+        logger.error(error_details, exc_info=True)
+        return doorman.build_response(
+            payload={"message": error_details}, status_code=500
+        )
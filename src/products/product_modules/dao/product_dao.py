@@ -1,5 +1,7 @@
 # Own's modules
+from product_modules.dao.version_dao import CollectionVersionDAO
 from product_modules.data_access.dynamo_handler import DynamoDBHandler
+from product_modules.data_access.schemas import PRODUCT_SCHEMA
 
 import settings
 
@@ -9,14 +11,41 @@ class ProductDAO:
     A class for handling interactions with the DynamoDB table and the Lambda Function.
     """
 
+    COLLECTION = "products"
+
     def __init__(self):
         """
         Initializes a new instance of the DAO class.
         """
         self.products_db = DynamoDBHandler(
             table_name=settings.PRODUCTS_TABLE_NAME,
-            partition_key="Id",
+            partition_key="id",
+            backend=settings.PRODUCTS_DYNAMODB_BACKEND,
+            schema=PRODUCT_SCHEMA,
         )
+        self.versions = CollectionVersionDAO()
+
+    def fetch_marker(self) -> str | None:
+        """
+        Attempts to retrieve the version marker of the products.
+
+        :return: the marker, None if it could not be read
+        :rtype: str | None
+        """
+        return self.versions.fetch_marker(self.COLLECTION)
+
+    def touch(self, response: dict) -> dict:
+        """
+        Replaces the version marker of the products when a write was successful.
+
+        :param response: Response object of the write
+        :type response: dict
+        :return: the same response object
+        :rtype: dict
+        """
+        if response["status"] == "success":
+            self.versions.touch(self.COLLECTION)
+        return response
 
     def create_product(self, item: dict) -> dict:
         """
@@ -28,7 +57,7 @@ class ProductDAO:
         :rtype: dict
         """
         response = self.products_db.insert_record(item)
-        return response
+        return self.touch(response)
 
     def fetch_products(self) -> dict:
         """
@@ -52,7 +81,25 @@ class ProductDAO:
         :rtype: dict
         """
         response = self.products_db.update_record(item)
-        return response
+        return self.touch(response)
+
+    def patch_product(self, id: str, changes: dict, version: int) -> dict:
+        """
+        Attempts to write only the changed attributes of a product, if it is still on the given version.
+
+        :param id: Id of the product
+        :type id: str
+        :param changes: Attributes to set
+        :type changes: dict
+        :param version: Version of the product the changes were made on
+        :type version: int
+        :return: A dictionary that contains the response object, with the updated attributes as payload
+        :rtype: dict
+        """
+        response = self.products_db.patch_record(
+            key={"id": id}, changes=changes, expected_version=version
+        )
+        return self.touch(response)
 
     def delete_product(self, id: str) -> dict:
         """
@@ -65,4 +112,4 @@ class ProductDAO:
         """
         key = {"id": id}
         response = self.products_db.delete_record(key)
-        return response
+        return self.touch(response)
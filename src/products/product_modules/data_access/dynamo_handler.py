@@ -1,11 +1,13 @@
 # Python libraries
-import json
-from decimal import Decimal
 from typing import Dict
 from typing import Any
+from typing import List
 
 # Own modules
+from product_modules.data_access.client_table import ClientTable
+from product_modules.data_access.client_table import EntitySchema
 from product_modules.utils.aws import AWSClientManager
+from product_modules.utils.encoders import floats_to_decimals
 
 # Third-party libraries
 from aws_lambda_powertools import Logger
@@ -23,17 +25,52 @@ class DynamoDBHandler:
     HTTP_STATUS_BAD_REQUEST = 400
     HTTP_STATUS_FORBIDDEN = 403
     HTTP_STATUS_NOT_FOUND = 404
+    HTTP_STATUS_CONFLICT = 409
     HTTP_STATUS_INTERNAL_SERVER_ERROR = 500
+    VERSION_ATTRIBUTE = "version"
+    VERSIONED_PUT_MAX_ATTEMPTS = 3
 
-    def __init__(self, table_name: str, partition_key: str, sort_key: str = None):
+    def __init__(
+        self,
+        table_name: str,
+        partition_key: str,
+        sort_key: str = None,
+        backend: str = "resource",
+        schema: EntitySchema = None,
+    ):
+        """
+        :param backend: resource for the boto3 Table resource, client for the low-level client with the
+            compiled converters of the schema, defaults to resource
+        :type backend: str, optional
+        :param schema: Types of the attributes of the items, used by the client backend
+        :type schema: EntitySchema, optional
+        """
         self.table_name = table_name
         self.partition_key = partition_key
         self.sort_key = sort_key
-        aws_resources_manager = AWSClientManager()
-        dynamodb_resource = aws_resources_manager.dynamodb
-        self.table = dynamodb_resource.Table(table_name)
+        if backend == "client":
+            self.table = ClientTable(table_name, schema or EntitySchema(table_name, {}))
+        elif backend == "resource":
+            aws_resources_manager = AWSClientManager()
+            dynamodb_resource = aws_resources_manager.dynamodb
+            self.table = dynamodb_resource.Table(table_name)
+        else:
+            raise ValueError(f"DynamoDB backend not supported: {backend}")
         self.logger = Logger()
 
+    def to_db_item(self, item: dict) -> dict:
+        """The Table resource rejects floats, they are converted to Decimal. The client backend
+        converts floats itself, so its items are sent as they are.
+
+        :param item: Item or changes as dict
+        :type item: dict
+        :return: The item to write
+        :rtype: dict
+        """
+        if isinstance(self.table, ClientTable):
+            return item
+        return floats_to_decimals(item)
+
     def insert_record(self, item: dict) -> Dict[str, Any]:
         """This function is used to save a record to a database.
         It takes in a dictionary, which is build from a Order Model, as an argument and attempts to put the item into the database.
@@ -48,7 +85,7 @@ class DynamoDBHandler:
         :rtype: Dict[str, Any]
         """
         try:
-            db_item = json.loads(json.dumps(item), parse_float=Decimal)
+            db_item = self.to_db_item(item)
             response = self.table.put_item(Item=db_item)
             if response["ResponseMetadata"]["HTTPStatusCode"] == self.HTTP_STATUS_OK:
                 self.logger.info("Product was created in DynamoDB")
@@ -171,9 +208,44 @@ class DynamoDBHandler:
                 message=str(error),
             )
 
+    def build_versioned_put(self, item: dict) -> Dict[str, Any]:
+        """
+        This function reads the version of the stored item and builds the arguments of a put_item that
+        replaces it with the next version. The put is conditioned on the version that was read,
+        records written before versioning are on version 0.
+
+        :param item: Item as dict
+        :type item: dict
+        :return: Item, condition and expression attributes of the put_item
+        :rtype: Dict[str, Any]
+        """
+        key = {name: item[name] for name in (self.partition_key, self.sort_key) if name}
+        stored_item = (
+            self.table.get_item(
+                Key=key,
+                ProjectionExpression="#version",
+                ExpressionAttributeNames={"#version": self.VERSION_ATTRIBUTE},
+                ConsistentRead=True,
+            ).get("Item")
+            or {}
+        )
+        put_arguments = {"ExpressionAttributeNames": {"#version": self.VERSION_ATTRIBUTE}}
+        if self.VERSION_ATTRIBUTE in stored_item:
+            stored_version = int(stored_item[self.VERSION_ATTRIBUTE])
+            put_arguments["ConditionExpression"] = "#version = :stored_version"
+            put_arguments["ExpressionAttributeValues"] = {":stored_version": stored_version}
+        else:
+            stored_version = 0
+            put_arguments["ConditionExpression"] = "attribute_not_exists(#version)"
+        put_arguments["Item"] = self.to_db_item(
+            {**item, self.VERSION_ATTRIBUTE: stored_version + 1}
+        )
+        return put_arguments
+
     def update_record(self, item: dict) -> Dict[str, Any]:
         """
         This function is used to update a record in the database using put_item.
+        The item gets the next version of the stored one, see build_versioned_put.
         If the item already exists, it will be updated.
 
         :param item: Item as dict
@@ -182,8 +254,20 @@ class DynamoDBHandler:
         :rtype: Dict[str, Any]
         """
         try:
-            db_item = json.loads(json.dumps(item), parse_float=Decimal)
-            response = self.table.put_item(Item=db_item)
+            for _ in range(self.VERSIONED_PUT_MAX_ATTEMPTS):
+                try:
+                    response = self.table.put_item(**self.build_versioned_put(item))
+                    break
+                except ClientError as error:
+                    if error.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                        raise
+                    self.logger.info("Record was modified while it was replaced, reading it again")
+            else:
+                return self.build_response_object(
+                    status="error",
+                    status_code=self.HTTP_STATUS_CONFLICT,
+                    message="Record was modified while it was replaced, try again",
+                )
             if response["ResponseMetadata"]["HTTPStatusCode"] == self.HTTP_STATUS_OK:
                 self.logger.info("Product was updated in DynamoDB")
                 return self.build_response_object(
@@ -215,6 +299,181 @@ class DynamoDBHandler:
                 message=str(error),
             )
 
+    def fetch_record(
+        self, key: Dict[str, Any], consistent_read: bool = False
+    ) -> Dict[str, Any]:
+        """This function is used to fetch a single record by its primary key.
+
+        :param key: Primary key of the record
+        :type key: Dict[str, Any]
+        :param consistent_read: Whether the read must include every write acknowledged before it, defaults to False
+        :type consistent_read: bool, optional
+        :return: A summary of the get action, with the item as payload
+        :rtype: Dict[str, Any]
+        """
+        try:
+            item = self.table.get_item(Key=key, ConsistentRead=consistent_read).get("Item")
+            if item is None:
+                return self.build_response_object(
+                    status="error",
+                    status_code=self.HTTP_STATUS_NOT_FOUND,
+                    message="Item was not found",
+                )
+
+            return self.build_response_object(
+                status="success",
+                status_code=self.HTTP_STATUS_OK,
+                message="Item was found",
+                payload=item,
+            )
+        except ClientError as error:
+            message = f"{error.response['Error']['Message']}. {error.response['Error']['Code']}"
+            self.logger.error(f"ClientError when fetching record: Details: {message}")
+            return self.build_response_object(
+                status="error",
+                status_code=error.response["ResponseMetadata"]["HTTPStatusCode"],
+                message=message,
+            )
+        except Exception as error:
+            self.logger.error(f"Exception when fetching record: Details: {error}")
+            return self.build_response_object(
+                status="error",
+                status_code=self.HTTP_STATUS_INTERNAL_SERVER_ERROR,
+                message=str(error),
+            )
+
+    def check_version(
+        self, stored_item: Dict[str, Any], expected_version: int
+    ) -> Dict[str, Any]:
+        """
+        This function compares the version of a stored record with the version read by the client,
+        before the changes of a patch are built. Records written before versioning are on version 0.
+
+        :param stored_item: Record as it is stored
+        :type stored_item: Dict[str, Any]
+        :param expected_version: Version of the record read by the client
+        :type expected_version: int
+        :return: A success with the stored version as payload, or a 409 with the stored version as payload
+        :rtype: Dict[str, Any]
+        """
+        stored_version = int(stored_item.get(self.VERSION_ATTRIBUTE, 0))
+        if stored_version != expected_version:
+            return self.build_response_object(
+                status="error",
+                status_code=self.HTTP_STATUS_CONFLICT,
+                message=f"Record was modified after version {expected_version}, fetch it again",
+                payload={"version": stored_version},
+            )
+        return self.build_response_object(
+            status="success",
+            status_code=self.HTTP_STATUS_OK,
+            message="Record is on the expected version",
+            payload={"version": stored_version},
+        )
+
+    def patch_record(
+        self,
+        key: Dict[str, Any],
+        changes: Dict[str, Any],
+        expected_version: int,
+        removals: List[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        This function is used to update only the given attributes of an existing record using update_item.
+        The record must still be on expected_version, records written before versioning are on version 0.
+        Every patch increases the version by one, when it does not match a 409 status code is returned.
+
+        :param key: Primary key of the record
+        :type key: Dict[str, Any]
+        :param changes: Attributes to set, key attributes can not be changed
+        :type changes: Dict[str, Any]
+        :param expected_version: Version of the record read by the client
+        :type expected_version: int
+        :param removals: Attributes to remove, like index keys that can not be set to null, defaults to None
+        :type removals: List[str], optional
+        :return: A summary of the update_item action, with the new version and the updated attributes
+            as changes in the payload
+        :rtype: Dict[str, Any]
+        """
+        try:
+            db_changes = self.to_db_item(changes)
+            expression_attribute_names = {
+                "#pk": self.partition_key,
+                "#version": self.VERSION_ATTRIBUTE,
+            }
+            expression_attribute_values = {
+                ":expected_version": expected_version,
+                ":next_version": expected_version + 1,
+            }
+            set_expression_parts = ["#version = :next_version"]
+            for index, (name, value) in enumerate(db_changes.items()):
+                expression_attribute_names[f"#attr{index}"] = name
+                expression_attribute_values[f":attr{index}"] = value
+                set_expression_parts.append(f"#attr{index} = :attr{index}")
+            remove_expression_parts = []
+            for index, name in enumerate(removals or []):
+                expression_attribute_names[f"#remove{index}"] = name
+                remove_expression_parts.append(f"#remove{index}")
+
+            condition_expression = "attribute_exists(#pk) AND #version = :expected_version"
+            if expected_version == 0:
+                condition_expression = (
+                    "attribute_exists(#pk) AND "
+                    "(attribute_not_exists(#version) OR #version = :expected_version)"
+                )
+
+            update_expression = f"SET {', '.join(set_expression_parts)}"
+            if remove_expression_parts:
+                update_expression += f" REMOVE {', '.join(remove_expression_parts)}"
+
+            response = self.table.update_item(
+                Key=key,
+                UpdateExpression=update_expression,
+                ConditionExpression=condition_expression,
+                ExpressionAttributeNames=expression_attribute_names,
+                ExpressionAttributeValues=expression_attribute_values,
+                ReturnValues="UPDATED_NEW",
+            )
+            self.logger.info(f"Record {key} was patched in DynamoDB")
+            updated_attributes = response.get("Attributes") or {}
+            return self.build_response_object(
+                status="success",
+                status_code=self.HTTP_STATUS_OK,
+                message="Record updated in DynamoDB",
+                payload={
+                    "version": updated_attributes.get(self.VERSION_ATTRIBUTE),
+                    "changes": {
+                        name: value
+                        for name, value in updated_attributes.items()
+                        if name != self.VERSION_ATTRIBUTE
+                    },
+                },
+            )
+        except ClientError as error:
+            if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                self.logger.info(
+                    f"Record {key} does not exist or is not on version {expected_version}"
+                )
+                return self.build_response_object(
+                    status="error",
+                    status_code=self.HTTP_STATUS_CONFLICT,
+                    message=f"Record does not exist or was modified after version {expected_version}, fetch it again",
+                )
+            message = f"{error.response['Error']['Message']}. {error.response['Error']['Code']}"
+            self.logger.error(f"ClientError when patching record: Details: {message}")
+            return self.build_response_object(
+                status="error",
+                status_code=error.response["ResponseMetadata"]["HTTPStatusCode"],
+                message=message,
+            )
+        except Exception as error:
+            self.logger.error(f"Exception when patching record: Details: {error}")
+            return self.build_response_object(
+                status="error",
+                status_code=self.HTTP_STATUS_INTERNAL_SERVER_ERROR,
+                message=str(error),
+            )
+
     def build_response_object(
         self,
         status: str,
@@ -0,0 +1,16 @@
+# Own modules
+from product_modules.data_access.client_table import EntitySchema
+
+PRODUCT_SCHEMA = EntitySchema(
+    "Product",
+    {
+        "id": str,
+        "name": str,
+        "price": float,
+        "version": int,
+        "created_by": str,
+        "created_at": str,
+        "updated_by": str,
+        "updated_at": str,
+    },
+)
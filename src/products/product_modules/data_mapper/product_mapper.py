@@ -33,3 +33,25 @@ class ProductHelper:
             "created_at": datetime.now().isoformat(),
         }
         return data
+
+    def build_product_patch(
+        self,
+        product_data: Dict[str, Any],
+        username: str,
+    ) -> Dict[str, Any]:
+        """This function will create a dictionary with only the attributes of a product that were sent
+
+        Arguments:
+            product_data -- Attributes sent by the client, without id and version
+            username -- who is sending the request
+
+        Returns:
+            Attributes to set in the product
+        """
+        data = {name: value for name, value in product_data.items() if value is not None}
+        if not data:
+            return {}
+
+        data["updated_by"] = username
+        data["updated_at"] = datetime.now().isoformat()
+        return data
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from pydantic import StrictStr
 from pydantic import confloat
+from pydantic import conint
 
 
 class HIBerryProduct(BaseModel):
@@ -10,3 +11,10 @@ class HIBerryProduct(BaseModel):
 
 class HIBerryProductUpdate(HIBerryProduct):
     id: StrictStr
+
+
+class HIBerryProductPatch(BaseModel):
+    id: StrictStr
+    version: conint(ge=0)
+    name: StrictStr | None = None
+    price: confloat(ge=0.0) | None = None
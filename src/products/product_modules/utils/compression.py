@@ -0,0 +1,123 @@
+# Python's libraries
+import base64
+import gzip
+from typing import Any
+from typing import Dict
+
+# Third-party libraries
+try:
+    import brotli
+except ImportError:  # Brotli is optional, responses are compressed with gzip without it
+    brotli = None
+
+
+# In order of preference when the client accepts several of them with the same weight
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+# BinaryMediaTypes of the APIs, API Gateway only decodes a base64 body for the client when the
+# first media type of the Accept header is one of them
+BINARY_MEDIA_TYPES = ("application/json",)
+
+
+def accepts_binary(accept: str | None) -> bool:
+    """Checks whether API Gateway sends a base64 encoded body as binary to the client.
+
+    :param accept: Value of the Accept header, None when it was not sent
+    :type accept: str | None
+    :return: True when the first media type of the header is a binary media type of the APIs
+    :rtype: bool
+    """
+    if not accept:
+        return False
+    media_type = accept.split(",")[0].partition(";")[0].strip().lower()
+    return media_type in BINARY_MEDIA_TYPES
+
+
+def choose_encoding(accept_encoding: str | None) -> str | None:
+    """Selects the content coding for a response from the Accept-Encoding header of the request.
+
+    :param accept_encoding: Value of the Accept-Encoding header, None when it was not sent
+    :type accept_encoding: str | None
+    :return: The supported coding with the highest weight, None when the body must not be compressed
+    :rtype: str | None
+    """
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for coding in accept_encoding.split(","):
+        name, _, parameters = coding.strip().partition(";")
+        weight = 1.0
+        parameter_name, _, value = parameters.strip().partition("=")
+        if parameter_name.strip().lower() == "q":
+            try:
+                weight = float(value)
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+
+    candidates = [
+        (weights.get(encoding, weights.get("*", 0.0)), -preference, encoding)
+        for preference, encoding in enumerate(SUPPORTED_ENCODINGS)
+    ]
+    weight, _, encoding = max(candidates)
+    return encoding if weight > 0 else None
+
+
+def compress_body(body: bytes, encoding: str, level: int) -> bytes:
+    """Compresses a body with gzip or brotli.
+
+    :param body: Body to compress
+    :type body: bytes
+    :param encoding: br or gzip
+    :type encoding: str
+    :param level: Compression level, 1 to 9 for gzip and 0 to 11 for brotli
+    :type level: int
+    :return: The compressed body
+    :rtype: bytes
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=max(0, min(level, 11)))
+    # mtime is fixed so the same body is always compressed into the same bytes
+    return gzip.compress(body, compresslevel=max(1, min(level, 9)), mtime=0)
+
+
+def compress_response(
+    response: Dict[str, Any],
+    accept: str | None,
+    accept_encoding: str | None,
+    min_bytes: int,
+    level: int,
+) -> Dict[str, Any]:
+    """Compresses the body of an API Gateway response when it is bigger than min_bytes and the client
+    accepts gzip or brotli. Compressed bodies are base64 encoded, API Gateway sends them as binary
+    only when the client accepts a binary media type, so other clients get the body as it is.
+
+    :param response: Response with a JSON body
+    :type response: Dict[str, Any]
+    :param accept: Value of the Accept header of the request
+    :type accept: str | None
+    :param accept_encoding: Value of the Accept-Encoding header of the request
+    :type accept_encoding: str | None
+    :param min_bytes: Smaller bodies are sent as they are
+    :type min_bytes: int
+    :param level: Compression level
+    :type level: int
+    :return: The same response, compressed when it was worth it
+    :rtype: Dict[str, Any]
+    """
+    if response.get("isBase64Encoded") or not response.get("body"):
+        return response
+
+    body = response["body"].encode("utf-8")
+    if len(body) < min_bytes:
+        return response
+
+    response["headers"]["Vary"] = "Accept, Accept-Encoding"
+    encoding = choose_encoding(accept_encoding)
+    if encoding is None or not accepts_binary(accept):
+        return response
+
+    response["body"] = base64.b64encode(compress_body(body, encoding, level)).decode("ascii")
+    response["isBase64Encoded"] = True
+    response["headers"]["Content-Encoding"] = encoding
+    return response
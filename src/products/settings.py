@@ -3,3 +3,11 @@ import os
 
 environment = os.environ.get("APP_ENVIRONMENT", "local")
 PRODUCTS_TABLE_NAME = "Products"
+COLLECTION_VERSIONS_TABLE_NAME = "CollectionVersions"
+COLLECTION_VERSIONS_PRIMARY_KEY = "collection"
+# Bodies smaller than this are not compressed, the level applies to gzip (1-9) and brotli (0-11)
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.environ.get("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+RESPONSE_COMPRESSION_LEVEL = int(os.environ.get("RESPONSE_COMPRESSION_LEVEL", "6"))
+# resource uses the boto3 Table resource, client uses the low-level client with the compiled converters of the
+# schema, which returns numbers as int and float instead of Decimal
+PRODUCTS_DYNAMODB_BACKEND = os.environ.get("PRODUCTS_DYNAMODB_BACKEND", "resource")
@@ -0,0 +1,92 @@
+"""Microbenchmark of the DynamoDB backends on a day of 128 orders.
+
+Compares the boto3 Table resource with ClientTable for a query that returns the 128 orders and for
+a put of one order. Requests never leave the process, botocore receives canned HTTP responses,
+so the numbers are the client side cost: serialization, parsing and type conversion. Run it from
+the tests folder:
+
+    python -m benchmarks.dynamodb_backend_benchmark
+"""
+import json
+import timeit
+
+import boto3
+from boto3.dynamodb.conditions import Key
+from botocore.awsrequest import AWSResponse
+
+from benchmarks.serialization_benchmark import build_orders
+from src.orders.order_modules.data_access.client_table import ClientTable
+from src.orders.order_modules.data_access.schemas import ORDER_SCHEMA
+from src.orders.order_modules.utils.encoders import floats_to_decimals
+
+NUMBER = 100
+REPEAT = 5
+
+
+class CannedBody:
+    def __init__(self, body: bytes):
+        self.body = body
+
+    def stream(self, **kwargs):
+        yield self.body
+
+
+def reply_with(bodies):
+    """Answers every request with the canned JSON body of its operation."""
+
+    def before_send(request, **kwargs):
+        operation = request.headers["X-Amz-Target"].decode().split(".")[-1]
+        return AWSResponse(request.url, 200, {}, CannedBody(bodies[operation]))
+
+    return before_send
+
+
+def measure(label, function):
+    best = min(timeit.repeat(function, number=NUMBER, repeat=REPEAT)) / NUMBER
+    print(f"{label:<30} {best * 1000:8.3f} ms")
+    return best
+
+
+def main():
+    orders = build_orders()
+    bodies = {
+        "Query": json.dumps(
+            {"Items": [ORDER_SCHEMA.marshal(order) for order in orders], "Count": len(orders)}
+        ).encode(),
+        "PutItem": b"{}",
+    }
+    session = boto3.Session(
+        aws_access_key_id="benchmark",
+        aws_secret_access_key="benchmark",
+        region_name="us-east-1",
+    )
+    resource_table = session.resource("dynamodb").Table("Orders")
+    resource_table.meta.client.meta.events.register("before-send", reply_with(bodies))
+
+    client_table = ClientTable.__new__(ClientTable)
+    client_table.table_name = "Orders"
+    client_table.schema = ORDER_SCHEMA
+    client_table.client = session.client("dynamodb")
+    client_table.client.meta.events.register("before-send", reply_with(bodies))
+
+    condition = Key("delivery_date").eq("2024-01-08")
+    order = orders[0]
+    print(f"{len(orders)} orders, best of {REPEAT} x {NUMBER} runs")
+
+    resource = measure(
+        "query: resource", lambda: resource_table.query(KeyConditionExpression=condition)
+    )
+    client = measure(
+        "query: client", lambda: client_table.query(KeyConditionExpression=condition)
+    )
+    print(f"{'':<30} {resource / client:8.2f} x")
+
+    resource = measure(
+        "put: resource", lambda: resource_table.put_item(Item=floats_to_decimals(order))
+    )
+    client = measure("put: client", lambda: client_table.put_item(Item=order))
+    print(f"{'':<30} {resource / client:8.2f} x")
+
+
+if __name__ == "__main__":
+    main()
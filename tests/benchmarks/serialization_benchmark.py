@@ -0,0 +1,80 @@
+"""Microbenchmark of the JSON layer on a day of 128 orders.
+
+Compares the json round trip and DecimalEncoder that the handlers used with floats_to_decimals
+and dumps_json. Run it from the tests folder:
+
+    python -m benchmarks.serialization_benchmark
+"""
+import json
+import timeit
+from decimal import Decimal
+
+from src.orders.order_modules.utils import encoders
+from src.orders.order_modules.utils.encoders import DecimalEncoder
+from src.orders.order_modules.utils.encoders import dumps_json
+from src.orders.order_modules.utils.encoders import floats_to_decimals
+
+ORDERS_PER_DAY = 128
+NUMBER = 200
+REPEAT = 5
+
+
+def build_orders():
+    return [
+        {
+            "id": f"123e4567-e89b-12d3-a456-4266141740{index:02d}",
+            "client_name": "Marco Burgos",
+            "delivery_address": "Aurelio Ortega 2699-A, Colonia Jardines de la Seattle, 45150",
+            "delivery_date": "2024-01-08",
+            "delivery_time": "8 AM - 1 PM" if index % 2 else "1 PM - 5 PM",
+            "phone_number": "1122334455",
+            "cart_items": [
+                {"product": "Fresa", "price": 150.5, "quantity": 1, "sku": "111111"},
+                {"product": "Mango", "price": 20.25, "quantity": 3, "sku": "222222"},
+            ],
+            "total_amount": 211.25,
+            "payment_method": "efectivo",
+            "status": "Creada",
+            "source": 0,
+            "latitude": 20.721708 - index * 0.0001,
+            "longitude": -103.370272 + index * 0.0001,
+            "driver": index % 4 + 1,
+            "delivery_sequence": index // 4 + 1,
+            "driver_route": f"{index % 4 + 1}#2024-01-08",
+            "changed_at": "2024-01-08T10:00:00.000000Z",
+            "version": 1,
+        }
+        for index in range(ORDERS_PER_DAY)
+    ]
+
+
+def measure(label, function):
+    best = min(timeit.repeat(function, number=NUMBER, repeat=REPEAT)) / NUMBER
+    print(f"{label:<45} {best * 1000:8.3f} ms")
+    return best
+
+
+def main():
+    orders = build_orders()
+    stored_orders = floats_to_decimals(orders)
+    assert stored_orders == json.loads(json.dumps(orders), parse_float=Decimal)
+
+    print(f"{ORDERS_PER_DAY} orders, best of {REPEAT} x {NUMBER} runs")
+    before = measure(
+        "write: json round trip with parse_float",
+        lambda: json.loads(json.dumps(orders), parse_float=Decimal),
+    )
+    after = measure("write: floats_to_decimals", lambda: floats_to_decimals(orders))
+    print(f"{'':<45} {before / after:8.2f} x")
+
+    before = measure(
+        "response: json.dumps with DecimalEncoder",
+        lambda: json.dumps(stored_orders, cls=DecimalEncoder),
+    )
+    backend = "orjson" if encoders.orjson is not None else "json"
+    after = measure(f"response: dumps_json ({backend})", lambda: dumps_json(stored_orders))
+    print(f"{'':<45} {before / after:8.2f} x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,18 @@
 from unittest import TestCase
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
 import json
 import os
 import uuid
 
 from src.orders.app import create_order
+from src.orders.app import create_orders_batch
+from src.orders.app import patch_order
+from src.orders.app import retrieve_order_changes
+from src.orders.app import retrieve_orders
+from src.orders.order_modules.data_access.dynamo_handler import DynamoDBHandler
 
 
 class TestCreateOrderLambdaHandler(TestCase):
@@ -40,6 +47,8 @@ class TestCreateOrderLambdaHandler(TestCase):
 
     @patch("uuid.uuid4")
     @patch.dict(os.environ, {"APP_ENVIRONMENT": "local"}, clear=True)
+    @patch("src.orders.order_modules.data_mapper.order_mapper.CapacityDAO.fetch_capacity")
+    @patch("src.orders.order_modules.data_mapper.order_mapper.CapacityDAO.reserve_slot")
     @patch("src.orders.app.OrderDAO.create_order")
     @patch("src.orders.app.OrderHelper.get_available_driver")
     @patch(
@@ -56,8 +65,12 @@ class TestCreateOrderLambdaHandler(TestCase):
         geolocation_mocked,
         get_driver_mocked,
         dao_mocked,
+        reserve_slot_mocked,
+        fetch_capacity_mocked,
         uuid_mock,
     ):
+        fetch_capacity_mocked.return_value = {("9 AM - 1 PM", 2): 1}
+        reserve_slot_mocked.return_value = {"status": "success", "status_code": 200}
         get_driver_mocked.return_value = 2
         mock_id = "123e4567-e89b-12d3-a456-426614174000"
         uuid_mock.return_value = uuid.UUID(mock_id)
@@ -68,7 +81,8 @@ class TestCreateOrderLambdaHandler(TestCase):
             "headers": {
                 "Content-Type": "application/json",
                 "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,Authorization,x-apigateway-header,X-Amz-Date,X-Api-Key,X-Amz-Security-Token",
+                "Access-Control-Allow-Headers": "Content-Type,Authorization,x-apigateway-header,X-Amz-Date,X-Api-Key,X-Amz-Security-Token,If-None-Match",
+                "Access-Control-Expose-Headers": "ETag",
                 "Access-Control-Allow-Methods": "GET, POST, PATCH, OPTIONS, DELETE",
             },
             "body": json.dumps(
@@ -97,6 +111,9 @@ class TestCreateOrderLambdaHandler(TestCase):
         dao_mocked.return_value = dao_response
         observed = create_order({"body": json.dumps(self.valid_input)}, None)
         expected = response
+        # The body separators depend on the JSON backend, the document is compared
+        observed["body"] = json.loads(observed["body"])
+        expected["body"] = json.loads(expected["body"])
 
         self.assertEqual(observed, expected)
 
@@ -113,7 +130,8 @@ class TestCreateOrderLambdaHandler(TestCase):
             "statusCode": 400,
             "headers": {
                 "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,Authorization,x-apigateway-header,X-Amz-Date,X-Api-Key,X-Amz-Security-Token",
+                "Access-Control-Allow-Headers": "Content-Type,Authorization,x-apigateway-header,X-Amz-Date,X-Api-Key,X-Amz-Security-Token,If-None-Match",
+                "Access-Control-Expose-Headers": "ETag",
                 "Access-Control-Allow-Methods": "GET, POST, PATCH, OPTIONS, DELETE",
             },
             "body": {
@@ -147,7 +165,8 @@ class TestCreateOrderLambdaHandler(TestCase):
             "statusCode": 403,
             "headers": {
                 "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,Authorization,x-apigateway-header,X-Amz-Date,X-Api-Key,X-Amz-Security-Token",
+                "Access-Control-Allow-Headers": "Content-Type,Authorization,x-apigateway-header,X-Amz-Date,X-Api-Key,X-Amz-Security-Token,If-None-Match",
+                "Access-Control-Expose-Headers": "ETag",
                 "Access-Control-Allow-Methods": "GET, POST, PATCH, OPTIONS, DELETE",
             },
             "body": {"message": "user Mock User was not auth to create a new order"},
@@ -178,7 +197,8 @@ class TestCreateOrderLambdaHandler(TestCase):
             "statusCode": 500,
             "headers": {
                 "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,Authorization,x-apigateway-header,X-Amz-Date,X-Api-Key,X-Amz-Security-Token",
+                "Access-Control-Allow-Headers": "Content-Type,Authorization,x-apigateway-header,X-Amz-Date,X-Api-Key,X-Amz-Security-Token,If-None-Match",
+                "Access-Control-Expose-Headers": "ETag",
                 "Access-Control-Allow-Methods": "GET, POST, PATCH, OPTIONS, DELETE",
             },
             "body": {"message": "Error processing the order: Mocked"},
@@ -197,20 +217,55 @@ class TestCreateOrderLambdaHandler(TestCase):
 
         self.assertEqual(observed, expected)
 
+    @patch.dict(os.environ, {"APP_ENVIRONMENT": "local"}, clear=True)
+    @patch("src.orders.app.OrderHelper.release_capacity")
+    @patch("src.orders.app.OrderHelper.build_order")
+    @patch("src.orders.app.OrderDAO.create_order")
+    @patch("src.orders.app.DoormanUtil")
+    def test_give_an_error_writing_the_order_when_a_request_is_made_then_the_reserved_slot_is_released(
+        self, doorman_mocked, dao_mocked, build_order_mocked, release_capacity_mocked
+    ):
+        doorman_mocked.return_value.get_username_from_context.return_value = "Mock User"
+        doorman_mocked.return_value.auth_user.return_value = True
+        doorman_mocked.return_value.get_body_from_request.return_value = (
+            self.valid_input
+        )
+        build_order_mocked.return_value = {"id": "order"}
+        dao_mocked.side_effect = Exception("Mocked")
+
+        create_order({"body": json.dumps(self.valid_input)}, None)
+
+        release_capacity_mocked.assert_called_once()
+        self.assertEqual(
+            doorman_mocked.return_value.build_response.call_args.kwargs["status_code"], 500
+        )
+
     @patch("uuid.uuid4")
     @patch.dict(os.environ, {"APP_ENVIRONMENT": "local"}, clear=True)
     @patch("src.orders.order_modules.data_mapper.order_mapper.OrderDAO.create_order")
-    @patch("src.orders.order_modules.data_mapper.order_mapper.OrderDAO.fetch_orders")
+    @patch("src.orders.order_modules.data_mapper.order_mapper.OrderDAO.iter_orders")
+    @patch(
+        "src.orders.order_modules.data_mapper.order_mapper.CapacityDAO.initialize_capacity"
+    )
+    @patch("src.orders.order_modules.data_mapper.order_mapper.CapacityDAO.reserve_slot")
+    @patch(
+        "src.orders.order_modules.data_mapper.order_mapper.CapacityDAO.fetch_capacity"
+    )
     @patch("src.orders.app.DoormanUtil.auth_user")
     @patch("src.orders.app.DoormanUtil.get_username_from_context")
     def test_order_from_shopify(
         self,
         get_username_mocked,
         auth_user_mocked,
+        fetch_capacity_mock,
+        reserve_slot_mock,
+        initialize_capacity_mock,
         fetch_mock,
         dao_mocked,
         uuid_mock,
     ):
+        fetch_capacity_mock.return_value = {}
+        reserve_slot_mock.return_value = {"status": "success", "status_code": 200}
         mock_id = "123e4567-e89b-12d3-a456-426614174000"
         uuid_mock.return_value = uuid.UUID(mock_id)
         dao_response = {
@@ -225,7 +280,8 @@ class TestCreateOrderLambdaHandler(TestCase):
             "headers": {
                 "Content-Type": "application/json",
                 "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,Authorization,x-apigateway-header,X-Amz-Date,X-Api-Key,X-Amz-Security-Token",
+                "Access-Control-Allow-Headers": "Content-Type,Authorization,x-apigateway-header,X-Amz-Date,X-Api-Key,X-Amz-Security-Token,If-None-Match",
+                "Access-Control-Expose-Headers": "ETag",
                 "Access-Control-Allow-Methods": "GET, POST, PATCH, OPTIONS, DELETE",
             },
             "body": json.dumps(
@@ -258,8 +314,7 @@ class TestCreateOrderLambdaHandler(TestCase):
         orders += [{"delivery_time": "8 AM - 1 PM", "driver": 2} for _ in range(32)]
         orders += [{"delivery_time": "8 AM - 1 PM", "driver": 1} for _ in range(32)]
         orders += [{"delivery_time": "1 PM - 5 PM", "driver": 2} for _ in range(32)]
-        mock_orders = {"payload": orders}
-        fetch_mock.return_value = mock_orders
+        fetch_mock.return_value = iter(orders)
         get_username_mocked.return_value = "Mock User"
         auth_user_mocked.return_value = True
 
@@ -267,5 +322,214 @@ class TestCreateOrderLambdaHandler(TestCase):
 
         observed = create_order({"body": input}, None)
         expected = response
+        # The body separators depend on the JSON backend, the document is compared
+        observed["body"] = json.loads(observed["body"])
+        expected["body"] = json.loads(expected["body"])
 
         self.assertEqual(observed, expected)
+        reserve_slot_mock.assert_called_once_with(
+            delivery_date=datetime.now().strftime("%Y-%m-%d"),
+            delivery_time="8 AM - 1 PM",
+            driver=1,
+            max_orders=None,
+        )
+
+
+class TestCreateOrdersBatchLambdaHandler(TestCase):
+    def setUp(self):
+        self.valid_order = {
+            "client_name": "Test User",
+            "delivery_date": datetime.now().strftime("%Y-%m-%d"),
+            "delivery_time": "9-1",
+            "delivery_address": "Mock Address 1234, Colonia Juárez, Zapopan, Jalisco, 12345",
+            "phone_number": "3312121212",
+            "cart_items": [
+                {"product": "Berry", "quantity": 2, "price": 10, "sku": "222222"},
+            ],
+            "total_amount": 20.00,
+            "payment_method": "cash",
+        }
+        self.stored_order = {
+            "id": "order",
+            "delivery_date": self.valid_order["delivery_date"],
+            "latitude": 20.67,
+            "longitude": -103.34,
+            "status": "Creada",
+            "driver": 1,
+            "errors": [],
+        }
+
+    @patch.dict(os.environ, {"APP_ENVIRONMENT": "local"}, clear=True)
+    @patch("src.orders.app.OrderDAO")
+    @patch("src.orders.app.OrderBatchHelper")
+    def test_give_only_invalid_orders_when_a_batch_is_created_then_a_bad_request_will_return(
+        self, helper_mocked, dao_mocked
+    ):
+        helper_mocked.return_value.build_orders.return_value = []
+        event = {"body": json.dumps({"orders": [{"client_name": 1}, {}]})}
+
+        observed = create_orders_batch(event, None)
+
+        self.assertEqual(observed["statusCode"], 400)
+        self.assertEqual(json.loads(observed["body"])["created"], 0)
+        dao_mocked.return_value.create_orders.assert_not_called()
+
+    @patch.dict(os.environ, {"APP_ENVIRONMENT": "local"}, clear=True)
+    @patch("src.orders.app.OrderDAO")
+    @patch("src.orders.app.OrderBatchHelper")
+    def test_give_valid_and_invalid_orders_when_a_batch_is_created_then_a_multi_status_will_return(
+        self, helper_mocked, dao_mocked
+    ):
+        helper_mocked.return_value.build_orders.return_value = [{"order": self.stored_order}]
+        dao_mocked.return_value.create_orders.return_value = {
+            "payload": {"written": [0], "failures": []}
+        }
+        event = {"body": json.dumps({"orders": [{}, self.valid_order]})}
+
+        observed = create_orders_batch(event, None)
+
+        body = json.loads(observed["body"])
+        self.assertEqual(observed["statusCode"], 207)
+        self.assertEqual(
+            [(result["index"], result["status_code"]) for result in body["results"]],
+            [(0, 400), (1, 201)],
+        )
+
+
+class TestRetrieveOrdersLambdaHandler(TestCase):
+    def setUp(self):
+        self.event = {"queryStringParameters": {"date": "2024-01-08"}, "headers": {}}
+
+    @patch.dict(os.environ, {"APP_ENVIRONMENT": "local"}, clear=True)
+    @patch("src.orders.app.OrderDAO")
+    @patch("src.orders.app.DoormanUtil.auth_user")
+    @patch("src.orders.app.DoormanUtil.get_username_from_context")
+    def test_give_the_current_etag_when_orders_are_retrieved_then_not_modified_is_returned_without_querying(
+        self, get_username_mocked, auth_user_mocked, dao_mocked
+    ):
+        get_username_mocked.return_value = "Admin"
+        auth_user_mocked.return_value = True
+        dao_mocked.return_value.fetch_marker.return_value = "abc"
+        dao_mocked.return_value.fetch_orders.return_value = {
+            "status": "success",
+            "payload": [{"id": "order"}],
+        }
+
+        first_response = retrieve_orders(self.event, None)
+        etag = first_response["headers"]["ETag"]
+        self.event["headers"] = {"if-none-match": etag}
+        observed = retrieve_orders(self.event, None)
+
+        self.assertEqual(first_response["statusCode"], 200)
+        self.assertEqual(observed["statusCode"], 304)
+        self.assertEqual(observed["body"], "")
+        self.assertEqual(observed["headers"]["ETag"], etag)
+        self.assertEqual(dao_mocked.return_value.fetch_orders.call_count, 1)
+
+    @patch.dict(os.environ, {"APP_ENVIRONMENT": "local"}, clear=True)
+    @patch("src.orders.app.OrderDAO")
+    @patch("src.orders.app.DoormanUtil.auth_user")
+    @patch("src.orders.app.DoormanUtil.get_username_from_context")
+    def test_give_an_etag_of_another_projection_when_orders_are_retrieved_then_orders_are_returned(
+        self, get_username_mocked, auth_user_mocked, dao_mocked
+    ):
+        get_username_mocked.return_value = "Admin"
+        auth_user_mocked.return_value = True
+        dao_mocked.return_value.fetch_marker.return_value = "abc"
+        dao_mocked.return_value.fetch_orders.return_value = {
+            "status": "success",
+            "payload": [{"id": "order", "status": "Creada"}],
+        }
+
+        full_response = retrieve_orders(self.event, None)
+        self.event["queryStringParameters"]["fields"] = "status"
+        self.event["headers"] = {"If-None-Match": full_response["headers"]["ETag"]}
+        observed = retrieve_orders(self.event, None)
+
+        self.assertEqual(observed["statusCode"], 200)
+        self.assertNotEqual(observed["headers"]["ETag"], full_response["headers"]["ETag"])
+
+
+class TestRetrieveOrderChangesLambdaHandler(TestCase):
+    @patch.dict(os.environ, {"APP_ENVIRONMENT": "local"}, clear=True)
+    @patch("src.orders.app.OrderDAO")
+    @patch("src.orders.app.DoormanUtil.auth_user")
+    @patch("src.orders.app.DoormanUtil.get_username_from_context")
+    def test_give_a_watermark_older_than_the_tombstones_when_changes_are_retrieved_then_gone_is_returned(
+        self, get_username_mocked, auth_user_mocked, dao_mocked
+    ):
+        get_username_mocked.return_value = "Admin"
+        auth_user_mocked.return_value = True
+        since = datetime.now(timezone.utc) - timedelta(days=8)
+        event = {
+            "queryStringParameters": {"date": "2024-01-08", "since": since.isoformat()},
+            "headers": {},
+        }
+
+        observed = retrieve_order_changes(event, None)
+
+        self.assertEqual(observed["statusCode"], 410)
+        self.assertTrue(json.loads(observed["body"])["full_resync"])
+        dao_mocked.return_value.fetch_changes.assert_not_called()
+
+    @patch.dict(os.environ, {"APP_ENVIRONMENT": "local"}, clear=True)
+    @patch("src.orders.app.OrderDAO")
+    @patch("src.orders.app.DoormanUtil.auth_user")
+    @patch("src.orders.app.DoormanUtil.get_username_from_context")
+    def test_give_a_recent_watermark_when_changes_are_retrieved_then_the_changes_are_returned(
+        self, get_username_mocked, auth_user_mocked, dao_mocked
+    ):
+        get_username_mocked.return_value = "Admin"
+        auth_user_mocked.return_value = True
+        dao_mocked.return_value.fetch_changes.return_value = {
+            "status": "success",
+            "payload": {"orders": [{"id": "order"}], "deleted": []},
+        }
+        since = datetime.now(timezone.utc) - timedelta(days=1)
+        event = {
+            "queryStringParameters": {"date": "2024-01-08", "since": since.isoformat()},
+            "headers": {},
+        }
+
+        observed = retrieve_order_changes(event, None)
+
+        self.assertEqual(observed["statusCode"], 200)
+        self.assertEqual(json.loads(observed["body"])["orders"], [{"id": "order"}])
+
+
+class TestPatchOrderLambdaHandler(TestCase):
+    @patch("src.orders.app.OrderDAO")
+    @patch("src.orders.app.DoormanUtil")
+    def test_give_an_order_replaced_by_a_put_when_a_stale_patch_is_made_then_a_conflict_is_returned(
+        self, doorman_mocked, dao_mocked
+    ):
+        handler = DynamoDBHandler.__new__(DynamoDBHandler)
+        handler.partition_key = "delivery_date"
+        handler.sort_key = "id"
+        handler.logger = Mock()
+        handler.table = Mock()
+        handler.table.get_item.return_value = {}
+        handler.table.put_item.return_value = {"ResponseMetadata": {"HTTPStatusCode": 200}}
+        handler.update_record({"delivery_date": "2024-01-08", "id": "order", "notes": "put"})
+        stored_order = handler.table.put_item.call_args.kwargs["Item"]
+
+        doorman_mocked.return_value.auth_user.return_value = True
+        doorman_mocked.return_value.get_body_from_request.return_value = {
+            "id": "order",
+            "delivery_date": "2024-01-08",
+            "version": 0,
+            "notes": "stale",
+        }
+        dao_mocked.return_value.orders_db = handler
+        dao_mocked.return_value.fetch_order.return_value = {
+            "status": "success",
+            "status_code": 200,
+            "payload": stored_order,
+        }
+
+        patch_order({}, None)
+
+        response = doorman_mocked.return_value.build_response.call_args.kwargs
+        self.assertEqual(response["status_code"], 409)
+        self.assertEqual(response["payload"]["version"], 1)
+        dao_mocked.return_value.patch_order.assert_not_called()
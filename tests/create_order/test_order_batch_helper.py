@@ -0,0 +1,81 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch
+import os
+
+from src.orders.order_modules.data_mapper.order_batch_mapper import OrderBatchHelper
+
+
+class TestOrderBatchHelperCapacity(TestCase):
+    def setUp(self):
+        self.monday = "2024-01-08"
+        self.morning_time = "9 AM - 1 PM"
+        self.orders_data = [
+            {
+                "delivery_date": self.monday,
+                "delivery_time": self.morning_time,
+                "geolocation": {"latitude": 20.709747, "longitude": -103.380421},
+            }
+            for _ in range(3)
+        ]
+        self.capacity_dao = Mock()
+        self.capacity_dao.fetch_capacity.return_value = {(self.morning_time, 1): 5}
+
+    @patch.dict(os.environ, {"APP_ENVIRONMENT": "local"}, clear=True)
+    def test_give_orders_of_the_same_slot_when_drivers_are_assigned_then_the_slot_is_reserved_once(
+        self,
+    ):
+        self.capacity_dao.reserve_slot.return_value = {
+            "status": "success",
+            "status_code": 200,
+        }
+        batch = OrderBatchHelper(
+            self.orders_data,
+            location_service=Mock(),
+            capacity_dao=self.capacity_dao,
+            client_dao=Mock(),
+        )
+
+        failures = batch.assign_drivers()
+        observed = batch.reserve_slots([0, 1, 2])
+
+        self.assertEqual(failures, [None, None, None])
+        self.assertEqual(observed, [None, None, None])
+        self.assertEqual(batch.drivers, [1, 1, 1])
+        self.assertEqual(batch.slot_snapshots[self.monday][(self.morning_time, 1)], 8)
+        self.capacity_dao.fetch_capacity.assert_called_once()
+        self.capacity_dao.reserve_slot.assert_called_once_with(
+            delivery_date=self.monday,
+            delivery_time=self.morning_time,
+            driver=1,
+            max_orders=32,
+            amount=3,
+        )
+
+    @patch.dict(os.environ, {"APP_ENVIRONMENT": "local"}, clear=True)
+    def test_give_reserved_orders_when_capacity_is_released_then_the_slot_is_released_once(
+        self,
+    ):
+        self.capacity_dao.reserve_slot.return_value = {
+            "status": "success",
+            "status_code": 200,
+        }
+        self.capacity_dao.release_slot.return_value = {"status": "success"}
+        batch = OrderBatchHelper(
+            self.orders_data,
+            location_service=Mock(),
+            capacity_dao=self.capacity_dao,
+            client_dao=Mock(),
+        )
+        batch.assign_drivers()
+        batch.reserve_slots([0, 1, 2])
+
+        batch.release_capacity([0, 2])
+
+        self.capacity_dao.release_slot.assert_called_once_with(
+            delivery_date=self.monday,
+            delivery_time=self.morning_time,
+            driver=1,
+            amount=2,
+        )
+        self.assertIsNone(batch.helpers[0].reserved_slot)
+        self.assertIsNotNone(batch.helpers[1].reserved_slot)
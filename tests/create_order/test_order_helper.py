@@ -0,0 +1,255 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch
+import os
+
+from decimal import Decimal
+
+from src.orders.order_modules.data_mapper.order_mapper import (
+    OrderHelper,
+    BusinessError,
+    OrderSource,
+)
+
+
+class TestOrderHelperCapacity(TestCase):
+    def setUp(self):
+        self.geolocation = {"latitude": 20.709747, "longitude": -103.380421}
+        self.monday = "2024-01-08"
+        self.morning_time = "9 AM - 1 PM"
+        self.capacity_dao = Mock()
+        self.capacity_dao.fetch_capacity.return_value = {(self.morning_time, 1): 5}
+
+    @patch.dict(os.environ, {"APP_ENVIRONMENT": "local"}, clear=True)
+    def test_give_a_free_slot_when_a_driver_is_assigned_then_the_slot_is_reserved(
+        self,
+    ):
+        self.capacity_dao.reserve_slot.return_value = {
+            "status": "success",
+            "status_code": 200,
+        }
+        helper = OrderHelper({}, location_service=Mock(), capacity_dao=self.capacity_dao)
+
+        observed = helper.get_available_driver(
+            self.geolocation, self.morning_time, self.monday, OrderSource.HIBERRYAPP
+        )
+
+        self.assertEqual(observed, 1)
+        self.assertEqual(helper.reserved_slot, (self.monday, self.morning_time, 1))
+        self.capacity_dao.reserve_slot.assert_called_once_with(
+            delivery_date=self.monday,
+            delivery_time=self.morning_time,
+            driver=1,
+            max_orders=32,
+        )
+
+    @patch.dict(os.environ, {"APP_ENVIRONMENT": "local"}, clear=True)
+    def test_give_a_slot_taken_by_a_concurrent_order_when_a_driver_is_assigned_then_capacity_is_evaluated_again(
+        self,
+    ):
+        self.capacity_dao.reserve_slot.side_effect = [
+            {"status": "error", "status_code": 409, "message": "full"},
+            {"status": "success", "status_code": 200},
+        ]
+        helper = OrderHelper({}, location_service=Mock(), capacity_dao=self.capacity_dao)
+
+        observed = helper.get_available_driver(
+            self.geolocation, self.morning_time, self.monday, OrderSource.HIBERRYAPP
+        )
+
+        self.assertEqual(observed, 1)
+        self.assertEqual(self.capacity_dao.fetch_capacity.call_count, 2)
+
+    @patch.dict(os.environ, {"APP_ENVIRONMENT": "local"}, clear=True)
+    def test_give_a_slot_that_stays_full_when_a_driver_is_assigned_then_a_business_error_is_raised(
+        self,
+    ):
+        self.capacity_dao.reserve_slot.return_value = {
+            "status": "error",
+            "status_code": 409,
+            "message": "full",
+        }
+        helper = OrderHelper({}, location_service=Mock(), capacity_dao=self.capacity_dao)
+
+        with self.assertRaises(BusinessError):
+            helper.get_available_driver(
+                self.geolocation, self.morning_time, self.monday, OrderSource.HIBERRYAPP
+            )
+        self.assertIsNone(helper.reserved_slot)
+
+    @patch("src.orders.order_modules.data_mapper.order_mapper.OrderDAO")
+    def test_give_an_untracked_date_with_orders_when_a_manual_driver_is_reserved_then_its_orders_are_counted_first(
+        self, order_dao
+    ):
+        self.capacity_dao.fetch_capacity.return_value = {}
+        self.capacity_dao.reserve_slot.return_value = {
+            "status": "success",
+            "status_code": 200,
+        }
+        order_dao.return_value.iter_orders.return_value = iter(
+            [{"delivery_time": self.morning_time, "driver": 2} for _ in range(3)]
+        )
+        helper = OrderHelper({}, location_service=Mock(), capacity_dao=self.capacity_dao)
+
+        helper.reserve_capacity(self.monday, self.morning_time, 2)
+
+        self.assertEqual(
+            [call[0] for call in self.capacity_dao.method_calls],
+            ["fetch_capacity", "initialize_capacity", "reserve_slot"],
+        )
+        self.capacity_dao.initialize_capacity.assert_called_once_with(
+            self.monday, {(self.morning_time, 2): 3}
+        )
+        self.assertEqual(helper.reserved_slot, (self.monday, self.morning_time, 2))
+
+
+class TestOrderHelperClientGeolocation(TestCase):
+    def setUp(self):
+        self.client_dao = Mock()
+        self.client_dao.fetch_client_locations.return_value = {
+            "status": "success",
+            "status_code": 200,
+            "payload": {
+                "address": "Av. Patria 1200, Zapopan",
+                "address_latitude": "20.7097",
+                "address_longitude": "-103.3804",
+                "second_address": "Calle Juárez 15, Guadalajara",
+                "second_address_latitude": "20.6736",
+                "second_address_longitude": "-103.3440",
+            },
+        }
+        self.location_service = Mock()
+
+    def test_give_an_address_of_the_client_when_geolocation_is_fetched_then_stored_coordinates_are_used(
+        self,
+    ):
+        order_data = {
+            "phone_number": "3312345678",
+            "delivery_address": "calle juarez 15 guadalajara",
+        }
+        helper = OrderHelper(
+            order_data,
+            location_service=self.location_service,
+            capacity_dao=Mock(),
+            client_dao=self.client_dao,
+        )
+
+        observed = helper.fetch_geolocation()
+
+        self.assertEqual(observed, {"latitude": 20.6736, "longitude": -103.344})
+        self.client_dao.fetch_client_locations.assert_called_once_with("3312345678")
+        self.location_service.get_lat_and_long_from_street_address.assert_not_called()
+
+    def test_give_a_new_address_when_geolocation_is_fetched_then_geolocation_service_is_used(
+        self,
+    ):
+        order_data = {
+            "phone_number": "3312345678",
+            "delivery_address": "Av. Vallarta 500, Guadalajara",
+        }
+        self.location_service.get_lat_and_long_from_street_address.return_value = {
+            "latitude": 20.67,
+            "longitude": -103.39,
+        }
+        helper = OrderHelper(
+            order_data,
+            location_service=self.location_service,
+            capacity_dao=Mock(),
+            client_dao=self.client_dao,
+        )
+
+        observed = helper.fetch_geolocation()
+
+        self.assertEqual(observed, {"latitude": 20.67, "longitude": -103.39})
+        self.location_service.get_lat_and_long_from_street_address.assert_called_once()
+
+
+class TestOrderHelperPatch(TestCase):
+    def setUp(self):
+        self.stored_order = {
+            "id": "order",
+            "delivery_date": "2024-01-08",
+            "delivery_time": "9 AM - 1 PM",
+            "delivery_address": "Av. Patria 1200, Zapopan",
+            "latitude": Decimal("20.7097"),
+            "longitude": Decimal("-103.3804"),
+            "driver": Decimal("1"),
+            "notes": "",
+            # Numbers are read back from DynamoDB as Decimal
+            "source": Decimal(OrderSource.HIBERRYAPP.value),
+            "version": Decimal("3"),
+        }
+        self.location_service = Mock()
+        self.capacity_dao = Mock()
+
+    def test_give_only_new_notes_when_the_patch_is_built_then_address_and_capacity_are_not_evaluated(
+        self,
+    ):
+        helper = OrderHelper(
+            {"notes": "Tocar el timbre", "delivery_address": "Av. Patria 1200, Zapopan"},
+            location_service=self.location_service,
+            capacity_dao=self.capacity_dao,
+        )
+
+        observed = helper.build_order_patch(self.stored_order, "Admin")
+
+        self.assertEqual(set(observed), {"notes", "updated_by", "updated_at"})
+        self.location_service.get_lat_and_long_from_street_address.assert_not_called()
+        self.capacity_dao.fetch_capacity.assert_not_called()
+        self.capacity_dao.reserve_slot.assert_not_called()
+
+    def test_give_the_same_values_when_the_patch_is_built_then_there_are_no_changes(
+        self,
+    ):
+        helper = OrderHelper(
+            {"geolocation": {"latitude": 20.7097, "longitude": -103.3804}, "notes": ""},
+            location_service=self.location_service,
+            capacity_dao=self.capacity_dao,
+        )
+
+        observed = helper.build_order_patch(self.stored_order, "Admin")
+
+        self.assertEqual(observed, {})
+
+    def test_give_a_new_driver_when_the_patch_is_built_then_the_new_slot_is_reserved(
+        self,
+    ):
+        self.capacity_dao.reserve_slot.return_value = {
+            "status": "success",
+            "status_code": 200,
+        }
+        helper = OrderHelper(
+            {"driver": 2},
+            location_service=self.location_service,
+            capacity_dao=self.capacity_dao,
+        )
+
+        observed = helper.build_order_patch(self.stored_order, "Admin")
+
+        self.assertEqual(observed["driver"], 2)
+        self.assertEqual(helper.reserved_slot, ("2024-01-08", "9 AM - 1 PM", 2))
+
+    @patch.dict(os.environ, {"APP_ENVIRONMENT": "local"}, clear=True)
+    def test_give_a_stored_shopify_order_when_its_delivery_time_is_patched_then_the_capacity_limit_is_skipped(
+        self,
+    ):
+        self.stored_order["source"] = Decimal(OrderSource.SHOPIFY.value)
+        self.capacity_dao.fetch_capacity.return_value = {
+            (delivery_time, driver): 32
+            for delivery_time in ("9 AM - 1 PM", "1 PM - 5 PM")
+            for driver in (1, 2)
+        }
+        self.capacity_dao.reserve_slot.return_value = {
+            "status": "success",
+            "status_code": 200,
+        }
+        helper = OrderHelper(
+            {"delivery_time": "1 PM - 5 PM"},
+            location_service=self.location_service,
+            capacity_dao=self.capacity_dao,
+        )
+
+        observed = helper.build_order_patch(self.stored_order, "Admin")
+
+        self.assertEqual(observed["driver"], 1)
+        self.assertEqual(helper.reserved_slot, ("2024-01-08", "1 PM - 5 PM", 1))
+        self.assertIsNone(self.capacity_dao.reserve_slot.call_args_list[0].kwargs["max_orders"])
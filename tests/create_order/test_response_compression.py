@@ -0,0 +1,89 @@
+from unittest import TestCase
+from unittest.mock import Mock
+import base64
+import gzip
+import json
+import pathlib
+
+from src.orders.order_modules.utils.compression import accepts_binary
+from src.orders.order_modules.utils.compression import choose_encoding
+from src.orders.order_modules.utils.doorman import DoormanUtil
+
+
+class TestResponseCompression(TestCase):
+    def setUp(self):
+        self.orders = [
+            {"id": str(index), "client_name": "Test User", "delivery_time": "9 AM - 1 PM"}
+            for index in range(64)
+        ]
+
+    def test_give_a_large_payload_and_a_gzip_client_when_the_response_is_built_then_the_body_is_compressed(
+        self,
+    ):
+        doorman = DoormanUtil(
+            {"headers": {"accept": "application/json", "accept-encoding": "gzip, deflate"}},
+            Mock(),
+        )
+
+        response = doorman.build_response(self.orders, 200)
+
+        self.assertTrue(response["isBase64Encoded"])
+        self.assertEqual(response["headers"]["Content-Encoding"], "gzip")
+        self.assertEqual(response["headers"]["Vary"], "Accept, Accept-Encoding")
+        body = gzip.decompress(base64.b64decode(response["body"]))
+        self.assertEqual(json.loads(body), self.orders)
+
+    def test_give_a_small_payload_when_the_response_is_built_then_the_body_is_not_compressed(
+        self,
+    ):
+        doorman = DoormanUtil({"headers": {"Accept-Encoding": "gzip"}}, Mock())
+
+        response = doorman.build_response({"message": "ok"}, 200)
+
+        self.assertFalse(response["isBase64Encoded"])
+        self.assertNotIn("Content-Encoding", response["headers"])
+        self.assertEqual(json.loads(response["body"]), {"message": "ok"})
+
+    def test_give_a_base64_request_body_when_it_is_read_then_the_json_is_decoded(self):
+        doorman = DoormanUtil(
+            {
+                "body": base64.b64encode(b'{"driver": 2}').decode("ascii"),
+                "isBase64Encoded": True,
+            },
+            Mock(),
+        )
+
+        self.assertEqual(doorman.get_body_from_request(), {"driver": 2})
+
+    def test_give_a_refused_coding_when_the_encoding_is_chosen_then_it_is_not_used(self):
+        self.assertIsNone(choose_encoding("gzip;q=0, identity"))
+        self.assertIsNone(choose_encoding(None))
+        self.assertEqual(choose_encoding("*"), choose_encoding("br, gzip"))
+
+    def test_give_a_client_that_accepts_any_media_type_when_the_response_is_built_then_the_body_is_not_compressed(
+        self,
+    ):
+        doorman = DoormanUtil({"headers": {"Accept": "*/*", "Accept-Encoding": "gzip"}}, Mock())
+
+        response = doorman.build_response(self.orders, 200)
+
+        self.assertFalse(response["isBase64Encoded"])
+        self.assertNotIn("Content-Encoding", response["headers"])
+        self.assertEqual(json.loads(response["body"]), self.orders)
+        self.assertTrue(accepts_binary("application/json, text/plain;q=0.9"))
+        self.assertFalse(accepts_binary(None))
+
+    def test_give_the_services_when_their_compression_modules_are_read_then_they_are_the_same(
+        self,
+    ):
+        source = pathlib.Path(__file__).resolve().parents[2] / "src"
+        copies = [
+            source / "orders/order_modules/utils/compression.py",
+            source / "orders/delivery/delivery_modules/utils/compression.py",
+            source / "clients/client_modules/utils/compression.py",
+            source / "products/product_modules/utils/compression.py",
+        ]
+
+        contents = {copy.read_bytes() for copy in copies}
+
+        self.assertEqual(len(contents), 1)
@@ -0,0 +1,32 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from src.orders.order_modules.utils import aws
+
+
+class TestAWSClientRegistry(TestCase):
+    def setUp(self):
+        aws.clear_registry()
+
+    def tearDown(self):
+        aws.clear_registry()
+
+    @patch("src.orders.order_modules.utils.aws.boto3.resource")
+    def test_give_several_managers_when_dynamodb_is_used_then_resource_is_created_once(
+        self, resource_mock
+    ):
+        first = aws.AWSClientManager().dynamodb
+        second = aws.AWSClientManager().dynamodb
+
+        self.assertIs(first, second)
+        resource_mock.assert_called_once_with(
+            "dynamodb", region_name=aws.DEFAULT_REGION, config=aws.BOTO_CONFIG
+        )
+
+    @patch("src.orders.order_modules.utils.aws.boto3.client")
+    def test_give_a_new_manager_when_it_is_created_then_no_client_is_created(
+        self, client_mock
+    ):
+        aws.AWSClientManager()
+
+        client_mock.assert_not_called()
@@ -0,0 +1,132 @@
+from unittest import TestCase
+from unittest.mock import Mock
+from decimal import Decimal
+
+from boto3.dynamodb.conditions import Key
+
+from src.orders.order_modules.data_access.client_table import ClientTable
+from src.orders.order_modules.data_access.dynamo_handler import DynamoDBHandler
+from src.orders.order_modules.data_access.schemas import ORDER_SCHEMA
+
+
+def build_client_table():
+    table = ClientTable.__new__(ClientTable)
+    table.table_name = "Orders"
+    table.schema = ORDER_SCHEMA
+    table.client = Mock()
+    table.meta = Mock()
+    return table
+
+
+class TestOrderSchema(TestCase):
+    def setUp(self):
+        self.order = {
+            "id": "order",
+            "delivery_date": "2024-01-08",
+            "latitude": 20.721708,
+            "total_amount": 120.0,
+            "driver": 2,
+            "notes": None,
+            "cart_items": [{"product": "Fresa", "price": 150.5, "quantity": 1}],
+            "errors": [],
+            "extra": {"flag": True, "amount": Decimal("1.5")},
+        }
+
+    def test_give_an_order_when_it_is_marshalled_then_it_has_the_attribute_values_of_the_client(
+        self,
+    ):
+        observed = ORDER_SCHEMA.marshal(self.order)
+
+        self.assertEqual(observed["latitude"], {"N": "20.721708"})
+        self.assertEqual(observed["driver"], {"N": "2"})
+        self.assertEqual(observed["notes"], {"NULL": True})
+        self.assertEqual(
+            observed["cart_items"],
+            {
+                "L": [
+                    {
+                        "M": {
+                            "product": {"S": "Fresa"},
+                            "price": {"N": "150.5"},
+                            "quantity": {"N": "1"},
+                        }
+                    }
+                ]
+            },
+        )
+        self.assertEqual(
+            observed["extra"], {"M": {"flag": {"BOOL": True}, "amount": {"N": "1.5"}}}
+        )
+
+    def test_give_a_marshalled_order_when_it_is_unmarshalled_then_it_has_native_types(
+        self,
+    ):
+        observed = ORDER_SCHEMA.unmarshal(ORDER_SCHEMA.marshal(self.order))
+
+        self.assertEqual(observed["extra"], {"flag": True, "amount": 1.5})
+        self.assertIsInstance(observed["driver"], int)
+        self.assertIsInstance(observed["total_amount"], float)
+        self.assertEqual(observed["cart_items"], self.order["cart_items"])
+
+    def test_give_a_value_of_another_type_when_it_is_converted_then_the_generic_converter_is_used(
+        self,
+    ):
+        observed = ORDER_SCHEMA.marshal({"driver": "2", "latitude": Decimal("20.5")})
+
+        self.assertEqual(observed, {"driver": {"S": "2"}, "latitude": {"N": "20.5"}})
+        self.assertEqual(ORDER_SCHEMA.unmarshal(observed), {"driver": "2", "latitude": 20.5})
+
+
+class TestClientTable(TestCase):
+    def setUp(self):
+        self.table = build_client_table()
+
+    def test_give_a_key_condition_when_the_table_is_queried_then_it_is_sent_as_an_expression(
+        self,
+    ):
+        self.table.client.query.return_value = {
+            "Items": [{"id": {"S": "order"}, "driver": {"N": "2"}}],
+            "LastEvaluatedKey": {"delivery_date": {"S": "2024-01-08"}, "id": {"S": "order"}},
+        }
+
+        observed = self.table.query(
+            KeyConditionExpression=Key("delivery_date").eq("2024-01-08"),
+            ProjectionExpression="#field0",
+            ExpressionAttributeNames={"#field0": "id"},
+            ExclusiveStartKey={"delivery_date": "2024-01-08", "id": "first"},
+        )
+
+        request = self.table.client.query.call_args.kwargs
+        self.assertEqual(request["TableName"], "Orders")
+        self.assertEqual(request["KeyConditionExpression"], "#n0 = :v0")
+        self.assertEqual(
+            request["ExpressionAttributeNames"], {"#field0": "id", "#n0": "delivery_date"}
+        )
+        self.assertEqual(request["ExpressionAttributeValues"], {":v0": {"S": "2024-01-08"}})
+        self.assertEqual(request["ExclusiveStartKey"]["id"], {"S": "first"})
+        self.assertEqual(observed["Items"], [{"id": "order", "driver": 2}])
+        self.assertEqual(
+            observed["LastEvaluatedKey"], {"delivery_date": "2024-01-08", "id": "order"}
+        )
+
+    def test_give_a_client_backend_when_an_order_is_inserted_then_floats_are_sent_without_decimals(
+        self,
+    ):
+        handler = DynamoDBHandler.__new__(DynamoDBHandler)
+        handler.table = self.table
+        handler.logger = Mock()
+        self.table.client.put_item.return_value = {"ResponseMetadata": {"HTTPStatusCode": 200}}
+
+        observed = handler.insert_record({"id": "order", "latitude": 20.5})
+
+        self.assertEqual(observed["status"], "success")
+        self.assertEqual(
+            self.table.client.put_item.call_args.kwargs["Item"],
+            {"id": {"S": "order"}, "latitude": {"N": "20.5"}},
+        )
+
+    def test_give_an_unknown_backend_when_the_handler_is_built_then_a_value_error_is_raised(
+        self,
+    ):
+        with self.assertRaises(ValueError):
+            DynamoDBHandler("Orders", "delivery_date", backend="memory")
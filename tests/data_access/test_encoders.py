@@ -0,0 +1,47 @@
+from unittest import TestCase
+from unittest.mock import patch
+from decimal import Decimal
+import json
+
+from src.orders.order_modules.utils.encoders import dumps_json
+from src.orders.order_modules.utils.encoders import floats_to_decimals
+from src.orders.order_modules.utils.encoders import loads_json
+
+
+class TestEncoders(TestCase):
+    def setUp(self):
+        self.order = {
+            "id": "order",
+            "latitude": 20.721708,
+            "total_amount": 120.0,
+            "driver": 2,
+            "paid": True,
+            "notes": None,
+            "cart_items": [{"price": 10.1, "quantity": 2}, (0.1, "sku")],
+        }
+
+    def test_give_an_item_with_floats_when_it_is_converted_then_it_matches_the_json_round_trip(
+        self,
+    ):
+        observed = floats_to_decimals(self.order)
+
+        self.assertEqual(observed, json.loads(json.dumps(self.order), parse_float=Decimal))
+        self.assertEqual(observed["cart_items"][0]["price"], Decimal("10.1"))
+        self.assertIs(observed["paid"], True)
+        self.assertEqual(floats_to_decimals({"price": Decimal("5")}), {"price": Decimal("5")})
+
+    def test_give_decimals_when_the_payload_is_serialized_then_they_are_strings_with_any_backend(
+        self,
+    ):
+        payload = {"total_amount": Decimal("120.50"), "driver": 2, "notes": None}
+
+        observed = dumps_json(payload)
+        with patch("src.orders.order_modules.utils.encoders.orjson", None):
+            fallback = dumps_json(payload)
+
+        self.assertEqual(loads_json(observed), {"total_amount": "120.50", "driver": 2, "notes": None})
+        self.assertEqual(json.loads(fallback), loads_json(observed))
+
+    def test_give_an_invalid_document_when_it_is_parsed_then_a_value_error_is_raised(self):
+        with self.assertRaises(ValueError):
+            loads_json("{not json")
@@ -0,0 +1,73 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from src.orders.order_modules.data_access import geocode_cache
+from src.orders.order_modules.data_access import geolocation_handler
+from src.orders.order_modules.data_access.geocode_cache import (
+    GeocodeCache,
+    normalize_address,
+)
+
+
+class TestGeocodeCache(TestCase):
+    def setUp(self):
+        geocode_cache.clear_memory_cache()
+        self.table = Mock()
+        self.table.get_item.return_value = {}
+        self.cache = GeocodeCache(table=self.table)
+
+    def tearDown(self):
+        geocode_cache.clear_memory_cache()
+
+    def test_give_the_same_address_written_differently_when_it_is_normalized_then_keys_match(
+        self,
+    ):
+        self.assertEqual(
+            normalize_address("Av. Patria #1200,  Col. Jardines   de Guadalupe, Zapopan"),
+            normalize_address("avenida patria numero 1200 colonia jardines de guadalupe zapopan"),
+        )
+        self.assertEqual(normalize_address("Calle Juárez"), "calle juarez")
+
+    def test_give_a_stored_location_when_it_is_requested_twice_then_table_is_read_once(
+        self,
+    ):
+        self.table.get_item.return_value = {
+            "Item": {
+                "address": "calle juarez",
+                "found": True,
+                "latitude": "20.67",
+                "longitude": "-103.35",
+                "expires_at": 9999999999,
+            }
+        }
+
+        first = self.cache.get("Calle Juárez")
+        second = self.cache.get("calle juarez")
+
+        self.assertEqual(first, (True, {"latitude": 20.67, "longitude": -103.35}))
+        self.assertEqual(second, first)
+        self.table.get_item.assert_called_once()
+        stats = geocode_cache.get_cache_stats()
+        self.assertEqual((stats["table_hits"], stats["memory_hits"]), (1, 1))
+
+    @patch.object(geolocation_handler.settings, "environment", "prod")
+    @patch("src.orders.order_modules.data_access.geolocation_handler.AWSClientManager")
+    def test_give_an_address_without_results_when_it_is_geocoded_twice_then_negative_result_is_cached(
+        self, manager_mock
+    ):
+        location_client = manager_mock.return_value.location
+        location_client.search_place_index_for_text.return_value = {
+            "ResponseMetadata": {"HTTPStatusCode": 200},
+            "Results": [],
+        }
+        service = geolocation_handler.Geolocation(cache=self.cache)
+
+        first = service.get_lat_and_long_from_street_address("Unknown street 1")
+        second = service.get_lat_and_long_from_street_address("Unknown street 1")
+
+        self.assertIsNone(first)
+        self.assertIsNone(second)
+        location_client.search_place_index_for_text.assert_called_once()
+        stored_item = self.table.put_item.call_args.kwargs["Item"]
+        self.assertFalse(stored_item["found"])
+        self.assertEqual(geocode_cache.get_cache_stats()["negative_hits"], 1)
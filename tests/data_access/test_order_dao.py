@@ -0,0 +1,194 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+from botocore.exceptions import ClientError
+
+from src.orders.order_modules.dao.capacity_dao import CapacityDAO
+from src.orders.order_modules.dao.order_dao import OrderDAO
+from src.orders.order_modules.dao.tombstone_dao import TombstoneDAO
+from src.orders.order_modules.data_access.dynamo_handler import DynamoDBHandler
+
+
+def build_handler(table_name, partition_key, sort_key=None):
+    handler = DynamoDBHandler.__new__(DynamoDBHandler)
+    handler.table_name = table_name
+    handler.partition_key = partition_key
+    handler.sort_key = sort_key
+    handler.logger = Mock()
+    handler.table = Mock()
+    return handler
+
+
+def build_cancellation(*codes):
+    return ClientError(
+        {
+            "Error": {"Code": "TransactionCanceledException", "Message": "Cancelled"},
+            "CancellationReasons": [{"Code": code} for code in codes],
+            "ResponseMetadata": {"HTTPStatusCode": 400},
+        },
+        "TransactWriteItems",
+    )
+
+
+class TestOrderDAOMoveOrder(TestCase):
+    def setUp(self):
+        self.dao = OrderDAO.__new__(OrderDAO)
+        self.dao.orders_db = build_handler("Orders", "delivery_date")
+        self.dao.versions = Mock()
+        self.dao.versions.touch.return_value = {"status": "success", "message": ""}
+        self.dao.capacity = CapacityDAO.__new__(CapacityDAO)
+        self.dao.capacity.capacity_db = build_handler(
+            "OrdersCapacity", "delivery_date", "slot"
+        )
+        self.dao.tombstones = TombstoneDAO.__new__(TombstoneDAO)
+        self.dao.tombstones.tombstones_db = build_handler(
+            "OrderTombstones", "delivery_date", "id"
+        )
+        self.dao.orders_db.table.get_item.return_value = {
+            "Item": {"delivery_time": "9 AM - 1 PM", "driver": 2}
+        }
+        self.client = self.dao.orders_db.table.meta.client
+        self.item = {"id": "order", "delivery_date": "2024-01-09", "latitude": 20.5}
+
+    def test_give_a_new_date_when_an_order_is_moved_then_put_delete_tombstone_and_release_are_one_transaction(
+        self,
+    ):
+        observed = self.dao.move_order(self.item, original_date="2024-01-08")
+
+        self.assertEqual(observed["status"], "success")
+        self.assertEqual(
+            observed["payload"],
+            {"delivery_date": "2024-01-08", "delivery_time": "9 AM - 1 PM", "driver": 2},
+        )
+        transact_items = self.client.transact_write_items.call_args.kwargs["TransactItems"]
+        self.assertEqual(
+            [list(transact_item) for transact_item in transact_items],
+            [["Put"], ["Delete"], ["Put"], ["Update"]],
+        )
+        self.assertEqual(
+            transact_items[1]["Delete"]["Key"],
+            {"delivery_date": "2024-01-08", "id": "order"},
+        )
+        self.assertEqual(
+            transact_items[2]["Put"]["Item"]["id"], "order"
+        )
+        self.assertEqual(
+            transact_items[2]["Put"]["TableName"], "OrderTombstones"
+        )
+        self.assertEqual(
+            transact_items[3]["Update"]["Key"],
+            {"delivery_date": "2024-01-08", "slot": "9 AM - 1 PM#2"},
+        )
+
+    def test_give_a_slot_missing_in_the_ledger_when_an_order_is_moved_then_it_is_moved_without_release(
+        self,
+    ):
+        self.client.transact_write_items.side_effect = [
+            build_cancellation("None", "None", "None", "ConditionalCheckFailed"),
+            {},
+        ]
+
+        observed = self.dao.move_order(self.item, original_date="2024-01-08")
+
+        self.assertEqual(observed["status"], "success")
+        retried_items = self.client.transact_write_items.call_args.kwargs["TransactItems"]
+        self.assertEqual(len(retried_items), 3)
+
+    def test_give_an_order_changed_concurrently_when_it_is_moved_then_a_conflict_is_returned(
+        self,
+    ):
+        self.client.transact_write_items.side_effect = build_cancellation(
+            "None", "ConditionalCheckFailed", "None", "None"
+        )
+
+        observed = self.dao.move_order(self.item, original_date="2024-01-08")
+
+        self.assertEqual(observed["status"], "error")
+        self.assertEqual(observed["status_code"], 409)
+        self.assertEqual(self.client.transact_write_items.call_count, 1)
+
+
+class TestOrderDAODriverRoute(TestCase):
+    def setUp(self):
+        self.dao = OrderDAO.__new__(OrderDAO)
+        self.dao.orders_db = build_handler("Orders", "delivery_date")
+        self.dao.versions = Mock()
+        self.dao.versions.touch.return_value = {"status": "success", "message": ""}
+        self.table = self.dao.orders_db.table
+
+    def test_give_a_new_order_without_sequence_when_it_is_created_then_it_has_route_but_no_null_sequence(
+        self,
+    ):
+        self.dao.create_order(
+            {"id": "order", "delivery_date": "2024-01-08", "driver": 2, "delivery_sequence": None}
+        )
+
+        item = self.table.put_item.call_args.kwargs["Item"]
+        self.assertEqual(item["driver_route"], "2#2024-01-08")
+        self.assertNotIn("delivery_sequence", item)
+
+    def test_give_an_order_without_driver_when_it_is_patched_then_its_route_is_removed(
+        self,
+    ):
+        self.table.update_item.return_value = {"Attributes": {"version": 2}}
+
+        self.dao.patch_order("2024-01-08", "order", {"driver": None}, version=1)
+
+        request = self.table.update_item.call_args.kwargs
+        self.assertTrue(request["UpdateExpression"].endswith("REMOVE #remove0"))
+        self.assertEqual(request["ExpressionAttributeNames"]["#remove0"], "driver_route")
+
+    def test_give_a_driver_and_a_date_when_stops_are_fetched_then_the_route_index_is_queried(
+        self,
+    ):
+        self.table.query.return_value = {"Items": [{"id": "order", "delivery_sequence": 1}]}
+
+        observed = self.dao.fetch_driver_stops("2024-01-08", 2, fields=["id"])
+
+        self.assertEqual(observed["payload"], [{"id": "order", "delivery_sequence": 1}])
+        self.assertEqual(
+            self.table.query.call_args.kwargs["IndexName"], "DriverRouteIndex"
+        )
+
+
+class TestOrderDAOChanges(TestCase):
+    def setUp(self):
+        self.dao = OrderDAO.__new__(OrderDAO)
+        self.dao.orders_db = build_handler("Orders", "delivery_date")
+        self.dao.versions = Mock()
+        self.dao.versions.touch.return_value = {"status": "success", "message": ""}
+        self.dao.tombstones = TombstoneDAO.__new__(TombstoneDAO)
+        self.dao.tombstones.tombstones_db = build_handler(
+            "OrderTombstones", "delivery_date", "id"
+        )
+
+    def test_give_changes_after_a_watermark_when_they_are_fetched_then_orders_and_newer_deletions_are_returned(
+        self,
+    ):
+        self.dao.orders_db.table.query.return_value = {
+            "Items": [
+                {"id": "updated", "changed_at": "2024-01-08T10:00:00.000000Z"},
+                {"id": "moved-back", "changed_at": "2024-01-08T10:05:00.000000Z"},
+            ]
+        }
+        self.dao.tombstones.tombstones_db.table.query.return_value = {
+            "Items": [
+                {"id": "old", "changed_at": "2024-01-08T08:00:00.000000Z"},
+                {"id": "deleted", "changed_at": "2024-01-08T10:01:00.000000Z"},
+                {"id": "moved-back", "changed_at": "2024-01-08T10:02:00.000000Z"},
+            ]
+        }
+
+        observed = self.dao.fetch_changes("2024-01-08", "2024-01-08T09:00:00.000000Z")
+
+        self.assertEqual(
+            [order["id"] for order in observed["payload"]["orders"]],
+            ["updated", "moved-back"],
+        )
+        self.assertEqual(
+            observed["payload"]["deleted"],
+            [{"id": "deleted", "changed_at": "2024-01-08T10:01:00.000000Z"}],
+        )
+        self.assertEqual(
+            self.dao.orders_db.table.query.call_args.kwargs["IndexName"], "ChangesIndex"
+        )
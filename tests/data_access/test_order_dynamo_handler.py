@@ -0,0 +1,271 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from decimal import Decimal
+
+from botocore.exceptions import ClientError
+
+from src.orders.order_modules.data_access.dynamo_handler import DynamoDBHandler
+
+
+class TestOrderDynamoDBHandlerPagination(TestCase):
+    def setUp(self):
+        self.handler = DynamoDBHandler.__new__(DynamoDBHandler)
+        self.handler.logger = Mock()
+        self.handler.table = Mock()
+        self.handler.table.query.side_effect = [
+            {"Items": [{"id": "1"}, {"id": "2"}], "LastEvaluatedKey": {"id": "2"}},
+            {"Items": [{"id": "3"}, {"id": "4"}], "LastEvaluatedKey": {"id": "4"}},
+            {"Items": [{"id": "5"}]},
+        ]
+
+    def test_give_a_query_bigger_than_a_page_when_records_are_retrieved_then_all_pages_are_returned(
+        self,
+    ):
+        observed = self.handler.retrieve_records("condition", page_size=2)
+
+        self.assertEqual(observed["status"], "success")
+        self.assertEqual([item["id"] for item in observed["payload"]], ["1", "2", "3", "4", "5"])
+        self.assertEqual(self.handler.table.query.call_count, 3)
+        self.handler.table.query.assert_called_with(
+            KeyConditionExpression="condition", Limit=2, ExclusiveStartKey={"id": "4"}
+        )
+
+    def test_give_a_limit_when_items_are_iterated_then_next_pages_are_not_requested(
+        self,
+    ):
+        observed = list(self.handler.query_items("condition", limit=2))
+
+        self.assertEqual([item["id"] for item in observed], ["1", "2"])
+        self.assertEqual(self.handler.table.query.call_count, 1)
+
+    def test_give_a_projection_and_a_start_key_when_a_page_is_retrieved_then_only_that_page_is_requested(
+        self,
+    ):
+        observed = self.handler.retrieve_page(
+            "condition",
+            page_size=2,
+            exclusive_start_key={"id": "2"},
+            projection=["id", "status"],
+        )
+
+        self.assertEqual(observed["status"], "success")
+        self.assertEqual(observed["payload"]["last_evaluated_key"], {"id": "2"})
+        self.handler.table.query.assert_called_once_with(
+            KeyConditionExpression="condition",
+            Limit=2,
+            ProjectionExpression="#field0, #field1",
+            ExpressionAttributeNames={"#field0": "id", "#field1": "status"},
+            ExclusiveStartKey={"id": "2"},
+        )
+
+
+class TestOrderDynamoDBHandlerPatch(TestCase):
+    def setUp(self):
+        self.handler = DynamoDBHandler.__new__(DynamoDBHandler)
+        self.handler.partition_key = "delivery_date"
+        self.handler.logger = Mock()
+        self.handler.table = Mock()
+        self.key = {"delivery_date": "2024-01-08", "id": "order"}
+
+    def test_give_some_changes_when_a_record_is_patched_then_only_those_attributes_and_the_version_are_set(
+        self,
+    ):
+        self.handler.table.update_item.return_value = {
+            "Attributes": {"notes": "Tocar el timbre", "version": 4}
+        }
+
+        observed = self.handler.patch_record(
+            self.key, {"notes": "Tocar el timbre", "latitude": 20.5}, expected_version=3
+        )
+
+        self.assertEqual(observed["status"], "success")
+        self.assertEqual(observed["payload"]["version"], 4)
+        self.assertEqual(observed["payload"]["changes"], {"notes": "Tocar el timbre"})
+        request = self.handler.table.update_item.call_args.kwargs
+        self.assertEqual(
+            request["UpdateExpression"],
+            "SET #version = :next_version, #attr0 = :attr0, #attr1 = :attr1",
+        )
+        self.assertEqual(request["ExpressionAttributeValues"][":attr1"], Decimal("20.5"))
+        self.assertEqual(request["ExpressionAttributeValues"][":next_version"], 4)
+        self.assertNotIn("attribute_not_exists", request["ConditionExpression"])
+
+    def test_give_a_record_modified_by_someone_else_when_it_is_patched_then_a_conflict_is_returned(
+        self,
+    ):
+        self.handler.table.update_item.side_effect = ClientError(
+            {
+                "Error": {"Code": "ConditionalCheckFailedException", "Message": "failed"},
+                "ResponseMetadata": {"HTTPStatusCode": 400},
+            },
+            "UpdateItem",
+        )
+
+        observed = self.handler.patch_record(self.key, {"notes": ""}, expected_version=0)
+
+        self.assertEqual(observed["status_code"], 409)
+        request = self.handler.table.update_item.call_args.kwargs
+        self.assertIn("attribute_not_exists(#version)", request["ConditionExpression"])
+
+
+class TestOrderDynamoDBHandlerVersionedPut(TestCase):
+    def setUp(self):
+        self.handler = DynamoDBHandler.__new__(DynamoDBHandler)
+        self.handler.partition_key = "delivery_date"
+        self.handler.sort_key = "id"
+        self.handler.logger = Mock()
+        self.handler.table = Mock()
+        self.handler.table.put_item.return_value = {
+            "ResponseMetadata": {"HTTPStatusCode": 200}
+        }
+        self.item = {"delivery_date": "2024-01-08", "id": "order", "notes": "put"}
+
+    def test_give_a_versioned_order_when_it_is_replaced_then_it_gets_the_next_version(
+        self,
+    ):
+        self.handler.table.get_item.return_value = {"Item": {"version": Decimal("3")}}
+
+        observed = self.handler.update_record(self.item)
+
+        self.assertEqual(observed["status"], "success")
+        request = self.handler.table.put_item.call_args.kwargs
+        self.assertEqual(request["Item"]["version"], 4)
+        self.assertEqual(request["ConditionExpression"], "#version = :stored_version")
+        self.assertEqual(request["ExpressionAttributeValues"], {":stored_version": 3})
+
+    def test_give_an_order_written_meanwhile_when_it_is_replaced_then_the_version_is_read_again(
+        self,
+    ):
+        self.handler.table.get_item.side_effect = [{}, {"Item": {"version": 1}}]
+        self.handler.table.put_item.side_effect = [
+            ClientError(
+                {"Error": {"Code": "ConditionalCheckFailedException", "Message": "Failed"}},
+                "PutItem",
+            ),
+            {"ResponseMetadata": {"HTTPStatusCode": 200}},
+        ]
+
+        observed = self.handler.update_record(self.item)
+
+        self.assertEqual(observed["status"], "success")
+        first, second = self.handler.table.put_item.call_args_list
+        self.assertEqual(first.kwargs["ConditionExpression"], "attribute_not_exists(#version)")
+        self.assertEqual(first.kwargs["Item"]["version"], 1)
+        self.assertEqual(second.kwargs["Item"]["version"], 2)
+
+
+class TestOrderDynamoDBHandlerCounter(TestCase):
+    def setUp(self):
+        self.handler = DynamoDBHandler.__new__(DynamoDBHandler)
+        self.handler.logger = Mock()
+        self.handler.table = Mock()
+        self.handler.table.update_item.return_value = {"Attributes": {"order_count": 3}}
+
+    def test_give_a_maximum_when_a_counter_is_updated_then_the_update_is_conditional(
+        self,
+    ):
+        observed = self.handler.update_counter(
+            {"delivery_date": "2024-01-08", "slot": "9 AM - 1 PM#1"},
+            "order_count",
+            1,
+            max_value=32,
+        )
+
+        self.assertEqual(observed["status"], "success")
+        request = self.handler.table.update_item.call_args.kwargs
+        self.assertEqual(request["UpdateExpression"], "ADD #counter :amount")
+        self.assertIn("ConditionExpression", request)
+
+
+    def test_give_an_untracked_slot_when_a_counter_is_initialized_then_it_is_set_only_if_missing(
+        self,
+    ):
+        observed = self.handler.initialize_counter(
+            {"delivery_date": "2024-01-08", "slot": "9 AM - 1 PM#1"},
+            "order_count",
+            5,
+            attributes={"delivery_time": "9 AM - 1 PM", "driver": 1},
+        )
+
+        self.assertEqual(observed["status"], "success")
+        request = self.handler.table.update_item.call_args.kwargs
+        self.assertEqual(
+            request["UpdateExpression"],
+            "SET #counter = if_not_exists(#counter, :value), #attr0 = :attr0, #attr1 = :attr1",
+        )
+        self.assertEqual(request["ConditionExpression"], "attribute_not_exists(#counter)")
+        self.assertEqual(request["ExpressionAttributeValues"][":value"], 5)
+
+    def test_give_a_slot_seeded_meanwhile_when_a_counter_is_initialized_then_it_is_left_untouched(
+        self,
+    ):
+        self.handler.table.update_item.side_effect = ClientError(
+            {"Error": {"Code": "ConditionalCheckFailedException", "Message": "Exists"}},
+            "UpdateItem",
+        )
+
+        observed = self.handler.initialize_counter(
+            {"delivery_date": "2024-01-08", "slot": "9 AM - 1 PM#1"}, "order_count", 5
+        )
+
+        self.assertEqual(observed["status"], "success")
+        self.assertEqual(observed["status_code"], 200)
+
+
+class TestOrderDynamoDBHandlerBatchInsert(TestCase):
+    def setUp(self):
+        self.handler = DynamoDBHandler.__new__(DynamoDBHandler)
+        self.handler.logger = Mock()
+        self.handler.table_name = "Orders"
+        self.handler.table = Mock()
+        self.items = [
+            {"delivery_date": "2024-01-08", "id": str(position), "latitude": 20.5}
+            for position in range(30)
+        ]
+
+    @patch("src.orders.order_modules.data_access.dynamo_handler.time.sleep")
+    def test_give_unprocessed_items_when_a_batch_is_written_then_only_they_are_sent_again(
+        self, sleep
+    ):
+        unprocessed = {"PutRequest": {"Item": {"delivery_date": "2024-01-08", "id": "3"}}}
+        self.handler.table.meta.client.batch_write_item.side_effect = [
+            {"UnprocessedItems": {"Orders": [unprocessed]}},
+            {"UnprocessedItems": {}},
+            {},
+        ]
+
+        observed = self.handler.batch_insert(self.items, ["delivery_date", "id"])
+
+        self.assertEqual(observed["status"], "success")
+        self.assertEqual(observed["payload"]["written"], list(range(30)))
+        calls = self.handler.table.meta.client.batch_write_item.call_args_list
+        self.assertEqual(len(calls[0].kwargs["RequestItems"]["Orders"]), 25)
+        self.assertEqual(calls[1].kwargs["RequestItems"]["Orders"], [unprocessed])
+        self.assertEqual(len(calls[2].kwargs["RequestItems"]["Orders"]), 5)
+        self.assertEqual(
+            calls[0].kwargs["RequestItems"]["Orders"][0]["PutRequest"]["Item"]["latitude"],
+            Decimal("20.5"),
+        )
+        sleep.assert_called_once()
+
+    @patch("src.orders.order_modules.data_access.dynamo_handler.time.sleep")
+    def test_give_a_validation_error_when_a_batch_is_written_then_its_items_are_reported_as_failures(
+        self, sleep
+    ):
+        self.handler.table.meta.client.batch_write_item.side_effect = [
+            ClientError(
+                {"Error": {"Code": "ValidationException", "Message": "Invalid item"}},
+                "BatchWriteItem",
+            ),
+            {},
+        ]
+
+        observed = self.handler.batch_insert(self.items, ["delivery_date", "id"])
+
+        self.assertEqual(observed["status_code"], 207)
+        self.assertEqual(observed["payload"]["written"], list(range(25, 30)))
+        self.assertEqual(
+            [failure["position"] for failure in observed["payload"]["failures"]], list(range(25))
+        )
+        sleep.assert_not_called()
@@ -0,0 +1,40 @@
+from unittest import TestCase
+
+from pydantic import ValidationError
+
+from src.orders.order_modules.models.order import OrdersPageRequest
+from src.orders.order_modules.utils.cursor import encode_cursor
+
+
+class TestOrdersPageRequest(TestCase):
+    def setUp(self):
+        self.start_key = {"delivery_date": "2023-11-16", "id": "order-10"}
+
+    def test_give_a_cursor_from_a_previous_page_when_request_is_validated_then_start_key_is_restored(
+        self,
+    ):
+        observed = OrdersPageRequest(
+            delivery_date="2023-11-16",
+            limit="50",
+            cursor=encode_cursor(self.start_key),
+            fields="status, driver",
+        )
+
+        self.assertTrue(observed.is_paginated)
+        self.assertEqual(observed.limit, 50)
+        self.assertEqual(observed.exclusive_start_key, self.start_key)
+        self.assertEqual(observed.fields, ["delivery_date", "id", "status", "driver"])
+
+    def test_give_a_cursor_of_another_date_when_request_is_validated_then_validation_error_is_raised(
+        self,
+    ):
+        with self.assertRaises(ValidationError):
+            OrdersPageRequest(
+                delivery_date="2023-11-17", cursor=encode_cursor(self.start_key)
+            )
+
+    def test_give_an_unknown_field_when_request_is_validated_then_validation_error_is_raised(
+        self,
+    ):
+        with self.assertRaises(ValidationError):
+            OrdersPageRequest(delivery_date="2023-11-16", fields="status,password")
@@ -0,0 +1,32 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from src.orders.delivery.delivery_modules.utils.doorman import DoormanUtil
+
+
+@patch("src.orders.delivery.delivery_modules.utils.doorman.environment", "prod")
+class TestDeliveryDoorman(TestCase):
+    def build_doorman(self, claims):
+        return DoormanUtil({"requestContext": {"authorizer": {"claims": claims}}}, Mock())
+
+    def test_give_a_repartidor_when_it_acts_on_a_route_then_only_its_own_driver_is_allowed(
+        self,
+    ):
+        doorman = self.build_doorman(
+            {"cognito:groups": "Repartidor", "custom:driver": "2"}
+        )
+
+        self.assertTrue(doorman.can_access_driver(2))
+        self.assertFalse(doorman.can_access_driver(3))
+
+    def test_give_a_repartidor_without_driver_when_it_acts_on_a_route_then_it_is_rejected(
+        self,
+    ):
+        doorman = self.build_doorman({"cognito:groups": "Repartidor"})
+
+        self.assertFalse(doorman.can_access_driver(2))
+
+    def test_give_an_admin_when_it_acts_on_a_route_then_any_driver_is_allowed(self):
+        doorman = self.build_doorman({"cognito:groups": "Repartidor,Admin"})
+
+        self.assertTrue(doorman.can_access_driver(3))
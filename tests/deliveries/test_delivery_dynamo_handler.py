@@ -0,0 +1,108 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+from botocore.exceptions import ClientError
+
+from src.orders.delivery.delivery_modules.data_access.dynamo_handler import (
+    DynamoDBHandler,
+)
+
+
+class TestDeliveryDynamoDBHandlerBulkUpdate(TestCase):
+    def setUp(self):
+        self.handler = DynamoDBHandler.__new__(DynamoDBHandler)
+        self.handler.table_name = "Orders"
+        self.handler.partition_key = "delivery_date"
+        self.handler.sort_key = "id"
+        self.handler.version_attribute = "version"
+        self.handler.logger = Mock()
+        self.handler.table = Mock()
+        self.client = self.handler.table.meta.client
+        self.records = [
+            {
+                "id": str(index),
+                "delivery_date": "2024-01-08",
+                "delivery_sequence": index,
+                "driver": 1,
+                "status": "Programada",
+            }
+            for index in range(128)
+        ]
+
+    def test_give_a_full_day_when_records_are_updated_then_they_are_written_in_transactions(
+        self,
+    ):
+        observed = self.handler.update_records(self.records)
+
+        self.assertEqual(observed["status"], "success")
+        self.assertEqual(observed["payload"], {"updated": 128, "failures": []})
+        self.assertEqual(self.client.transact_write_items.call_count, 2)
+        self.client.update_item.assert_not_called()
+        first_update = self.client.transact_write_items.call_args_list[0].kwargs[
+            "TransactItems"
+        ][0]["Update"]
+        self.assertEqual(first_update["Key"], {"delivery_date": "2024-01-08", "id": "0"})
+        self.assertEqual(
+            first_update["UpdateExpression"],
+            "SET #attr0 = :attr0, #attr1 = :attr1, #attr2 = :attr2"
+            " ADD #version :version_increment",
+        )
+
+    def test_give_a_rejected_transaction_when_records_are_updated_then_failures_are_reported_per_record(
+        self,
+    ):
+        self.client.transact_write_items.side_effect = ClientError(
+            {"Error": {"Code": "TransactionCanceledException", "Message": "Canceled"}},
+            "TransactWriteItems",
+        )
+
+        def update_item(**request):
+            if request["Key"]["id"] == "7":
+                raise ClientError(
+                    {"Error": {"Code": "ValidationException", "Message": "Bad value"}},
+                    "UpdateItem",
+                )
+
+        self.client.update_item.side_effect = update_item
+
+        observed = self.handler.update_records(self.records[:10])
+
+        self.assertEqual(observed["status"], "error")
+        self.assertEqual(observed["status_code"], 207)
+        self.assertEqual(observed["payload"]["updated"], 9)
+        self.assertEqual(
+            observed["payload"]["failures"],
+            [
+                {
+                    "delivery_date": "2024-01-08",
+                    "id": "7",
+                    "message": "Bad value. ValidationException",
+                }
+            ],
+        )
+        self.assertEqual(self.client.update_item.call_count, 10)
+
+    def test_give_records_with_the_same_shape_when_requests_are_built_then_expression_is_reused(
+        self,
+    ):
+        first = self.handler.build_update_request(self.records[0])
+        second = self.handler.build_update_request(self.records[1])
+
+        self.assertIs(first["UpdateExpression"], second["UpdateExpression"])
+        self.assertEqual(second["ExpressionAttributeValues"][":attr0"], 1)
+        self.assertTrue(first["UpdateExpression"].endswith(" ADD #version :version_increment"))
+        self.assertEqual(second["ExpressionAttributeValues"][":version_increment"], 1)
+
+    def test_give_attributes_without_value_when_a_request_is_built_then_they_are_removed(
+        self,
+    ):
+        observed = self.handler.build_update_request(
+            {"id": "7", "delivery_date": "2024-01-08", "changed_at": "now", "driver": None}
+        )
+
+        self.assertEqual(
+            observed["UpdateExpression"],
+            "SET #attr0 = :attr0 REMOVE #removed0 ADD #version :version_increment",
+        )
+        self.assertEqual(observed["ExpressionAttributeNames"]["#removed0"], "driver")
+        self.assertNotIn(None, observed["ExpressionAttributeValues"].values())
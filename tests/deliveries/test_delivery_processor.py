@@ -0,0 +1,224 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+from decimal import Decimal
+
+from src.orders.delivery.delivery_modules.processors.delivery_helpers import (
+    DeliveryProcessor,
+)
+from src.orders.delivery.delivery_modules.processors.order_helpers import OrderIndex
+
+
+class TestDeliveryProcessor(TestCase):
+    def setUp(self):
+        self.orders = [
+            {
+                "id": str(index),
+                "delivery_date": "2024-01-08",
+                "delivery_time": "9 AM - 1 PM",
+                "driver": 1,
+                "latitude": 20.70 - index * 0.01,
+                "longitude": -103.38,
+            }
+            for index in range(5)
+        ]
+        self.dao = Mock()
+        self.dao.bulk_update.side_effect = lambda items: {
+            "status": "success",
+            "status_code": 200,
+            "message": "Records updated in DynamoDB",
+            "payload": {"updated": len(items), "failures": []},
+        }
+
+    def test_give_a_day_scheduled_before_when_it_is_scheduled_again_then_only_the_late_order_is_written(
+        self,
+    ):
+        processor = DeliveryProcessor()
+        processor.process_records_for_driver(1, self.orders, self.dao)
+        for order in self.orders:
+            order["status"] = "Programada"
+            order["driver_route"] = "1#2024-01-08"
+        late_order = {**self.orders[0], "id": "late", "latitude": 20.60, "status": "Creada"}
+        del late_order["delivery_sequence"]
+        self.orders.append(late_order)
+        self.dao.reset_mock()
+
+        stored_schedule = DeliveryProcessor.snapshot_schedule(self.orders)
+        observed = processor.process_records_for_driver(
+            1, self.orders, self.dao, stored_schedule
+        )
+
+        self.assertEqual(observed, 1)
+        written = self.dao.bulk_update.call_args.args[0]
+        self.assertEqual([order["id"] for order in written], ["late"])
+        self.assertEqual(written[0]["delivery_sequence"], 6)
+
+    def test_give_no_stored_schedule_when_a_shift_is_scheduled_then_every_order_is_written(
+        self,
+    ):
+        observed = DeliveryProcessor().process_records_for_driver(1, self.orders, self.dao)
+
+        self.assertEqual(observed, 5)
+        written = self.dao.bulk_update.call_args.args[0]
+        self.assertEqual(len(written), 5)
+        self.assertEqual({order["driver_route"] for order in written}, {"1#2024-01-08"})
+
+    def test_give_several_drivers_when_they_are_processed_in_parallel_then_every_route_is_written(
+        self,
+    ):
+        orders = self.orders + [
+            {**order, "id": f"{order['id']}-2", "driver": 2} for order in self.orders
+        ]
+        index = OrderIndex(orders, available_drivers=[1, 2])
+
+        observed = DeliveryProcessor().process_records_in_parallel(
+            [1, 2], index, self.dao, max_workers=2
+        )
+
+        self.assertEqual(observed, 10)
+        written = [
+            order for call in self.dao.bulk_update.call_args_list for order in call.args[0]
+        ]
+        self.assertEqual(sorted(order["delivery_sequence"] for order in written), [1, 1, 2, 2, 3, 3, 4, 4, 5, 5])
+        self.assertEqual({order["driver"] for order in written}, {1, 2})
+
+    def test_give_a_scheduled_day_when_a_late_order_is_inserted_then_only_the_following_orders_are_written(
+        self,
+    ):
+        processor = DeliveryProcessor()
+        processor.process_records_for_driver(1, self.orders, self.dao)
+        for order in self.orders:
+            order["status"] = "Programada"
+            order["driver_route"] = "1#2024-01-08"
+            order["delivery_sequence"] = Decimal(order["delivery_sequence"])
+        # Between the third and the fourth stop of the route
+        late_order = {**self.orders[0], "id": "late", "latitude": 20.675, "status": "Creada"}
+        del late_order["delivery_sequence"]
+        self.orders.append(late_order)
+        self.dao.reset_mock()
+
+        stored_schedule = DeliveryProcessor.snapshot_schedule(self.orders)
+        observed = processor.process_insertions(
+            [1], OrderIndex(self.orders, [1]), self.dao, stored_schedule
+        )
+
+        written = {
+            order["id"]: order["delivery_sequence"]
+            for order in self.dao.bulk_update.call_args.args[0]
+        }
+        self.assertEqual(observed, 3)
+        self.assertEqual(written, {"late": 4, "3": 5, "4": 6})
+
+    def test_give_an_order_on_the_street_when_a_late_order_is_inserted_then_it_keeps_its_schedule(
+        self,
+    ):
+        processor = DeliveryProcessor()
+        processor.process_records_for_driver(1, self.orders, self.dao)
+        for order in self.orders:
+            order["status"] = "En ruta" if order["id"] == "0" else "Programada"
+            order["driver_route"] = "1#2024-01-08"
+            order["delivery_sequence"] = Decimal(order["delivery_sequence"])
+        # Closer to the offices than the order on the street
+        late_order = {**self.orders[0], "id": "late", "latitude": 20.72, "status": "Creada"}
+        del late_order["delivery_sequence"]
+        self.orders.append(late_order)
+        self.dao.reset_mock()
+
+        stored_schedule = DeliveryProcessor.snapshot_schedule(self.orders)
+        observed = processor.process_insertions(
+            [1], OrderIndex(self.orders, [1]), self.dao, stored_schedule
+        )
+
+        written = {
+            order["id"]: (order["delivery_sequence"], order["status"])
+            for order in self.dao.bulk_update.call_args.args[0]
+        }
+        self.assertNotIn("0", written)
+        self.assertEqual(self.orders[0]["status"], "En ruta")
+        self.assertEqual(self.orders[0]["delivery_sequence"], 1)
+        self.assertEqual(observed, len(written))
+        self.assertEqual(written["late"], (2, "Programada"))
+        self.assertTrue(all(sequence > 1 for sequence, _ in written.values()))
+
+    def test_give_a_driver_on_the_street_when_it_is_rerouted_then_delivered_orders_keep_their_sequence(
+        self,
+    ):
+        processor = DeliveryProcessor()
+        processor.process_records_for_driver(1, self.orders, self.dao)
+        for order in self.orders:
+            order["status"] = "Entregada" if order["id"] in ("0", "1") else "En ruta"
+            order["driver_route"] = "1#2024-01-08"
+            order["delivery_sequence"] = Decimal(order["delivery_sequence"])
+        self.dao.reset_mock()
+
+        stored_schedule = DeliveryProcessor.snapshot_schedule(self.orders)
+        remaining_stops, observed = processor.reroute_driver(
+            1,
+            self.orders,
+            {"latitude": 20.60, "longitude": -103.38},
+            self.dao,
+            stored_schedule,
+        )
+
+        self.assertEqual(
+            [(stop["id"], stop["delivery_sequence"]) for stop in remaining_stops],
+            [("4", 3), ("3", 4), ("2", 5)],
+        )
+        written = self.dao.bulk_update.call_args.args[0]
+        self.assertEqual(observed, 2)
+        self.assertEqual(sorted(order["id"] for order in written), ["2", "4"])
+        self.assertEqual({order["status"] for order in written}, {"En ruta"})
+
+    def test_give_orders_left_out_of_the_routes_when_they_are_dropped_then_their_route_is_removed(
+        self,
+    ):
+        DeliveryProcessor().process_records_for_driver(1, self.orders, self.dao)
+        for order in self.orders:
+            order["status"] = "Programada"
+            order["driver_route"] = "1#2024-01-08"
+        self.orders[1]["status"] = "En ruta"
+        self.dao.reset_mock()
+
+        observed = DeliveryProcessor().drop_orders(self.orders[:2], self.dao)
+
+        written = self.dao.bulk_update.call_args.args[0]
+        self.assertEqual(observed, 1)
+        self.assertEqual(
+            written,
+            [
+                {
+                    "id": "0",
+                    "delivery_date": "2024-01-08",
+                    "driver": None,
+                    "delivery_sequence": None,
+                    "driver_route": None,
+                }
+            ],
+        )
+        self.assertNotIn("driver", self.orders[0])
+        self.assertEqual(self.orders[1]["driver_route"], "1#2024-01-08")
+
+
+class TestOrderIndex(TestCase):
+    def test_give_orders_of_several_drivers_when_they_are_indexed_then_orders_without_available_driver_are_reported(
+        self,
+    ):
+        orders = [
+            {"id": "1", "delivery_time": "9 AM - 1 PM", "driver": Decimal("1")},
+            {"id": "2", "delivery_time": "1 PM - 5 PM", "driver": Decimal("2")},
+            {"id": "3", "delivery_time": "9 AM - 1 PM", "driver": Decimal("1")},
+            {"id": "4", "delivery_time": "9 AM - 1 PM"},
+            {"id": "5", "delivery_time": "9 AM - 1 PM", "driver": Decimal("3")},
+        ]
+
+        index = OrderIndex(orders, available_drivers=[1, 2])
+
+        self.assertEqual(
+            [order["id"] for order in index.select(1, "9 AM - 1 PM")], ["1", "3"]
+        )
+        self.assertEqual([order["id"] for order in index.select(2, "1 PM - 5 PM")], ["2"])
+        self.assertEqual(index.select(2, "9 AM - 1 PM"), [])
+        self.assertEqual(
+            [(order["id"], order["reason"]) for order in index.report_unscheduled()],
+            [("4", OrderIndex.MISSING_DRIVER), ("5", OrderIndex.UNAVAILABLE_DRIVER)],
+        )
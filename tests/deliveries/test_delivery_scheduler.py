@@ -524,3 +524,122 @@ class TestDeliveryScheduler(TestCase):
         expected = 2
 
         self.assertEqual(observed, expected)
+
+    def test_give_capacity_slots_instead_of_orders_the_same_driver_is_assigned(
+        self,
+    ):
+
+        scheduler = DeliveryScheduler()
+        orders = [{"delivery_time": self.morning_time, "driver": 1} for _ in range(32)]
+        orders += [{"delivery_time": self.morning_time, "driver": 2} for _ in range(10)]
+        slots = {(self.morning_time, 1): 32, (self.morning_time, 2): 10}
+
+        self.assertEqual(scheduler.count_orders_by_slot(orders), slots)
+
+        observed = scheduler.assign_driver_from_slots(
+            self.northwest_location, self.morning_time, self.monday, slots
+        )
+        expected = scheduler.assign_driver_for_delivery(
+            self.northwest_location, self.morning_time, self.monday, orders
+        )
+
+        self.assertEqual(observed, expected)
+        self.assertEqual(observed, 2)
+
+    def test_give_capacity_slots_for_a_full_day_order_will_not_be_created(
+        self,
+    ):
+
+        scheduler = DeliveryScheduler()
+        slots = {
+            (self.morning_time, 1): 32,
+            (self.morning_time, 2): 32,
+            (self.afternoon_time, 1): 32,
+            (self.afternoon_time, 2): 32,
+        }
+
+        observed = scheduler.assign_driver_from_slots(
+            self.northwest_location, self.morning_time, self.monday, slots
+        )
+        expected = 0
+
+        self.assertEqual(observed, expected)
+
+    def test_give_locations_of_every_sector_when_sectors_are_computed_together_they_match_one_by_one(
+        self,
+    ):
+
+        scheduler = DeliveryScheduler()
+        locations = [
+            self.northwest_location,
+            self.southwest_location,
+            self.northeast_location,
+            self.southeast_location,
+            scheduler.origin,
+        ]
+
+        observed = scheduler._get_customer_sectors(locations + [(None, None)])
+        expected = [scheduler._get_customer_sector(location) for location in locations]
+
+        self.assertEqual(observed, expected + [scheduler.INVALID_SECTOR])
+
+    def test_give_a_batch_bigger_than_a_shift_drivers_are_assigned_counting_previous_orders(
+        self,
+    ):
+
+        scheduler = DeliveryScheduler()
+        latitude, longitude = self.northwest_location
+        pending_orders = [
+            {
+                "latitude": latitude,
+                "longitude": longitude,
+                "delivery_time": self.morning_time,
+            }
+            for _ in range(33)
+        ]
+        pending_orders.append(
+            {"latitude": None, "longitude": None, "delivery_time": self.morning_time}
+        )
+        slots = {}
+
+        observed = scheduler.assign_drivers_for_date(self.monday, pending_orders, slots)
+
+        self.assertEqual(observed, [1] * 32 + [2, 0])
+        self.assertEqual(slots, {(self.morning_time, 1): 32, (self.morning_time, 2): 1})
+
+    def test_give_a_batch_of_orders_the_same_drivers_are_assigned_than_one_by_one(
+        self,
+    ):
+
+        scheduler = DeliveryScheduler()
+        locations = [
+            self.northwest_location,
+            self.southwest_location,
+            self.northeast_location,
+            self.southeast_location,
+        ]
+        pending_orders = [
+            {
+                "latitude": locations[position % 4][0],
+                "longitude": locations[position % 4][1],
+                "delivery_time": self.morning_time if position % 3 else self.afternoon_time,
+            }
+            for position in range(150)
+        ]
+        slots = {}
+        expected = []
+        for order in pending_orders:
+            driver = scheduler.assign_driver_from_slots(
+                (order["latitude"], order["longitude"]),
+                order["delivery_time"],
+                self.tuesday,
+                slots,
+            )
+            slot = (order["delivery_time"], driver)
+            if driver:
+                slots[slot] = slots.get(slot, 0) + 1
+            expected.append(driver)
+
+        observed = scheduler.assign_drivers_for_date(self.tuesday, pending_orders, {})
+
+        self.assertEqual(observed, expected)
@@ -0,0 +1,74 @@
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from src.orders.delivery.distance_metrics import (
+    CachedMetric,
+    DistanceMetric,
+    HaversineMetric,
+    PrecomputedMatrixMetric,
+)
+
+
+class TestDistanceMetrics(TestCase):
+    def setUp(self):
+        self.offices = {"latitude": 20.7257943, "longitude": -103.3792193}
+        self.downtown = {"latitude": 20.6736, "longitude": -103.3440}
+        self.zapopan = {"latitude": 20.7214, "longitude": -103.3918}
+
+    def test_give_two_points_when_haversine_is_used_then_distance_is_in_kilometers(
+        self,
+    ):
+        matrix = HaversineMetric().build_matrix([self.offices, self.downtown])
+
+        self.assertAlmostEqual(matrix[0, 1], 6.84, places=1)
+        self.assertEqual(matrix[0, 1], matrix[1, 0])
+        self.assertEqual(matrix[0, 0], 0.0)
+
+    def test_give_known_stops_when_precomputed_matrix_is_used_then_road_costs_are_returned(
+        self,
+    ):
+        stops = [[20.7257943, -103.3792193], [20.6736, -103.3440]]
+        metric = PrecomputedMatrixMetric(stops, [[0, 18.5], [21.0, 0]])
+
+        matrix = metric.build_matrix([self.downtown, self.offices])
+
+        self.assertEqual(matrix.tolist(), [[0, 21.0], [18.5, 0]])
+        self.assertEqual(
+            metric.build_matrix([self.offices, self.zapopan]).tolist(),
+            HaversineMetric().build_matrix([self.offices, self.zapopan]).tolist(),
+        )
+
+    def test_give_the_same_stops_in_another_order_when_matrix_is_cached_then_it_is_not_measured_again(
+        self,
+    ):
+        CachedMetric._memory_cache.clear()
+        with tempfile.TemporaryDirectory() as cache_dir:
+            metric = CachedMetric(HaversineMetric(), cache_dir=cache_dir)
+            with patch.object(
+                HaversineMetric, "build_matrix", wraps=metric.metric.build_matrix
+            ) as build_mock:
+                first = metric.build_matrix([self.offices, self.downtown, self.zapopan])
+                second = metric.build_matrix([self.zapopan, self.offices, self.downtown])
+
+        build_mock.assert_called_once()
+        self.assertEqual(second[1, 2], first[0, 1])
+        self.assertEqual(second[0, 1], first[2, 0])
+
+    def test_give_a_pair_of_points_when_it_is_measured_with_a_cached_metric_then_no_matrix_is_cached(
+        self,
+    ):
+        CachedMetric._memory_cache.clear()
+        metric = CachedMetric(HaversineMetric())
+
+        observed = metric.calculate_distance(self.offices, self.downtown)
+
+        self.assertAlmostEqual(observed, 6.84, places=1)
+        self.assertEqual(len(CachedMetric._memory_cache), 0)
+
+    def test_give_a_metric_without_matrix_when_it_is_built_then_it_is_rejected(self):
+        class IncompleteMetric(DistanceMetric):
+            name = "incomplete"
+
+        with self.assertRaises(TypeError):
+            IncompleteMetric()
@@ -0,0 +1,73 @@
+from decimal import Decimal
+from random import Random
+from unittest import TestCase
+
+import numpy as np
+
+from src.orders.delivery.location_router import TravelPlanner
+
+
+class TestTravelPlanner(TestCase):
+    def setUp(self):
+        self.start_point = {"latitude": 20.7257943, "longitude": -103.3792193}
+        random = Random(7)
+        self.locations = [
+            {
+                "id": str(index),
+                "latitude": Decimal(str(round(random.uniform(20.55, 20.76), 6))),
+                "longitude": Decimal(str(round(random.uniform(-103.45, -103.28), 6))),
+            }
+            for index in range(60)
+        ]
+
+    def test_give_a_list_of_locations_when_path_is_found_then_every_location_gets_a_sequence(
+        self,
+    ):
+        planner = TravelPlanner()
+
+        observed = planner.find_shortest_path(self.locations, self.start_point)
+
+        self.assertEqual(
+            sorted(location["id"] for location in observed),
+            sorted(location["id"] for location in self.locations),
+        )
+        self.assertEqual(
+            [location["delivery_sequence"] for location in observed],
+            list(range(1, len(self.locations) + 1)),
+        )
+
+    def test_give_a_large_day_when_route_is_optimized_then_it_is_not_longer_than_nearest_neighbour(
+        self,
+    ):
+        planner = TravelPlanner()
+        matrix = planner.build_distance_matrix([self.start_point, *self.locations])
+
+        nearest_neighbour = planner.build_nearest_neighbour_route(matrix)
+        optimized = planner.optimize_route(matrix)
+
+        self.assertEqual(optimized[0], 0)
+        self.assertEqual(sorted(optimized), list(range(len(matrix))))
+        self.assertLess(
+            planner.route_length(matrix, optimized),
+            planner.route_length(matrix, nearest_neighbour),
+        )
+
+    def test_give_no_locations_when_path_is_found_then_an_empty_path_is_returned(
+        self,
+    ):
+        self.assertEqual(TravelPlanner().find_shortest_path([], self.start_point), [])
+
+    def test_give_an_asymmetric_matrix_when_route_is_optimized_then_reversals_are_priced(
+        self,
+    ):
+        planner = TravelPlanner()
+        matrix = planner.build_distance_matrix([self.start_point, *self.locations[:20]])
+        # One-way streets, going back towards the start point takes longer
+        matrix = matrix + np.triu(matrix) * 0.5
+
+        optimized = planner.optimize_route(matrix)
+
+        self.assertLessEqual(
+            planner.route_length(matrix, optimized),
+            planner.route_length(matrix, planner.build_nearest_neighbour_route(matrix)),
+        )
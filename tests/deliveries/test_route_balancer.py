@@ -0,0 +1,55 @@
+from random import Random
+from unittest import TestCase
+
+from src.orders.delivery.delivery_modules.processors.route_balancer import (
+    RouteBalancer,
+)
+
+
+class TestRouteBalancer(TestCase):
+    def setUp(self):
+        random = Random(3)
+        self.orders = [
+            {
+                "id": str(index),
+                "delivery_date": "2024-01-08",
+                "delivery_time": "9 AM - 1 PM" if index % 3 else "1 PM - 5 PM",
+                # Most of the stops are in the south, the quadrant rule gave them to one driver
+                "latitude": random.uniform(20.55, 20.70) if index % 5 else 20.74,
+                "longitude": random.uniform(-103.45, -103.28),
+                "driver": 1,
+            }
+            for index in range(50)
+        ]
+
+    def test_give_an_uneven_day_when_drivers_are_assigned_then_stops_are_balanced_per_shift(
+        self,
+    ):
+        assigned, unassigned = RouteBalancer().assign_drivers(self.orders, [1, 2, 3])
+
+        self.assertEqual(len(assigned), 50)
+        self.assertEqual(unassigned, [])
+        for delivery_time in ("9 AM - 1 PM", "1 PM - 5 PM"):
+            counts = [
+                sum(
+                    1
+                    for order in assigned
+                    if order["driver"] == driver and order["delivery_time"] == delivery_time
+                )
+                for driver in (1, 2, 3)
+            ]
+            self.assertLessEqual(max(counts) - min(counts), 1)
+
+    def test_give_more_stops_than_capacity_when_drivers_are_assigned_then_extra_stops_are_reported(
+        self,
+    ):
+        orders = self.orders + [{"id": "no-geo", "delivery_time": "9 AM - 1 PM"}]
+
+        assigned, unassigned = RouteBalancer(shift_capacity=10).assign_drivers(
+            orders, [1, 2]
+        )
+
+        reasons = [order["reason"] for order in unassigned]
+        self.assertEqual(len(assigned), 20 + 17)
+        self.assertEqual(reasons.count(RouteBalancer.OVER_CAPACITY), 13)
+        self.assertEqual(reasons.count(RouteBalancer.MISSING_GEOLOCATION), 1)
@@ -0,0 +1,104 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+from decimal import Decimal
+
+from src.orders.delivery.delivery_modules.processors.delivery_helpers import (
+    DeliveryProcessor,
+)
+from src.orders.delivery.delivery_modules.processors.job_tracker import SchedulingJob
+from src.orders.delivery.delivery_modules.processors.order_helpers import OrderIndex
+from src.orders.delivery.delivery_modules.utils.job_queue import LocalJobQueue
+
+
+class TestLocalJobQueue(TestCase):
+    def test_give_several_jobs_when_they_are_sent_then_they_run_in_order_with_json_messages(
+        self,
+    ):
+        received = []
+        job_queue = LocalJobQueue(received.append)
+
+        job_queue.send({"job_id": "1", "request": {"driver": Decimal("2")}})
+        job_queue.send({"job_id": "2", "request": {}})
+        job_queue.join()
+
+        self.assertEqual(
+            received,
+            [{"job_id": "1", "request": {"driver": "2"}}, {"job_id": "2", "request": {}}],
+        )
+
+    def test_give_a_job_that_fails_when_it_runs_then_the_next_jobs_still_run(self):
+        received = []
+
+        def worker(message):
+            if message["job_id"] == "1":
+                raise ValueError("broken job")
+            received.append(message["job_id"])
+
+        job_queue = LocalJobQueue(worker)
+        job_queue.send({"job_id": "1"})
+        job_queue.send({"job_id": "2"})
+        job_queue.join()
+
+        self.assertEqual(received, ["2"])
+
+
+class TestSchedulingJob(TestCase):
+    def setUp(self):
+        self.job_dao = Mock()
+        self.job_dao.update_job.return_value = {"status": "success", "message": ""}
+        self.order_dao = Mock()
+        self.order_dao.bulk_update.side_effect = lambda items: {
+            "status": "success",
+            "status_code": 200,
+            "message": "Records updated in DynamoDB",
+            "payload": {"updated": len(items), "failures": []},
+        }
+
+    def test_give_a_scheduling_request_when_the_record_is_built_then_every_driver_is_pending(
+        self,
+    ):
+        record = SchedulingJob.build_record(
+            {"date": "2024-01-08", "available_drivers": [1, 2]}, "Admin", 7
+        )
+
+        self.assertEqual(record["status"], SchedulingJob.QUEUED)
+        self.assertEqual(set(record["drivers"]), {"1", "2"})
+        self.assertGreater(record["expires_at"], 0)
+
+    def test_give_a_running_job_when_drivers_are_scheduled_then_the_progress_of_each_driver_is_saved(
+        self,
+    ):
+        orders = [
+            {
+                "id": f"{driver}-{index}",
+                "delivery_date": "2024-01-08",
+                "delivery_time": "9 AM - 1 PM",
+                "driver": driver,
+                "latitude": 20.70 - index * 0.01,
+                "longitude": -103.38,
+            }
+            for driver in (1, 2)
+            for index in range(3)
+        ]
+        job = SchedulingJob("job", self.job_dao)
+        job.start([1, 2])
+
+        DeliveryProcessor().process_insertions(
+            [1, 2],
+            OrderIndex(orders, [1, 2]),
+            self.order_dao,
+            on_driver_scheduled=job.record_driver,
+        )
+        job.complete({"rewritten_orders": 6})
+
+        updates = [call.args[0] for call in self.job_dao.update_job.call_args_list]
+        self.assertEqual(updates[0]["status"], SchedulingJob.RUNNING)
+        self.assertEqual(
+            updates[1]["drivers"]["1"],
+            {"status": SchedulingJob.DRIVER_SCHEDULED, "rewritten_orders": 3},
+        )
+        self.assertEqual(
+            updates[-1]["result"], {"rewritten_orders": 6}
+        )
+        self.assertEqual(updates[-1]["status"], SchedulingJob.COMPLETED)